@@ -1,7 +1,7 @@
 from flask import Flask
 from flask_login import current_user
 from flask_login import LoginManager
-from controllers.models import db, Usuario, Rol
+from controllers.models import db, Usuario, Rol, VersionDatos
 from routes.auth import auth_bp
 from routes.main import main_bp
 from routes.admin import admin_bp
@@ -11,12 +11,45 @@ from routes.padres import padre_bp
 from routes.perfil import perfil
 from config import Config
 from extensions import init_app 
-from flask import Flask
+from services.metricas_service import init_metricas
+from services.logging_service import init_logging
+from services.perfilador_service import init_perfilador
+from services.tiempo_limite_service import init_tiempo_limite
+from services.replica_service import init_replica
+from services.arranque_service import init_arranque
+from services.compresion_service import init_compresion
+from services.condicional_service import init_condicional
+from services.json_service import init_json
+from services.estaticos_service import init_estaticos, es_recurso_con_huella
+from services.busqueda_service import init_busqueda
+from services.autocompletado_service import init_autocompletado
+from services.mantenimiento_service import init_mantenimiento
+from services.asignacion_service import init_asignaciones
+from services.horario_service import init_horarios
+from flask import Flask, request
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config.from_object(Config)
+init_logging(app)
 init_app(app)
+init_json(app)
+init_metricas(app)
+init_perfilador(app)
+init_tiempo_limite(app)
+init_replica(app)
+init_arranque(app)
+init_compresion(app)
+init_estaticos(app)
+init_condicional(app)
+init_busqueda(app)
+init_autocompletado(app)
+init_mantenimiento(app)
+init_asignaciones(app)
+init_horarios(app)
 
 app.jinja_env.globals.update(getattr=getattr)
 
@@ -33,7 +66,23 @@ def load_user(user_id):
 def create_initial_data():
     with app.app_context():
         db.create_all()
-        print("Base de datos y tablas verificadas/creadas.")
+        logger.info('Base de datos y tablas verificadas/creadas.')
+
+        from services.base_datos_service import asegurar_columnas, asegurar_indices
+        asegurar_columnas()
+        creados = asegurar_indices()
+        if creados:
+            logger.info('Índices creados: %s', ', '.join(creados))
+
+        from services.busqueda_service import indice_vacio, reconstruir_indice
+        if indice_vacio():
+            usuarios, tokens = reconstruir_indice()
+            logger.info('Índice de búsqueda de usuarios generado: %s usuarios, %s tokens.', usuarios, tokens)
+
+        from services import asignacion_service
+        if asignacion_service.indice_vacio():
+            indexadas, omitidas = asignacion_service.reconstruir_indice()
+            logger.info('Índice de asignaciones activas generado: %s asignaciones, %s omitidas.', indexadas, omitidas)
 
         roles_to_create = ['Super Admin', 'Profesor', 'Estudiante', 'Padre']
 
@@ -43,7 +92,13 @@ def create_initial_data():
                 role = Rol(nombre=role_name)
                 db.session.add(role)
                 db.session.commit()
-                print(f"Rol '{role_name}' creado.")
+                logger.info("Rol '%s' creado.", role_name)
+
+        from services.votacion_service import CLAVE_VERSION_CANDIDATOS, CLAVE_VERSION_RESULTADOS
+        for clave in (CLAVE_VERSION_CANDIDATOS, CLAVE_VERSION_RESULTADOS):
+            if not db.session.get(VersionDatos, clave):
+                db.session.add(VersionDatos(clave=clave, version=0))
+        db.session.commit()
 
         if not Usuario.query.filter_by(no_identidad='000000000').first():
             super_admin_role = Rol.query.filter_by(nombre='Super Admin').first()
@@ -65,10 +120,10 @@ def create_initial_data():
                 super_admin.set_password('admin123')
                 db.session.add(super_admin)
                 db.session.commit()
-                print(" Usuario 'Super Administrador' creado con contraseña 'admin123'.")
-                print(" Email marcado como VERIFICADO automáticamente.")
+                logger.info("Usuario 'Super Administrador' creado con contraseña 'admin123'.")
+                logger.info('Email marcado como VERIFICADO automáticamente.')
             else:
-                print(" Rol 'Super Admin' no encontrado. No se pudo crear el usuario superadmin.")
+                logger.warning("Rol 'Super Admin' no encontrado. No se pudo crear el usuario superadmin.")
         else:
             existing_admin = Usuario.query.filter_by(no_identidad='000000000').first()
             if existing_admin and not existing_admin.email_verified:
@@ -77,7 +132,7 @@ def create_initial_data():
                 existing_admin.verification_code_expires = None
                 existing_admin.verification_attempts = 0
                 db.session.commit()
-                print(" Usuario Super Administrador actualizado: email marcado como VERIFICADO.")
+                logger.info('Usuario Super Administrador actualizado: email marcado como VERIFICADO.')
 
 UPLOAD_FOLDER = os.path.join(os.getcwd(), "static", "images", "candidatos")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -90,6 +145,41 @@ app.register_blueprint(estudiante_bp)
 app.register_blueprint(padre_bp)
 app.register_blueprint(profesor_bp)
 app.register_blueprint(perfil)
+@app.after_request
+def cache_rendiciones_inmutables(response):
+    if request.endpoint == 'static' and response.status_code == 200:
+        from services.imagen_service import es_rendicion, CACHE_INMUTABLE
+        filename = request.view_args.get('filename')
+        if es_rendicion(filename) or es_recurso_con_huella(filename):
+            response.headers['Cache-Control'] = CACHE_INMUTABLE
+    return response
+
+@app.cli.command('procesar-fotos-candidatos')
+def procesar_fotos_candidatos():
+    """Genera las rendiciones de las fotos de candidatos aún sin procesar."""
+    from controllers.models import Candidato
+    from services.imagen_service import procesar_foto_candidato, es_rendicion, CARPETA_CANDIDATOS
+    from services.votacion_service import incrementar_version_candidatos
+
+    carpeta = os.path.join(app.static_folder, CARPETA_CANDIDATOS)
+    procesados = 0
+    for candidato in Candidato.query.all():
+        ruta = os.path.join(carpeta, candidato.foto or '')
+        if not candidato.foto or es_rendicion(candidato.foto) or not os.path.isfile(ruta):
+            continue
+        with open(ruta, 'rb') as original:
+            nombre, error = procesar_foto_candidato(original.read(), carpeta)
+        if error:
+            logger.warning('%s: %s', candidato.nombre, error)
+            continue
+        candidato.foto = nombre
+        procesados += 1
+
+    if procesados:
+        incrementar_version_candidatos()
+        db.session.commit()
+    logger.info('Fotos de candidatos procesadas: %s', procesados)
+
 @app.context_processor
 def inject_unread_notifications():
     try:
@@ -0,0 +1,301 @@
+"""
+Benchmark del servicio de asignación de equipos.
+
+Genera una institución sintética en una base SQLite temporal, reparte
+asignaciones activas entre los equipos en estado Asignado (varios
+estudiantes de cursos distintos por equipo) y compara:
+
+    antes:  Equipo.puede_asignar_a_curso con una consulta de Matricula por
+            asignación activa, y Usuario.get_equipos_activos filtrando en
+            Python
+    ahora:  una consulta sobre asignaciones_activas por comprobación
+
+Comprueba que:
+
+    1. reconstruir_indice() indexa todas las asignaciones activas y omite,
+       avisando, las que incumplen las reglas;
+    2. puede_asignar_a_curso y get_equipos_activos dan lo mismo que antes
+       con una consulta cada uno;
+    3. asignar_equipo() rechaza equipos ocupados y un segundo equipo en la
+       misma sala, y devolver_equipo() deja el equipo Disponible;
+    4. la base de datos rechaza las asignaciones que incumplen las reglas
+       aunque se salten las comprobaciones, también con peticiones
+       simultáneas;
+    5. asignar_curso_a_sala() asigna un curso entero con un número de
+       sentencias que no depende del número de estudiantes, y no asigna
+       nada si faltan equipos;
+    6. las rutas del profesor usan el servicio;
+    7. una matrícula nueva (promoción) o borrada mueve el curso del
+       estudiante en el índice en la misma transacción, y si con el curso
+       nuevo comparte equipo con otro estudiante de ese curso el commit no
+       falla y la asignación deja de indexarse.
+
+Uso:
+    python -m benchmarks.asignacion_equipos
+    python -m benchmarks.asignacion_equipos --estudiantes 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones, base_sqlite, sentencias_ejecutadas  # noqa: E402
+
+
+ESCALA = ['--sedes', '3', '--cursos', '12', '--anios', '2', '--dias-por-anio', '1',
+          '--notificaciones-por-usuario', '0', '--mensajes-por-usuario', '0', '--eventos-por-anio', '1',
+          '--equipos-por-sala', '100']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--estudiantes', type=int, default=600)
+    parser.add_argument('--muestras', type=int, default=300, help='comprobaciones de curso medidas')
+    args = parser.parse_args()
+
+    ruta_db = base_sqlite('asignacion', MANTENIMIENTO_PLANIFICADOR='0')
+
+    from datetime import datetime
+    from sqlalchemy import func, select
+    from sqlalchemy.exc import IntegrityError
+    from app import app, create_initial_data
+    from controllers.models import (
+        db, AsignacionActiva, AsignacionEquipo, Clase, Equipo, Matricula, Usuario
+    )
+    from services.asignacion_service import (
+        asignar_curso_a_sala, asignar_equipo, devolver_equipo, equipo_libre, reconstruir_indice
+    )
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    app.config.update(TESTING=True)
+    rnd = random.Random(7)
+    comprobar = Comprobaciones()
+
+    def medir(funcion):
+        with sentencias_ejecutadas(db.engine, excluir='version_datos') as sentencias:
+            inicio = time.perf_counter()
+            resultado = funcion()
+            duracion = (time.perf_counter() - inicio) * 1000
+        return resultado, duracion, len(sentencias)
+
+    def curso_antes(estudiante_id):
+        matricula = Matricula.query.filter_by(estudianteId=estudiante_id).order_by(Matricula.año.desc()).first()
+        return matricula.cursoId if matricula else None
+
+    def puede_asignar_antes(equipo, curso_id):
+        for asignacion in equipo.get_asignaciones_activas():
+            if curso_antes(asignacion.estudiante_id) == curso_id:
+                return False
+        return True
+
+    with app.app_context():
+        create_initial_data()
+        generador = Generador(crear_parser().parse_args(ESCALA + ['--estudiantes', str(args.estudiantes)]), 'x')
+        generador.generar()
+
+        # Curso actual de cada estudiante y asignaciones que cumplen las reglas
+        anio = db.session.execute(select(func.max(Matricula.año))).scalar()
+        cursos = dict(db.session.execute(select(Matricula.estudianteId, Matricula.cursoId)
+                                         .where(Matricula.año == anio)).all())
+        ocupados = db.session.execute(select(Equipo.id_equipo, Equipo.id_salon_fk)
+                                      .where(Equipo.estado == 'Asignado')).all()
+        filas, salas_estudiante, cursos_equipo = [], set(), set()
+        for estudiante_id in rnd.sample(sorted(cursos), len(cursos) * 2 // 3):
+            equipo_id, salon_id = rnd.choice(ocupados)
+            if (estudiante_id, salon_id) in salas_estudiante or (equipo_id, cursos[estudiante_id]) in cursos_equipo:
+                continue
+            salas_estudiante.add((estudiante_id, salon_id))
+            cursos_equipo.add((equipo_id, cursos[estudiante_id]))
+            filas.append({'equipo_id': equipo_id, 'estudiante_id': estudiante_id, 'fecha_asignacion': datetime.now(),
+                          'estado_asignacion': 'activa'})
+        generador.insertar(AsignacionEquipo.__table__, filas)
+
+        # Una asignación heredada que incumple la regla de un equipo por sala
+        salon_ocupado = dict(ocupados)[filas[0]['equipo_id']]
+        otro_equipo = next(e for e, s in ocupados if s == salon_ocupado and e != filas[0]['equipo_id'])
+        conflicto = AsignacionEquipo(equipo_id=otro_equipo, estudiante_id=filas[0]['estudiante_id'],
+                                     estado_asignacion='devuelto')
+        db.session.add(conflicto)
+        db.session.commit()
+        db.session.execute(AsignacionEquipo.__table__.update()
+                           .where(AsignacionEquipo.id_asignacion == conflicto.id_asignacion)
+                           .values(estado_asignacion='activa'))
+        db.session.commit()
+        indexadas_con_conflicto, omitidas = reconstruir_indice()
+        db.session.execute(AsignacionEquipo.__table__.delete()
+                           .where(AsignacionEquipo.id_asignacion == conflicto.id_asignacion))
+        db.session.commit()
+        (indexadas, sin_indexar), ms_indice, _ = medir(reconstruir_indice)
+        db.session.remove()
+        print(f"\n{len(cursos):,} estudiantes, {len(ocupados):,} equipos ocupados, {len(filas):,} asignaciones activas\n")
+        comprobar(f"1. índice reconstruido en {ms_indice:.0f} ms", indexadas == len(filas) and sin_indexar == 0
+                  and omitidas == 1 and indexadas_con_conflicto == len(filas), f"{indexadas:,} indexadas")
+
+        # 2. Comprobaciones por curso y equipos de un estudiante
+        ids_curso = sorted(set(cursos.values()))
+        muestras = [(rnd.choice(ocupados)[0], rnd.choice(ids_curso)) for _ in range(args.muestras)]
+        equipos = {e.id_equipo: e for e in Equipo.query.filter(Equipo.id_equipo.in_({m[0] for m in muestras}))}
+        antes, ms_antes, consultas_antes = medir(lambda: [puede_asignar_antes(equipos[e], c) for e, c in muestras])
+        ahora, ms_ahora, consultas_ahora = medir(lambda: [equipos[e].puede_asignar_a_curso(c) for e, c in muestras])
+        print(f"{'método':<8} {'ms':>8} {'consultas':>10}   ({len(muestras)} comprobaciones de curso)")
+        print(f"{'antes':<8} {ms_antes:>8.1f} {consultas_antes:>10,}")
+        print(f"{'ahora':<8} {ms_ahora:>8.1f} {consultas_ahora:>10,}\n")
+        con_equipo = [f['estudiante_id'] for f in filas[:50]]
+        estudiantes = Usuario.query.filter(Usuario.id_usuario.in_(con_equipo)).all()
+        esperados = {u.id_usuario: sorted(a.equipo_id for a in u.equipos_asignados if a.estado_asignacion == 'activa')
+                     for u in estudiantes}
+        obtenidos, _, consultas_equipos = medir(lambda: {u.id_usuario: sorted(e.id_equipo for e in u.get_equipos_activos())
+                                                         for u in estudiantes})
+        comprobar('2. mismas respuestas con una consulta por comprobación',
+                  antes == ahora and consultas_ahora == len(muestras) and obtenidos == esperados
+                  and consultas_equipos == len(estudiantes),
+                  f"{antes.count(False)} cursos ocupados; {consultas_ahora} y {consultas_equipos} consultas")
+        db.session.remove()
+
+        # 3. Asignación individual y devolución
+        estudiante_id = filas[0]['estudiante_id']
+        libres = db.session.execute(select(Equipo.id_equipo).where(
+            Equipo.id_salon_fk == salon_ocupado, Equipo.estado == 'Disponible')).scalars().all()
+        _, error_sala = asignar_equipo(libres[0], estudiante_id)
+        _, error_ocupado = asignar_equipo(filas[0]['equipo_id'], filas[1]['estudiante_id'])
+        sin_equipo = next(e for e in sorted(cursos) if (e, salon_ocupado) not in salas_estudiante)
+        (asignacion, error), _, consultas_asignar = medir(lambda: asignar_equipo(libres[0], sin_equipo, 'prueba'))
+        asignado = db.session.get(Equipo, libres[0]).estado == 'Asignado' and not equipo_libre(libres[0])
+        equipo, error_devolver = devolver_equipo(libres[0], sin_equipo)
+        comprobar('3. asignar y devolver', bool(error_sala) and 'sala' in error_sala and bool(error_ocupado)
+                  and not error and asignado and not error_devolver and equipo.estado == 'Disponible'
+                  and equipo_libre(libres[0]), f"{consultas_asignar} sentencias por asignación")
+        db.session.remove()
+
+        # 4. Restricciones en la base de datos
+        rechazos = 0
+        for valores in ({'equipo_id': libres[1], 'estudiante_id': estudiante_id},
+                        {'equipo_id': filas[0]['equipo_id'], 'estudiante_id': next(
+                            e for e in sorted(cursos) if cursos[e] == cursos[estudiante_id] and e != estudiante_id
+                            and (e, salon_ocupado) not in salas_estudiante)}):
+            db.session.add(AsignacionEquipo(estado_asignacion='activa', **valores))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                rechazos += 1
+            db.session.rollback()
+        db.session.remove()
+
+    resultados = []
+
+    def asignar_en_paralelo(equipo_id):
+        with app.app_context():
+            resultados.append(asignar_equipo(equipo_id, sin_equipo)[1] is None)
+            db.session.remove()
+
+    hilos = [threading.Thread(target=asignar_en_paralelo, args=(e,)) for e in libres[2:10]]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    comprobar('4. la base de datos impone las reglas', rechazos == 2 and resultados.count(True) == 1,
+              f"{rechazos} inserciones directas rechazadas, {resultados.count(True)} de {len(resultados)} "
+              f"asignaciones simultáneas aceptadas")
+
+    with app.app_context():
+        # 5. Un curso entero a una sala libre
+        tamanos = dict(db.session.execute(select(Matricula.cursoId, func.count())
+                                          .where(Matricula.año == anio).group_by(Matricula.cursoId)).all())
+        disponibles = dict(db.session.execute(
+            select(Equipo.id_salon_fk, func.count()).where(
+                Equipo.estado == 'Disponible', Equipo.id_equipo.not_in(select(AsignacionActiva.equipo_id)))
+            .group_by(Equipo.id_salon_fk)).all())
+        salon_id = max(disponibles, key=disponibles.get)
+        curso_pequeno = min((c for c in tamanos if tamanos[c] <= disponibles[salon_id]), key=tamanos.get)
+        curso_grande = max((c for c in tamanos if c != curso_pequeno), key=tamanos.get)
+        ya = db.session.execute(select(func.count()).select_from(AsignacionActiva).join(
+            Matricula, (Matricula.estudianteId == AsignacionActiva.estudiante_id) & (Matricula.año == anio))
+            .where(AsignacionActiva.salon_id == salon_id, Matricula.cursoId == curso_pequeno)).scalar()
+        (resultado, error), ms_curso, sentencias_curso = medir(lambda: asignar_curso_a_sala(curso_pequeno, salon_id))
+        en_sala = db.session.execute(select(func.count()).select_from(AsignacionActiva).where(
+            AsignacionActiva.salon_id == salon_id, AsignacionActiva.curso_id == curso_pequeno)).scalar()
+        (repetido, _), _, _ = medir(lambda: asignar_curso_a_sala(curso_pequeno, salon_id))
+        activas = db.session.execute(select(func.count()).select_from(AsignacionActiva)).scalar()
+        # Quedan disponibles[salon_id] - asignados equipos libres en la sala
+        (_, error_pocos), _, _ = medir(lambda: asignar_curso_a_sala(curso_grande, salon_id))
+        sin_cambios = db.session.execute(select(func.count()).select_from(AsignacionActiva)).scalar() == activas
+        comprobar(f"5. curso de {tamanos[curso_pequeno]} estudiantes a una sala en {ms_curso:.0f} ms",
+                  not error and resultado['asignados'] + resultado['ya_asignados'] == tamanos[curso_pequeno]
+                  and resultado['ya_asignados'] == ya and en_sala == tamanos[curso_pequeno]
+                  and sentencias_curso <= 8 and repetido['asignados'] == 0
+                  and bool(error_pocos) and sin_cambios,
+                  f"{sentencias_curso} sentencias; sin equipos suficientes: {error_pocos}")
+
+        clase = db.session.execute(select(Clase.profesorId, Clase.cursoId).where(Clase.cursoId != curso_pequeno)).first()
+        libre = db.session.execute(select(Matricula.estudianteId).where(
+            Matricula.estudianteId.not_in(select(AsignacionActiva.estudiante_id))).limit(1)).scalar()
+        db.session.remove()
+
+    cliente = app.test_client()
+    with cliente.session_transaction() as s:
+        s['_user_id'] = str(clase.profesorId)
+        s['_fresh'] = True
+    disponibles_ruta = cliente.get(f'/profesor/api/equipos-disponibles?salon_id={salon_id}').get_json()
+    estudiantes_ruta = cliente.get(f'/profesor/api/estudiantes-curso/{curso_pequeno}').get_json()
+    masiva = cliente.post('/profesor/api/asignar-curso-sala', json={'curso_id': clase.cursoId, 'salon_id': salon_id})
+    ajena = cliente.post('/profesor/api/asignar-curso-sala', json={'curso_id': curso_pequeno, 'salon_id': salon_id})
+    equipo_ruta = disponibles_ruta['equipos'][0]['id_equipo'] if disponibles_ruta.get('equipos') else None
+    individual = cliente.post('/profesor/api/asignar-equipo', json={'estudiante_id': libre, 'equipo_id': equipo_ruta})
+    comprobar('6. rutas del profesor', disponibles_ruta['success'] and estudiantes_ruta['success']
+              and sum(e['total_equipos'] for e in estudiantes_ruta['estudiantes']) >= tamanos[curso_pequeno]
+              and masiva.status_code in (200, 400) and ajena.status_code == 403 and individual.status_code == 200,
+              f"asignar-curso-sala: {masiva.get_json().get('message') or masiva.get_json().get('error')}")
+
+    with app.app_context():
+        # 7. El índice sigue a las matrículas
+        def curso_indexado(estudiante_id):
+            return db.session.execute(select(AsignacionActiva.curso_id)
+                                      .where(AsignacionActiva.estudiante_id == estudiante_id)).scalars().all()
+
+        ocupacion = {(f['equipo_id'], cursos[f['estudiante_id']]) for f in filas}
+        promovido, equipo_id = next((f['estudiante_id'], f['equipo_id']) for f in filas[2:]
+                                    if len(curso_indexado(f['estudiante_id'])) == 1)
+        curso_origen = cursos[promovido]
+        curso_nuevo = next(c for c in ids_curso if c != curso_origen and (equipo_id, c) not in ocupacion)
+        equipo = db.session.get(Equipo, equipo_id)
+        antes_destino = equipo.puede_asignar_a_curso(curso_nuevo)
+        matricula = Matricula(estudianteId=promovido, cursoId=curso_nuevo, año=anio + 1)
+        db.session.add(matricula)
+        db.session.commit()
+        promocion = (curso_indexado(promovido) == [curso_nuevo] and antes_destino
+                     and not equipo.puede_asignar_a_curso(curso_nuevo) and equipo.puede_asignar_a_curso(curso_origen))
+        db.session.delete(matricula)
+        db.session.commit()
+        baja = curso_indexado(promovido) == [curso_origen] and equipo.puede_asignar_a_curso(curso_nuevo)
+
+        # Dos estudiantes de cursos distintos en el mismo equipo; uno pasa al curso del otro
+        comparten = {}
+        for f in filas:
+            comparten.setdefault(f['equipo_id'], []).append(f['estudiante_id'])
+        anterior, pasa = next(e for e in comparten.values() if len(e) >= 2 and promovido not in e)[:2]
+        indexadas = db.session.execute(select(func.count()).select_from(AsignacionActiva)).scalar()
+        db.session.add(Matricula(estudianteId=pasa, cursoId=cursos[anterior], año=anio + 1))
+        try:
+            db.session.commit()
+            confirmado = True
+        except IntegrityError:
+            db.session.rollback()
+            confirmado = False
+        restantes = db.session.execute(select(func.count()).select_from(AsignacionActiva)).scalar()
+        comprobar('7. el índice sigue a las matrículas', promocion and baja and confirmado
+                  and curso_indexado(anterior) == [cursos[anterior]] and restantes == indexadas - 1,
+                  f"promoción {promocion}, baja {baja}, conflicto confirmado {confirmado}, "
+                  f"{indexadas - restantes} asignación sin indexar")
+        db.session.remove()
+
+    os.remove(ruta_db)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
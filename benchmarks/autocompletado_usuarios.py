@@ -0,0 +1,142 @@
+"""
+Benchmark del autocompletado de destinatarios en memoria.
+
+Crea N usuarios sintéticos en una base SQLite temporal y compara, pulsación
+a pulsación, la búsqueda en el índice en memoria (autocompletar) con la
+consulta SQL de busqueda_service. Mide con tracemalloc la memoria del
+índice y comprueba que:
+
+    1. el hilo de fondo construye el índice al arrancar;
+    2. las búsquedas no ejecutan ninguna sentencia SQL;
+    3. editar, desactivar y crear usuarios con el ORM se refleja tras un refresco;
+    4. /admin/api/usuarios/buscar responde desde el índice.
+
+Uso:
+    python -m benchmarks.autocompletado_usuarios
+    python -m benchmarks.autocompletado_usuarios --usuarios 50000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones, base_sqlite, sentencias_ejecutadas  # noqa: E402
+
+
+BUSQUEDAS = ['José Pérez', 'maria gomez', 'Rodríguez', 'est1234@bench', 'ana lu', 'padre6']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--usuarios', type=int, default=20000)
+    args = parser.parse_args()
+
+    ruta_db = base_sqlite('autocompletado', AUTOCOMPLETADO_INTERVALO='0.2')
+
+    from app import app, create_initial_data
+    from controllers.models import db, Rol, Usuario
+    from services import autocompletado_service
+    from services.autocompletado_service import (
+        IndiceAutocompletado, _cargar_usuarios, autocompletar, iniciar_autocompletado, refrescar
+    )
+    from services.busqueda_service import buscar_usuarios
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    app.config.update(TESTING=True)
+    with app.app_context():
+        create_initial_data()
+        roles = {r.nombre: r.id_rol for r in Rol.query.all()}
+        generador = Generador(crear_parser().parse_args([]), 'x')
+        cuarto = args.usuarios // 4
+        generador.insertar(Usuario.__table__, generador.usuarios(1000, cuarto, roles['Profesor'], 'prof', 7000000000))
+        generador.insertar(Usuario.__table__, generador.usuarios(10000, cuarto * 2, roles['Estudiante'], 'est', 1000000000))
+        generador.insertar(Usuario.__table__, generador.usuarios(60000, cuarto, roles['Padre'], 'padre', 3000000000))
+
+        tracemalloc.start()
+        antes = tracemalloc.take_snapshot()
+        indice = IndiceAutocompletado(_cargar_usuarios())
+        memoria = tracemalloc.take_snapshot().compare_to(antes, 'filename')
+        tracemalloc.stop()
+        total = sum(d.size_diff for d in memoria)
+        arrays = sys.getsizeof(indice.tokens) + sys.getsizeof(indice.ids)
+        print(f"\nÍndice: {len(indice.usuarios):,} usuarios, {len(indice.tokens):,} palabras, "
+              f"{total / 2 ** 20:.1f} MB (lista de palabras + ids: {arrays / 2 ** 20:.1f} MB)")
+        del indice
+        db.session.remove()
+
+    comprobar = Comprobaciones()
+
+    iniciar_autocompletado(app)
+    inicio = time.perf_counter()
+    while autocompletado_service._estado['indice'] is None and time.perf_counter() - inicio < 60:
+        time.sleep(0.05)
+    comprobar('1. el hilo de fondo construye el índice', autocompletado_service._estado['indice'] is not None,
+              f"{time.perf_counter() - inicio:.1f} s")
+
+    with app.app_context():
+        with sentencias_ejecutadas(db.engine) as sentencias:
+
+            tiempos = {'sql': [], 'memoria': []}
+            for busqueda in BUSQUEDAS:
+                for fin in range(2, len(busqueda) + 1):
+                    texto = busqueda[:fin]
+                    for nombre, funcion in (('sql', lambda t: buscar_usuarios(t, solo_activos=True)),
+                                            ('memoria', autocompletar)):
+                        inicio = time.perf_counter()
+                        funcion(texto)
+                        tiempos[nombre].append((time.perf_counter() - inicio) * 1000)
+                    db.session.remove()
+
+            consultas_sql = len(sentencias)
+            sentencias.clear()
+            for busqueda in BUSQUEDAS:
+                for fin in range(2, len(busqueda) + 1):
+                    autocompletar(busqueda[:fin])
+
+        print(f"\n{len(tiempos['sql'])} pulsaciones sobre {args.usuarios:,} usuarios\n")
+        print(f"{'método':<10} {'p50 ms':>9} {'p95 ms':>9} {'máx ms':>9}")
+        for nombre, valores in tiempos.items():
+            p95 = statistics.quantiles(valores, n=20)[-1]
+            print(f"{nombre:<10} {statistics.median(valores):>9.3f} {p95:>9.3f} {max(valores):>9.3f}")
+        print()
+        comprobar('2. sin SQL en las búsquedas', not sentencias,
+                  f"{consultas_sql} sentencias con SQL, {len(sentencias)} en memoria")
+
+        autocompletado_service._estado['pid'] = None  # el hilo no interfiere con los refrescos manuales
+        usuario = db.session.get(Usuario, 1000)
+        usuario.nombre, usuario.apellido = 'Íñigo', 'Peñalosa'
+        otro = db.session.get(Usuario, 1001)
+        otro.estado_cuenta = 'inactiva'
+        correo_inactivo = otro.correo
+        db.session.add(Usuario(tipo_doc='CC', no_identidad='99999999', nombre='Zoe', apellido='Ñúñez',
+                               correo='zoe.nunez@ejemplo.com', password_hash='x', id_rol_fk=roles['Padre']))
+        db.session.commit()
+        db.session.remove()
+        time.sleep(0.5)
+        with app.app_context():
+            refrescar()
+            db.session.remove()
+        comprobar('3. edición, baja y alta reflejadas',
+                  [u.id_usuario for u in autocompletar('inigo penal')] == [1000]
+                  and not any(u.id_usuario == 1001 for u in autocompletar(correo_inactivo))
+                  and [u.correo for u in autocompletar('nunez zo')] == ['zoe.nunez@ejemplo.com'])
+
+    cliente = app.test_client()
+    with cliente.session_transaction() as s:
+        s['_user_id'] = '1'
+        s['_fresh'] = True
+    respuesta = cliente.get('/admin/api/usuarios/buscar?q=Íñigo')
+    comprobar('4. /admin/api/usuarios/buscar', respuesta.status_code == 200
+              and [u['id'] for u in respuesta.get_json()] == [1000], respuesta.get_data(as_text=True)[:120])
+
+    os.remove(ruta_db)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark de generación de boletines en PDF.
+
+Genera N boletines sintéticos con distintos tamaños de pool de procesos y
+muestra el rendimiento (boletines por segundo) para comprobar que escala con
+los núcleos disponibles.
+
+Uso:
+    python -m benchmarks.bench_boletines --boletines 2000
+    python -m benchmarks.bench_boletines --boletines 2000 --procesos 1 2 4 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.boletin_service import generar_boletines  # noqa: E402
+
+
+ASIGNATURAS = [
+    'Matemáticas', 'Lengua Castellana', 'Ciencias Naturales', 'Ciencias Sociales',
+    'Inglés', 'Educación Física', 'Artística', 'Tecnología e Informática', 'Ética', 'Religión'
+]
+CATEGORIAS = [('Evaluaciones', 40.0), ('Tareas', 30.0), ('Participación', 30.0)]
+
+
+def datos_sinteticos(total, semilla=42):
+    rnd = random.Random(semilla)
+    datos = []
+    for i in range(total):
+        asignaturas = []
+        for nombre in ASIGNATURAS:
+            categorias = [
+                {'nombre': c, 'porcentaje': p, 'promedio': round(rnd.uniform(30, 100), 2), 'cantidad': rnd.randint(1, 8)}
+                for c, p in CATEGORIAS
+            ]
+            promedio = round(sum(c['promedio'] * c['porcentaje'] for c in categorias) / 100, 2)
+            asignaturas.append({
+                'nombre': nombre,
+                'categorias': categorias,
+                'promedio': promedio,
+                'estado': 'Aprobado' if promedio >= 60 else 'Reprobado'
+            })
+        total_asistencia = rnd.randint(150, 200)
+        presentes = total_asistencia - rnd.randint(0, 20)
+        datos.append({
+            'periodo': {'nombre': 'Primer Periodo', 'ciclo': 'Año Escolar 2026',
+                        'fecha_inicio': '2026-01-20', 'fecha_fin': '2026-04-10'},
+            'estudiante': {'id': i, 'documento': f"{1000000000 + i}", 'nombre': f"Apellido{i} Nombre{i}"},
+            'curso': {'id': i // 40, 'nombre': f"Curso {i // 40:03d}", 'sede': 'Sede Principal'},
+            'asignaturas': asignaturas,
+            'promedio_general': round(sum(a['promedio'] for a in asignaturas) / len(asignaturas), 2),
+            'nota_aprobacion': 60.0,
+            'asistencia': {'total': total_asistencia, 'presentes': presentes,
+                           'ausencias': total_asistencia - presentes, 'excusas': rnd.randint(0, 5)}
+        })
+    return datos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--boletines', type=int, default=2000)
+    parser.add_argument('--procesos', type=int, nargs='+')
+    parser.add_argument('--por-curso', action='store_true')
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    procesos = args.procesos or sorted({1, 2, 4, nucleos} & set(range(1, nucleos + 1))) or [1]
+    datos = datos_sinteticos(args.boletines)
+
+    print(f"Boletines: {args.boletines} | núcleos: {nucleos}")
+    print(f"{'procesos':>8} {'segundos':>9} {'boletines/s':>12} {'aceleración':>12}")
+
+    base = None
+    for n in procesos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            inicio = time.perf_counter()
+            archivos = generar_boletines(datos, carpeta, procesos=n, por_curso=args.por_curso)
+            duracion = time.perf_counter() - inicio
+            tamano = sum(os.path.getsize(os.path.join(carpeta, a)) for a in archivos)
+
+        base = base or duracion
+        print(f"{n:>8} {duracion:>9.2f} {args.boletines / duracion:>12.1f} {base / duracion:>11.2f}x"
+              f"  ({len(archivos)} zip, {tamano / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,514 @@
+"""
+Prueba de carga con sesiones concurrentes por rol contra una instancia local.
+
+Cada usuario virtual es una corrutina asyncio con su propia conexión HTTP
+keep-alive y su cookie de sesión: inicia sesión con el formulario real (con
+token CSRF) y repite el escenario de su rol con tiempos de espera aleatorios.
+Las mezclas reproducen los picos conocidos: inicio de periodo, cierre de
+notas y jornada electoral.
+
+Se informa por escenario el rendimiento (peticiones/s), los percentiles de
+latencia, la tasa de errores y las sentencias SQL por petición y por segundo;
+estas últimas se obtienen de la diferencia de /metrics antes y después de la
+prueba (acentrax_sql_statements_per_request). Con --salida se guarda el
+resultado y con --comparar se marca como regresión una caída del rendimiento
+o una subida del p95 mayor que --umbral.
+
+Los escenarios escriben en la base de datos (votos, asistencia, notas): úsese
+una base de datos desechable poblada con benchmarks.datos_sinteticos.
+
+Uso:
+    python -m benchmarks.datos_sinteticos --db sqlite:////tmp/acentrax_bench.db --reiniciar
+    MYSQL_URL=sqlite:////tmp/acentrax_bench.db gunicorn -w 4 -b 127.0.0.1:8000 app:app
+    python -m benchmarks.bench_carga --db sqlite:////tmp/acentrax_bench.db --mezcla eleccion --usuarios 200
+    python -m benchmarks.bench_carga --db ... --mezcla cierre --duracion 120 --comparar antes.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Peso de cada escenario en cada mezcla de tráfico
+MEZCLAS = {
+    'inicio': {'estudiante_notas': 45, 'padre_panel': 30, 'profesor_registro': 15, 'admin_directorios': 10},
+    'cierre': {'profesor_registro': 45, 'estudiante_notas': 25, 'padre_panel': 25, 'admin_directorios': 5},
+    'eleccion': {'estudiante_votacion': 70, 'estudiante_notas': 10, 'padre_panel': 10, 'profesor_registro': 10},
+}
+
+RE_CSRF = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+RE_METRICA = re.compile(r'^acentrax_sql_statements_per_request_(sum|count)\{endpoint="([^"]*)"\} (\S+)$')
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    k = (len(ordenados) - 1) * p / 100
+    inferior = int(k)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (k - inferior)
+
+
+# =========================================================
+#  CLIENTE HTTP/1.1 MÍNIMO SOBRE ASYNCIO
+# =========================================================
+
+class ErrorHTTP(Exception):
+    pass
+
+
+class ClienteHTTP:
+    """Una conexión keep-alive (se reabre si el servidor la cierra) con cookies."""
+
+    def __init__(self, host, puerto, tiempo_limite):
+        self.host = host
+        self.puerto = puerto
+        self.tiempo_limite = tiempo_limite
+        self.cookies = {}
+        self.lector = None
+        self.escritor = None
+
+    async def cerrar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            try:
+                await self.escritor.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self.lector = self.escritor = None
+
+    async def _leer_respuesta(self):
+        linea = await self.lector.readline()
+        if not linea:
+            raise ErrorHTTP('conexión cerrada por el servidor')
+        version, estado = linea.split(b' ', 2)[:2]
+        cabeceras = {}
+        while True:
+            linea = await self.lector.readline()
+            if linea in (b'\r\n', b'\n', b''):
+                break
+            nombre, valor = linea.decode('latin-1').split(':', 1)
+            nombre, valor = nombre.strip().lower(), valor.strip()
+            if nombre == 'set-cookie':
+                par = valor.split(';', 1)[0]
+                clave, _, dato = par.partition('=')
+                if dato:
+                    self.cookies[clave] = dato
+                else:
+                    self.cookies.pop(clave, None)
+            cabeceras[nombre] = valor
+
+        if cabeceras.get('transfer-encoding', '').lower() == 'chunked':
+            partes = []
+            while True:
+                tamano = int((await self.lector.readline()).split(b';')[0], 16)
+                if tamano == 0:
+                    await self.lector.readline()
+                    break
+                partes.append(await self.lector.readexactly(tamano))
+                await self.lector.readline()
+            cuerpo = b''.join(partes)
+        elif 'content-length' in cabeceras:
+            cuerpo = await self.lector.readexactly(int(cabeceras['content-length']))
+        else:
+            cuerpo = await self.lector.read()
+
+        if version == b'HTTP/1.0' or cabeceras.get('connection', '').lower() == 'close' \
+                or 'content-length' not in cabeceras and 'transfer-encoding' not in cabeceras:
+            await self.cerrar()
+        return int(estado), cabeceras, cuerpo
+
+    async def solicitar(self, metodo, ruta, json_cuerpo=None, formulario=None, cabeceras_extra=None):
+        cuerpo = b''
+        cabeceras = {'Host': f"{self.host}:{self.puerto}", 'Connection': 'keep-alive', 'Accept': '*/*'}
+        if json_cuerpo is not None:
+            cuerpo = json.dumps(json_cuerpo).encode()
+            cabeceras['Content-Type'] = 'application/json'
+        elif formulario is not None:
+            cuerpo = urlencode(formulario).encode()
+            cabeceras['Content-Type'] = 'application/x-www-form-urlencoded'
+        if cuerpo or metodo in ('POST', 'PUT'):
+            cabeceras['Content-Length'] = str(len(cuerpo))
+        if self.cookies:
+            cabeceras['Cookie'] = '; '.join(f"{k}={v}" for k, v in self.cookies.items())
+        cabeceras.update(cabeceras_extra or {})
+        peticion = (f"{metodo} {ruta} HTTP/1.1\r\n"
+                    + ''.join(f"{k}: {v}\r\n" for k, v in cabeceras.items()) + "\r\n").encode() + cuerpo
+
+        for intento in range(2):
+            reutilizada = self.escritor is not None
+            if not reutilizada:
+                self.lector, self.escritor = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.puerto), self.tiempo_limite)
+            try:
+                self.escritor.write(peticion)
+                await self.escritor.drain()
+                return await asyncio.wait_for(self._leer_respuesta(), self.tiempo_limite)
+            except (ErrorHTTP, ConnectionError, asyncio.IncompleteReadError) as e:
+                await self.cerrar()
+                # Una conexión keep-alive caducada se reintenta una vez con una nueva.
+                if not reutilizada or intento:
+                    raise ErrorHTTP(str(e)) from e
+            except asyncio.TimeoutError:
+                await self.cerrar()
+                raise
+
+
+# =========================================================
+#  USUARIOS VIRTUALES Y ESCENARIOS
+# =========================================================
+
+class Prueba:
+    def __init__(self, args, cuentas):
+        url = urlsplit(args.url)
+        self.host = url.hostname
+        self.puerto = url.port or 80
+        self.args = args
+        self.cuentas = cuentas
+        self.votantes = list(cuentas['votantes'])
+        self.fin = 0.0
+        self.rnd = random.Random(args.semilla)
+        # escenario -> lista de (latencia_ms, error); escenario -> endpoint -> peticiones
+        self.muestras = defaultdict(list)
+        self.endpoints = defaultdict(lambda: defaultdict(int))
+
+    def cliente(self):
+        return ClienteHTTP(self.host, self.puerto, self.args.tiempo_limite)
+
+    async def pedir(self, cliente, escenario, endpoint, metodo, ruta, esperado=(200,), **kwargs):
+        inicio = time.perf_counter()
+        try:
+            estado, _, cuerpo = await cliente.solicitar(metodo, ruta, **kwargs)
+            error = estado not in esperado
+        except (ErrorHTTP, OSError, asyncio.TimeoutError):
+            estado, cuerpo, error = 0, b'', True
+        if time.monotonic() <= self.fin:
+            self.muestras[escenario].append(((time.perf_counter() - inicio) * 1000, error))
+            self.endpoints[escenario][endpoint] += 1
+        return estado, cuerpo
+
+    async def iniciar_sesion(self, cliente, escenario, correo, password):
+        cliente.cookies.clear()
+        _, html = await self.pedir(cliente, escenario, 'auth.login', 'GET', '/login')
+        token = RE_CSRF.search(html.decode('utf-8', 'replace'))
+        formulario = {'correo': correo, 'password': password}
+        if token:
+            formulario['csrf_token'] = token.group(1)
+        estado, _ = await self.pedir(cliente, escenario, 'auth.login', 'POST', '/login',
+                                     esperado=(302,), formulario=formulario)
+        return estado == 302
+
+    async def pausa(self):
+        await asyncio.sleep(self.rnd.uniform(0, 2 * self.args.espera))
+
+    # -----------------------------------------------------
+
+    async def estudiante_votacion(self, cliente):
+        if not self.votantes:
+            await self.estudiante_notas(cliente)
+            return
+        estudiante_id, correo = self.votantes.pop()
+        e = 'estudiante_votacion'
+        if not await self.iniciar_sesion(cliente, e, correo, self.args.password):
+            return
+        await self.pedir(cliente, e, 'estudiante.eleccion_electoral', 'GET', '/estudiante/eleccion')
+        _, cuerpo = await self.pedir(cliente, e, 'estudiante.listar_candidatos', 'GET', '/estudiante/candidatos')
+        await self.pausa()
+        try:
+            candidatos = json.loads(cuerpo)
+            votos = {cat: lista[self.rnd.randrange(len(lista))]['id'] for cat, lista in candidatos.items() if lista}
+        except (ValueError, KeyError, TypeError):
+            return
+        await self.pedir(cliente, e, 'estudiante.votar', 'POST', '/estudiante/votar', esperado=(201,),
+                         json_cuerpo={'estudiante_id': estudiante_id, 'votos': votos})
+
+    async def estudiante_notas(self, cliente):
+        e = 'estudiante_notas'
+        _, correo = self.rnd.choice(self.cuentas['estudiantes'])
+        if not await self.iniciar_sesion(cliente, e, correo, self.args.password):
+            return
+        await self.pedir(cliente, e, 'estudiante.estudiante_panel', 'GET', '/estudiante/dashboard')
+        await self.pausa()
+        await self.pedir(cliente, e, 'estudiante.ver_calificaciones', 'GET', '/estudiante/calificaciones')
+        await self.pausa()
+        await self.pedir(cliente, e, 'estudiante.api_obtener_notificaciones', 'GET', '/estudiante/api/notificaciones')
+
+    async def profesor_registro(self, cliente):
+        e = 'profesor_registro'
+        profesor = self.rnd.choice(self.cuentas['profesores'])
+        if not await self.iniciar_sesion(cliente, e, profesor['correo'], self.args.password):
+            return
+        await self.pedir(cliente, e, 'profesor.api_seleccionar_curso_asignatura', 'POST',
+                         '/profesor/api/seleccionar-curso-asignatura',
+                         json_cuerpo={'curso_id': profesor['curso'], 'asignatura_id': profesor['asignatura']})
+        await self.pedir(cliente, e, 'profesor.dashboard', 'GET', '/profesor/dashboard')
+        await self.pausa()
+        await self.pedir(cliente, e, 'profesor.api_guardar_asistencia', 'POST', '/profesor/api/guardar-asistencia',
+                         json_cuerpo={'fecha': date.today().isoformat(), 'asistencias': [
+                             {'estudiante_id': est, 'estado': self.rnd.choices(['presente', 'ausente', 'tarde'], [90, 6, 4])[0],
+                              'excusa': False}
+                             for est in profesor['estudiantes']
+                         ]})
+        for estudiante_id in self.rnd.sample(profesor['estudiantes'], min(5, len(profesor['estudiantes']))):
+            await self.pausa()
+            await self.pedir(cliente, e, 'profesor.guardar_calificacion', 'POST', '/profesor/api/guardar-calificacion',
+                             json_cuerpo={'estudiante_id': estudiante_id, 'asignatura_id': profesor['asignatura'],
+                                          'categoria_id': profesor['categoria'], 'valor': self.rnd.randint(30, 100),
+                                          'nombre_calificacion': 'Carga'})
+
+    async def padre_panel(self, cliente):
+        e = 'padre_panel'
+        if not await self.iniciar_sesion(cliente, e, self.rnd.choice(self.cuentas['padres']), self.args.password):
+            return
+        # Un padre deja el panel abierto y el navegador sondea el contador.
+        for _ in range(3):
+            await self.pedir(cliente, e, 'padre.dashboard', 'GET', '/padre/dashboard')
+            await self.pausa()
+            await self.pedir(cliente, e, 'padre.api_contador_notificaciones', 'GET', '/padre/api/notificaciones/contador')
+            await self.pausa()
+
+    async def admin_directorios(self, cliente):
+        e = 'admin_directorios'
+        if not await self.iniciar_sesion(cliente, e, self.args.admin_correo, self.args.admin_password):
+            return
+        for endpoint, ruta in (('admin.api_estudiantes', '/admin/api/estudiantes'),
+                               ('admin.api_profesores', '/admin/api/profesores'),
+                               ('admin.api_padres', '/admin/api/padres')):
+            await self.pedir(cliente, e, endpoint, 'GET', ruta)
+            await self.pausa()
+
+    async def usuario_virtual(self, escenario, retraso):
+        await asyncio.sleep(retraso)
+        cliente = self.cliente()
+        try:
+            while time.monotonic() < self.fin:
+                await getattr(self, escenario)(cliente)
+        finally:
+            await cliente.cerrar()
+
+
+# =========================================================
+#  CUENTAS Y MÉTRICAS DEL SERVIDOR
+# =========================================================
+
+def cargar_cuentas(db_url, maximo):
+    """Lee de la base de datos poblada las cuentas sintéticas y los cursos de cada profesor."""
+    from sqlalchemy import create_engine, text
+
+    motor = create_engine(db_url)
+    with motor.connect() as conexion:
+        def filas(sql, **parametros):
+            return conexion.execute(text(sql), parametros).all()
+
+        anio = conexion.execute(text('SELECT MAX(año) FROM matricula')).scalar()
+        dominio = '%@bench.acentrax.edu.co'
+        estudiantes = filas('SELECT id_usuario, correo FROM usuarios WHERE id_rol_fk = 3 AND correo LIKE :d '
+                            'ORDER BY id_usuario LIMIT :m', d=dominio, m=maximo)
+        votantes = filas('SELECT id_usuario, correo FROM usuarios WHERE id_rol_fk = 3 AND correo LIKE :d '
+                         'AND (voto_registrado = :f OR voto_registrado IS NULL) ORDER BY id_usuario DESC LIMIT :m',
+                         d=dominio, f=False, m=maximo * 10)
+        padres = [r[0] for r in filas('SELECT correo FROM usuarios WHERE id_rol_fk = 4 AND correo LIKE :d LIMIT :m',
+                                      d=dominio, m=maximo)]
+        categoria = conexion.execute(text('SELECT MIN(id_categoria) FROM categoria_calificacion')).scalar()
+
+        profesores = []
+        for clase_id, profesor_id, correo, curso_id, asignatura_id in filas(
+                'SELECT c.id_clase, c.profesorId, u.correo, c.cursoId, c.asignaturaId FROM clase c '
+                'JOIN usuarios u ON u.id_usuario = c.profesorId WHERE u.correo LIKE :d ORDER BY c.id_clase LIMIT :m',
+                d=dominio, m=maximo):
+            alumnos = [r[0] for r in filas('SELECT estudianteId FROM matricula WHERE cursoId = :c AND año = :a',
+                                           c=curso_id, a=anio)]
+            if alumnos:
+                profesores.append({'correo': correo, 'curso': curso_id, 'asignatura': asignatura_id,
+                                   'categoria': categoria, 'estudiantes': alumnos})
+    motor.dispose()
+
+    if not (estudiantes and padres and profesores):
+        sys.exit('No hay cuentas sintéticas en la base de datos; ejecute primero benchmarks.datos_sinteticos')
+    return {'estudiantes': [tuple(r) for r in estudiantes], 'votantes': [tuple(r) for r in votantes],
+            'padres': padres, 'profesores': profesores}
+
+
+async def leer_metricas(prueba):
+    """Devuelve {endpoint: (suma_sentencias, peticiones)} de /metrics, o None si no es accesible."""
+    cliente = prueba.cliente()
+    try:
+        cabeceras = {}
+        if prueba.args.token_metricas:
+            cabeceras['Authorization'] = f"Bearer {prueba.args.token_metricas}"
+        else:
+            await prueba.iniciar_sesion(cliente, '_metricas', prueba.args.admin_correo, prueba.args.admin_password)
+        estado, _, cuerpo = await cliente.solicitar('GET', '/metrics', cabeceras_extra=cabeceras)
+    except (ErrorHTTP, OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        await cliente.cerrar()
+    if estado != 200:
+        return None
+
+    series = defaultdict(lambda: [0.0, 0.0])
+    for linea in cuerpo.decode().splitlines():
+        coincidencia = RE_METRICA.match(linea)
+        if coincidencia:
+            tipo, endpoint, valor = coincidencia.groups()
+            series[endpoint][0 if tipo == 'sum' else 1] = float(valor)
+    return dict(series)
+
+
+def sentencias_por_escenario(prueba, antes, despues):
+    """
+    Reparte las sentencias de cada endpoint entre los escenarios en proporción
+    a las peticiones que cada escenario hizo a ese endpoint.
+    """
+    if antes is None or despues is None:
+        return {}
+    por_endpoint = {}
+    for endpoint, (suma, cuenta) in despues.items():
+        suma_antes, cuenta_antes = antes.get(endpoint, (0.0, 0.0))
+        if cuenta > cuenta_antes:
+            por_endpoint[endpoint] = (suma - suma_antes) / (cuenta - cuenta_antes)
+
+    resultado = {}
+    for escenario, endpoints in prueba.endpoints.items():
+        resultado[escenario] = sum(n * por_endpoint.get(endpoint, 0.0) for endpoint, n in endpoints.items())
+    return resultado
+
+
+# =========================================================
+#  EJECUCIÓN E INFORME
+# =========================================================
+
+async def ejecutar(args, cuentas):
+    prueba = Prueba(args, cuentas)
+    pesos = MEZCLAS[args.mezcla]
+    escenarios = prueba.rnd.choices(list(pesos), list(pesos.values()), k=args.usuarios)
+
+    antes = await leer_metricas(prueba)
+    if antes is None:
+        print('⚠️ /metrics no es accesible (use --token-metricas o credenciales de administrador); '
+              'no se informarán sentencias SQL')
+
+    inicio = time.monotonic()
+    prueba.fin = inicio + args.rampa + args.duracion
+    await asyncio.gather(*(
+        prueba.usuario_virtual(escenario, args.rampa * i / max(args.usuarios, 1))
+        for i, escenario in enumerate(escenarios)
+    ))
+    duracion = time.monotonic() - inicio
+
+    if args.espera_metricas:
+        await asyncio.sleep(args.espera_metricas)
+    sentencias = sentencias_por_escenario(prueba, antes, await leer_metricas(prueba) if antes else None)
+
+    resultados = {}
+    for escenario in sorted(prueba.muestras):
+        muestras = prueba.muestras[escenario]
+        latencias = [m[0] for m in muestras]
+        errores = sum(1 for m in muestras if m[1])
+        resultados[escenario] = {
+            'usuarios': escenarios.count(escenario),
+            'peticiones': len(muestras),
+            'rps': round(len(muestras) / duracion, 2),
+            'p50_ms': round(percentil(latencias, 50), 1),
+            'p95_ms': round(percentil(latencias, 95), 1),
+            'p99_ms': round(percentil(latencias, 99), 1),
+            'media_ms': round(statistics.mean(latencias), 1),
+            'error_pct': round(100 * errores / len(muestras), 2),
+            'sql_por_peticion': round(sentencias[escenario] / len(muestras), 1) if escenario in sentencias else None,
+            'sql_por_segundo': round(sentencias[escenario] / duracion, 1) if escenario in sentencias else None,
+        }
+    return resultados, duracion
+
+
+def imprimir(resultados, base=None, umbral=10.0):
+    regresiones = []
+    print(f"{'escenario':<22} {'VU':>4} {'pet.':>7} {'pet/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'error %':>8} {'SQL/pet':>8} {'SQL/s':>8}" + (f" {'Δ pet/s':>9} {'Δ p95':>8}" if base else ''))
+    for escenario, r in resultados.items():
+        sql_pet = f"{r['sql_por_peticion']:>8.1f}" if r['sql_por_peticion'] is not None else f"{'-':>8}"
+        sql_seg = f"{r['sql_por_segundo']:>8.1f}" if r['sql_por_segundo'] is not None else f"{'-':>8}"
+        linea = (f"{escenario:<22} {r['usuarios']:>4} {r['peticiones']:>7} {r['rps']:>8.2f} {r['p50_ms']:>8.1f} "
+                 f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['error_pct']:>8.2f} {sql_pet} {sql_seg}")
+        anterior = (base or {}).get(escenario)
+        if anterior:
+            delta_rps = (r['rps'] - anterior['rps']) / anterior['rps'] * 100 if anterior['rps'] else 0.0
+            delta_p95 = (r['p95_ms'] - anterior['p95_ms']) / anterior['p95_ms'] * 100 if anterior['p95_ms'] else 0.0
+            linea += f" {delta_rps:>+8.1f}% {delta_p95:>+7.1f}%"
+            if delta_rps < -umbral or delta_p95 > umbral:
+                linea += '  ⚠️'
+                regresiones.append(escenario)
+        print(linea)
+    return regresiones
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Instancia local de la aplicación')
+    parser.add_argument('--db', required=True, help='Base de datos de la instancia, para leer las cuentas sintéticas')
+    parser.add_argument('--mezcla', choices=sorted(MEZCLAS), default='inicio')
+    parser.add_argument('--usuarios', type=int, default=50, help='Usuarios virtuales concurrentes')
+    parser.add_argument('--duracion', type=float, default=60.0, help='Segundos de carga sostenida')
+    parser.add_argument('--rampa', type=float, default=10.0, help='Segundos para arrancar todos los usuarios')
+    parser.add_argument('--espera', type=float, default=1.0, help='Tiempo medio de espera entre acciones (s)')
+    parser.add_argument('--tiempo-limite', type=float, default=30.0, help='Tiempo límite por petición (s)')
+    parser.add_argument('--password', default='Benchmark123!', help='Contraseña de los usuarios sintéticos')
+    parser.add_argument('--admin-correo', default='Gestion.Acentrax@gmail.com')
+    parser.add_argument('--admin-password', default='admin123')
+    parser.add_argument('--token-metricas', default=os.environ.get('METRICS_TOKEN'))
+    parser.add_argument('--espera-metricas', type=float, default=0.0,
+                        help='Segundos antes de la lectura final de /metrics (METRICS_FLUSH_INTERVAL con varios workers)')
+    parser.add_argument('--semilla', type=int, default=7)
+    parser.add_argument('--salida', help='Guarda los resultados en este archivo JSON')
+    parser.add_argument('--comparar', help='JSON de una ejecución anterior')
+    parser.add_argument('--umbral', type=float, default=10.0, help='Porcentaje que se considera regresión')
+    return parser
+
+
+def main():
+    args = crear_parser().parse_args()
+
+    cuentas = cargar_cuentas(args.db, max(args.usuarios * 4, 200))
+    print(f"Mezcla '{args.mezcla}' | {args.usuarios} usuarios | {args.duracion:.0f} s (+{args.rampa:.0f} s de rampa) "
+          f"| {args.url}\n")
+
+    resultados, duracion = asyncio.run(ejecutar(args, cuentas))
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)['resultados']
+    regresiones = imprimir(resultados, base, args.umbral)
+    total = sum(r['peticiones'] for r in resultados.values())
+    print(f"\n{total:,} peticiones en {duracion:.1f} s ({total / duracion:.1f} pet/s)")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'url': args.url,
+                'mezcla': args.mezcla,
+                'usuarios': args.usuarios,
+                'duracion': args.duracion,
+                'resultados': resultados,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"Resultados guardados en {args.salida}")
+
+    if regresiones:
+        print(f"⚠️ Regresión de capacidad en: {', '.join(regresiones)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
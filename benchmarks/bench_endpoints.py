@@ -0,0 +1,269 @@
+"""
+Benchmark de los endpoints críticos con el cliente de pruebas de Flask.
+
+Ejecuta cada escenario N veces contra una base de datos poblada con
+benchmarks.datos_sinteticos y muestra la latencia (p50, p95, máximo) y el
+número de consultas SQL por petición. Con --salida se guarda el resultado en
+JSON para compararlo más adelante con --comparar.
+
+Los escenarios de escritura (calificaciones, asistencia, horarios y votación)
+modifican la base de datos: úsese siempre una base de datos desechable.
+
+Uso:
+    python -m benchmarks.datos_sinteticos --db sqlite:////tmp/acentrax_bench.db --reiniciar
+    python -m benchmarks.bench_endpoints --db sqlite:////tmp/acentrax_bench.db --iteraciones 50
+    python -m benchmarks.bench_endpoints --escenarios dashboards directorios --salida antes.json
+    python -m benchmarks.bench_endpoints --comparar antes.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+ESCENARIOS = ['login', 'dashboards', 'calificaciones', 'asistencia', 'horarios', 'directorios', 'votacion']
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    k = (len(ordenados) - 1) * p / 100
+    inferior = int(k)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (k - inferior)
+
+
+class Banco:
+    """Ejecuta peticiones con el cliente de pruebas y acumula tiempos y consultas."""
+
+    def __init__(self, app, contrasena):
+        from sqlalchemy import event
+        from extensions import db
+
+        self.app = app
+        self.contrasena = contrasena
+        self.resultados = {}
+        self.consultas = 0
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._contar)
+
+    def _contar(self, *args):
+        self.consultas += 1
+
+    def cliente(self, usuario_id, **sesion):
+        cliente = self.app.test_client()
+        with cliente.session_transaction() as s:
+            s['_user_id'] = str(usuario_id)
+            s['_fresh'] = True
+            s.update(sesion)
+        return cliente
+
+    def medir(self, nombre, iteraciones, calentamiento, peticion, correcta=None):
+        """peticion(i) realiza una petición y devuelve la respuesta."""
+        correcta = correcta or (lambda respuesta: respuesta.status_code < 400)
+        for i in range(calentamiento):
+            peticion(i)
+
+        tiempos, consultas, errores = [], [], 0
+        for i in range(calentamiento, calentamiento + iteraciones):
+            self.consultas = 0
+            inicio = time.perf_counter()
+            respuesta = peticion(i)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+            consultas.append(self.consultas)
+            if not correcta(respuesta):
+                errores += 1
+
+        self.resultados[nombre] = {
+            'n': iteraciones,
+            'p50_ms': round(percentil(tiempos, 50), 2),
+            'p95_ms': round(percentil(tiempos, 95), 2),
+            'max_ms': round(max(tiempos), 2),
+            'sql_p50': percentil(consultas, 50),
+            'sql_media': round(statistics.mean(consultas), 1),
+            'errores': errores,
+        }
+
+
+def preparar_datos():
+    """Elige usuarios y cursos representativos de la base de datos poblada."""
+    from sqlalchemy import func
+    from controllers.models import (
+        db, Usuario, Clase, Matricula, Calificacion, CategoriaCalificacion, HorarioCurso,
+        HorarioGeneral, Curso, Candidato, estudiante_padre
+    )
+
+    clase = Clase.query.order_by(Clase.id_clase).first()
+    if clase is None:
+        sys.exit('La base de datos no tiene clases; ejecute primero benchmarks.datos_sinteticos')
+
+    anio = db.session.query(func.max(Matricula.año)).scalar()
+    estudiantes = [m.estudianteId for m in Matricula.query.filter_by(cursoId=clase.cursoId, año=anio).all()]
+    padre_id = db.session.query(estudiante_padre.c.padre_id).filter(
+        estudiante_padre.c.estudiante_id == estudiantes[0]
+    ).scalar()
+    curso = db.session.get(Curso, clase.cursoId)
+    horario = HorarioCurso.query.filter_by(curso_id=curso.id_curso).all()
+
+    votantes = [u.id_usuario for u in Usuario.query.filter_by(id_rol_fk=3, voto_registrado=False)
+                .order_by(Usuario.id_usuario.desc()).limit(5000).all()]
+    candidatos = {}
+    for c in Candidato.query.filter_by(activo=True).all():
+        candidatos.setdefault(c.categoria, c.id_candidato)
+
+    return {
+        'admin': Usuario.query.filter_by(id_rol_fk=1).first().id_usuario,
+        'profesor': clase.profesorId,
+        'profesor_correo': db.session.get(Usuario, clase.profesorId).correo,
+        'curso': clase.cursoId,
+        'asignatura': clase.asignaturaId,
+        'estudiantes': estudiantes,
+        'padre': padre_id,
+        'categoria': CategoriaCalificacion.query.order_by(CategoriaCalificacion.id_categoria).first().id_categoria,
+        'horario_general': curso.horario_general_id or HorarioGeneral.query.first().id_horario,
+        'horario': {
+            'asignaciones': {f"{h.dia_semana}-{h.hora_inicio}": h.asignatura_id for h in horario},
+            'profesores_asignaciones': {f"{h.dia_semana}-{h.hora_inicio}": h.profesor_id for h in horario},
+            'salones_asignaciones': {f"{h.dia_semana}-{h.hora_inicio}": h.id_salon_fk for h in horario if h.id_salon_fk},
+        },
+        'votantes': votantes,
+        'candidatos': candidatos,
+        'calificaciones': Calificacion.query.count(),
+    }
+
+
+def ejecutar(banco, escenarios, iteraciones, calentamiento):
+    with banco.app.app_context():
+        d = preparar_datos()
+
+    print(f"Curso {d['curso']} | {len(d['estudiantes'])} estudiantes | profesor {d['profesor']} "
+          f"| {d['calificaciones']:,} calificaciones en la base de datos\n")
+
+    total = iteraciones + calentamiento
+    admin = banco.cliente(d['admin'])
+    profesor = banco.cliente(d['profesor'], curso_seleccionado=d['curso'], asignatura_seleccionada=d['asignatura'])
+
+    if 'login' in escenarios:
+        def login(i):
+            cliente = banco.app.test_client()
+            return cliente.post('/login', data={'correo': d['profesor_correo'], 'password': banco.contrasena})
+        # Un inicio de sesión válido redirige al panel; un 200 es el formulario con error.
+        banco.medir('login', iteraciones, calentamiento, login, lambda r: r.status_code == 302)
+
+    if 'dashboards' in escenarios:
+        estudiante = banco.cliente(d['estudiantes'][0])
+        padre = banco.cliente(d['padre'])
+        banco.medir('dashboard admin', iteraciones, calentamiento, lambda i: admin.get('/admin/dashboard'))
+        banco.medir('dashboard profesor', iteraciones, calentamiento, lambda i: profesor.get('/profesor/dashboard'))
+        banco.medir('dashboard estudiante', iteraciones, calentamiento, lambda i: estudiante.get('/estudiante/dashboard'))
+        banco.medir('dashboard padre', iteraciones, calentamiento, lambda i: padre.get('/padre/dashboard'))
+
+    if 'calificaciones' in escenarios:
+        def guardar_calificacion(i):
+            return profesor.post('/profesor/api/guardar-calificacion', json={
+                'estudiante_id': d['estudiantes'][i % len(d['estudiantes'])],
+                'asignatura_id': d['asignatura'],
+                'categoria_id': d['categoria'],
+                'valor': 50 + i % 50,
+                'nombre_calificacion': 'Benchmark',
+            })
+        banco.medir('guardar calificación', iteraciones, calentamiento, guardar_calificacion)
+
+    if 'asistencia' in escenarios:
+        hoy = date.today().isoformat()
+
+        def guardar_asistencia(i):
+            return profesor.post('/profesor/api/guardar-asistencia', json={
+                'fecha': hoy,
+                'asistencias': [
+                    {'estudiante_id': e, 'estado': 'presente' if (e + i) % 10 else 'ausente', 'excusa': False}
+                    for e in d['estudiantes']
+                ],
+            })
+        banco.medir('guardar asistencia (curso)', iteraciones, calentamiento, guardar_asistencia)
+
+    if 'horarios' in escenarios:
+        banco.medir('guardar horario de curso', iteraciones, calentamiento, lambda i: admin.post(
+            '/admin/api/horario_curso/guardar',
+            json=dict(d['horario'], curso_id=d['curso'], horario_general_id=d['horario_general'])
+        ))
+
+    if 'directorios' in escenarios:
+        for ruta in ('/admin/api/estudiantes', '/admin/api/profesores', '/admin/api/padres',
+                     '/admin/api/directorio/estudiantes'):
+            banco.medir(ruta, iteraciones, calentamiento, lambda i, ruta=ruta: admin.get(ruta))
+
+    if 'votacion' in escenarios:
+        if len(d['votantes']) < total:
+            print(f"⚠️ Solo hay {len(d['votantes'])} estudiantes sin votar; se omite la votación")
+        else:
+            votante = banco.cliente(d['votantes'][0])
+            banco.medir('candidatos', iteraciones, calentamiento, lambda i: votante.get('/estudiante/candidatos'))
+
+            def votar(i):
+                cliente = banco.cliente(d['votantes'][i])
+                return cliente.post('/estudiante/votar', json={
+                    'estudiante_id': d['votantes'][i], 'votos': d['candidatos']
+                })
+            banco.medir('votar', iteraciones, calentamiento, votar)
+
+
+def imprimir(resultados, base=None):
+    print(f"{'escenario':<32} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'máx ms':>9} {'SQL p50':>8} {'SQL media':>10} {'errores':>8}"
+          + (f" {'Δ p95':>9}" if base else ''))
+    for nombre, r in resultados.items():
+        linea = (f"{nombre:<32} {r['n']:>5} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['max_ms']:>9.2f} "
+                 f"{r['sql_p50']:>8.0f} {r['sql_media']:>10.1f} {r['errores']:>8}")
+        if base and nombre in base:
+            anterior = base[nombre]['p95_ms']
+            linea += f" {(r['p95_ms'] - anterior) / anterior * 100 if anterior else 0.0:>+8.1f}%"
+        print(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='URL de la base de datos (por defecto, la de Config / MYSQL_URL)')
+    parser.add_argument('--iteraciones', type=int, default=30)
+    parser.add_argument('--calentamiento', type=int, default=3)
+    parser.add_argument('--escenarios', nargs='+', choices=ESCENARIOS, default=ESCENARIOS)
+    parser.add_argument('--password', default='Benchmark123!', help='Contraseña de los usuarios sintéticos')
+    parser.add_argument('--salida', help='Guarda los resultados en este archivo JSON')
+    parser.add_argument('--comparar', help='Archivo JSON de una ejecución anterior para comparar el p95')
+    args = parser.parse_args()
+
+    if args.db:
+        os.environ['MYSQL_URL'] = args.db
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    from app import app
+
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    banco = Banco(app, args.password)
+    ejecutar(banco, args.escenarios, args.iteraciones, args.calentamiento)
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)['resultados']
+    imprimir(banco.resultados, base)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'base_de_datos': app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1],
+                'iteraciones': args.iteraciones,
+                'resultados': banco.resultados,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark de modelos de worker de gunicorn con la carga real de la aplicación.
+
+Para cada combinación de modelo de worker (sync, gthread, gevent si está
+instalado) y preload_app arranca gunicorn con gunicorn.conf.py, ejecuta una
+mezcla de benchmarks.bench_carga y mide el rendimiento total, el p95 y la
+memoria de cada worker: RSS y PSS (la PSS reparte las páginas compartidas por
+copy-on-write entre los procesos que las usan, así que refleja el ahorro de
+preload_app).
+
+Uso:
+    python -m benchmarks.datos_sinteticos --db sqlite:////tmp/acentrax_bench.db --reiniciar
+    python -m benchmarks.bench_gunicorn --db sqlite:////tmp/acentrax_bench.db --workers 4 --usuarios 80
+    python -m benchmarks.bench_gunicorn --db ... --modelos gthread --sin-preload
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_carga  # noqa: E402
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def esperar_servidor(puerto, proceso, limite=60.0):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        if proceso.poll() is not None:
+            raise RuntimeError('gunicorn terminó durante el arranque')
+        try:
+            with socket.create_connection(('127.0.0.1', puerto), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn no respondió a tiempo')
+
+
+def hijos(pid):
+    resultado = []
+    for entrada in os.listdir('/proc'):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/stat") as f:
+                campos = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(campos[1]) == pid:
+            resultado.append(int(entrada))
+    return resultado
+
+
+def memoria_kb(pid):
+    """(RSS, PSS) en kB; la PSS requiere /proc/<pid>/smaps_rollup (Linux 4.14+)."""
+    rss = pss = None
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for linea in f:
+                if linea.startswith('Rss:'):
+                    rss = int(linea.split()[1])
+                elif linea.startswith('Pss:'):
+                    pss = int(linea.split()[1])
+    except OSError:
+        with open(f"/proc/{pid}/status") as f:
+            for linea in f:
+                if linea.startswith('VmRSS:'):
+                    rss = int(linea.split()[1])
+    return rss, pss
+
+
+def medir(args, modelo, preload, cuentas):
+    puerto = puerto_libre()
+    carpeta_metricas = tempfile.mkdtemp(prefix='acentrax-metricas-')
+    entorno = dict(
+        os.environ,
+        PORT=str(puerto),
+        GUNICORN_WORKER_CLASS=modelo,
+        GUNICORN_PRELOAD='1' if preload else '0',
+        WEB_CONCURRENCY=str(args.workers),
+        GUNICORN_THREADS=str(args.hilos),
+        METRICS_DIR=carpeta_metricas,
+        METRICS_FLUSH_INTERVAL='1',
+        LOG_LEVEL='WARNING',
+    )
+    if args.db:
+        entorno['MYSQL_URL'] = args.db
+
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+        cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        esperar_servidor(puerto, proceso)
+        time.sleep(1.0)
+
+        carga = bench_carga.crear_parser().parse_args([
+            '--url', f"http://127.0.0.1:{puerto}", '--db', args.db or '', '--mezcla', args.mezcla,
+            '--usuarios', str(args.usuarios), '--duracion', str(args.duracion), '--rampa', str(args.rampa),
+            '--espera', str(args.espera), '--espera-metricas', '0',
+        ])
+        resultados, duracion = asyncio.run(bench_carga.ejecutar(carga, cuentas))
+
+        memorias = [memoria_kb(pid) for pid in hijos(proceso.pid)]
+        maestro = memoria_kb(proceso.pid)
+    finally:
+        proceso.send_signal(signal.SIGTERM)
+        try:
+            proceso.wait(timeout=40)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+
+    peticiones = sum(r['peticiones'] for r in resultados.values())
+    latencias_p95 = [r['p95_ms'] for r in resultados.values()]
+    errores = sum(r['peticiones'] * r['error_pct'] / 100 for r in resultados.values())
+    rss = [m[0] for m in memorias if m[0]]
+    pss = [m[1] for m in memorias if m[1]]
+    return {
+        'pet_s': peticiones / duracion,
+        'p95_max_ms': max(latencias_p95) if latencias_p95 else 0.0,
+        'error_pct': 100 * errores / peticiones if peticiones else 0.0,
+        'workers': len(memorias),
+        'rss_mb': sum(rss) / len(rss) / 1024 if rss else 0.0,
+        'pss_mb': sum(pss) / len(pss) / 1024 if pss else 0.0,
+        'total_mb': (sum(pss or rss) + (maestro[1] or maestro[0] or 0)) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', required=True, help='Base de datos poblada con benchmarks.datos_sinteticos')
+    parser.add_argument('--modelos', nargs='+', default=['sync', 'gthread', 'gevent'])
+    parser.add_argument('--sin-preload', action='store_true', help='Mide también cada modelo sin preload_app')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--hilos', type=int, default=4, help='Hilos por worker gthread')
+    parser.add_argument('--mezcla', choices=sorted(bench_carga.MEZCLAS), default='inicio')
+    parser.add_argument('--usuarios', type=int, default=50)
+    parser.add_argument('--duracion', type=float, default=30.0)
+    parser.add_argument('--rampa', type=float, default=5.0)
+    parser.add_argument('--espera', type=float, default=0.5)
+    args = parser.parse_args()
+
+    modelos = [m for m in args.modelos if m != 'gevent' or importlib.util.find_spec('gevent')]
+    if len(modelos) < len(args.modelos):
+        print('⚠️ gevent no está instalado; se omite ese modelo')
+
+    cuentas = bench_carga.cargar_cuentas(args.db, max(args.usuarios * 4, 200))
+    print(f"{args.workers} workers | mezcla '{args.mezcla}' | {args.usuarios} usuarios | {args.duracion:.0f} s\n")
+    print(f"{'modelo':<10} {'preload':>8} {'workers':>8} {'pet/s':>8} {'p95 máx ms':>11} {'error %':>8} "
+          f"{'RSS/worker MB':>14} {'PSS/worker MB':>14} {'total MB':>9}")
+
+    for modelo in modelos:
+        for preload in ([True, False] if args.sin_preload else [True]):
+            r = medir(args, modelo, preload, cuentas)
+            print(f"{modelo:<10} {'sí' if preload else 'no':>8} {r['workers']:>8} {r['pet_s']:>8.1f} "
+                  f"{r['p95_max_ms']:>11.1f} {r['error_pct']:>8.2f} {r['rss_mb']:>14.1f} {r['pss_mb']:>14.1f} "
+                  f"{r['total_mb']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
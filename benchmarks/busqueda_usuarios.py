@@ -0,0 +1,137 @@
+"""
+Benchmark del buscador de usuarios (índice usuario_busqueda).
+
+Crea N usuarios sintéticos en una base SQLite temporal (o en --db) y simula
+a un administrador tecleando búsquedas letra a letra. Compara, por
+pulsación:
+
+    antes:  cuatro consultas (una por rol) con ilike '%texto%' en documento,
+            nombre y apellido, como hacía /admin/buscar-usuario
+    índice: buscar_usuarios_por_rol() sobre usuario_busqueda (hasta 5 por
+            rol): una sola consulta
+
+Comprueba además que cada pulsación ejecuta una sola sentencia, que la
+búsqueda ignora tildes y mayúsculas, que editar un usuario por el ORM
+actualiza el índice y que los estudiantes (la mitad de los usuarios) no
+ocultan las coincidencias de los demás roles.
+
+Uso:
+    python -m benchmarks.busqueda_usuarios
+    python -m benchmarks.busqueda_usuarios --usuarios 50000 --presupuesto-ms 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones, base_sqlite, sentencias_ejecutadas  # noqa: E402
+
+
+ROLES = ['Profesor', 'Estudiante', 'Padre', 'Administrador Institucional']
+BUSQUEDAS = ['José Pérez', 'maria gomez', 'Rodríguez', '10000123', 'est1234@bench', 'ana lu']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='Archivo SQLite (por defecto, uno temporal)')
+    parser.add_argument('--usuarios', type=int, default=20000)
+    parser.add_argument('--presupuesto-ms', type=float, default=20.0, help='p95 máximo por pulsación con el índice')
+    args = parser.parse_args()
+
+    ruta_db = base_sqlite('busqueda', args.db)
+
+    from app import app, create_initial_data
+    from controllers.models import db, Rol, Usuario
+    from services.busqueda_service import buscar_usuarios, buscar_usuarios_por_rol, reconstruir_indice
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    with app.app_context():
+        create_initial_data()
+        roles = {r.nombre: r.id_rol for r in Rol.query.all()}
+        generador = Generador(crear_parser().parse_args([]), 'x')
+        tercio = args.usuarios // 4
+        generador.insertar(Usuario.__table__, generador.usuarios(1000, tercio, roles['Profesor'], 'prof', 7000000000))
+        generador.insertar(Usuario.__table__, generador.usuarios(10000, tercio * 2, roles['Estudiante'], 'est', 1000000000))
+        generador.insertar(Usuario.__table__, generador.usuarios(60000, tercio, roles['Padre'], 'padre', 3000000000))
+        inicio = time.perf_counter()
+        usuarios, tokens = reconstruir_indice()
+        print(f"\nÍndice: {usuarios:,} usuarios, {tokens:,} tokens en {time.perf_counter() - inicio:.1f} s\n")
+
+        def antes(texto):
+            encontrados = []
+            for rol in ROLES:
+                rol_obj = Rol.query.filter_by(nombre=rol).first()
+                if rol_obj:
+                    encontrados += Usuario.query.filter(
+                        Usuario.id_rol_fk == rol_obj.id_rol,
+                        db.or_(Usuario.no_identidad.ilike(f'%{texto}%'), Usuario.nombre.ilike(f'%{texto}%'),
+                               Usuario.apellido.ilike(f'%{texto}%'))
+                    ).limit(5).all()
+            return encontrados
+
+        def indice(texto):
+            por_rol = buscar_usuarios_por_rol(texto, ROLES)
+            return [u for encontrados in por_rol.values() for u in encontrados]
+
+        tiempos = {'antes': [], 'índice': []}
+        sentencias_por_pulsacion = set()
+        for busqueda in BUSQUEDAS:
+            for fin in range(1, len(busqueda) + 1):
+                texto = busqueda[:fin]
+                for nombre, funcion in (('antes', antes), ('índice', indice)):
+                    with sentencias_ejecutadas(db.engine) as sentencias:
+                        inicio = time.perf_counter()
+                        funcion(texto)
+                        tiempos[nombre].append((time.perf_counter() - inicio) * 1000)
+                    if nombre == 'índice':
+                        sentencias_por_pulsacion.add(len(sentencias))
+                    db.session.remove()
+
+        print(f"{len(tiempos['antes'])} pulsaciones sobre {args.usuarios:,} usuarios\n")
+        print(f"{'método':<10} {'p50 ms':>9} {'p95 ms':>9} {'máx ms':>9}")
+        for nombre, valores in tiempos.items():
+            p95 = statistics.quantiles(valores, n=20)[-1]
+            print(f"{nombre:<10} {statistics.median(valores):>9.2f} {p95:>9.2f} {max(valores):>9.2f}")
+
+        comprobar = Comprobaciones()
+
+        print()
+        usuario = db.session.get(Usuario, 1000)
+        usuario.nombre, usuario.apellido = 'Íñigo', 'Peñalosa Ñáñez'
+        db.session.commit()
+        comprobar('sin tildes ni mayúsculas encuentra "Íñigo Peñalosa"',
+                  any(u.id_usuario == 1000 for u in buscar_usuarios('INIGO penal')))
+        comprobar('con tildes encuentra "Íñigo Peñalosa"',
+                  any(u.id_usuario == 1000 for u in buscar_usuarios('Íñi Ñáñ')))
+        comprobar('búsqueda por prefijo del correo', buscar_usuarios('prof1000@bench')[0].id_usuario == 1000)
+        usuario.nombre = 'Zacarías'
+        db.session.commit()
+        comprobar('la edición actualiza el índice', not any(u.id_usuario == 1000 for u in buscar_usuarios('inigo'))
+                  and any(u.id_usuario == 1000 for u in buscar_usuarios('zacarias penalosa')))
+
+        por_rol = {}
+        for u in indice('maria'):
+            por_rol[u.rol] = por_rol.get(u.rol, 0) + 1
+        con_coincidencias = {u.rol for u in buscar_usuarios('maria', limite=args.usuarios)}
+        comprobar(f"hasta 5 por rol sin que un rol oculte a otro {por_rol}",
+                  set(por_rol) == con_coincidencias and all(n <= 5 for n in por_rol.values()))
+        comprobar('cada rol igual que su búsqueda por separado', all(
+            [u.id_usuario for u in encontrados] == [u.id_usuario for u in buscar_usuarios(texto, [rol], limite=5)]
+            for texto in ('mar', 'maria gomez') for rol, encontrados in buscar_usuarios_por_rol(texto, ROLES).items()
+        ))
+        comprobar(f"una sentencia por pulsación {sorted(sentencias_por_pulsacion)}", sentencias_por_pulsacion == {1})
+
+        p95 = statistics.quantiles(tiempos['índice'], n=20)[-1]
+        comprobar(f"p95 por pulsación {p95:.1f} ms <= {args.presupuesto_ms:.0f} ms", p95 <= args.presupuesto_ms)
+
+    if not args.db:
+        os.remove(ruta_db)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
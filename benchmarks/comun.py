@@ -0,0 +1,65 @@
+"""
+Utilidades compartidas por los benchmarks que comprueban un cambio.
+
+    ruta_db = base_sqlite('horario', MANTENIMIENTO_PLANIFICADOR='0')   # antes de importar app
+    from app import app
+    ...
+    comprobar = Comprobaciones()
+    with sentencias_ejecutadas(db.engine, excluir='version_datos') as sentencias:
+        ...
+    comprobar('1. una consulta por petición', len(sentencias) == 1, f"{len(sentencias)} sentencias")
+    comprobar.terminar()
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+def base_sqlite(nombre, ruta=None, **entorno):
+    """
+    Apunta la aplicación a una base SQLite vacía (temporal si no se indica
+    `ruta`) con las variables de `entorno`, y devuelve su ruta. Debe
+    llamarse antes de importar app: Config lee el entorno al importarse.
+    """
+    ruta = ruta or os.path.join(tempfile.mkdtemp(prefix=f'acentrax-{nombre}-'), f'{nombre}.db')
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    os.environ.update(MYSQL_URL=f"sqlite:///{ruta}", **entorno)
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    return ruta
+
+
+class Comprobaciones:
+    """Imprime cada comprobación como OK/ERR y termina con código 1 si alguna falló."""
+
+    def __init__(self):
+        self.fallos = 0
+
+    def __call__(self, nombre, ok, detalle=''):
+        self.fallos += not ok
+        print(f"{'OK ' if ok else 'ERR'} {nombre}{f': {detalle}' if detalle else ''}")
+        return ok
+
+    def terminar(self):
+        print(f"\n{'Todo correcto' if not self.fallos else f'{self.fallos} comprobaciones fallidas'}")
+        sys.exit(1 if self.fallos else 0)
+
+
+@contextmanager
+def sentencias_ejecutadas(motor, excluir=None):
+    """Lista de las sentencias SQL que ejecuta `motor` en el bloque, sin las que contienen `excluir`."""
+    sentencias = []
+
+    def contar(conexion, cursor, sentencia, *_):
+        if excluir is None or excluir not in sentencia:
+            sentencias.append(sentencia)
+
+    event.listen(motor, 'before_cursor_execute', contar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(motor, 'before_cursor_execute', contar)
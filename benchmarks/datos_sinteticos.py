@@ -0,0 +1,532 @@
+"""
+Generador de datos sintéticos a escala de un colegio real.
+
+Crea sedes, salones, equipos, profesores, estudiantes, padres, cursos,
+horarios, varios años de matrículas, asistencia y calificaciones,
+notificaciones, comunicaciones, eventos y candidatos. Todo se inserta con
+INSERT masivos por lotes (executemany), con claves primarias asignadas en
+Python, sin crear objetos ORM ni hacer commit fila a fila.
+
+Todos los usuarios generados comparten la contraseña --password (por defecto
+'Benchmark123!'); el superadministrador de create_initial_data conserva la suya.
+
+Uso:
+    python -m benchmarks.datos_sinteticos --db sqlite:////tmp/acentrax_bench.db --reiniciar
+    python -m benchmarks.datos_sinteticos --estudiantes 2000 --cursos 40 --anios 2
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, time as hora, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+TAMANO_LOTE = 5000
+
+NOMBRES = [
+    'Juan', 'Pedro', 'Luis', 'Carlos', 'Miguel', 'José', 'Antonio', 'Francisco', 'Manuel', 'David',
+    'Javier', 'Daniel', 'Andrés', 'Sergio', 'Ricardo', 'Alejandro', 'María', 'Ana', 'Carmen', 'Laura',
+    'Isabel', 'Patricia', 'Sofía', 'Elena', 'Lucía', 'Paula', 'Andrea', 'Valentina', 'Gabriela',
+    'Carolina', 'Daniela', 'Natalia', 'Camila', 'Mariana', 'Juliana', 'Catalina'
+]
+APELLIDOS = [
+    'García', 'Rodríguez', 'Martínez', 'López', 'González', 'Pérez', 'Sánchez', 'Ramírez', 'Torres',
+    'Flores', 'Rivera', 'Gómez', 'Díaz', 'Cruz', 'Morales', 'Jiménez', 'Hernández', 'Ruiz', 'Reyes',
+    'Álvarez', 'Romero', 'Vargas', 'Castro', 'Ortiz', 'Ramos', 'Vega', 'Medina', 'Méndez', 'Silva', 'Rojas'
+]
+ASIGNATURAS = [
+    ('Matemáticas', 'Álgebra, geometría y aritmética'),
+    ('Lengua Castellana', 'Lectura, escritura y gramática'),
+    ('Inglés', 'Idioma extranjero nivel básico-intermedio'),
+    ('Ciencias Naturales', 'Biología, química y física'),
+    ('Ciencias Sociales', 'Historia, geografía y civismo'),
+    ('Educación Física', 'Deportes y actividad física'),
+    ('Artes', 'Expresión artística y cultural'),
+    ('Tecnología e Informática', 'Computación y tecnología'),
+    ('Ética y Valores', 'Formación en valores y ética'),
+    ('Religión', 'Formación religiosa'),
+    ('Música', 'Teoría y práctica musical'),
+    ('Emprendimiento', 'Formación empresarial y emprendimiento'),
+]
+CATEGORIAS = [('Evaluaciones', '#3498db', 40), ('Tareas', '#2ecc71', 30), ('Participación', '#f39c12', 30)]
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes']
+BLOQUES = ['07:00', '07:50', '08:40', '09:45', '10:35', '11:25']
+TIPOS_NOTIFICACION = ['calificacion', 'asistencia', 'evento', 'comunicacion']
+TIPOS_EQUIPO = ['Computadora de Escritorio', 'Laptop', 'Tablet', 'Proyector']
+
+
+class Generador:
+    """Mantiene los identificadores asignados y el progreso de la generación."""
+
+    def __init__(self, args, password_hash):
+        self.args = args
+        self.rnd = random.Random(args.semilla)
+        self.password_hash = password_hash
+        self.hoy = date.fromisoformat(args.fecha) if args.fecha else date.today()
+        self.ahora = datetime.combine(self.hoy, hora(12, 0)) if args.fecha else datetime.now()
+        self.anio_actual = self.hoy.year
+        self.anios = list(range(self.anio_actual - args.anios + 1, self.anio_actual + 1))
+        self.totales = {}
+        args.profesores = args.profesores or max(len(ASIGNATURAS), args.cursos * 3 // 2)
+
+    # -----------------------------------------------------
+    #  Utilidades
+    # -----------------------------------------------------
+
+    def siguiente_id(self, columna):
+        from sqlalchemy import func, select
+        from controllers.models import db
+        return (db.session.execute(select(func.max(columna))).scalar() or 0) + 1
+
+    def insertar(self, tabla, filas):
+        """Inserta un iterable de dicts por lotes de TAMANO_LOTE y hace commit al final."""
+        from controllers.models import db
+
+        inicio = time.perf_counter()
+        total = 0
+        lote = []
+        for fila in filas:
+            lote.append(fila)
+            if len(lote) >= TAMANO_LOTE:
+                db.session.execute(tabla.insert(), lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            db.session.execute(tabla.insert(), lote)
+            total += len(lote)
+        db.session.commit()
+
+        duracion = time.perf_counter() - inicio
+        self.totales[tabla.name] = self.totales.get(tabla.name, 0) + total
+        print(f"   {tabla.name:<28} {total:>10,} filas  {duracion:>7.1f} s  ({total / max(duracion, 1e-6):,.0f} filas/s)")
+        return total
+
+    def nombre(self):
+        return self.rnd.choice(NOMBRES), f"{self.rnd.choice(APELLIDOS)} {self.rnd.choice(APELLIDOS)}"
+
+    def usuarios(self, id_inicial, cantidad, rol_id, prefijo, documento_base):
+        for n in range(cantidad):
+            nombre, apellido = self.nombre()
+            yield {
+                'id_usuario': id_inicial + n,
+                'tipo_doc': 'TI' if prefijo == 'est' else 'CC',
+                'no_identidad': str(documento_base + id_inicial + n),
+                'nombre': nombre,
+                'apellido': apellido,
+                'correo': f"{prefijo}{id_inicial + n}@bench.acentrax.edu.co",
+                'telefono': f"3{self.rnd.randint(100000000, 199999999)}",
+                'direccion': f"Calle {self.rnd.randint(1, 120)} # {self.rnd.randint(1, 99)}-{self.rnd.randint(1, 99)}",
+                'password_hash': self.password_hash,
+                'id_rol_fk': rol_id,
+                'estado_cuenta': 'activa',
+                'voto_registrado': False,
+                'email_verified': True,
+                'verification_attempts': 0,
+            }
+
+    def dias_lectivos(self, anio):
+        """Días hábiles de febrero a noviembre, limitados a --dias-por-anio."""
+        dia = date(anio, 2, 1)
+        fin = min(date(anio, 11, 30), self.hoy)
+        dias = []
+        while dia <= fin and len(dias) < self.args.dias_por_anio:
+            if dia.weekday() < 5:
+                dias.append(dia)
+            dia += timedelta(days=1)
+        return dias
+
+    # -----------------------------------------------------
+    #  Estructura institucional
+    # -----------------------------------------------------
+
+    def generar(self):
+        from controllers.models import (
+            db, Rol, Usuario, Sede, Salon, Equipo, Curso, HorarioGeneral, BloqueHorario, Asignatura,
+            CategoriaCalificacion, ConfiguracionCalificacion, CicloAcademico, PeriodoAcademico,
+            Matricula, Clase, HorarioCurso, HorarioCompartido, Asistencia, Calificacion,
+            Notificacion, Comunicacion, Evento, Candidato, asignatura_profesor, estudiante_padre
+        )
+
+        a = self.args
+        rnd = self.rnd
+        roles = {r.nombre: r.id_rol for r in Rol.query.all()}
+
+        print('🏫 Estructura institucional')
+        sede_id = self.siguiente_id(Sede.id_sede)
+        sedes = list(range(sede_id, sede_id + a.sedes))
+        self.insertar(Sede.__table__, (
+            {'id_sede': s, 'nombre': f"Sede {n + 1}", 'direccion': f"Carrera {10 + n} # {20 + n}-{30 + n}"}
+            for n, s in enumerate(sedes)
+        ))
+
+        salon_id = self.siguiente_id(Salon.id_salon)
+        # Al menos un aula por sede aunque haya menos cursos que sedes
+        salones_por_sede = max(1, a.cursos // a.sedes) + 2
+        salones = []
+        filas = []
+        for n, sede in enumerate(sedes):
+            for k in range(salones_por_sede):
+                tipo = 'Sala de Informática' if k >= salones_por_sede - 2 else 'Aula'
+                filas.append({
+                    'id_salon': salon_id, 'nombre': f"B{sede_id + n}-{salon_id:05d}", 'tipo': tipo,
+                    'capacidad': 40, 'cantidad_sillas': 40, 'cantidad_mesas': 20,
+                    'id_sede_fk': sede, 'estado': 'disponible', 'fecha_creacion': self.ahora
+                })
+                salones.append((salon_id, sede, tipo))
+                salon_id += 1
+        self.insertar(Salon.__table__, filas)
+
+        equipo_id = self.siguiente_id(Equipo.id_equipo)
+        salas = [s for s in salones if s[2] == 'Sala de Informática']
+        self.insertar(Equipo.__table__, (
+            {
+                'id_equipo': equipo_id + n, 'id_referencia': f"BENCH-{equipo_id + n:06d}",
+                'nombre': f"Equipo {equipo_id + n}", 'tipo': rnd.choice(TIPOS_EQUIPO),
+                'estado': rnd.choices(['Disponible', 'Asignado', 'Mantenimiento', 'Incidente'], [70, 20, 7, 3])[0],
+                'id_salon_fk': salas[n % len(salas)][0], 'sistema_operativo': 'Windows 11', 'ram': '8GB DDR4',
+                'disco_duro': '256GB SSD', 'fecha_adquisicion': self.hoy - timedelta(days=rnd.randint(30, 1800)),
+                'descripcion': None, 'observaciones': None, 'fecha_registro': self.ahora
+            }
+            for n in range(len(salas) * a.equipos_por_sala)
+        ))
+
+        horario_id = self.siguiente_id(HorarioGeneral.id_horario)
+        self.insertar(HorarioGeneral.__table__, [{
+            'id_horario': horario_id, 'nombre': 'Jornada Única (sintética)', 'periodo': str(self.anio_actual),
+            'horaInicio': hora(7, 0), 'horaFin': hora(12, 15),
+            'diasSemana': '["Lunes","Martes","Miércoles","Jueves","Viernes"]',
+            'duracion_clase': 50, 'duracion_descanso': 15, 'activo': True, 'fecha_creacion': self.ahora
+        }])
+        bloque_id = self.siguiente_id(BloqueHorario.id_bloque)
+        filas = []
+        for dia in DIAS_SEMANA:
+            for orden, inicio in enumerate(BLOQUES, start=1):
+                h, m = map(int, inicio.split(':'))
+                fin = (datetime.combine(self.hoy, hora(h, m)) + timedelta(minutes=50)).time()
+                filas.append({
+                    'id_bloque': bloque_id, 'horario_general_id': horario_id, 'dia_semana': dia,
+                    'horaInicio': hora(h, m), 'horaFin': fin, 'tipo': 'clase', 'orden': orden,
+                    'nombre': f"Bloque {orden}", 'class_type': 'normal', 'break_type': None
+                })
+                bloque_id += 1
+        self.insertar(BloqueHorario.__table__, filas)
+
+        asignatura_id = self.siguiente_id(Asignatura.id_asignatura)
+        asignaturas = list(range(asignatura_id, asignatura_id + len(ASIGNATURAS)))
+        self.insertar(Asignatura.__table__, (
+            {'id_asignatura': i, 'nombre': n, 'descripcion': d, 'estado': 'activa'}
+            for i, (n, d) in zip(asignaturas, ASIGNATURAS)
+        ))
+
+        categoria_id = self.siguiente_id(CategoriaCalificacion.id_categoria)
+        categorias = list(range(categoria_id, categoria_id + len(CATEGORIAS)))
+        self.insertar(CategoriaCalificacion.__table__, (
+            {'id_categoria': i, 'nombre': n, 'color': c, 'porcentaje': p}
+            for i, (n, c, p) in zip(categorias, CATEGORIAS)
+        ))
+        if not ConfiguracionCalificacion.query.first():
+            self.insertar(ConfiguracionCalificacion.__table__, [{
+                'asignatura_id': None, 'notaMinima': 0, 'notaMaxima': 100,
+                'notaMinimaAprobacion': 60, 'fecha_creacion': self.ahora
+            }])
+
+        ciclo_id = self.siguiente_id(CicloAcademico.id_ciclo)
+        periodo_id = self.siguiente_id(PeriodoAcademico.id_periodo)
+        ciclos, periodos = [], []
+        for n, anio in enumerate(self.anios):
+            actual = anio == self.anio_actual
+            ciclos.append({
+                'id_ciclo': ciclo_id + n, 'nombre': f"Año Escolar {anio}", 'fecha_inicio': date(anio, 1, 20),
+                'fecha_fin': date(anio, 11, 30), 'estado': 'activo' if actual else 'cerrado', 'activo': actual,
+                'fecha_creacion': self.ahora
+            })
+            for p in range(4):
+                inicio = date(anio, 2 + p * 2, 1)
+                fin = date(anio, 3 + p * 2, 28)
+                periodos.append({
+                    'id_periodo': periodo_id, 'ciclo_academico_id': ciclo_id + n, 'numero_periodo': p + 1,
+                    'nombre': f"Periodo {p + 1}", 'fecha_inicio': inicio, 'fecha_fin': fin,
+                    'fecha_cierre_notas': fin + timedelta(days=5),
+                    'estado': 'cerrado' if fin < self.hoy else ('activo' if inicio <= self.hoy else 'planificado'),
+                    'dias_notificacion_anticipada': 7, 'fecha_creacion': self.ahora
+                })
+                periodo_id += 1
+        self.insertar(CicloAcademico.__table__, ciclos)
+        self.insertar(PeriodoAcademico.__table__, periodos)
+
+        curso_id = self.siguiente_id(Curso.id_curso)
+        cursos = list(range(curso_id, curso_id + a.cursos))
+        self.insertar(Curso.__table__, (
+            {
+                'id_curso': c, 'nombreCurso': f"{6 + n % 6}{chr(65 + (n // 6) % 26)}{'' if n < 156 else n // 156}",
+                'sedeId': sedes[n % len(sedes)], 'horario_general_id': horario_id
+            }
+            for n, c in enumerate(cursos)
+        ))
+
+        # -------------------------------------------------
+        #  Usuarios
+        # -------------------------------------------------
+        print('👥 Usuarios')
+        usuario_id = self.siguiente_id(Usuario.id_usuario)
+        profesores = list(range(usuario_id, usuario_id + a.profesores))
+        estudiantes = list(range(profesores[-1] + 1, profesores[-1] + 1 + a.estudiantes))
+        padres = list(range(estudiantes[-1] + 1, estudiantes[-1] + 1 + int(a.estudiantes * 0.75)))
+
+        self.insertar(Usuario.__table__, self.usuarios(profesores[0], len(profesores), roles['Profesor'], 'prof', 7000000000))
+        self.insertar(Usuario.__table__, self.usuarios(estudiantes[0], len(estudiantes), roles['Estudiante'], 'est', 1000000000))
+        self.insertar(Usuario.__table__, self.usuarios(padres[0], len(padres), roles['Padre'], 'padre', 3000000000))
+
+        # Cada profesor dicta una o dos asignaturas; cada asignatura tiene al menos un profesor.
+        profesores_por_asignatura = {asig: [] for asig in asignaturas}
+        filas = []
+        for n, prof in enumerate(profesores):
+            propias = {asignaturas[n % len(asignaturas)]}
+            if rnd.random() < 0.3:
+                propias.add(rnd.choice(asignaturas))
+            for asig in propias:
+                profesores_por_asignatura[asig].append(prof)
+                filas.append({'asignatura_id': asig, 'profesor_id': prof, 'fecha_asignacion': self.ahora})
+        self.insertar(asignatura_profesor, filas)
+
+        estudiantes_por_curso = {c: [] for c in cursos}
+        for n, est in enumerate(estudiantes):
+            estudiantes_por_curso[cursos[n % len(cursos)]].append(est)
+
+        filas = []
+        for n, est in enumerate(estudiantes):
+            filas.append({'estudiante_id': est, 'padre_id': padres[n % len(padres)], 'fecha_asignacion': self.ahora})
+            if rnd.random() < 0.25:
+                otro = rnd.choice(padres)
+                if otro != padres[n % len(padres)]:
+                    filas.append({'estudiante_id': est, 'padre_id': otro, 'fecha_asignacion': self.ahora})
+        self.insertar(estudiante_padre, filas)
+
+        matricula_id = self.siguiente_id(Matricula.id_matricula)
+        self.insertar(Matricula.__table__, (
+            {
+                'id_matricula': matricula_id + k * len(estudiantes) + n, 'estudianteId': est,
+                'cursoId': cursos[n % len(cursos)], 'año': anio, 'fecha_matricula': datetime(anio, 1, 15)
+            }
+            for k, anio in enumerate(self.anios)
+            for n, est in enumerate(estudiantes)
+        ))
+
+        # -------------------------------------------------
+        #  Clases y horarios sin choques de profesor
+        # -------------------------------------------------
+        print('📅 Clases y horarios')
+        clase_id = self.siguiente_id(Clase.id_clase)
+        clases = {}
+        carga = {prof: 0 for prof in profesores}
+        filas = []
+        for curso in cursos:
+            for asig in asignaturas:
+                candidatos = profesores_por_asignatura[asig] or profesores
+                prof = min(candidatos, key=lambda p: (carga[p], p))
+                carga[prof] += 1
+                clases[(curso, asig)] = (clase_id, prof)
+                filas.append({
+                    'id_clase': clase_id, 'asignaturaId': asig, 'profesorId': prof, 'cursoId': curso,
+                    'horarioId': horario_id, 'representanteCursoId': None
+                })
+                clase_id += 1
+        self.insertar(Clase.__table__, filas)
+
+        self.insertar(HorarioCompartido.__table__, (
+            {'profesor_id': prof, 'curso_id': curso, 'asignatura_id': asig,
+             'horario_general_id': horario_id, 'fecha_compartido': self.ahora}
+            for (curso, asig), (_, prof) in clases.items()
+        ))
+
+        ocupados = set()
+        salones_aula = {}
+        for salon, sede, tipo in salones:
+            if tipo == 'Aula':
+                salones_aula.setdefault(sede, []).append(salon)
+        filas = []
+        for n, curso in enumerate(cursos):
+            aulas = salones_aula[sedes[n % len(sedes)]]
+            salon = aulas[(n // len(sedes)) % len(aulas)]
+            for d, dia in enumerate(DIAS_SEMANA):
+                for b, inicio in enumerate(BLOQUES):
+                    orden = asignaturas[(d * len(BLOQUES) + b + n) % len(asignaturas):] + asignaturas
+                    for asig in orden:
+                        prof = clases[(curso, asig)][1]
+                        if (prof, dia, inicio) not in ocupados:
+                            ocupados.add((prof, dia, inicio))
+                            h, m = map(int, inicio.split(':'))
+                            filas.append({
+                                'curso_id': curso, 'asignatura_id': asig, 'profesor_id': prof,
+                                'dia_semana': dia, 'hora_inicio': inicio,
+                                'hora_fin': (datetime(2000, 1, 1, h, m) + timedelta(minutes=45)).strftime('%H:%M'),
+                                'horario_general_id': horario_id, 'id_salon_fk': salon, 'fecha_creacion': self.ahora
+                            })
+                            break
+        self.insertar(HorarioCurso.__table__, filas)
+
+        # -------------------------------------------------
+        #  Historial académico
+        # -------------------------------------------------
+        print('📚 Asistencia y calificaciones')
+        clases_por_curso = {c: [clases[(c, asig)][0] for asig in asignaturas] for c in cursos}
+
+        def asistencias():
+            for anio in self.anios:
+                for d, dia in enumerate(self.dias_lectivos(anio)):
+                    registro = datetime.combine(dia, hora(12, 0))
+                    for curso, alumnos in estudiantes_por_curso.items():
+                        ids_clase = clases_por_curso[curso]
+                        for k in range(a.clases_asistencia):
+                            clase = ids_clase[(d + k) % len(ids_clase)]
+                            for est in alumnos:
+                                r = rnd.random()
+                                estado = 'presente' if r < 0.90 else ('ausente' if r < 0.96 else 'tarde')
+                                yield {
+                                    'estudianteId': est, 'claseId': clase, 'fecha': dia, 'estado': estado,
+                                    'fecha_registro': registro, 'excusa': estado == 'ausente' and r < 0.92
+                                }
+
+        self.insertar(Asistencia.__table__, asistencias())
+
+        def calificaciones():
+            for anio in self.anios:
+                for curso, alumnos in estudiantes_por_curso.items():
+                    for asig in asignaturas:
+                        prof = clases[(curso, asig)][1]
+                        for cat, (nombre_cat, _, _) in zip(categorias, CATEGORIAS):
+                            for k in range(a.notas_por_categoria):
+                                registro = datetime(anio, 2 + (k * 9) // max(a.notas_por_categoria, 1), 10, 10, 0)
+                                if registro > self.ahora:
+                                    continue
+                                for est in alumnos:
+                                    yield {
+                                        'estudianteId': est, 'asignaturaId': asig, 'categoriaId': cat,
+                                        'valor': round(min(100, max(0, rnd.gauss(72, 14))), 2),
+                                        'nombre_calificacion': f"{nombre_cat} {k + 1} ({anio})",
+                                        'observaciones': None, 'fecha_registro': registro,
+                                        'descripcion_tarea': None, 'archivo_url': None, 'archivo_nombre': None,
+                                        'fecha_vencimiento': None, 'es_tarea_publicada': False, 'profesor_id': prof
+                                    }
+
+        self.insertar(Calificacion.__table__, calificaciones())
+
+        # -------------------------------------------------
+        #  Comunicación
+        # -------------------------------------------------
+        print('🔔 Notificaciones, mensajes y eventos')
+        todos = profesores + estudiantes + padres
+
+        def notificaciones():
+            for usuario in todos:
+                for k in range(a.notificaciones_por_usuario):
+                    tipo = rnd.choice(TIPOS_NOTIFICACION)
+                    yield {
+                        'usuario_id': usuario, 'titulo': f"Actualización de {tipo}",
+                        'mensaje': f"Tienes una actualización en {tipo}", 'tipo': tipo, 'link': None,
+                        'leida': rnd.random() < 0.7,
+                        'creada_en': self.ahora - timedelta(days=rnd.randint(0, 365 * a.anios), minutes=k)
+                    }
+
+        self.insertar(Notificacion.__table__, notificaciones())
+
+        def comunicaciones():
+            for k in range(len(todos) * a.mensajes_por_usuario):
+                destinatario = rnd.choice(padres) if k % 2 else rnd.choice(estudiantes)
+                yield {
+                    'remitente_id': rnd.choice(profesores), 'destinatario_id': destinatario,
+                    'asunto': rnd.choice(['Seguimiento académico', 'Citación reunión', 'Informe de rendimiento']),
+                    'mensaje': 'Mensaje de seguimiento académico del estudiante.',
+                    'fecha_envio': self.ahora - timedelta(days=rnd.randint(0, 365 * a.anios), minutes=k % 1440),
+                    'estado': rnd.choice(['inbox', 'sent']), 'grupo_id': None
+                }
+
+        self.insertar(Comunicacion.__table__, comunicaciones())
+
+        self.insertar(Evento.__table__, (
+            {
+                'nombre': f"Evento {n + 1}", 'descripcion': 'Evento institucional sintético',
+                'fecha': date(anio, 2, 1) + timedelta(days=n * 6), 'hora': hora(9, 0),
+                'rol_destino': rnd.choice(['Estudiante', 'Profesor', 'Padre', 'todos'])
+            }
+            for anio in self.anios for n in range(a.eventos_por_anio)
+        ))
+
+        candidato_id = self.siguiente_id(Candidato.id_candidato)
+        filas = []
+        for categoria in ('Personero', 'Contralor', 'Cabildante'):
+            for k in range(3):
+                nombre, apellido = self.nombre()
+                filas.append({
+                    'id_candidato': candidato_id, 'nombre': f"{nombre} {apellido}",
+                    'tarjeton': f"BN{candidato_id:04d}", 'propuesta': 'Propuesta sintética',
+                    'categoria': categoria, 'foto': 'default.jpg', 'votos': 0, 'activo': True,
+                    'fecha_registro': self.ahora
+                })
+                candidato_id += 1
+        self.insertar(Candidato.__table__, filas)
+
+        db.session.commit()
+        return self.totales
+
+
+def _entero_positivo(valor):
+    numero = int(valor)
+    if numero < 1:
+        raise argparse.ArgumentTypeError(f"debe ser al menos 1: {valor}")
+    return numero
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='URL de la base de datos (por defecto, la de Config / MYSQL_URL)')
+    parser.add_argument('--reiniciar', action='store_true', help='Borra y recrea todas las tablas antes de generar')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--password', default='Benchmark123!')
+    parser.add_argument('--sedes', type=_entero_positivo, default=5)
+    parser.add_argument('--cursos', type=_entero_positivo, default=200)
+    parser.add_argument('--profesores', type=int, default=None, help='Por defecto, 1.5 por curso')
+    parser.add_argument('--estudiantes', type=int, default=10000)
+    parser.add_argument('--anios', type=int, default=5)
+    parser.add_argument('--dias-por-anio', type=int, default=190)
+    parser.add_argument('--clases-asistencia', type=int, default=1,
+                        help='Clases con asistencia registrada por estudiante y día')
+    parser.add_argument('--notas-por-categoria', type=int, default=2,
+                        help='Calificaciones por categoría, asignatura y año')
+    parser.add_argument('--equipos-por-sala', type=int, default=30)
+    parser.add_argument('--notificaciones-por-usuario', type=int, default=20)
+    parser.add_argument('--mensajes-por-usuario', type=int, default=5)
+    parser.add_argument('--eventos-por-anio', type=int, default=40)
+    parser.add_argument('--fecha', help='Fecha de referencia YYYY-MM-DD (por defecto, hoy) para datos reproducibles')
+    return parser
+
+
+def main():
+    args = crear_parser().parse_args()
+
+    if args.db:
+        os.environ['MYSQL_URL'] = args.db
+
+    from werkzeug.security import generate_password_hash
+    from app import app, create_initial_data
+    from controllers.models import db
+
+    inicio = time.perf_counter()
+    with app.app_context():
+        if args.reiniciar:
+            db.drop_all()
+        create_initial_data()
+
+        generador = Generador(args, generate_password_hash(args.password))
+        totales = generador.generar()
+
+    duracion = time.perf_counter() - inicio
+    print(f"\n✅ {sum(totales.values()):,} filas en {duracion:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Equivalencia entre perfiles de base de datos (SQLite frente a MySQL).
+
+Pobla cada base de datos con el mismo conjunto sintético (misma semilla y
+fecha de referencia), consulta los endpoints JSON de lectura de cada rol y
+compara las respuestas. Así se comprueba que los resultados medidos con el
+perfil SQLite (pruebas y benchmarks sin servidor) valen para producción.
+
+Cada base de datos se puebla en un proceso aparte porque la URI se fija al
+importar la aplicación. Las bases de datos indicadas se BORRAN y recrean.
+
+Uso:
+    python -m benchmarks.equivalencia_dialectos --mysql mysql+pymysql://root:@127.0.0.1:3306/acentrax_equivalencia
+    python -m benchmarks.equivalencia_dialectos --referencia sqlite:////tmp/a.db --mysql sqlite://
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+FECHA_REFERENCIA = '2026-06-15'
+ESCALA = ['--sedes', '2', '--cursos', '6', '--estudiantes', '120', '--anios', '2', '--dias-por-anio', '20',
+          '--notificaciones-por-usuario', '3', '--mensajes-por-usuario', '1', '--eventos-por-anio', '5',
+          '--equipos-por-sala', '3']
+
+ENDPOINTS = {
+    'admin': [
+        '/admin/api/estudiantes', '/admin/api/profesores', '/admin/api/padres',
+        '/admin/api/directorio/estudiantes',
+    ],
+    'profesor': [
+        '/profesor/api/mis-cursos', '/profesor/api/mis-horarios', '/profesor/api/obtener-calificaciones',
+        '/profesor/api/obtener-estadisticas-calificaciones', '/profesor/api/periodos',
+    ],
+    'estudiante': [
+        '/estudiante/api/mi-horario', '/estudiante/api/mis-calificaciones', '/estudiante/api/mis-asistencias',
+        '/estudiante/api/periodos', '/estudiante/candidatos',
+    ],
+    'padre': ['/padre/api/obtener_hijos', '/padre/api/periodos', '/padre/api/notificaciones/contador'],
+}
+
+
+def capturar(db_url, salida):
+    """Pobla la base de datos y guarda {endpoint: [estado, cuerpo]} en `salida`."""
+    os.environ['MYSQL_URL'] = db_url
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    from werkzeug.security import generate_password_hash
+    from app import app, create_initial_data
+    from controllers.models import db, Usuario, Clase, estudiante_padre
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    args = crear_parser().parse_args(ESCALA + ['--fecha', FECHA_REFERENCIA])
+    with app.app_context():
+        db.drop_all()
+        create_initial_data()
+        Generador(args, generate_password_hash(args.password)).generar()
+
+        clase = Clase.query.order_by(Clase.id_clase).first()
+        padre_id, estudiante_id = db.session.query(
+            estudiante_padre.c.padre_id, estudiante_padre.c.estudiante_id
+        ).order_by(estudiante_padre.c.estudiante_id).first()
+        usuarios = {
+            'admin': Usuario.query.filter_by(id_rol_fk=1).first().id_usuario,
+            'profesor': clase.profesorId,
+            'estudiante': estudiante_id,
+            'padre': padre_id,
+        }
+
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    respuestas = {}
+    for rol, rutas in ENDPOINTS.items():
+        cliente = app.test_client()
+        with cliente.session_transaction() as s:
+            s['_user_id'] = str(usuarios[rol])
+            s['_fresh'] = True
+            if rol == 'profesor':
+                s['curso_seleccionado'] = clase.cursoId
+                s['asignatura_seleccionada'] = clase.asignaturaId
+        for ruta in rutas:
+            respuesta = cliente.get(ruta)
+            respuestas[ruta] = [respuesta.status_code, respuesta.get_json(silent=True)]
+
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(respuestas, f, ensure_ascii=False, default=str)
+
+
+def normalizar(valor):
+    """Listas sin orden (el orden de cotejo difiere entre motores) y números como float."""
+    if isinstance(valor, dict):
+        return {k: normalizar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return sorted((normalizar(v) for v in valor), key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return round(float(valor), 2)
+    return valor
+
+
+def diferencias(a, b, ruta=''):
+    if type(a) is not type(b):
+        return [f"{ruta or '/'}: {a!r} != {b!r}"]
+    if isinstance(a, dict):
+        salida = []
+        for clave in sorted(set(a) | set(b)):
+            if clave not in a or clave not in b:
+                salida.append(f"{ruta}.{clave}: solo en {'referencia' if clave in a else 'mysql'}")
+            else:
+                salida.extend(diferencias(a[clave], b[clave], f"{ruta}.{clave}"))
+        return salida
+    if isinstance(a, list):
+        if len(a) != len(b):
+            return [f"{ruta}: {len(a)} elementos != {len(b)}"]
+        salida = []
+        for i, (x, y) in enumerate(zip(a, b)):
+            salida.extend(diferencias(x, y, f"{ruta}[{i}]"))
+        return salida
+    return [] if a == b else [f"{ruta}: {a!r} != {b!r}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--referencia', default='sqlite://', help='Base de datos de referencia (por defecto, SQLite en memoria)')
+    parser.add_argument('--mysql', default=os.environ.get('MYSQL_URL_EQUIVALENCIA'),
+                        help='Base de datos MySQL desechable (o MYSQL_URL_EQUIVALENCIA)')
+    parser.add_argument('--capturar', nargs=2, metavar=('DB', 'SALIDA'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.capturar:
+        capturar(*args.capturar)
+        return
+    if not args.mysql:
+        print('Sin base de datos MySQL (--mysql o MYSQL_URL_EQUIVALENCIA): no hay nada que comparar.')
+        return
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        for nombre, url in (('referencia', args.referencia), ('mysql', args.mysql)):
+            salida = os.path.join(carpeta, f"{nombre}.json")
+            print(f"Poblando y consultando {nombre}...")
+            # Hash fijo: algunos endpoints arman listas a partir de sets de cadenas.
+            subprocess.run([sys.executable, '-m', 'benchmarks.equivalencia_dialectos', '--capturar', url, salida],
+                           check=True, env=dict(os.environ, PYTHONHASHSEED='0'))
+            with open(salida, encoding='utf-8') as f:
+                resultados.append(json.load(f))
+
+    referencia, mysql = resultados
+    fallos = 0
+    for ruta in referencia:
+        difs = diferencias(normalizar(referencia[ruta]), normalizar(mysql.get(ruta)))
+        fallos += bool(difs)
+        print(f"{'OK ' if not difs else 'DIF'} {ruta}")
+        for linea in difs[:10]:
+            print(f"      {linea}")
+
+    print(f"\n{len(referencia) - fallos}/{len(referencia)} endpoints equivalentes")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == '__main__':
+    main()
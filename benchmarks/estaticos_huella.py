@@ -0,0 +1,110 @@
+"""
+Comprobación de los estáticos con huella de contenido.
+
+Trabaja sobre una copia temporal de static/ y compara una visita repetida a
+varias páginas sin y con manifiesto: cuenta los CSS/JS que el navegador
+tendría que revalidar (peticiones condicionales) porque no se sirven como
+inmutables. Comprueba además que:
+
+    1. url_for('static') devuelve la URL con huella de cada archivo del manifiesto;
+    2. la URL con huella responde 200 con Cache-Control immutable;
+    3. al cambiar un archivo y reconstruir, cambia su URL y la copia anterior
+       desaparece.
+
+Uso:
+    python -m benchmarks.estaticos_huella
+"""
+
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones  # noqa: E402
+
+
+PAGINAS = ['/', '/login', '/forgot_password', '/admin/profesores', '/admin/padres', '/admin/superadmins',
+           '/admin/equipos', '/admin/salones', '/admin/incidentes', '/admin/mantenimiento',
+           '/admin/gestion-horarios', '/admin/sistema-votaciones']
+_PATRON_ESTATICO = re.compile(r'(?:src|href)="(/static/[^"?#]+\.(?:css|js))"')
+
+
+def main():
+    os.environ.setdefault('DB_PERFIL', 'memoria')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    from flask import url_for
+    from app import app, create_initial_data
+    from services.estaticos_service import construir_estaticos, cargar_manifiesto, _manifiestos
+
+    carpeta = tempfile.mkdtemp(prefix='acentrax-estaticos-')
+    for subcarpeta in ('css', 'js'):
+        shutil.copytree(os.path.join(app.static_folder, subcarpeta), os.path.join(carpeta, subcarpeta))
+    app.static_folder = carpeta
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        create_initial_data()
+    cliente = app.test_client()
+    with cliente.session_transaction() as s:
+        s['_user_id'] = '1'
+        s['_fresh'] = True
+
+    def visitar():
+        """(URLs de CSS/JS referenciadas, cuántas habría que revalidar en una visita repetida)."""
+        urls = set()
+        for pagina in PAGINAS:
+            respuesta = cliente.get(pagina)
+            if respuesta.status_code == 200:
+                urls.update(_PATRON_ESTATICO.findall(respuesta.get_data(as_text=True)))
+        revalidar = 0
+        for url in urls:
+            respuesta = cliente.get(url)
+            if respuesta.status_code == 200 and 'immutable' not in respuesta.headers.get('Cache-Control', ''):
+                revalidar += 1
+        return urls, revalidar
+
+    comprobar = Comprobaciones()
+
+    urls, revalidar_antes = visitar()
+    print(f"Sin manifiesto: {len(urls)} CSS/JS en {len(PAGINAS)} páginas, {revalidar_antes} a revalidar")
+
+    manifiesto, escritos = construir_estaticos(carpeta)
+    original = sum(os.path.getsize(os.path.join(carpeta, o)) for o in manifiesto if o.endswith('.css'))
+    minificado = sum(os.path.getsize(os.path.join(carpeta, h)) for o, h in manifiesto.items() if o.endswith('.css'))
+    print(f"Construidos: {len(manifiesto)} archivos ({escritos} nuevos), CSS {original / 1024:.0f} KB -> "
+          f"{minificado / 1024:.0f} KB minificado")
+
+    urls, revalidar_despues = visitar()
+    print(f"Con manifiesto: {len(urls)} CSS/JS, {revalidar_despues} a revalidar\n")
+    comprobar('1. visita repetida sin revalidaciones', revalidar_despues == 0 and revalidar_antes > 0,
+              f"{revalidar_antes} -> {revalidar_despues}")
+
+    with app.test_request_context():
+        distintas = [o for o, h in manifiesto.items() if url_for('static', filename=o) != f"/static/{h}"]
+    comprobar('2. url_for devuelve la URL con huella', not distintas, ', '.join(distintas[:3]))
+
+    respuesta = cliente.get(f"/static/{manifiesto['css/login.css']}")
+    comprobar('3. URL con huella inmutable', respuesta.status_code == 200
+              and 'immutable' in respuesta.headers.get('Cache-Control', ''), respuesta.headers.get('Cache-Control'))
+
+    anterior = manifiesto['css/login.css']
+    with open(os.path.join(carpeta, 'css/login.css'), 'a', encoding='utf-8') as f:
+        f.write('\n.cambio { color: red; }\n')
+    nuevo, _ = construir_estaticos(carpeta)
+    with app.test_request_context():
+        url = url_for('static', filename='css/login.css')
+    comprobar('4. un cambio genera una URL nueva', url == f"/static/{nuevo['css/login.css']}" and url != f"/static/{anterior}"
+              and not os.path.exists(os.path.join(carpeta, anterior)), url)
+    comprobar('5. el manifiesto en memoria se recarga', cargar_manifiesto(carpeta) == nuevo)
+
+    _manifiestos.clear()
+    shutil.rmtree(carpeta, ignore_errors=True)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark de la exportación de calificaciones.
+
+Genera una institución sintética con varios años de matrículas en una
+base SQLite temporal y recorre exportacion_calificaciones() completa y
+por curso.
+
+Comprueba que:
+
+    1. cada calificación se exporta una sola vez aunque el estudiante
+       tenga matrículas de varios años;
+    2. el curso de cada fila es el de la matrícula más reciente del
+       estudiante;
+    3. la suma de las exportaciones por curso es la exportación completa;
+    4. la respuesta CSV tiene una línea por calificación más el
+       encabezado.
+
+Uso:
+    python -m benchmarks.exportacion_calificaciones
+    python -m benchmarks.exportacion_calificaciones --estudiantes 3000
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones, base_sqlite  # noqa: E402
+
+
+ESCALA = ['--sedes', '2', '--cursos', '8', '--anios', '3', '--dias-por-anio', '2',
+          '--notificaciones-por-usuario', '0', '--mensajes-por-usuario', '0', '--eventos-por-anio', '1',
+          '--equipos-por-sala', '1']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--estudiantes', type=int, default=300)
+    args = parser.parse_args()
+
+    ruta_db = base_sqlite('exportacion', MANTENIMIENTO_PLANIFICADOR='0')
+
+    from sqlalchemy import func, select
+    from app import app, create_initial_data
+    from controllers.models import db, Calificacion, Curso, Matricula, Usuario
+    from services import exportacion_service
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    app.config.update(TESTING=True)
+    comprobar = Comprobaciones()
+
+    with app.app_context():
+        create_initial_data()
+        Generador(crear_parser().parse_args(ESCALA + ['--estudiantes', str(args.estudiantes)]), 'x').generar()
+        total = db.session.scalar(select(func.count()).select_from(Calificacion))
+        repetidos = db.session.scalar(
+            select(func.count()).select_from(
+                select(Matricula.estudianteId).group_by(Matricula.estudianteId)
+                .having(func.count() > 1).subquery()
+            )
+        )
+        actual = {}
+        for identidad, año, curso in db.session.execute(
+                select(Usuario.no_identidad, Matricula.año, Curso.nombreCurso)
+                .join(Matricula, Matricula.estudianteId == Usuario.id_usuario)
+                .join(Curso, Matricula.cursoId == Curso.id_curso)
+                .order_by(Matricula.año, Matricula.id_matricula)):
+            actual[identidad] = curso
+        cursos = db.session.execute(select(Curso.id_curso)).scalars().all()
+
+        inicio = time.perf_counter()
+        _, filas = exportacion_service.exportacion_calificaciones()
+        filas = list(filas)
+        ms = (time.perf_counter() - inicio) * 1000
+        print(f"\n{total} calificaciones, {repetidos} estudiantes con varias matrículas, "
+              f"exportación completa {ms:.0f} ms\n")
+
+        comprobar('1. una fila por calificación', len(filas) == total, f"{len(filas)} filas / {total} calificaciones")
+        distintos = [f for f in filas if actual.get(f[1]) != f[0]]
+        comprobar('2. curso de la matrícula más reciente', not distintos, f"{len(distintos)} filas con otro curso")
+        por_curso = sum(len(list(exportacion_service.exportacion_calificaciones(curso_id=c)[1])) for c in cursos)
+        comprobar('3. suma por curso = exportación completa', por_curso == len(filas), f"{por_curso} / {len(filas)}")
+
+        with app.test_request_context():
+            respuesta, _ = exportacion_service.respuesta_exportacion(
+                'calificaciones', *exportacion_service.exportacion_calificaciones(), formato='csv'
+            )
+            texto = b''.join(respuesta.response).decode('utf-8-sig')
+        lineas = sum(1 for _ in csv.reader(io.StringIO(texto)))
+        comprobar('4. CSV con una línea por calificación', lineas == total + 1, f"{lineas} líneas")
+
+    os.remove(ruta_db)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
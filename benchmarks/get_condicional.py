@@ -0,0 +1,203 @@
+"""
+Comprobación de las respuestas condicionales (ETag / 304) por endpoint.
+
+Para cada endpoint decorado con @respuesta_condicional comprueba que:
+    1. la primera petición responde 200 con ETag y Cache-Control;
+    2. repetirla con If-None-Match responde 304 sin cuerpo y sin ejecutar
+       las consultas de la vista;
+    3. tras modificar una tabla de la que depende (por el ORM, con
+       update() o con SQL crudo) la ETag cambia y se responde 200.
+
+También comprueba If-Modified-Since, que una respuesta comprimida (ETag
+débil) siga revalidándose con 304, que cambiar columnas de usuarios que no
+muestra ninguna vista (voto, intentos de verificación) no cambia la ETag, y
+que los contadores se incrementan después del commit y no dentro de la
+transacción que escribe.
+
+Uso:
+    python -m benchmarks.get_condicional
+    python -m benchmarks.get_condicional --db /tmp/condicional.db
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones, base_sqlite  # noqa: E402
+
+
+ESCALA = ['--sedes', '1', '--cursos', '2', '--estudiantes', '20', '--anios', '1', '--dias-por-anio', '5',
+          '--notificaciones-por-usuario', '1', '--mensajes-por-usuario', '1', '--eventos-por-anio', '3',
+          '--equipos-por-sala', '1']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='Archivo SQLite (por defecto, uno temporal)')
+    args = parser.parse_args()
+
+    ruta_db = base_sqlite('condicional', args.db, RESPUESTAS_CONDICIONALES='1')
+
+    from sqlalchemy import event, text, update
+    from werkzeug.security import generate_password_hash
+    from app import app, create_initial_data
+    from controllers.models import (
+        db, Usuario, Matricula, Salon, HorarioCurso, Equipo, Evento, Sede, estudiante_padre
+    )
+    from services.condicional_service import PREFIJO_TABLA
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    datos = crear_parser().parse_args(ESCALA)
+    with app.app_context():
+        create_initial_data()
+        Generador(datos, generate_password_hash(datos.password)).generar()
+        admin_id = Usuario.query.filter_by(id_rol_fk=1).first().id_usuario
+        estudiante_id, otro_estudiante_id = [m[0] for m in db.session.query(Matricula.estudianteId).limit(2)]
+        padre_id, hijo_id = db.session.query(estudiante_padre.c.padre_id, estudiante_padre.c.estudiante_id).first()
+        profesor_id = db.session.query(HorarioCurso.profesor_id).filter(HorarioCurso.profesor_id.isnot(None)).first()[0]
+        db.session.remove()
+
+        sentencias = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: sentencias.append(a[2]))
+        contadores = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda *a: contadores.append(a[2]) if PREFIJO_TABLA in str(a[3]) else None)
+
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+
+    def cambiar_salon():
+        matricula = Matricula.query.filter_by(estudianteId=estudiante_id).first()
+        horario = HorarioCurso.query.filter_by(curso_id=matricula.cursoId).filter(HorarioCurso.id_salon_fk.isnot(None)).first()
+        salon = db.session.get(Salon, horario.id_salon_fk)
+        salon.nombre = salon.nombre + ' *'
+
+    def vincular_hijo():
+        padre = db.session.get(Usuario, padre_id)
+        otro = Usuario.query.filter(Usuario.id_rol_fk == 3, Usuario.id_usuario != hijo_id).first()
+        otro.padres.append(padre)
+
+    def mover_horario_profesor():
+        db.session.execute(update(HorarioCurso).where(HorarioCurso.profesor_id == profesor_id)
+                           .values(dia_semana=HorarioCurso.dia_semana))
+
+    def renombrar_horario_general():
+        db.session.execute(text("UPDATE horario_general SET nombre = nombre || ' *'"))
+
+    def nuevo_equipo():
+        salon = Salon.query.first()
+        db.session.add(Equipo(id_referencia='COND-1', nombre='Equipo condicional', tipo='Portátil',
+                              estado='Disponible', id_salon_fk=salon.id_salon))
+
+    def nuevo_evento():
+        db.session.add(Evento(nombre='Evento condicional', descripcion='Prueba ETag',
+                              fecha=date.today() + timedelta(days=1), hora=time(9, 0), rol_destino='Todos'))
+
+    def nueva_sede():
+        db.session.add(Sede(nombre='Sede condicional', direccion='Calle 1'))
+
+    casos = [
+        ('estudiante mi-horario', '/estudiante/api/mi-horario', estudiante_id, cambiar_salon),
+        ('padre horario_estudiante', f'/padre/api/horario_estudiante/{hijo_id}', padre_id, vincular_hijo),
+        ('profesor mis-horarios', '/profesor/api/mis-horarios', profesor_id, mover_horario_profesor),
+        ('admin horarios', '/admin/api/horarios', admin_id, renombrar_horario_general),
+        ('admin salas_todas', '/admin/api/salas_todas', admin_id, nuevo_equipo),
+        ('público eventos', '/api/public/eventos', None, nuevo_evento),
+        ('público resumen', '/api/public/resumen', None, nueva_sede),
+    ]
+
+    comprobar = Comprobaciones()
+
+    for nombre, ruta, usuario_id, modificar in casos:
+        cliente = app.test_client()
+        if usuario_id:
+            with cliente.session_transaction() as s:
+                s['_user_id'] = str(usuario_id)
+                s['_fresh'] = True
+
+        sentencias.clear()
+        primera = cliente.get(ruta)
+        consultas_200 = len(sentencias)
+        etag = primera.headers.get('ETag')
+        comprobar(f"{nombre} 1. 200 con ETag", primera.status_code == 200 and bool(etag),
+                  f"HTTP {primera.status_code}, ETag {etag}, {primera.headers.get('Cache-Control')}")
+
+        sentencias.clear()
+        segunda = cliente.get(ruta, headers={'If-None-Match': etag or ''})
+        comprobar(f"{nombre} 2. 304 con If-None-Match",
+                  segunda.status_code == 304 and not segunda.data and len(sentencias) < consultas_200,
+                  f"HTTP {segunda.status_code}, {len(sentencias)} consultas (200: {consultas_200})")
+
+        with app.app_context():
+            modificar()
+            db.session.commit()
+            db.session.remove()
+        tercera = cliente.get(ruta, headers={'If-None-Match': etag or ''})
+        comprobar(f"{nombre} 3. cambio en una tabla dependiente",
+                  tercera.status_code == 200 and tercera.headers.get('ETag') not in (None, etag),
+                  f"HTTP {tercera.status_code}, ETag {tercera.headers.get('ETag')}")
+
+    cliente = app.test_client()
+    primera = cliente.get('/api/public/eventos')
+    respuesta = cliente.get('/api/public/eventos', headers={'If-Modified-Since': primera.headers['Last-Modified']})
+    comprobar('If-Modified-Since', respuesta.status_code == 304, f"HTTP {respuesta.status_code}")
+
+    with cliente.session_transaction() as s:
+        s['_user_id'] = str(admin_id)
+        s['_fresh'] = True
+    app.config['COMPRESION_MINIMO'] = 0
+    comprimida = cliente.get('/admin/api/salas_todas', headers={'Accept-Encoding': 'gzip'})
+    etag = comprimida.headers.get('ETag', '')
+    respuesta = cliente.get('/admin/api/salas_todas', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    comprobar('ETag débil de respuesta comprimida',
+              respuesta.status_code == 304 and comprimida.headers.get('Content-Encoding') == 'gzip' and etag.startswith('W/'),
+              f"{comprimida.headers.get('Content-Encoding')}, ETag {etag}, HTTP {respuesta.status_code}")
+
+    cliente = app.test_client()
+    with cliente.session_transaction() as s:
+        s['_user_id'] = str(estudiante_id)
+        s['_fresh'] = True
+    etags = {ruta: cliente.get(ruta).headers.get('ETag') for ruta in ('/estudiante/api/mi-horario', '/api/public/resumen')}
+    with app.app_context():
+        contadores.clear()
+        usuario = db.session.get(Usuario, estudiante_id)
+        usuario.voto_registrado = not usuario.voto_registrado
+        usuario.verification_attempts = (usuario.verification_attempts or 0) + 1
+        db.session.execute(update(Usuario).where(Usuario.id_usuario == otro_estudiante_id)
+                           .values(last_verification_attempt=date.today()))
+        db.session.commit()
+        db.session.remove()
+    escrituras = [x for x in contadores if not x.lstrip().upper().startswith('SELECT')]
+    vigentes = [cliente.get(ruta, headers={'If-None-Match': etag}).status_code for ruta, etag in etags.items()]
+    comprobar('Columnas no mostradas no cambian la ETag', vigentes == [304, 304] and not escrituras,
+              f"HTTP {vigentes}, {len(escrituras)} incrementos de contadores")
+
+    with app.app_context():
+        cambiar_salon()
+        contadores.clear()
+        db.session.flush()
+        en_transaccion = list(contadores)
+        db.session.commit()
+        tras_commit = contadores[len(en_transaccion):]
+        db.session.remove()
+    comprobar('Contadores incrementados tras el commit', not en_transaccion and len(tras_commit) == 1,
+              f"{len(en_transaccion)} en la transacción, {len(tras_commit)} después")
+
+    etags = set()
+    for usuario_id in (estudiante_id, otro_estudiante_id):
+        cliente = app.test_client()
+        with cliente.session_transaction() as s:
+            s['_user_id'] = str(usuario_id)
+            s['_fresh'] = True
+        etags.add(cliente.get('/estudiante/api/mi-horario').headers.get('ETag'))
+    comprobar('ETag privada distinta por usuario', len(etags) == 2)
+
+    if not args.db:
+        os.remove(ruta_db)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
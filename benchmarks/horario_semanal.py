@@ -0,0 +1,297 @@
+"""
+Benchmark de los horarios semanales materializados.
+
+Genera una institución sintética en una base SQLite temporal (con un
+descanso añadido al horario general) y compara, por curso y por profesor:
+
+    sin caché:      construir_horario_curso() / construir_horario_profesor(),
+                    lo que antes se hacía en cada petición
+    materializado:  horario_curso() / horario_profesor()
+
+Comprueba que:
+
+    1. el horario materializado es igual al construido desde cero;
+    2. una vez materializado, el dashboard del profesor no consulta los
+       horarios y hace las mismas consultas, en un tiempo similar, con
+       --asignaciones filas más de HorarioCurso;
+    3. cada escritura vigilada (ORM y masiva) invalida los horarios al
+       confirmarse, y las demás escrituras (el nombre de un estudiante
+       incluido) y los rollbacks no;
+    4. tras un cambio confirmado por otro worker, las vistas condicionales
+       responden enseguida con la ETag nueva y el horario nuevo (y 304 al
+       revalidarla), y el resto lo ve tras HORARIOS_VERSION_TTL;
+    5. las rutas de estudiante, padre y profesor devuelven el horario
+       materializado;
+    6. dentro de una vista de solo lectura la versión y la matriz se leen
+       de la primaria, aunque la réplica esté atrasada.
+
+Uso:
+    python -m benchmarks.horario_semanal
+    python -m benchmarks.horario_semanal --asignaciones 20000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones, base_sqlite, sentencias_ejecutadas  # noqa: E402
+
+
+ESCALA = ['--sedes', '3', '--cursos', '30', '--estudiantes', '300', '--anios', '1', '--dias-por-anio', '1',
+          '--notificaciones-por-usuario', '0', '--mensajes-por-usuario', '0', '--eventos-por-anio', '1',
+          '--equipos-por-sala', '1']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--asignaciones', type=int, default=3000, help='filas de HorarioCurso añadidas al profesor')
+    parser.add_argument('--repeticiones', type=int, default=30)
+    args = parser.parse_args()
+
+    ruta_db = base_sqlite('horario', MANTENIMIENTO_PLANIFICADOR='0')
+    ruta_replica = os.path.join(os.path.dirname(ruta_db), 'replica.db')
+    os.environ['MYSQL_REPLICA_URL'] = f"sqlite:///{ruta_replica}"
+
+    from datetime import datetime, time as hora
+    from sqlalchemy import select, update
+    from app import app, create_initial_data
+    from controllers.models import (
+        db, Asignatura, BloqueHorario, Curso, HorarioCompartido, HorarioCurso, Matricula, Usuario, VersionDatos,
+        estudiante_padre
+    )
+    from extensions import pool_actual
+    from services import horario_service
+    from services.condicional_service import PREFIJO_TABLA
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    app.config.update(TESTING=True)
+    rnd = random.Random(3)
+    comprobar = Comprobaciones()
+
+    def medir(funcion, repeticiones):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos)
+
+    with app.app_context():
+        create_initial_data()
+        Generador(crear_parser().parse_args(ESCALA), 'x').generar()
+        horario_general = db.session.execute(select(Curso.horario_general_id)).scalars().first()
+        db.session.add(BloqueHorario(horario_general_id=horario_general, dia_semana='Miércoles', horaInicio=hora(9, 30),
+                                     horaFin=hora(9, 45), tipo='Descanso', orden=4, nombre='Recreo', break_type='recreo'))
+        db.session.commit()
+        cursos = db.session.execute(select(Curso.id_curso)).scalars().all()
+        profesores = db.session.execute(select(HorarioCurso.profesor_id).distinct()).scalars().all()
+        profesor = profesores[0]
+        curso, asignatura = db.session.execute(select(HorarioCurso.curso_id, HorarioCurso.asignatura_id)
+                                               .where(HorarioCurso.profesor_id == profesor)).first()
+        estudiante = db.session.execute(select(Matricula.estudianteId).where(Matricula.cursoId == curso)).scalars().first()
+        padre = db.session.execute(select(estudiante_padre.c.padre_id)
+                                   .where(estudiante_padre.c.estudiante_id == estudiante)).scalars().first()
+        motor = db.engine
+        db.session.remove()
+        # Réplica congelada en este punto: todo lo que sigue la deja atrasada
+        origen, destino = sqlite3.connect(ruta_db), sqlite3.connect(ruta_replica)
+        origen.backup(destino)
+        origen.close()
+        destino.close()
+
+        iguales = all(horario_service.horario_curso(c) == horario_service.construir_horario_curso(c) for c in cursos) \
+            and all(horario_service.horario_profesor(p) == horario_service.construir_horario_profesor(p)
+                    for p in profesores)
+        construir = medir(lambda: [horario_service.construir_horario_curso(c) for c in cursos], 3) / len(cursos)
+        materializado = medir(lambda: [horario_service.horario_curso(c) for c in cursos], 3) / len(cursos)
+        construir_p = medir(lambda: horario_service.construir_horario_profesor(profesor), 3)
+        materializado_p = medir(lambda: horario_service.horario_profesor(profesor), args.repeticiones)
+        print(f"\n{len(cursos)} cursos, {len(profesores)} profesores\n")
+        print(f"{'horario':<10} {'sin caché ms':>13} {'materializado ms':>17}")
+        print(f"{'curso':<10} {construir:>13.2f} {materializado:>17.3f}")
+        print(f"{'profesor':<10} {construir_p:>13.2f} {materializado_p:>17.3f}\n")
+        comprobar('1. materializado = construido desde cero', iguales)
+        db.session.remove()
+
+    cliente = app.test_client()
+
+    def iniciar_sesion(usuario_id):
+        with cliente.session_transaction() as s:
+            s['_user_id'] = str(usuario_id)
+            s['_fresh'] = True
+
+    def dashboard():
+        with sentencias_ejecutadas(motor, excluir='version_datos') as sentencias:
+            respuesta = cliente.get('/profesor/dashboard')
+        return respuesta.status_code, sentencias
+
+    iniciar_sesion(profesor)
+    dashboard()
+    estado, antes = dashboard()
+    ms_antes = medir(dashboard, args.repeticiones)
+
+    with app.app_context():
+        bloques = db.session.execute(select(BloqueHorario.dia_semana, BloqueHorario.horaInicio)).all()
+        filas = []
+        for _ in range(args.asignaciones):
+            dia, inicio = rnd.choice(bloques)
+            filas.append({'curso_id': curso, 'asignatura_id': asignatura, 'profesor_id': profesor, 'dia_semana': dia,
+                          'hora_inicio': inicio.strftime('%H:%M'), 'hora_fin': f"{inicio.hour + 1:02d}:00",
+                          'horario_general_id': horario_general, 'fecha_creacion': datetime.utcnow()})
+        db.session.execute(HorarioCurso.__table__.insert(), filas)
+        db.session.commit()
+        db.session.remove()
+
+    dashboard()
+    estado_despues, despues = dashboard()
+    ms_despues = medir(dashboard, args.repeticiones)
+    de_horarios = [s for s in despues if 'horario_curso' in s or 'bloque_horario' in s]
+    print(f"{'dashboard':<28} {'consultas':>10} {'p50 ms':>8}")
+    print(f"{'antes':<28} {len(antes):>10} {ms_antes:>8.1f}")
+    print(f"{f'con {args.asignaciones:,} asignaciones más':<28} {len(despues):>10} {ms_despues:>8.1f}\n")
+    comprobar('2. dashboard independiente del número de asignaciones',
+              estado == estado_despues == 200 and len(antes) == len(despues) and not de_horarios
+              and ms_despues < 2 * ms_antes,
+              f"{len(despues)} consultas, {len(de_horarios)} de horarios")
+
+    with app.app_context():
+        def version():
+            return db.session.execute(select(VersionDatos.version).where(
+                VersionDatos.clave == PREFIJO_TABLA + horario_service.CONTADOR_HORARIOS)).scalar() or 0
+
+        def invalida(cambio, confirmar=True):
+            inicial = version()
+            cambio()
+            en_transaccion = version()
+            db.session.commit() if confirmar else db.session.rollback()
+            if not confirmar:
+                return en_transaccion == version() == inicial
+            return en_transaccion == inicial and version() > inicial
+
+        hc = HorarioCurso.query.filter_by(curso_id=curso).first()
+        bloque = BloqueHorario.query.filter_by(horario_general_id=horario_general).first()
+        casos = {
+            'alta de HorarioCurso': lambda: db.session.add(HorarioCurso(
+                curso_id=curso, asignatura_id=asignatura, profesor_id=profesor, dia_semana='Sábado',
+                hora_inicio='08:00', hora_fin='09:00')) or db.session.flush(),
+            'UPDATE masivo de HorarioCurso': lambda: db.session.execute(
+                update(HorarioCurso).where(HorarioCurso.id_horario_curso == hc.id_horario_curso).values(hora_fin='23:00')),
+            'alta de HorarioCompartido': lambda: db.session.add(HorarioCompartido(
+                profesor_id=profesor, curso_id=curso, asignatura_id=asignatura)) or db.session.flush(),
+            'nombre de BloqueHorario': lambda: setattr(bloque, 'nombre', 'Primera hora') or db.session.flush(),
+            'Curso.horario_general_id': lambda: setattr(db.session.get(Curso, cursos[-1]), 'horario_general_id', None)
+            or db.session.flush(),
+            'nombre de Asignatura': lambda: setattr(db.session.get(Asignatura, asignatura), 'nombre', 'Álgebra')
+            or db.session.flush(),
+            'nombre del profesor': lambda: setattr(db.session.get(Usuario, profesor), 'nombre', 'Ana')
+            or db.session.flush(),
+        }
+        resultados = {nombre: invalida(cambio) for nombre, cambio in casos.items()}
+        ajenos = {
+            'teléfono de Usuario': lambda: setattr(db.session.get(Usuario, profesor), 'telefono', '3000000000')
+            or db.session.flush(),
+            'nombre de estudiante': lambda: setattr(db.session.get(Usuario, estudiante), 'nombre', 'Luis')
+            or db.session.flush(),
+            'nombre de padre': lambda: setattr(db.session.get(Usuario, padre), 'apellido', 'Rojas')
+            or db.session.flush(),
+        }
+        ajenos_ok = all(not invalida(cambio) for cambio in ajenos.values())
+        rollback_ok = invalida(lambda: db.session.execute(
+            update(HorarioCurso).where(HorarioCurso.curso_id == curso).values(hora_fin='22:00')), confirmar=False)
+        horario = horario_service.horario_curso(curso)
+        sin_general = horario_service.horario_curso(cursos[-1])
+        del_profesor = horario_service.horario_profesor(profesor)
+        visibles = (horario == horario_service.construir_horario_curso(curso)
+                    and any(c and c['asignatura'] == 'Álgebra' for d in horario['clases_por_bloque'].values()
+                            for c in d.values())
+                    and any(b['nombre'] == 'Primera hora' for d in horario['matriz_bloques'].values() for b in d.values())
+                    and not sin_general['matriz_bloques']
+                    and any(h['dia_semana'] == 'Sábado' for h in del_profesor['detallados'])
+                    and any(c and c['profesor'].startswith('Ana ') for d in horario['clases_por_bloque'].values()
+                            for c in d.values())
+                    and del_profesor == horario_service.construir_horario_profesor(profesor))
+        fallidos = [nombre for nombre, ok in resultados.items() if not ok]
+        comprobar('3. invalidación al confirmar', not fallidos and ajenos_ok and rollback_ok and visibles,
+                  ', '.join(fallidos) or f"{len(casos)} escrituras vigiladas, {len(ajenos)} ajenas y un rollback")
+        db.session.remove()
+
+    # Las peticiones, fuera del app_context: dentro compartirían g (usuario y versiones)
+    def vista(usuario_id, ruta, etag=None):
+        iniciar_sesion(usuario_id)
+        return cliente.get(ruta, headers={'If-None-Match': etag} if etag else {})
+
+    def nombres(matriz):
+        return {c['asignatura'] for d in matriz.values() for c in d.values() if c}
+
+    vistas = {estudiante: '/estudiante/api/mi-horario', profesor: '/profesor/api/mis-horarios'}
+    etags_antes = {u: vista(u, ruta).headers.get('ETag') for u, ruta in vistas.items()}
+    app.config['HORARIOS_VERSION_TTL'] = 1.0
+    with app.app_context():
+        # Otro worker: la versión cambia sin pasar por la sesión de este proceso
+        horario_service.horario_curso(curso)
+        with db.engine.begin() as conexion:
+            conexion.execute(update(Asignatura).where(Asignatura.id_asignatura == asignatura).values(nombre='Geometría'))
+            conexion.execute(update(VersionDatos)
+                             .where(VersionDatos.clave == PREFIJO_TABLA + horario_service.CONTADOR_HORARIOS)
+                             .values(version=VersionDatos.version + 1))
+        antes_ttl = horario_service.horario_curso(curso)['clases_por_bloque']
+        db.session.remove()
+
+    respuestas = {u: vista(u, ruta) for u, ruta in vistas.items()}
+    revalidadas = [vista(u, ruta, respuestas[u].headers.get('ETag')).status_code for u, ruta in vistas.items()]
+    coherentes = ('Geometría' in nombres(respuestas[estudiante].get_json()['horario']['clases_por_bloque'])
+                  and any(h['asignatura_nombre'] == 'Geometría' for h in respuestas[profesor].get_json()['horarios'])
+                  and all(respuestas[u].headers.get('ETag') != etags_antes[u] for u in vistas)
+                  and revalidadas == [304, 304])
+
+    with app.app_context():
+        time.sleep(1.05)
+        despues_ttl = horario_service.horario_curso(curso)['clases_por_bloque']
+        comprobar('4. cambio de otro worker: ETag y horario de la misma versión, y visible tras el TTL',
+                  coherentes and 'Geometría' not in nombres(antes_ttl) and 'Geometría' in nombres(despues_ttl),
+                  f"revalidaciones {revalidadas}")
+        esperado = {k: v for k, v in horario_service.construir_horario_curso(curso).items() if k != 'entradas'}
+        db.session.remove()
+
+    iniciar_sesion(estudiante)
+    del_estudiante = cliente.get('/estudiante/api/mi-horario').get_json()
+    iniciar_sesion(padre)
+    del_padre = cliente.get(f'/padre/api/horario_estudiante/{estudiante}').get_json()
+    iniciar_sesion(profesor)
+    horarios = cliente.get('/profesor/api/mis-horarios').get_json()
+    comprobar('5. rutas de estudiante, padre y profesor',
+              del_estudiante.get('horario') == esperado and del_padre.get('horario') == esperado
+              and horarios.get('total') == len(del_profesor['detallados'])
+              and cliente.get('/profesor/ver_horario_clases').status_code == 200,
+              f"{len(esperado['bloques'])} bloques, {horarios.get('total')} horarios del profesor")
+
+    with app.app_context():
+        db.session.get(Asignatura, asignatura).nombre = 'Trigonometría'
+        db.session.commit()
+        db.session.remove()
+        token = pool_actual.set('lectura')
+        try:
+            en_replica = db.session.get(Asignatura, asignatura).nombre
+            horario = horario_service.horario_curso(curso)
+            guardada = horario_service._cache[('curso', curso)][0]
+        finally:
+            pool_actual.reset(token)
+        db.session.remove()
+        comprobar('6. versión y matriz de la primaria con la réplica atrasada',
+                  en_replica != 'Trigonometría' and 'Trigonometría' in nombres(horario['clases_por_bloque'])
+                  and guardada == version(), f"réplica: {en_replica}")
+        db.session.remove()
+
+    os.remove(ruta_db)
+    os.remove(ruta_replica)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+Benchmark de la importación masiva de equipos (CSV / XLSX).
+
+Crea sedes y salones sintéticos en una base SQLite temporal y un CSV de N
+equipos con errores conocidos: salón inexistente, referencia repetida en
+el archivo, referencia ya registrada (ambas a veces con otras mayúsculas),
+nombre vacío y fecha inválida.
+Compara:
+
+    antes:  un equipo por envío, como /admin/registro_equipos (validación
+            del salón y la referencia por fila y un commit por equipo),
+            sobre las primeras --filas-antes filas
+    ahora:  importacion_service.importar_equipos() con el archivo entero
+
+Comprueba que:
+
+    1. se rechazan exactamente las filas con errores, con su número de fila
+       (una referencia que solo cambia en mayúsculas también está repetida,
+       como en el índice único de MySQL);
+    2. el número de consultas depende del número de lotes, no de filas;
+    3. repetir la importación rechaza todas las referencias ya registradas;
+    4. CSV con ';' y fechas DD/MM/AAAA, y XLSX, se leen igual;
+    5. /admin/api/equipos/importar en segundo plano termina y ofrece el
+       CSV con todas las filas rechazadas.
+
+Uso:
+    python -m benchmarks.importacion_equipos
+    python -m benchmarks.importacion_equipos --filas 100000
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones, base_sqlite, sentencias_ejecutadas  # noqa: E402
+
+
+ESCALA = ['--sedes', '3', '--cursos', '12', '--estudiantes', '50', '--anios', '1', '--dias-por-anio', '1',
+          '--notificaciones-por-usuario', '0', '--mensajes-por-usuario', '0', '--eventos-por-anio', '1',
+          '--equipos-por-sala', '20']
+ENCABEZADOS = ['ID Referencia', 'Nombre', 'Tipo', 'Estado', 'Salón', 'Sistema Operativo', 'RAM', 'Disco Duro',
+               'Fecha Adquisición', 'Descripción', 'Observaciones']
+
+
+def generar_filas(n, salones, existentes, rnd):
+    """Filas del archivo y {número de fila: motivo} de las que deben rechazarse."""
+    filas, rechazos = [], {}
+    for i in range(n):
+        numero = i + 2
+        fila = [f"IMP-{i:07d}", f"Equipo importado {i}", rnd.choice(['computadora', 'laptop', 'tablet']),
+                rnd.choice(['Disponible', 'disponible', '']), rnd.choice(salones), 'Windows 11', '16GB',
+                '512GB SSD', f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}", '', 'Lote sintético']
+        error = rnd.random()
+        if error < 0.02:
+            fila[4], rechazos[numero] = 999999, 'salón'
+        elif error < 0.03 and i > 10:
+            fila[0], rechazos[numero] = rnd.choice([f"IMP-{i - 5:07d}", f"imp-{i - 5:07d}"]), 'repetido'
+        elif error < 0.04:
+            referencia = rnd.choice(existentes)
+            fila[0], rechazos[numero] = rnd.choice([referencia, referencia.swapcase()]), 'registrado'
+        elif error < 0.05:
+            fila[1], rechazos[numero] = '', 'nombre'
+        elif error < 0.06:
+            fila[8], rechazos[numero] = '31/02/2024', 'fecha'
+        filas.append(fila)
+    # Una referencia repetida solo es error si la primera aparición era válida
+    for numero, motivo in list(rechazos.items()):
+        if motivo == 'repetido' and (numero - 5) in rechazos:
+            del rechazos[numero]
+    return filas, rechazos
+
+
+def a_csv(filas, separador=','):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=separador)
+    escritor.writerow(ENCABEZADOS)
+    escritor.writerows(filas)
+    return buffer.getvalue().encode('utf-8-sig')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=20000)
+    parser.add_argument('--filas-antes', type=int, default=2000)
+    args = parser.parse_args()
+
+    ruta_db = base_sqlite('importacion')
+
+    from datetime import datetime
+    from sqlalchemy import func, select
+    from app import app, create_initial_data
+    from controllers.models import db, Equipo, Salon
+    from services.importacion_service import FILAS_POR_LOTE, importar_equipos
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    app.config.update(TESTING=True)
+    rnd = random.Random(5)
+    comprobar = Comprobaciones()
+
+    def total_equipos():
+        return db.session.execute(select(func.count()).select_from(Equipo)).scalar()
+
+    with app.app_context():
+        create_initial_data()
+        Generador(crear_parser().parse_args(ESCALA), 'x').generar()
+        salones = db.session.execute(select(Salon.id_salon)).scalars().all()
+        existentes = db.session.execute(select(Equipo.id_referencia)).scalars().all()
+        filas, rechazos = generar_filas(args.filas, salones, existentes, rnd)
+        contenido = a_csv(filas)
+        print(f"\n{len(filas):,} filas ({len(contenido) / 2 ** 20:.1f} MB), {len(rechazos):,} con errores\n")
+
+        # Antes: validación y commit por equipo
+        inicio_antes = total_equipos()
+        inicio = time.perf_counter()
+        for fila in filas[:args.filas_antes]:
+            if not fila[1] or not db.session.get(Salon, fila[4]):
+                continue
+            # NOCASE: en MySQL la vista comparaba con la collation *_ci de la columna
+            if Equipo.query.filter(Equipo.id_referencia.collate('NOCASE') == fila[0]).first():
+                continue
+            try:
+                fecha = datetime.strptime(fila[8], '%Y-%m-%d').date()
+            except ValueError:
+                continue
+            db.session.add(Equipo(id_referencia=fila[0], nombre=fila[1], tipo=fila[2], estado='Disponible',
+                                  id_salon_fk=fila[4], sistema_operativo=fila[5], ram=fila[6], disco_duro=fila[7],
+                                  fecha_adquisicion=fecha, observaciones=fila[10]))
+            db.session.commit()
+        ms_antes = (time.perf_counter() - inicio) * 1000
+        db.session.execute(Equipo.__table__.delete().where(Equipo.id_referencia.like('IMP-%')))
+        db.session.commit()
+        db.session.remove()
+
+        rechazadas = {}
+        with sentencias_ejecutadas(db.engine, excluir='version_datos') as sentencias:
+            inicio = time.perf_counter()
+            informe, error = importar_equipos(io.BytesIO(contenido), 'csv',
+                                              al_error=lambda fila, _, errores: rechazadas.setdefault(fila, errores))
+            ms_ahora = (time.perf_counter() - inicio) * 1000
+        db.session.remove()
+
+        por_fila_antes = ms_antes / args.filas_antes
+        print(f"{'método':<8} {'ms/1000 filas':>14} {'filas/s':>10}")
+        print(f"{'antes':<8} {por_fila_antes * 1000:>14.0f} {1000 / por_fila_antes:>10,.0f}")
+        print(f"{'ahora':<8} {ms_ahora / len(filas) * 1000:>14.0f} {len(filas) / ms_ahora * 1000:>10,.0f}\n")
+
+        comprobar('1. filas rechazadas', not error and informe['rechazados'] == len(rechazos)
+                  and set(rechazadas) == set(rechazos)
+                  and {e['fila'] for e in informe['errores']} <= set(rechazos)
+                  and total_equipos() == inicio_antes + len(filas) - len(rechazos),
+                  f"{informe['importados']:,} importadas, {informe['rechazados']:,} rechazadas")
+        lotes = -(-informe['importados'] // FILAS_POR_LOTE)
+        comprobar('2. consultas por lote', len(sentencias) <= 1 + 2 * (lotes + 1),
+                  f"{len(sentencias)} sentencias para {lotes} lotes")
+
+        tracemalloc.start()
+        repetido, _ = importar_equipos(io.BytesIO(contenido), 'csv', simular=True)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        comprobar('3. repetir la importación no duplica', repetido['importados'] == 0
+                  and repetido['rechazados'] == len(filas), f"pico de memoria {pico / 2 ** 20:.1f} MB")
+
+        muestra = [f[:8] + [f"{f[8][8:10]}/{f[8][5:7]}/{f[8][:4]}"] + f[9:] for f in filas[:2000]]
+        for fila in muestra:
+            fila[0] = 'X' + fila[0]
+        esperado, _ = importar_equipos(io.BytesIO(a_csv(muestra)), 'csv', simular=True)
+        punto_y_coma, _ = importar_equipos(io.BytesIO(a_csv(muestra, ';')), 'csv', simular=True)
+        from openpyxl import Workbook
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet()
+        hoja.append(ENCABEZADOS)
+        for fila in muestra:
+            hoja.append(fila)
+        xlsx = io.BytesIO()
+        libro.save(xlsx)
+        xlsx.seek(0)
+        en_xlsx, error_xlsx = importar_equipos(xlsx, 'xlsx', simular=True)
+        claves = ('filas', 'importados', 'rechazados')
+        comprobar("4. CSV con ';' y XLSX", not error_xlsx and esperado['importados'] > 0
+                  and [punto_y_coma[c] for c in claves] == [esperado[c] for c in claves] == [en_xlsx[c] for c in claves],
+                  f"{esperado['importados']:,} válidas de {esperado['filas']:,}")
+        db.session.remove()
+
+    cliente = app.test_client()
+    with cliente.session_transaction() as s:
+        s['_user_id'] = '1'
+        s['_fresh'] = True
+    nuevas = [['N' + f[0]] + f[1:] for f in filas[:5000]]
+    respuesta = cliente.post('/admin/api/equipos/importar', content_type='multipart/form-data', data={
+        'archivo': (io.BytesIO(a_csv(nuevas)), 'equipos.csv'), 'fondo': '1'})
+    trabajo = None
+    if respuesta.status_code == 202:
+        url = respuesta.get_json()['estado_url']
+        inicio = time.perf_counter()
+        while time.perf_counter() - inicio < 60:
+            trabajo = cliente.get(url).get_json()['trabajo']
+            if trabajo['estado'] in ('completado', 'error'):
+                break
+            time.sleep(0.1)
+    lineas = 0
+    if trabajo and trabajo.get('errores_url'):
+        lineas = len(cliente.get(trabajo['errores_url']).get_data(as_text=True).strip().splitlines()) - 1
+    comprobar('5. importación en segundo plano', trabajo is not None and trabajo['estado'] == 'completado'
+              and lineas == trabajo['informe']['rechazados'] > 0,
+              f"{trabajo['informe']['importados']:,} importadas, {lineas} filas en errores.csv" if trabajo and trabajo.get('informe') else str(trabajo))
+    respuesta = cliente.post('/admin/api/equipos/importar', content_type='multipart/form-data', data={
+        'archivo': (io.BytesIO(b'nombre,tipo\nA,b\n'), 'equipos.csv')})
+    comprobar('   columnas obligatorias', respuesta.status_code == 400 and 'id_salon' in respuesta.get_json()['error'])
+
+    os.remove(ruta_db)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark del listado de inventario (/admin/api/equipos).
+
+Genera una institución sintética con ~5.000 equipos en una base SQLite
+temporal y les añade incidentes, mantenimientos y asignaciones activas a
+estudiantes. Compara:
+
+    antes:  Equipo.query.all() + to_dict() + len(incidentes) y
+            len(programaciones) por equipo (cargas perezosas y una consulta
+            de Matricula por asignación)
+    ahora:  inventario_service.listar_equipos(), tres consultas
+
+Comprueba que ambos devuelven los mismos datos, que el número de consultas
+no depende del número de equipos, que los filtros por estado, sede y salón
+coinciden con filtrar en Python, y que el endpoint responde en menos de
+--presupuesto-ms.
+
+Uso:
+    python -m benchmarks.inventario_equipos
+    python -m benchmarks.inventario_equipos --equipos-por-sala 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones, base_sqlite, sentencias_ejecutadas  # noqa: E402
+
+
+ESCALA = ['--sedes', '5', '--cursos', '40', '--estudiantes', '2000', '--anios', '2', '--dias-por-anio', '1',
+          '--notificaciones-por-usuario', '0', '--mensajes-por-usuario', '0', '--eventos-por-anio', '1']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--equipos-por-sala', type=int, default=500)
+    parser.add_argument('--presupuesto-ms', type=float, default=1000.0)
+    args = parser.parse_args()
+
+    ruta_db = base_sqlite('inventario')
+
+    from datetime import datetime, timedelta
+    from app import app, create_initial_data
+    from controllers.models import db, AsignacionEquipo, Equipo, Incidente, Mantenimiento, Rol, Salon, Usuario
+    from services.inventario_service import listar_equipos
+    from services.asignacion_service import reconstruir_indice
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    app.config.update(TESTING=True)
+    rnd = random.Random(7)
+    with app.app_context():
+        create_initial_data()
+        datos = crear_parser().parse_args(ESCALA + ['--equipos-por-sala', str(args.equipos_por_sala)])
+        generador = Generador(datos, 'x')
+        generador.generar()
+
+        equipos = db.session.execute(db.select(Equipo.id_equipo, Equipo.estado, Salon.id_sede_fk)
+                                     .join(Salon, Salon.id_salon == Equipo.id_salon_fk)).all()
+        rol = Rol.query.filter_by(nombre='Estudiante').first().id_rol
+        estudiantes = db.session.execute(db.select(Usuario.id_usuario).where(Usuario.id_rol_fk == rol)).scalars().all()
+        ahora = datetime.utcnow()
+        generador.insertar(Incidente.__table__, (
+            {'equipo_id': e.id_equipo, 'sede': f"Sede {e.id_sede_fk}", 'fecha': ahora - timedelta(days=rnd.randint(1, 400)),
+             'descripcion': 'Falla sintética', 'estado': 'reportado', 'prioridad': 'media'}
+            for e in equipos for _ in range(rnd.choice([0, 0, 0, 1, 2]))
+        ))
+        generador.insertar(Mantenimiento.__table__, (
+            {'equipo_id': e.id_equipo, 'sede_id': e.id_sede_fk, 'fecha_programada': (ahora + timedelta(days=rnd.randint(-200, 60))).date(),
+             'tipo': 'preventivo', 'estado': 'pendiente', 'fecha_creacion': ahora}
+            for e in equipos for _ in range(rnd.choice([0, 1, 1, 2]))
+        ))
+        generador.insertar(AsignacionEquipo.__table__, (
+            {'equipo_id': e.id_equipo, 'estudiante_id': estudiantes[n % len(estudiantes)],
+             'fecha_asignacion': ahora, 'estado_asignacion': 'activa'}
+            for n, e in enumerate(x for x in equipos if x.estado == 'Asignado')
+        ))
+        reconstruir_indice()
+        db.session.remove()
+        print(f"\n{len(equipos):,} equipos\n")
+
+        def antes():
+            lista = []
+            for equipo in Equipo.query.all():
+                datos_equipo = equipo.to_dict()
+                datos_equipo.update(
+                    id=equipo.id_equipo,
+                    salon_nombre=equipo.salon.nombre if equipo.salon else 'Sin salón',
+                    incidentes=len(equipo.incidentes),
+                    mantenimientos=len(equipo.programaciones),
+                )
+                lista.append(datos_equipo)
+            return lista
+
+        def medir(funcion):
+            with sentencias_ejecutadas(db.engine) as consultas:
+                inicio = time.perf_counter()
+                resultado = funcion()
+                duracion = (time.perf_counter() - inicio) * 1000
+            db.session.remove()
+            return resultado, duracion, len(consultas)
+
+        referencia, ms_antes, consultas_antes = medir(antes)
+        (nuevo, _), ms_ahora, consultas_ahora = medir(listar_equipos)
+        print(f"{'método':<8} {'ms':>10} {'consultas':>10}")
+        print(f"{'antes':<8} {ms_antes:>10.0f} {consultas_antes:>10,}")
+        print(f"{'ahora':<8} {ms_ahora:>10.0f} {consultas_ahora:>10,}\n")
+
+        comprobar = Comprobaciones()
+
+        def normalizar(fila):
+            return dict(fila, cursos_asignados=sorted(fila['cursos_asignados']))
+
+        distintos = [a['id_equipo'] for a, b in zip(referencia, nuevo) if normalizar(a) != normalizar(b)]
+        comprobar('1. mismos datos que to_dict() y los totales', len(referencia) == len(nuevo) and not distintos,
+                  f"{len(distintos)} equipos distintos" if distintos else '')
+        comprobar('2. número de consultas constante', consultas_ahora <= 3, f"{consultas_ahora}")
+
+        salon = referencia[0]['id_salon_fk']
+        sede = referencia[-1]['sede_id']
+        casos = [
+            ({'estado': 'Asignado'}, lambda e: e['estado'] == 'Asignado'),
+            ({'sede_id': sede}, lambda e: e['sede_id'] == sede),
+            ({'salon_id': salon, 'estado': 'Disponible'}, lambda e: e['id_salon_fk'] == salon and e['estado'] == 'Disponible'),
+        ]
+        errores = []
+        for filtros, condicion in casos:
+            filtrado, _ = listar_equipos(**filtros)
+            if [normalizar(e) for e in filtrado] != [normalizar(e) for e in referencia if condicion(e)]:
+                errores.append(str(filtros))
+        comprobar('3. filtros por estado, sede y salón', not errores, ', '.join(errores))
+
+    cliente = app.test_client()
+    with cliente.session_transaction() as s:
+        s['_user_id'] = '1'
+        s['_fresh'] = True
+    inicio = time.perf_counter()
+    respuesta = cliente.get('/admin/api/equipos')
+    ms_http = (time.perf_counter() - inicio) * 1000
+    comprobar(f"4. /admin/api/equipos en {ms_http:.0f} ms <= {args.presupuesto_ms:.0f} ms",
+              respuesta.status_code == 200 and len(respuesta.get_json()) == len(referencia)
+              and ms_http <= args.presupuesto_ms)
+    respuesta = cliente.get('/admin/api/equipos?estado=Roto')
+    comprobar('5. estado no válido responde 400', respuesta.status_code == 400)
+
+    os.remove(ruta_db)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark de serialización JSON de listados grandes.
+
+Genera N filas con la forma de /admin/api/mantenimientos en una base SQLite
+en memoria y compara, para la consulta + serialización completa:
+
+    antes:      columnas crudas, un dict por fila con strftime y `or ''`,
+                jsonify con el proveedor por defecto de Flask (json, sort_keys)
+    proyección: columnas etiquetadas con coalesce y fecha_formateada en
+                SQL, proyectar_filas() y ProveedorJSON con el módulo json
+    orjson:     lo mismo con ProveedorJSON sobre orjson (si está instalado)
+
+Comprueba además que las tres salidas son el mismo JSON, incluida una
+columna DateTime con el formato 'YYYY-MM-DD HH:MM' ("" si falta) que tenía
+fecha_generacion en /admin/api/reportes-calificaciones.
+
+Uso:
+    python -m benchmarks.json_serializacion
+    python -m benchmarks.json_serializacion --filas 50000 --repeticiones 7
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Column, Date, DateTime, Integer, MetaData, String, Table, Text, create_engine, func, insert, select
+
+from services.base_datos_service import fecha_formateada
+from services.json_service import ProveedorJSON, orjson, proyectar_filas
+
+
+metadatos = MetaData()
+mantenimientos = Table(
+    'mantenimientos', metadatos,
+    Column('id_mantenimiento', Integer, primary_key=True),
+    Column('equipo_id', Integer), Column('equipo_nombre', String(100)),
+    Column('sede_id', Integer), Column('sede_nombre', String(100)), Column('salon_nombre', String(100)),
+    Column('fecha_programada', Date), Column('tipo', String(50)), Column('estado', String(50)),
+    Column('descripcion', Text), Column('fecha_realizada', Date), Column('tecnico', String(100)),
+    Column('registrado_en', DateTime),
+)
+
+
+def poblar(motor, cantidad):
+    azar = random.Random(42)
+    hoy = date.today()
+    ahora = datetime.now()
+    filas = [{
+        'id_mantenimiento': i, 'equipo_id': azar.randint(1, 3000), 'equipo_nombre': f"Portátil {i:05d}",
+        'sede_id': azar.randint(1, 5), 'sede_nombre': f"Sede {azar.randint(1, 5)}",
+        'salon_nombre': azar.choice([None, 'Sala de sistemas 1', 'Laboratorio de física', 'Biblioteca']),
+        'fecha_programada': hoy - timedelta(days=azar.randint(0, 900)),
+        'tipo': azar.choice(['preventivo', 'correctivo']), 'estado': azar.choice(['pendiente', 'realizado']),
+        'descripcion': azar.choice([None, 'Revisión general del equipo, limpieza y actualización del sistema']),
+        'fecha_realizada': azar.choice([None, hoy - timedelta(days=azar.randint(0, 900))]),
+        'tecnico': azar.choice([None, 'Técnico de soporte']),
+        'registrado_en': azar.choice([None, ahora - timedelta(seconds=azar.randint(0, 10 ** 7))]),
+    } for i in range(1, cantidad + 1)]
+    metadatos.create_all(motor)
+    with motor.begin() as conexion:
+        conexion.execute(insert(mantenimientos), filas)
+
+
+def antes(conexion, proveedor):
+    m = mantenimientos.c
+    filas = conexion.execute(select(mantenimientos).order_by(m.fecha_programada.desc())).all()
+    datos = []
+    for mant in filas:
+        datos.append({
+            'id': mant.id_mantenimiento,
+            'equipo_id': mant.equipo_id,
+            'equipo_nombre': mant.equipo_nombre,
+            'sede_id': mant.sede_id,
+            'sede': mant.sede_nombre,
+            'salon_nombre': mant.salon_nombre or "N/A",
+            'fecha_programada': mant.fecha_programada.strftime('%Y-%m-%d'),
+            'tipo': mant.tipo,
+            'estado': mant.estado,
+            'descripcion': mant.descripcion or '',
+            'fecha_realizada': mant.fecha_realizada.strftime('%Y-%m-%d') if mant.fecha_realizada else None,
+            'tecnico': mant.tecnico or '',
+            'registrado_en': mant.registrado_en.strftime('%Y-%m-%d %H:%M') if mant.registrado_en else ''
+        })
+    return proveedor.response(datos).get_data()
+
+
+def proyeccion(conexion, proveedor):
+    m = mantenimientos.c
+    filas = conexion.execute(select(
+        m.id_mantenimiento.label('id'), m.equipo_id, m.equipo_nombre, m.sede_id, m.sede_nombre.label('sede'),
+        func.coalesce(m.salon_nombre, 'N/A').label('salon_nombre'), m.fecha_programada, m.tipo, m.estado,
+        func.coalesce(m.descripcion, '').label('descripcion'), m.fecha_realizada,
+        func.coalesce(m.tecnico, '').label('tecnico'),
+        func.coalesce(fecha_formateada(m.registrado_en, '%Y-%m-%d %H:%M'), '').label('registrado_en'),
+    ).order_by(m.fecha_programada.desc())).all()
+    return proveedor.response(proyectar_filas(filas)).get_data()
+
+
+def medir(funcion, conexion, proveedor, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        cuerpo = funcion(conexion, proveedor)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos), cuerpo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=10000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    motor = create_engine('sqlite://')
+    poblar(motor, args.filas)
+
+    app = Flask(__name__)
+    escenarios = [('antes', antes, DefaultJSONProvider(app))]
+    app.config['JSON_NATIVO'] = False
+    escenarios.append(('proyección + json', proyeccion, ProveedorJSON(app)))
+    if orjson is not None:
+        app.config['JSON_NATIVO'] = True
+        escenarios.append(('proyección + orjson', proyeccion, ProveedorJSON(app)))
+    else:
+        print('orjson no está instalado: se omite el codificador nativo\n')
+
+    resultados = []
+    with app.app_context(), motor.connect() as conexion:
+        for nombre, funcion, proveedor in escenarios:
+            funcion(conexion, proveedor)
+            ms, cuerpo = medir(funcion, conexion, proveedor, args.repeticiones)
+            resultados.append((nombre, ms, cuerpo))
+
+    base = resultados[0][1]
+    referencia = json.loads(resultados[0][2])
+    print(f"{args.filas:,} filas, mediana de {args.repeticiones} repeticiones (consulta + serialización)\n")
+    print(f"{'escenario':<22} {'ms':>9} {'KB':>9} {'mejora':>8}")
+    fallos = 0
+    for nombre, ms, cuerpo in resultados:
+        igual = json.loads(cuerpo) == referencia
+        fallos += not igual
+        print(f"{nombre:<22} {ms:>9.1f} {len(cuerpo) / 1024:>9.0f} {base / ms:>7.1f}x{'' if igual else '  ❌ salida distinta'}")
+
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == '__main__':
+    main()
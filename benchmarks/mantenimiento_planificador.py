@@ -0,0 +1,215 @@
+"""
+Benchmark del planificador de mantenimientos.
+
+Genera una institución sintética con ~5.000 equipos en una base SQLite
+temporal, crea políticas recurrentes por tipo de equipo y compara la
+materialización de sus ocurrencias:
+
+    antes:  por equipo y política, una consulta de la última fecha y un
+            Mantenimiento del ORM por ocurrencia
+    ahora:  mantenimiento_service.materializar_politicas(), tres consultas
+            y un INSERT (executemany) por lote
+
+Comprueba además que:
+
+    1. se crean las mismas ocurrencias que con el método ingenuo;
+    2. el número de consultas no depende del número de equipos;
+    3. repetir la materialización no crea nada;
+    4. el barrido marca solo los activos con fecha pasada y avisa a todos
+       los administradores con un único INSERT; repetido, no hace nada;
+    5. solo un worker toma la planificación de cada día;
+    6. el calendario de un mes usa el índice de fecha y responde en menos
+       de --presupuesto-ms;
+    7. desactivar una política borra sus pendientes futuros.
+
+Uso:
+    python -m benchmarks.mantenimiento_planificador
+    python -m benchmarks.mantenimiento_planificador --equipos-por-sala 1000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones, base_sqlite, sentencias_ejecutadas  # noqa: E402
+
+
+ESCALA = ['--sedes', '5', '--cursos', '40', '--estudiantes', '200', '--anios', '1', '--dias-por-anio', '1',
+          '--notificaciones-por-usuario', '0', '--mensajes-por-usuario', '0', '--eventos-por-anio', '1']
+POLITICAS = [('Computadora de Escritorio', 30), ('Laptop', 90), ('Proyector', 180)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--equipos-por-sala', type=int, default=500)
+    parser.add_argument('--presupuesto-ms', type=float, default=30.0, help='mediana máxima del calendario de un mes')
+    args = parser.parse_args()
+
+    ruta_db = base_sqlite('mantenimiento', MANTENIMIENTO_PLANIFICADOR='0')
+
+    from datetime import date, datetime, timedelta
+    from sqlalchemy import func, select, text
+    from app import app, create_initial_data
+    from controllers.models import db, Equipo, Mantenimiento, Notificacion, PoliticaMantenimiento, Salon, Usuario
+    from services.mantenimiento_service import (
+        TAMANO_LOTE, _primera_fecha, _reservar_barrido, barrer_vencidos, calendario_mes, crear_politica, desactivar_politica,
+        materializar_politicas
+    )
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    app.config.update(TESTING=True)
+    rnd = random.Random(11)
+    hoy = date.today()
+    hasta = hoy + timedelta(days=app.config['MANTENIMIENTO_HORIZONTE_DIAS'])
+    comprobar = Comprobaciones()
+
+    with app.app_context():
+        create_initial_data()
+        generador = Generador(crear_parser().parse_args(ESCALA + ['--equipos-por-sala', str(args.equipos_por_sala)]), 'x')
+        generador.generar()
+        generador.insertar(Usuario.__table__, generador.usuarios(90000, 4, 1, 'admin', 9000000000))
+        equipos = db.session.execute(select(Equipo.id_equipo, Equipo.tipo, Salon.id_sede_fk)
+                                     .join(Salon, Salon.id_salon == Equipo.id_salon_fk)).all()
+        politicas = []
+        for tipo, intervalo in POLITICAS:
+            politica, _ = crear_politica(tipo, intervalo, fecha_inicio=hoy - timedelta(days=rnd.randint(0, 400)))
+            politicas.append((politica.id_politica, tipo, intervalo, politica.fecha_inicio))
+        db.session.remove()
+        print(f"\n{len(equipos):,} equipos, {len(politicas)} políticas, horizonte {hasta}\n")
+
+        def antes():
+            creados = 0
+            for id_equipo, tipo, sede_id in equipos:
+                for id_politica, tipo_politica, intervalo, inicio in politicas:
+                    if tipo != tipo_politica:
+                        continue
+                    ultima = db.session.query(func.max(Mantenimiento.fecha_programada)).filter(
+                        Mantenimiento.politica_id == id_politica, Mantenimiento.equipo_id == id_equipo).scalar()
+                    fecha = _primera_fecha(ultima + timedelta(days=intervalo) if ultima else inicio, intervalo, hoy)
+                    while fecha <= hasta:
+                        db.session.add(Mantenimiento(equipo_id=id_equipo, sede_id=sede_id, fecha_programada=fecha,
+                                                     tipo='preventivo', estado='pendiente', politica_id=id_politica))
+                        creados += 1
+                        fecha += timedelta(days=intervalo)
+            db.session.commit()
+            return creados
+
+        def medir(funcion):
+            # Los contadores de version_datos de condicional_service no cuentan
+            with sentencias_ejecutadas(db.engine, excluir='version_datos') as consultas:
+                inicio = time.perf_counter()
+                resultado = funcion()
+                duracion = (time.perf_counter() - inicio) * 1000
+            db.session.remove()
+            return resultado, duracion, consultas
+
+        def ocurrencias():
+            return set(db.session.execute(select(Mantenimiento.politica_id, Mantenimiento.equipo_id,
+                                                 Mantenimiento.fecha_programada)).all())
+
+        creados_antes, ms_antes, consultas_antes = medir(antes)
+        consultas_antes = len(consultas_antes)
+        referencia = ocurrencias()
+        db.session.execute(Mantenimiento.__table__.delete())
+        db.session.commit()
+        creados, ms_ahora, consultas_ahora = medir(lambda: materializar_politicas(hoy=hoy))
+        consultas_ahora = len(consultas_ahora)
+        print(f"{'método':<8} {'ms':>10} {'consultas':>10} {'creados':>10}")
+        print(f"{'antes':<8} {ms_antes:>10.0f} {consultas_antes:>10,} {creados_antes:>10,}")
+        print(f"{'ahora':<8} {ms_ahora:>10.0f} {consultas_ahora:>10,} {creados:>10,}\n")
+
+        comprobar('1. mismas ocurrencias que el método ingenuo', ocurrencias() == referencia and creados == len(referencia),
+                  f"{creados:,} creados")
+        lotes = -(-creados // TAMANO_LOTE)
+        comprobar('2. consultas constantes', consultas_ahora <= 3 + lotes, f"{consultas_ahora} ({lotes} lotes de INSERT)")
+        repetidos, _, _ = medir(lambda: materializar_politicas(hoy=hoy))
+        comprobar('3. repetir la materialización no duplica', repetidos == 0 and len(ocurrencias()) == creados)
+
+        # Pendientes, en curso y completados con fecha pasada
+        estados = ['pendiente', 'en_progreso', 'completado', 'cancelado']
+        pasados = [{'equipo_id': e, 'sede_id': s, 'fecha_programada': hoy - timedelta(days=rnd.randint(1, 60)),
+                    'tipo': 'correctivo', 'estado': rnd.choice(estados), 'fecha_creacion': datetime.utcnow()}
+                   for e, _, s in rnd.sample(equipos, 800)]
+        generador.insertar(Mantenimiento.__table__, pasados)
+        esperados = sum(p['estado'] in ('pendiente', 'en_progreso') for p in pasados)
+        administradores = db.session.execute(select(func.count()).select_from(Usuario).where(
+            Usuario.id_rol_fk == 1, Usuario.estado_cuenta == 'activa')).scalar()
+        (marcados, avisos), ms_barrido, consultas = medir(lambda: barrer_vencidos(hoy))
+        inserciones = [s for s in consultas if s.lstrip().upper().startswith('INSERT INTO NOTIFICACIONES')]
+        marcados_bd = db.session.execute(select(func.count()).where(Mantenimiento.vencido_en.is_not(None))).scalar()
+        notificaciones = db.session.execute(select(func.count()).select_from(Notificacion)
+                                            .where(Notificacion.tipo == 'mantenimiento')).scalar()
+        (repetido, _), _, _ = medir(lambda: barrer_vencidos(hoy))
+        comprobar(f"4. barrido de vencidos en {ms_barrido:.0f} ms",
+                  marcados == esperados == marcados_bd and avisos == notificaciones == administradores
+                  and len(inserciones) == 1 and repetido == 0,
+                  f"{marcados} marcados, {avisos} avisos, {len(inserciones)} INSERT")
+
+    def reservar(dia, resultados):
+        with app.app_context():
+            resultados.append(_reservar_barrido(dia))
+            db.session.remove()
+
+    tomas = []
+    hilos = [threading.Thread(target=reservar, args=(hoy, tomas)) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    manana = []
+    reservar(hoy + timedelta(days=1), manana)
+    comprobar('5. un único worker toma el barrido del día', tomas.count(True) == 1 and manana == [True],
+              f"{tomas.count(True)} de {len(tomas)}")
+
+    with app.app_context():
+        mes = (hoy + timedelta(days=31)).strftime('%Y-%m')
+        tiempos = []
+        for _ in range(3):  # compilación de la sentencia y caché de páginas de SQLite
+            calendario_mes(mes)
+            db.session.remove()
+        for _ in range(30):
+            inicio = time.perf_counter()
+            filas, _ = calendario_mes(mes)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+            db.session.remove()
+        plan = db.session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id_mantenimiento FROM mantenimiento "
+            "WHERE fecha_programada >= :inicio AND fecha_programada < :fin"
+        ), {'inicio': f"{mes}-01", 'fin': f"{mes}-28"}).all()
+        usa_indice = any('ix_mantenimiento_fecha_estado_sede' in str(fila[-1]) for fila in plan)
+        p50 = statistics.median(tiempos)
+        comprobar(f"6. calendario de {mes}: {len(filas):,} filas, p50 {p50:.1f} ms <= {args.presupuesto_ms:.0f} ms",
+                  usa_indice and p50 <= args.presupuesto_ms, '' if usa_indice else 'sin índice')
+
+    cliente = app.test_client()
+    with cliente.session_transaction() as s:
+        s['_user_id'] = '1'
+        s['_fresh'] = True
+    respuesta = cliente.get(f'/admin/api/mantenimientos/calendario?mes={mes}')
+    comprobar('   /admin/api/mantenimientos/calendario',
+              respuesta.status_code == 200 and len(respuesta.get_json()) == len(filas)
+              and cliente.get('/admin/api/mantenimientos/calendario?mes=2024-13').status_code == 400)
+
+    with app.app_context():
+        id_politica = politicas[0][0]
+        borrados, _ = desactivar_politica(id_politica)
+        quedan = db.session.execute(select(func.count()).where(
+            Mantenimiento.politica_id == id_politica, Mantenimiento.fecha_programada >= hoy,
+            Mantenimiento.estado == 'pendiente')).scalar()
+        comprobar('7. desactivar una política borra sus pendientes futuros',
+                  borrados > 0 and quedan == 0 and not db.session.get(PoliticaMantenimiento, id_politica).activa
+                  and materializar_politicas(politica_ids=[id_politica]) == 0, f"{borrados:,} borrados")
+        db.session.remove()
+
+    os.remove(ruta_db)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Presupuesto de tiempo de arranque (importación de app.py).
+
+Importa la aplicación varias veces en procesos nuevos con `python -X importtime`
+y falla (código de salida 1) si:
+
+    - la mediana del tiempo de importación supera el presupuesto, o
+    - algún módulo que debe cargarse de forma diferida (MODULOS_DIFERIDOS)
+      se importa durante el arranque.
+
+La segunda comprobación no depende de la máquina, así que sirve en CI aunque
+el presupuesto en milisegundos haya que ajustarlo a cada entorno.
+
+Uso:
+    python -m benchmarks.presupuesto_arranque
+    python -m benchmarks.presupuesto_arranque --presupuesto-ms 900 --repeticiones 7 --top 25
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencias pesadas que solo usan rutas poco frecuentes (ver services/arranque_service.py)
+MODULOS_DIFERIDOS = ('requests', 'PIL', 'reportlab', 'openpyxl', 'pandas')
+
+PRESUPUESTO_MS = float(os.environ.get('ARRANQUE_PRESUPUESTO_MS', 1200))
+
+
+def medir_importacion():
+    """Devuelve {módulo: (propio_us, acumulado_us)} de una importación en frío de app."""
+    entorno = dict(os.environ, DB_PERFIL='memoria', LOG_LEVEL='WARNING')
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True
+    )
+    modulos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        modulos[nombre.strip()] = (int(propio), int(acumulado))
+    return modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--presupuesto-ms', type=float, default=PRESUPUESTO_MS,
+                        help='Mediana máxima de la importación de app (o ARRANQUE_PRESUPUESTO_MS)')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='Paquetes más lentos a mostrar')
+    args = parser.parse_args()
+
+    # La primera importación compila los .pyc; no cuenta.
+    medir_importacion()
+    mediciones = [medir_importacion() for _ in range(args.repeticiones)]
+    totales = [m['app'][1] / 1000 for m in mediciones]
+    mediana = statistics.median(totales)
+
+    por_paquete = defaultdict(list)
+    for medicion in mediciones:
+        sumas = defaultdict(int)
+        for nombre, (propio, _) in medicion.items():
+            sumas[nombre.split('.')[0]] += propio
+        for paquete, us in sumas.items():
+            por_paquete[paquete].append(us / 1000)
+
+    print(f"Importación de app: mediana {mediana:.0f} ms (mín {min(totales):.0f}, máx {max(totales):.0f}) "
+          f"| presupuesto {args.presupuesto_ms:.0f} ms\n")
+    print(f"{'paquete':<28} {'ms':>8}")
+    ranking = sorted(((statistics.median(v), k) for k, v in por_paquete.items()), reverse=True)
+    for ms, paquete in ranking[:args.top]:
+        print(f"{paquete:<28} {ms:>8.1f}")
+
+    cargados = sorted({n for n in mediciones[0] for m in MODULOS_DIFERIDOS if n == m or n.startswith(m + '.')})
+    fallos = []
+    if cargados:
+        raices = sorted({n.split('.')[0] for n in cargados})
+        fallos.append(f"módulos que deben ser diferidos importados al arrancar: {', '.join(raices)}")
+    if mediana > args.presupuesto_ms:
+        fallos.append(f"arranque de {mediana:.0f} ms supera el presupuesto de {args.presupuesto_ms:.0f} ms")
+
+    print()
+    for fallo in fallos:
+        print(f"❌ {fallo}")
+    if not fallos:
+        print('✅ Arranque dentro del presupuesto')
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == '__main__':
+    main()
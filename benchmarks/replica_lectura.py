@@ -0,0 +1,138 @@
+"""
+Comprobación del enrutamiento a la réplica de lectura con dos bases SQLite.
+
+La "replicación" se simula copiando la primaria sobre la réplica con la API
+de backup de sqlite3, así que el retraso de la réplica se controla a mano:
+mientras no se llama a replicar(), la réplica se queda atrás.
+
+Comprueba que:
+    1. sin latido replicado, las vistas @solo_lectura leen de la primaria;
+    2. con la réplica al día, leen de la réplica;
+    3. tras una escritura, el mismo usuario lee de la primaria (y ve lo que
+       escribió) durante DB_REPLICA_ADHERENCIA segundos;
+    4. pasada la adherencia, vuelve a la réplica;
+    5. si la réplica se atrasa más de DB_REPLICA_RETRASO_MAXIMO, se lee de la primaria.
+
+Uso:
+    python -m benchmarks.replica_lectura
+    python -m benchmarks.replica_lectura --carpeta /tmp/replica
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones  # noqa: E402
+
+
+ADHERENCIA = 1.0
+RETRASO_MAXIMO = 1.0
+ESCALA = ['--sedes', '1', '--cursos', '2', '--estudiantes', '20', '--anios', '1', '--dias-por-anio', '5',
+          '--notificaciones-por-usuario', '1', '--mensajes-por-usuario', '1', '--eventos-por-anio', '3',
+          '--equipos-por-sala', '1']
+
+
+def replicar(primaria, replica):
+    origen = sqlite3.connect(primaria)
+    destino = sqlite3.connect(replica)
+    try:
+        origen.backup(destino)
+    finally:
+        origen.close()
+        destino.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--carpeta', help='Carpeta para las dos bases de datos (por defecto, una temporal)')
+    args = parser.parse_args()
+
+    carpeta = args.carpeta or tempfile.mkdtemp(prefix='acentrax-replica-')
+    os.makedirs(carpeta, exist_ok=True)
+    primaria = os.path.join(carpeta, 'primaria.db')
+    replica = os.path.join(carpeta, 'replica.db')
+    for ruta in (primaria, replica):
+        for sufijo in ('', '-wal', '-shm'):
+            if os.path.exists(ruta + sufijo):
+                os.remove(ruta + sufijo)
+
+    os.environ.update(
+        MYSQL_URL=f"sqlite:///{primaria}", MYSQL_REPLICA_URL=f"sqlite:///{replica}",
+        DB_REPLICA_ADHERENCIA=str(ADHERENCIA), DB_REPLICA_RETRASO_MAXIMO=str(RETRASO_MAXIMO),
+        DB_REPLICA_VERIFICACION='0',
+    )
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    from sqlalchemy import event
+    from werkzeug.security import generate_password_hash
+    from app import app, create_initial_data
+    from controllers.models import db, Usuario
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    datos = crear_parser().parse_args(ESCALA)
+    with app.app_context():
+        create_initial_data()
+        Generador(datos, generate_password_hash(datos.password)).generar()
+        admin_id = Usuario.query.filter_by(id_rol_fk=1).first().id_usuario
+        db.session.remove()
+        # Sin latido en la réplica: replicar antes de que exista
+        replicar(primaria, replica)
+
+        lecturas = {'replica': 0}
+
+        def contar(conn, cursor, statement, *args):
+            if 'version_datos' not in statement:
+                lecturas['replica'] += 1
+
+        event.listen(db.engines['lectura'], 'before_cursor_execute', contar)
+
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    cliente = app.test_client()
+    with cliente.session_transaction() as s:
+        s['_user_id'] = str(admin_id)
+        s['_fresh'] = True
+
+    comprobar = Comprobaciones()
+
+    def comprobar_destino(nombre, esperado, ruta='/admin/eventos'):
+        lecturas['replica'] = 0
+        respuesta = cliente.get(ruta)
+        destino = 'replica' if lecturas['replica'] else 'primaria'
+        comprobar(nombre, respuesta.status_code == 200 and destino == esperado,
+                  f"{destino} (esperado {esperado}, HTTP {respuesta.status_code})")
+        return respuesta
+
+    comprobar_destino('1. réplica sin latido', 'primaria')
+    replicar(primaria, replica)
+    comprobar_destino('2. réplica al día', 'replica')
+
+    nuevo = {'nombre': 'Evento réplica', 'descripcion': 'Prueba de adherencia',
+             'fecha': (date.today() + timedelta(days=7)).isoformat(), 'hora': '10:00', 'rol_destino': 'Nadie'}
+    respuesta = cliente.post('/admin/eventos', json=nuevo)
+    print(f"    escritura: HTTP {respuesta.status_code}")
+    eventos = comprobar_destino('3. tras escribir', 'primaria').get_json() or []
+    comprobar('3b. el usuario ve lo que escribió', any(e.get('nombre') == nuevo['nombre'] for e in eventos))
+
+    time.sleep(ADHERENCIA + 0.2)
+    replicar(primaria, replica)
+    comprobar_destino('4. pasada la adherencia', 'replica')
+
+    time.sleep(RETRASO_MAXIMO + 0.5)
+    comprobar_destino('5. réplica atrasada', 'primaria')
+    replicar(primaria, replica)
+    comprobar_destino('5b. réplica recuperada', 'replica')
+
+    if not args.carpeta:
+        shutil.rmtree(carpeta, ignore_errors=True)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Comprobación de las respuestas cacheadas de la elección (ETag / 304).
+
+Para /estudiante/candidatos y /admin/resultados-publicos comprueba que:
+
+    1. la primera petición responde 200 con ETag;
+    2. repetirla con If-None-Match responde 304, sin comprimir y con
+       Accept-Encoding: gzip (la respuesta comprimida lleva la ETag débil
+       W/"..." y debe revalidarse igual);
+
+y que tras cambiar un candidato la ETag de /estudiante/candidatos cambia y
+se responde 200.
+
+Uso:
+    python -m benchmarks.votacion_etag
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.comun import Comprobaciones, base_sqlite  # noqa: E402
+
+
+ESCALA = ['--sedes', '1', '--cursos', '2', '--estudiantes', '20', '--anios', '1', '--dias-por-anio', '1',
+          '--notificaciones-por-usuario', '0', '--mensajes-por-usuario', '0', '--eventos-por-anio', '1',
+          '--equipos-por-sala', '1']
+RUTAS = {'candidatos': '/estudiante/candidatos', 'resultados': '/admin/resultados-publicos'}
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+def main():
+    # Sin mínimo de compresión: las respuestas de prueba son pequeñas
+    ruta_db = base_sqlite('votacion', MANTENIMIENTO_PLANIFICADOR='0', COMPRESION_MINIMO='0')
+
+    from app import app, create_initial_data
+    from controllers.models import db, Candidato, Usuario
+    from services.votacion_service import incrementar_version_candidatos
+    from benchmarks.datos_sinteticos import Generador, crear_parser
+
+    app.config.update(TESTING=True)
+    with app.app_context():
+        create_initial_data()
+        Generador(crear_parser().parse_args(ESCALA), 'x').generar()
+        estudiante = Usuario.query.filter_by(id_rol_fk=3).first().id_usuario
+        db.session.remove()
+
+    cliente = app.test_client()
+    with cliente.session_transaction() as s:
+        s['_user_id'] = str(estudiante)
+        s['_fresh'] = True
+    comprobar = Comprobaciones()
+
+    etags = {}
+    for nombre, ruta in RUTAS.items():
+        primera = cliente.get(ruta)
+        etags[nombre] = etag = primera.headers.get('ETag')
+        comprobar(f"{nombre} 1. 200 con ETag", primera.status_code == 200 and bool(etag),
+                  f"HTTP {primera.status_code}, ETag {etag}")
+
+        identidad = cliente.get(ruta, headers={'If-None-Match': etag})
+        comprimida = cliente.get(ruta, headers=GZIP)
+        debil = comprimida.headers.get('ETag')
+        revalidada = cliente.get(ruta, headers={**GZIP, 'If-None-Match': debil})
+        comprobar(f"{nombre} 2. 304 sin comprimir y con gzip",
+                  identidad.status_code == 304 and comprimida.headers.get('Content-Encoding') == 'gzip'
+                  and debil == f"W/{etag}" and revalidada.status_code == 304,
+                  f"HTTP {identidad.status_code} / {revalidada.status_code}, ETag comprimida {debil}")
+
+    # Como routes/admin.py al editar un candidato
+    with app.app_context():
+        candidato = Candidato.query.first()
+        candidato.propuesta = candidato.propuesta + ' (actualizada)'
+        incrementar_version_candidatos()
+        db.session.commit()
+        db.session.remove()
+    cambiada = cliente.get(RUTAS['candidatos'], headers={**GZIP, 'If-None-Match': f"W/{etags['candidatos']}"})
+    comprobar('candidatos 3. un cambio de candidato responde 200',
+              cambiada.status_code == 200 and cambiada.headers.get('ETag') != f"W/{etags['candidatos']}",
+              f"HTTP {cambiada.status_code}")
+
+    os.remove(ruta_db)
+    comprobar.terminar()
+
+
+if __name__ == '__main__':
+    main()
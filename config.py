@@ -10,10 +10,45 @@ class Config:
     if db_url and db_url.startswith("mysql://"):
         db_url = db_url.replace("mysql://", "mysql+pymysql://", 1)
 
-    # 3. Asignación final: Usa la URL de Railway (privada) o la URL local como respaldo.
-    SQLALCHEMY_DATABASE_URI = db_url or 'mysql+pymysql://root:@127.0.0.1:3306/institucion_db'
+    # 3. Perfil: 'mysql' (por defecto), 'sqlite' (archivo en instance/ o SQLITE_PATH)
+    #    o 'memoria' (SQLite en memoria, para pruebas y benchmarks sin servidor).
+    DB_PERFIL = os.environ.get('DB_PERFIL') or ('sqlite' if db_url and db_url.startswith('sqlite') else 'mysql')
+
+    # 4. Asignación final: Usa la URL de Railway (privada) o la URL local como respaldo.
+    if DB_PERFIL == 'memoria':
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    elif DB_PERFIL == 'sqlite':
+        SQLALCHEMY_DATABASE_URI = (db_url if db_url and db_url.startswith('sqlite')
+                                   else 'sqlite:///' + os.environ.get('SQLITE_PATH', 'acentrax.db'))
+    else:
+        SQLALCHEMY_DATABASE_URI = db_url or 'mysql+pymysql://root:@127.0.0.1:3306/institucion_db'
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # 5. Pool de conexiones (perfiles mysql y sqlite; ver services/base_datos_service.py).
+    #    DB_POOL_RECYCLE queda por debajo del cierre por inactividad del proxy de MySQL
+    #    y DB_POOL_PRE_PING descarta las conexiones que el servidor ya cerró.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 280))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') != '0'
+    # Pool aparte para los trabajos en segundo plano (boletines, tareas programadas),
+    # para que un lote largo no deje sin conexiones a las peticiones web.
+    DB_POOL_FONDO_SIZE = int(os.environ.get('DB_POOL_FONDO_SIZE', 2))
+    DB_MAX_OVERFLOW_FONDO = int(os.environ.get('DB_MAX_OVERFLOW_FONDO', 1))
+    DB_POOL_TIMEOUT_FONDO = float(os.environ.get('DB_POOL_TIMEOUT_FONDO', 60))
+
+    # 6. Réplica de lectura (opcional; ver services/replica_service.py). Las vistas
+    #    marcadas con @solo_lectura leen de ella salvo que el usuario haya escrito en
+    #    los últimos DB_REPLICA_ADHERENCIA segundos o la réplica lleve más de
+    #    DB_REPLICA_RETRASO_MAXIMO segundos de retraso.
+    DB_REPLICA_URL = os.environ.get('MYSQL_REPLICA_URL')
+    if DB_REPLICA_URL and DB_REPLICA_URL.startswith("mysql://"):
+        DB_REPLICA_URL = DB_REPLICA_URL.replace("mysql://", "mysql+pymysql://", 1)
+    DB_REPLICA_ADHERENCIA = float(os.environ.get('DB_REPLICA_ADHERENCIA', 10))
+    DB_REPLICA_RETRASO_MAXIMO = float(os.environ.get('DB_REPLICA_RETRASO_MAXIMO', 5))
+    DB_REPLICA_VERIFICACION = float(os.environ.get('DB_REPLICA_VERIFICACION', 5))
     
     # --- SEGURIDAD ---
     # Lee SECRET_KEY de Railway o usa la local.
@@ -51,3 +86,92 @@ class Config:
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'uploads', 'tareas')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
     ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt', 'png', 'jpg', 'jpeg', 'gif', 'zip', 'rar'}
+
+    # --- CACHÉ DEL SISTEMA DE VOTACIÓN ---
+    # Segundos que cada worker reutiliza la versión de la elección antes de releerla.
+    ELECCION_VERSION_TTL = float(os.environ.get('ELECCION_VERSION_TTL', 1.0))
+    # Los votos no invalidan la caché: los resultados publicados se recalculan cada tantos segundos.
+    ELECCION_RESULTADOS_INTERVALO = float(os.environ.get('ELECCION_RESULTADOS_INTERVALO', 5.0))
+
+    # --- HORARIOS ---
+    # Segundos que cada worker reutiliza la versión de los horarios materializados antes de releerla.
+    HORARIOS_VERSION_TTL = float(os.environ.get('HORARIOS_VERSION_TTL', 1.0))
+
+    # --- BOLETINES (PDF) ---
+    # Procesos usados para renderizar boletines; por defecto, todos los núcleos.
+    BOLETINES_PROCESOS = int(os.environ['BOLETINES_PROCESOS']) if os.environ.get('BOLETINES_PROCESOS') else None
+
+    # --- MÉTRICAS (PROMETHEUS) ---
+    # Si METRICS_TOKEN está definido, /metrics exige "Authorization: Bearer <token>";
+    # si no, solo lo pueden consultar los administradores con sesión iniciada.
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # Carpeta compartida por los workers de gunicorn para agregar sus contadores.
+    METRICS_DIR = os.environ.get('METRICS_DIR') or os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5.0))
+
+    # --- LOGGING ---
+    # Nivel global y niveles por módulo ("routes.admin=DEBUG,services.email_service=WARNING").
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+    # 'json' (una línea por registro) o 'texto' para desarrollo local.
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+
+    # --- PERFILADOR DE PETICIONES ---
+    # Con PERFILADOR_HABILITADO=0 no se registra ningún hook. La tasa de muestreo
+    # inicial se puede cambiar en caliente desde /admin/perfiles.
+    PERFILADOR_HABILITADO = os.environ.get('PERFILADOR_HABILITADO', '1') != '0'
+    PERFILADOR_TASA = float(os.environ.get('PERFILADOR_TASA', 0.0))
+    PERFILADOR_TOKEN_TTL = int(os.environ.get('PERFILADOR_TOKEN_TTL', 3600))
+    PERFILADOR_MAXIMO = int(os.environ.get('PERFILADOR_MAXIMO', 200))
+
+    # --- ARRANQUE ---
+    # Caché en disco de las plantillas Jinja compiladas (por defecto, instance/plantillas).
+    # Se llena sola o con `flask precompilar-plantillas` durante el build.
+    PLANTILLAS_CACHE_HABILITADA = os.environ.get('PLANTILLAS_CACHE_HABILITADA', '1') != '0'
+    PLANTILLAS_CACHE_DIR = os.environ.get('PLANTILLAS_CACHE_DIR')
+
+    # --- COMPRESIÓN DE RESPUESTAS ---
+    # gzip (o brotli si está instalado) para respuestas de al menos COMPRESION_MINIMO bytes
+    # de los tipos de COMPRESION_TIPOS (lista separada por comas; vacío = los predeterminados).
+    COMPRESION_HABILITADA = os.environ.get('COMPRESION_HABILITADA', '1') != '0'
+    COMPRESION_MINIMO = int(os.environ.get('COMPRESION_MINIMO', 1024))
+    COMPRESION_NIVEL = int(os.environ.get('COMPRESION_NIVEL', 6))
+    COMPRESION_TIPOS = os.environ.get('COMPRESION_TIPOS', '')
+
+    # --- ESTÁTICOS CON HUELLA ---
+    # Con static/manifiesto.json (`flask construir-estaticos`), url_for('static') apunta a
+    # copias con hash de contenido que se sirven como inmutables.
+    ESTATICOS_HUELLA = os.environ.get('ESTATICOS_HUELLA', '1') != '0'
+    ESTATICOS_CARPETAS = os.environ.get('ESTATICOS_CARPETAS', 'css,js')
+
+    # --- JSON ---
+    # orjson como codificador de app.json si está instalado (0 = siempre el módulo json).
+    JSON_NATIVO = os.environ.get('JSON_NATIVO', '1') != '0'
+
+    # --- RESPUESTAS CONDICIONALES (ETag / 304) ---
+    # VERSION_DESPLIEGUE invalida las ETags en cada despliegue (cambian las plantillas/serialización).
+    RESPUESTAS_CONDICIONALES = os.environ.get('RESPUESTAS_CONDICIONALES', '1') != '0'
+    VERSION_DESPLIEGUE = os.environ.get('RAILWAY_GIT_COMMIT_SHA') or os.environ.get('RAILWAY_DEPLOYMENT_ID', '')
+
+    # --- AUTOCOMPLETADO DE USUARIOS ---
+    # Índice en memoria por worker para /api/usuarios/buscar: se consultan los cambios cada
+    # AUTOCOMPLETADO_INTERVALO segundos y se reconstruye entero cada AUTOCOMPLETADO_RECONSTRUIR.
+    AUTOCOMPLETADO_HABILITADO = os.environ.get('AUTOCOMPLETADO_HABILITADO', '1') != '0'
+    AUTOCOMPLETADO_INTERVALO = float(os.environ.get('AUTOCOMPLETADO_INTERVALO', 2.0))
+    AUTOCOMPLETADO_RECONSTRUIR = float(os.environ.get('AUTOCOMPLETADO_RECONSTRUIR', 3600))
+
+    # --- IMPORTACIÓN DE EQUIPOS ---
+    # Archivos CSV/XLSX mayores que esto se importan en un hilo de fondo (ver services/importacion_service.py).
+    IMPORTACION_FONDO_BYTES = int(os.environ.get('IMPORTACION_FONDO_BYTES', 512 * 1024))
+
+    # --- MANTENIMIENTOS ---
+    # Planificador diario de services/mantenimiento_service.py: genera las ocurrencias de las
+    # políticas para los próximos MANTENIMIENTO_HORIZONTE_DIAS días y avisa de los vencidos.
+    MANTENIMIENTO_PLANIFICADOR = os.environ.get('MANTENIMIENTO_PLANIFICADOR', '1') != '0'
+    MANTENIMIENTO_HORIZONTE_DIAS = int(os.environ.get('MANTENIMIENTO_HORIZONTE_DIAS', 90))
+    MANTENIMIENTO_INTERVALO = float(os.environ.get('MANTENIMIENTO_INTERVALO', 3600))
+
+    # --- SERVIDOR (GUNICORN) ---
+    # Tiempo máximo por petición según su clase de ruta (segundos, 0 desactiva).
+    # Ver services/tiempo_limite_service.py y gunicorn.conf.py.
+    TIEMPO_LIMITE_RUTAS = os.environ.get('TIEMPO_LIMITE_RUTAS', 'interactiva=30,reporte=120,exportacion=300')
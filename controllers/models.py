@@ -150,7 +150,40 @@ class Usuario(db.Model, UserMixin):
     equipos_asignados = db.relationship('AsignacionEquipo', back_populates='estudiante')
     
     def get_equipos_activos(self):
-        return [asig.equipo for asig in self.equipos_asignados if asig.estado_asignacion == 'activa']
+        return Equipo.query.join(AsignacionActiva, AsignacionActiva.equipo_id == Equipo.id_equipo).filter(
+            AsignacionActiva.estudiante_id == self.id_usuario
+        ).order_by(AsignacionActiva.asignacion_id).all()
+
+
+class UsuarioBusqueda(db.Model):
+    """Índice de búsqueda de usuarios: un token normalizado por fila (ver services/busqueda_service.py)."""
+    __tablename__ = 'usuario_busqueda'
+
+    token = db.Column(db.String(120), primary_key=True)
+    id_usuario = db.Column(db.Integer, db.ForeignKey('usuarios.id_usuario', ondelete='CASCADE'), primary_key=True)
+    # Copia de Usuario.id_rol_fk: búsquedas de un solo rol por rango de (id_rol, token)
+    id_rol = db.Column(db.Integer, db.ForeignKey('roles.id_rol'), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_usuario_busqueda_usuario', 'id_usuario'),
+        db.Index('ix_usuario_busqueda_rol_token', 'id_rol', 'token', 'id_usuario'),
+    )
+
+    def __repr__(self):
+        return f"<UsuarioBusqueda {self.token} -> {self.id_usuario}>"
+
+
+class UsuarioCambio(db.Model):
+    """Registro de usuarios creados, editados o borrados que leen los índices en memoria (ver services/autocompletado_service.py)."""
+    __tablename__ = 'usuario_cambios'
+
+    id_cambio = db.Column(db.Integer, primary_key=True)
+    # Sin clave foránea: también se registran los usuarios borrados
+    id_usuario = db.Column(db.Integer, nullable=False)
+    creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<UsuarioCambio {self.id_cambio} usuario={self.id_usuario}>"
 
 # ================================
 # Modelos Académicos
@@ -199,6 +232,10 @@ class Matricula(db.Model):
     estudiante = db.relationship('Usuario', back_populates='matriculas', foreign_keys=[estudianteId])
     curso = db.relationship('Curso', back_populates='matriculas', foreign_keys=[cursoId])
 
+    __table_args__ = (
+        db.Index('ix_matricula_estudiante_anio', 'estudianteId', 'año'),
+    )
+
     def __repr__(self):
         return f'<Matricula {self.estudianteId} - {self.cursoId}>'
 
@@ -527,6 +564,12 @@ class Equipo(db.Model):
     asignaciones = db.relationship('AsignacionEquipo', back_populates='equipo', cascade='all, delete-orphan')
     incidentes = db.relationship('Incidente', back_populates='equipo')
     programaciones = db.relationship('Mantenimiento', back_populates='equipo')
+
+    __table_args__ = (
+        # Filtros del inventario (services/inventario_service.py)
+        db.Index('ix_equipos_estado_salon', 'estado', 'id_salon_fk'),
+        db.Index('ix_equipos_salon', 'id_salon_fk'),
+    )
     
     def get_asignaciones_activas(self):
         return [asig for asig in self.asignaciones if asig.estado_asignacion == 'activa']
@@ -535,24 +578,17 @@ class Equipo(db.Model):
         return [asig.estudiante for asig in self.get_asignaciones_activas()]
     
     def get_cursos_asignados(self):
-        cursos = set()
-        for asignacion in self.get_asignaciones_activas():
-            curso = asignacion.get_curso_estudiante()
-            if curso:
-                cursos.add(curso)
-        return list(cursos)
+        return db.session.execute(
+            db.select(Curso.nombreCurso).join(AsignacionActiva, AsignacionActiva.curso_id == Curso.id_curso)
+            .where(AsignacionActiva.equipo_id == self.id_equipo)
+        ).scalars().all()
     
     def puede_asignar_a_curso(self, curso_id):
- 
-        for asignacion in self.get_asignaciones_activas():
-            matricula = Matricula.query.filter_by(
-                estudianteId=asignacion.estudiante_id
-            ).order_by(Matricula.año.desc()).first()
-            
-            if matricula and matricula.cursoId == curso_id:
-                return False  
-        
-        return True
+        return db.session.execute(
+            db.select(AsignacionActiva.asignacion_id).where(
+                AsignacionActiva.equipo_id == self.id_equipo, AsignacionActiva.curso_id == curso_id
+            ).limit(1)
+        ).first() is None
     
     def to_dict(self):
         asignaciones_activas = self.get_asignaciones_activas()
@@ -632,6 +668,31 @@ class AsignacionEquipo(db.Model):
         return f'<AsignacionEquipo {self.equipo_id} -> {self.estudiante_id}>'
 
 
+class AsignacionActiva(db.Model):
+    """Índice de las asignaciones activas con el salón del equipo y el curso del estudiante (ver services/asignacion_service.py)."""
+    __tablename__ = 'asignaciones_activas'
+
+    asignacion_id = db.Column(db.Integer, db.ForeignKey('asignaciones_equipos.id_asignacion', ondelete='CASCADE'),
+                              primary_key=True, autoincrement=False)
+    equipo_id = db.Column(db.Integer, db.ForeignKey('equipos.id_equipo', ondelete='CASCADE'), nullable=False)
+    estudiante_id = db.Column(db.Integer, db.ForeignKey('usuarios.id_usuario', ondelete='CASCADE'), nullable=False)
+    salon_id = db.Column(db.Integer, db.ForeignKey('salones.id_salon'), nullable=False)
+    curso_id = db.Column(db.Integer, db.ForeignKey('curso.id_curso'), nullable=True)
+
+    __table_args__ = (
+        # Una asignación activa por equipo y estudiante, un equipo por estudiante
+        # y sala, y un estudiante por curso en cada equipo
+        db.UniqueConstraint('equipo_id', 'estudiante_id', name='uq_asignacion_activa_equipo_estudiante'),
+        db.UniqueConstraint('estudiante_id', 'salon_id', name='uq_asignacion_activa_estudiante_salon'),
+        db.UniqueConstraint('equipo_id', 'curso_id', name='uq_asignacion_activa_equipo_curso'),
+        db.Index('ix_asignacion_activa_curso', 'curso_id'),
+        db.Index('ix_asignacion_activa_salon', 'salon_id'),
+    )
+
+    def __repr__(self):
+        return f'<AsignacionActiva {self.equipo_id} -> {self.estudiante_id}>'
+
+
 class Incidente(db.Model):
     __tablename__ = 'incidentes'
     id_incidente = db.Column(db.Integer, primary_key=True)
@@ -647,6 +708,10 @@ class Incidente(db.Model):
     
     equipo = db.relationship('Equipo', back_populates='incidentes')
 
+    __table_args__ = (
+        db.Index('ix_incidentes_equipo', 'equipo_id'),
+    )
+
     def to_dict(self):
         return {
             "id_incidente": self.id_incidente,
@@ -678,9 +743,22 @@ class Mantenimiento(db.Model):
     fecha_realizada = db.Column(db.Date, nullable=True)
     tecnico = db.Column(db.String(100), nullable=True)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    # Ocurrencias generadas por una política recurrente (services/mantenimiento_service.py)
+    politica_id = db.Column(db.Integer, db.ForeignKey('politicas_mantenimiento.id_politica'), nullable=True)
+    # Momento en que el barrido diario lo marcó como vencido y avisó a los administradores
+    vencido_en = db.Column(db.DateTime, nullable=True)
     
     equipo = db.relationship('Equipo', back_populates='programaciones')
     sede = db.relationship('Sede', back_populates='mantenimientos')
+    politica = db.relationship('PoliticaMantenimiento', back_populates='mantenimientos')
+
+    __table_args__ = (
+        db.Index('ix_mantenimiento_equipo', 'equipo_id'),
+        # Calendario por meses y barrido de vencidos: rango de fechas, luego estado y sede
+        db.Index('ix_mantenimiento_fecha_estado_sede', 'fecha_programada', 'estado', 'sede_id'),
+        # Una ocurrencia por política, equipo y fecha: la materialización se puede repetir
+        db.Index('uq_mantenimiento_politica_equipo_fecha', 'politica_id', 'equipo_id', 'fecha_programada', unique=True),
+    )
 
 
     def to_dict(self):
@@ -700,7 +778,37 @@ class Mantenimiento(db.Model):
             "fecha_realizada": self.fecha_realizada.strftime("%Y-%m-%d") if self.fecha_realizada else None,
             "tecnico": self.tecnico or ""
         }
-        
+
+
+class PoliticaMantenimiento(db.Model):
+    """Mantenimiento recurrente para todos los equipos de un tipo (p. ej. preventivo cada 90 días)."""
+    __tablename__ = 'politicas_mantenimiento'
+
+    id_politica = db.Column(db.Integer, primary_key=True)
+    tipo_equipo = db.Column(db.String(100), nullable=False)
+    tipo_mantenimiento = db.Column(db.String(50), nullable=False, default='preventivo')
+    intervalo_dias = db.Column(db.Integer, nullable=False)
+    fecha_inicio = db.Column(db.Date, nullable=False, default=date.today)
+    descripcion = db.Column(db.Text, nullable=True)
+    activa = db.Column(db.Boolean, nullable=False, default=True)
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+
+    mantenimientos = db.relationship('Mantenimiento', back_populates='politica')
+
+    def to_dict(self):
+        return {
+            "id_politica": self.id_politica,
+            "tipo_equipo": self.tipo_equipo,
+            "tipo_mantenimiento": self.tipo_mantenimiento,
+            "intervalo_dias": self.intervalo_dias,
+            "fecha_inicio": self.fecha_inicio.strftime("%Y-%m-%d") if self.fecha_inicio else None,
+            "descripcion": self.descripcion or "",
+            "activa": self.activa
+        }
+
+    def __repr__(self):
+        return f"<PoliticaMantenimiento {self.tipo_equipo} cada {self.intervalo_dias} días>"
+
 
 # ================================
 # Modelos de Eventos y Comunicaciones
@@ -849,6 +957,20 @@ class EstadoPublicacion(db.Model):
             'ultima_actualizacion': self.ultima_actualizacion.isoformat() if self.ultima_actualizacion else None
         }
 
+# ================================
+# Modelo de Versiones de Datos (invalidación de cachés)
+# ================================
+
+class VersionDatos(db.Model):
+    __tablename__ = 'version_datos'
+    
+    clave = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<VersionDatos {self.clave} v{self.version}>"
+
 # ================================
 # Modelo de Reportes de Calificaciones
 # ================================
@@ -1,9 +1,38 @@
+from contextvars import ContextVar
+
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_mail import Mail
 
-db = SQLAlchemy()
+# Bind al que se dirigen las consultas del contexto actual (None = pool web).
+# Ver services/base_datos_service.pool_de_fondo y services/replica_service.
+pool_actual = ContextVar('pool_actual', default=None)
+
+
+class SesionEnrutada(Session):
+    """
+    Sesión que usa el motor del bind activo en pool_actual, si existe. Los
+    flush y las sentencias INSERT/UPDATE/DELETE nunca van a la réplica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        clave = pool_actual.get()
+        if clave == 'lectura' and (self._flushing or getattr(clause, 'is_dml', False)):
+            clave = None
+        if bind is None and clave is not None:
+            motor = self._db.engines.get(clave)
+            if motor is not None:
+                return motor
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': SesionEnrutada})
 mail = Mail()
 
 def init_app(app):
+    from services.base_datos_service import aplicar_perfil, init_base_datos
+
+    aplicar_perfil(app)
     db.init_app(app)
-    mail.init_app(app)
\ No newline at end of file
+    init_base_datos(app)
+    mail.init_app(app)
@@ -0,0 +1,140 @@
+"""
+Configuración de gunicorn para producción
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Variables de entorno:
+    PORT                    puerto (Railway lo define)
+    WEB_CONCURRENCY         workers; por defecto 2 por núcleo disponible + 1 (sync)
+                            o 1 por núcleo + 1 con hilos / gevent
+    GUNICORN_WORKER_CLASS   gthread (por defecto), sync o gevent
+    GUNICORN_THREADS        hilos por worker gthread (por defecto 4)
+    GUNICORN_CONNECTIONS    conexiones simultáneas por worker gevent (por defecto 100)
+    GUNICORN_PRELOAD        1 (por defecto) carga la app en el maestro antes del fork
+    GUNICORN_MAX_REQUESTS   reciclado de workers tras N peticiones (0 desactiva)
+
+Los tiempos límite por clase de ruta (TIEMPO_LIMITE_RUTAS) se aplican dentro
+de la aplicación; el timeout de gunicorn queda por encima del mayor de ellos
+para que solo actúe sobre workers realmente colgados.
+"""
+
+import os
+
+
+def _nucleos():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent':
+    # Debe ir antes de importar la aplicación en el maestro (preload_app).
+    from gevent import monkey
+    monkey.patch_all()
+
+from config import Config  # noqa: E402
+from services.tiempo_limite_service import limites_por_clase  # noqa: E402
+
+threads = int(os.environ.get('GUNICORN_THREADS', 4)) if worker_class == 'gthread' else 1
+worker_connections = int(os.environ.get('GUNICORN_CONNECTIONS', 100))
+
+if os.environ.get('WEB_CONCURRENCY'):
+    workers = int(os.environ['WEB_CONCURRENCY'])
+elif worker_class == 'sync':
+    workers = 2 * _nucleos() + 1
+else:
+    workers = _nucleos() + 1
+
+# La app (plantillas, rutas, modelos) se importa una vez en el maestro y los
+# workers comparten esas páginas de memoria por copy-on-write.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+timeout = int(max(limites_por_clase(Config.TIEMPO_LIMITE_RUTAS).values()) + 30)
+graceful_timeout = 30
+keepalive = 5
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+if os.path.isdir('/dev/shm'):
+    # El latido de los workers en disco puede bloquearse en contenedores.
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = None
+errorlog = '-'
+
+
+def on_starting(server):
+    """
+    Una vez por despliegue, en el maestro: genera los estáticos con huella y
+    precomprime los nuevos o modificados (incluidas las copias con huella).
+    """
+    from services.compresion_service import precomprimir_estaticos
+    from services.estaticos_service import construir_estaticos
+
+    carpeta = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    if Config.ESTATICOS_HUELLA:
+        carpetas = [c.strip() for c in Config.ESTATICOS_CARPETAS.split(',') if c.strip()]
+        try:
+            construir_estaticos(carpeta, carpetas)
+        except OSError as e:
+            server.log.warning('No se pudieron generar los estáticos con huella: %s', e)
+    if Config.COMPRESION_HABILITADA:
+        try:
+            precomprimir_estaticos(carpeta, Config.COMPRESION_MINIMO)
+        except OSError as e:
+            server.log.warning('No se pudieron precomprimir los estáticos: %s', e)
+
+
+def post_fork(server, worker):
+    """
+    Con preload_app el maestro ya creó el motor de SQLAlchemy: cada worker
+    descarta los pools heredados, web y de fondo (sin cerrar sockets que
+    pertenecen al maestro), y abre sus propias conexiones.
+    """
+    if not server.cfg.preload_app:
+        return
+    from app import app
+    from extensions import db
+
+    with app.app_context():
+        for motor in db.engines.values():
+            motor.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Cada worker arranca sus hilos de fondo: índice de autocompletado y planificador de mantenimientos."""
+    from app import app
+    from services.autocompletado_service import iniciar_autocompletado
+    from services.mantenimiento_service import iniciar_planificador
+
+    iniciar_autocompletado(app)
+    iniciar_planificador(app)
+
+
+def worker_exit(server, worker):
+    """Último volcado de métricas del worker antes de salir, para que child_exit lo recoja completo."""
+    from services.metricas_service import volcar_instantanea
+
+    try:
+        volcar_instantanea()
+    except OSError as e:
+        server.log.warning('No se pudieron volcar las métricas del worker %s: %s', worker.pid, e)
+
+
+def child_exit(server, worker):
+    """
+    En el maestro, al terminar un worker (reciclado por max_requests o caído):
+    sus contadores pasan al histórico de métricas y su instantánea se borra
+    para que /metrics no arrastre sus gauges ni acumule archivos.
+    """
+    from services.metricas_service import retirar_worker
+
+    try:
+        retirar_worker(worker.pid, Config.METRICS_DIR)
+    except OSError as e:
+        server.log.warning('No se pudieron retirar las métricas del worker %s: %s', worker.pid, e)
@@ -6,8 +6,10 @@ from datetime import datetime, date
 from sqlalchemy import text
 import os
 import json
-from werkzeug.utils import secure_filename
+import logging
 from controllers.decorators import role_required
+from services.replica_service import solo_lectura
+from services.condicional_service import respuesta_condicional
 from extensions import db
 from services.notification_service import (
     notificar_nuevo_evento, 
@@ -15,15 +17,40 @@ from services.notification_service import (
     notificar_evento_eliminado
 )
 from services.email_service import send_welcome_email, generate_verification_code, send_verification_success_email, send_welcome_email_with_retry, get_verification_info
+from services.imagen_service import procesar_foto_candidato, urls_rendiciones, CARPETA_CANDIDATOS
+from services.exportacion_service import (
+    respuesta_exportacion,
+    exportacion_usuarios,
+    exportacion_calificaciones,
+    exportacion_asistencia,
+    exportacion_inventario
+)
+from services.votacion_service import (
+    incrementar_version_candidatos,
+    incrementar_version_resultados,
+    respuesta_cacheada,
+    construir_resultados_publicos
+)
+from services.base_datos_service import fecha_formateada, insertar_o_ignorar, sql_con_listas
+from services.json_service import proyectar_filas
+from services.busqueda_service import buscar_usuarios_por_rol
+from services.autocompletado_service import autocompletar
+from services.inventario_service import listar_equipos
+from services.asignacion_service import asignacion_en_sala, mensaje_conflicto
+from services.mantenimiento_service import (
+    calendario_mes, crear_politica, desactivar_politica, materializar_politicas, resumen_vencimientos
+)
 from controllers.forms import RegistrationForm, UserEditForm, SalonForm, CursoForm, SedeForm, EquipoForm
 from controllers.models import (
     Usuario, Rol, Clase, Curso, Asignatura, Sede, Salon, 
     HorarioGeneral, HorarioCompartido, Matricula, BloqueHorario, 
-    HorarioCurso, AsignacionEquipo, Equipo, Incidente, Mantenimiento, Comunicacion, 
+    HorarioCurso, AsignacionEquipo, Equipo, Incidente, Mantenimiento, PoliticaMantenimiento, Comunicacion, 
     Evento, Candidato, HorarioVotacion, ReporteCalificaciones, Notificacion,
-    CicloAcademico, PeriodoAcademico,EstadoPublicacion, Voto
+    CicloAcademico, PeriodoAcademico,EstadoPublicacion, Voto, estudiante_padre
 )
 
+logger = logging.getLogger(__name__)
+
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
 # ========== FUNCIÓN AUXILIAR==========
@@ -35,9 +62,9 @@ def get_sidebar_counts():
         # DEBUG: Ver qué valores de estado existen
         estados = db.session.query(Comunicacion.estado).distinct().all()
         estados_lista = [e[0] for e in estados]
-        print("🔍 VALORES DE 'estado' EN COMUNICACIONES:", estados_lista)
+        logger.debug("🔍 VALORES DE 'estado' EN COMUNICACIONES: %s", estados_lista)
     except Exception as e:
-        print("❌ Error en debug de estados:", e)
+        logger.error('❌ Error en debug de estados: %s', e)
         estados_lista = []
     
     # Determinar el valor correcto para mensajes no leídos
@@ -53,7 +80,7 @@ def get_sidebar_counts():
     elif 'nuevo' in estados_lista:
         estado_no_leido = 'nuevo'
     
-    print(f"🎯 Usando estado: '{estado_no_leido}' para mensajes no leídos")
+    logger.debug("🎯 Usando estado: '%s' para mensajes no leídos", estado_no_leido)
     
     # Mensajes no leídos (para comunicaciones)
     unread_messages = Comunicacion.query.filter_by(
@@ -70,11 +97,15 @@ def get_sidebar_counts():
     # ✅ VERSIÓN CORREGIDA: Eventos próximos con filtro más estricto
     hoy = datetime.now().date()
     
-    # Obtener TODOS los eventos para debug
-    todos_eventos = Evento.query.all()
-    print(f"📋 TODOS LOS EVENTOS EN BD ({len(todos_eventos)} total):")
-    for evento in todos_eventos:
-        print(f"   - ID: {evento.id}, Nombre: '{evento.nombre}', Fecha: {evento.fecha}, Rol: {evento.rol_destino}")
+    # Obtener TODOS los eventos para debug (solo si el nivel DEBUG está activo)
+    if logger.isEnabledFor(logging.DEBUG):
+        todos_eventos = Evento.query.all()
+        logger.debug('📋 TODOS LOS EVENTOS EN BD (%s total):', len(todos_eventos))
+        for evento in todos_eventos:
+            logger.debug(
+                "- ID: %s, Nombre: '%s', Fecha: %s, Rol: %s",
+                evento.id, evento.nombre, evento.fecha, evento.rol_destino
+            )
     
     # Eventos que cumplen el filtro estricto
     eventos_filtrados = Evento.query.filter(
@@ -82,13 +113,17 @@ def get_sidebar_counts():
         Evento.fecha >= hoy        # Solo eventos de hoy en adelante
     ).all()
     
-    print(f"🎯 EVENTOS FILTRADOS (fecha >= {hoy} y fecha NOT NULL): {len(eventos_filtrados)} eventos")
-    for evento in eventos_filtrados:
-        print(f"   ✅ INCLUIDO - ID: {evento.id}, Nombre: '{evento.nombre}', Fecha: {evento.fecha}")
+    logger.debug('🎯 EVENTOS FILTRADOS (fecha >= %s y fecha NOT NULL): %s eventos', hoy, len(eventos_filtrados))
+    if logger.isEnabledFor(logging.DEBUG):
+        for evento in eventos_filtrados:
+            logger.debug("✅ INCLUIDO - ID: %s, Nombre: '%s', Fecha: %s", evento.id, evento.nombre, evento.fecha)
     
     upcoming_events = len(eventos_filtrados)
     
-    print(f"📊 RESUMEN CONTADORES - Mensajes: {unread_messages}, Notificaciones: {unread_notifications}, Eventos: {upcoming_events}")
+    logger.debug(
+        '📊 RESUMEN CONTADORES - Mensajes: %s, Notificaciones: %s, Eventos: %s',
+        unread_messages, unread_notifications, upcoming_events
+    )
     
     return {
         'unread_messages': unread_messages,
@@ -124,89 +159,27 @@ def inicio():
 @role_required(1)
 def buscar_usuario():
     identificacion = request.args.get('identificacion', '')
-    
+
+    # Hasta 5 por rol sobre el índice de búsqueda; un rol con muchas
+    # coincidencias no oculta a los demás
+    roles = {
+        'Profesor': ('profesor', 'admin.profesores'),
+        'Estudiante': ('estudiante', 'admin.estudiantes'),
+        'Padre': ('padre', 'admin.padres'),
+        'Administrador Institucional': ('admin', 'admin.superadmins'),
+    }
     usuarios_encontrados = []
-    
-    rol_profesor = Rol.query.filter_by(nombre='Profesor').first()
-    if rol_profesor:
-        profesores = Usuario.query.filter(
-            Usuario.id_rol_fk == rol_profesor.id_rol,
-            db.or_(
-                Usuario.no_identidad.ilike(f'%{identificacion}%'),
-                Usuario.nombre.ilike(f'%{identificacion}%'),
-                Usuario.apellido.ilike(f'%{identificacion}%')
-            )
-        ).limit(5).all()
-        
-        for prof in profesores:
-            usuarios_encontrados.append({
-                'id': prof.no_identidad,
-                'nombre': prof.nombre,
-                'apellido': prof.apellido,
-                'rol': 'profesor',
-                'rolUrl': url_for('admin.profesores')
-            })
-    
-    rol_estudiante = Rol.query.filter_by(nombre='Estudiante').first()
-    if rol_estudiante:
-        estudiantes = Usuario.query.filter(
-            Usuario.id_rol_fk == rol_estudiante.id_rol,
-            db.or_(
-                Usuario.no_identidad.ilike(f'%{identificacion}%'),
-                Usuario.nombre.ilike(f'%{identificacion}%'),
-                Usuario.apellido.ilike(f'%{identificacion}%')
-            )
-        ).limit(5).all()
-        
-        for est in estudiantes:
-            usuarios_encontrados.append({
-                'id': est.no_identidad,
-                'nombre': est.nombre,
-                'apellido': est.apellido,
-                'rol': 'estudiante',
-                'rolUrl': url_for('admin.estudiantes')
-            })
-    
-    rol_padre = Rol.query.filter_by(nombre='Padre').first()
-    if rol_padre:
-        padres = Usuario.query.filter(
-            Usuario.id_rol_fk == rol_padre.id_rol,
-            db.or_(
-                Usuario.no_identidad.ilike(f'%{identificacion}%'),
-                Usuario.nombre.ilike(f'%{identificacion}%'),
-                Usuario.apellido.ilike(f'%{identificacion}%')
-            )
-        ).limit(5).all()
-        
-        for pad in padres:
-            usuarios_encontrados.append({
-                'id': pad.no_identidad,
-                'nombre': pad.nombre,
-                'apellido': pad.apellido,
-                'rol': 'padre',
-                'rolUrl': url_for('admin.padres')
-            })
-    
-    rol_admin = Rol.query.filter_by(nombre='Administrador Institucional').first()
-    if rol_admin:
-        admins = Usuario.query.filter(
-            Usuario.id_rol_fk == rol_admin.id_rol,
-            db.or_(
-                Usuario.no_identidad.ilike(f'%{identificacion}%'),
-                Usuario.nombre.ilike(f'%{identificacion}%'),
-                Usuario.apellido.ilike(f'%{identificacion}%')
-            )
-        ).limit(5).all()
-        
-        for admin in admins:
+    for nombre_rol, encontrados in buscar_usuarios_por_rol(identificacion, roles, limite=5).items():
+        rol, endpoint = roles[nombre_rol]
+        for usuario in encontrados:
             usuarios_encontrados.append({
-                'id': admin.no_identidad,
-                'nombre': admin.nombre,
-                'apellido': admin.apellido,
-                'rol': 'admin',
-                'rolUrl': url_for('admin.superadmins')
+                'id': usuario.no_identidad,
+                'nombre': usuario.nombre,
+                'apellido': usuario.apellido,
+                'rol': rol,
+                'rolUrl': url_for(endpoint)
             })
-    
+
     return jsonify(usuarios_encontrados)
 
 @admin_bp.route('/profesores')
@@ -224,6 +197,7 @@ def profesores():
 @admin_bp.route('/api/profesores')
 @login_required
 @role_required(1)
+@solo_lectura
 def api_profesores():
     try:
         filter_id = request.args.get('filter_id', '')
@@ -271,7 +245,7 @@ def api_profesores():
             
         return jsonify({"data": lista_profesores})
     except Exception as e:
-        print(f"Error en la API de profesores: {e}")
+        logger.error('Error en la API de profesores: %s', e)
         return jsonify({"error": "Error interno del servidor"}), 500
 
 @admin_bp.route('/estudiantes')
@@ -303,13 +277,12 @@ def estudiantes():
         
         padres_dict = {}
         try:
-            from sqlalchemy import text
-            result = db.session.execute(text("""
+            result = db.session.execute(sql_con_listas("""
                 SELECT ep.estudiante_id, u.id_usuario, u.nombre, u.apellido 
                 FROM estudiante_padre ep 
                 JOIN usuarios u ON ep.padre_id = u.id_usuario 
                 WHERE ep.estudiante_id IN :estudiante_ids
-            """), {'estudiante_ids': tuple(estudiante_ids)})
+            """, 'estudiante_ids'), {'estudiante_ids': list(estudiante_ids)})
             
             for row in result:
                 estudiante_id = row[0]
@@ -317,7 +290,7 @@ def estudiantes():
                     padres_dict[estudiante_id] = []
                 padres_dict[estudiante_id].append(f"{row[2]} {row[3]}")
         except Exception as e:
-            print(f"Error cargando padres: {e}")
+            logger.error('Error cargando padres: %s', e)
             padres_dict = {}
         
         matriculas_por_estudiante = {}
@@ -362,6 +335,7 @@ def estudiantes():
 @admin_bp.route('/api/estudiantes')
 @login_required
 @role_required(1)
+@solo_lectura
 def api_estudiantes():
     try:
         filter_id = request.args.get('filter_id', '')
@@ -401,7 +375,7 @@ def api_estudiantes():
             
         return jsonify({"data": lista_estudiantes})
     except Exception as e:
-        print(f"Error en la API de estudiantes: {e}")
+        logger.error('Error en la API de estudiantes: %s', e)
         return jsonify({"error": "Error interno del servidor"}), 500
 
 @admin_bp.route('/api/estudiantes/<int:id>', methods=['GET'])
@@ -459,7 +433,7 @@ def api_detalles_estudiante(id):
         })
 
     except Exception as e:
-        print(f"[ERROR API ESTUDIANTE] ID {id}: {str(e)}")
+        logger.error('[ERROR API ESTUDIANTE] ID %s: %s', id, e)
         return jsonify({"success": False, "message": "Error interno del servidor"}), 500
 
 @admin_bp.route('/estudiantes/crear', methods=['GET', 'POST'])
@@ -486,7 +460,6 @@ def crear_estudiante():
             from datetime import datetime, timedelta
             verification_code = generate_verification_code()
             
-            print(f"DEBUG: Creando estudiante - Contraseña del formulario: {form.password.data}")
             
             new_user = Usuario(
                 tipo_doc=form.tipo_doc.data,
@@ -509,8 +482,7 @@ def crear_estudiante():
             db.session.add(new_user)
             db.session.flush()  
             
-            print(f"DEBUG: Estudiante creado con ID: {new_user.id_usuario}")
-            print(f"DEBUG: Contraseña temporal guardada: {new_user.temp_password}")
+            logger.debug('Estudiante creado con ID: %s', new_user.id_usuario)
             
             if form.curso_id.data and form.anio_matricula.data:
                 nueva_matricula = Matricula(
@@ -526,11 +498,9 @@ def crear_estudiante():
                     padre_id_int = int(parent_id)
                     padre = Usuario.query.get(padre_id_int)
                     if padre:
-                        from sqlalchemy import text
-                        db.session.execute(
-                            text("INSERT INTO estudiante_padre (estudiante_id, padre_id) VALUES (:estudiante_id, :padre_id)"),
-                            {'estudiante_id': new_user.id_usuario, 'padre_id': padre_id_int}
-                        )
+                        insertar_o_ignorar(estudiante_padre, {
+                            'estudiante_id': new_user.id_usuario, 'padre_id': padre_id_int
+                        })
                         flash(f'Padre "{padre.nombre_completo}" asignado correctamente al estudiante', 'success')
                     else:
                         flash('El padre seleccionado no existe', 'warning')
@@ -539,25 +509,25 @@ def crear_estudiante():
             
             db.session.commit()
             
-            print(f"DEBUG: Enviando correo de verificación a {new_user.correo}")
+            logger.debug('Enviando correo de verificación a %s', new_user.correo)
             
             email_result = send_welcome_email(new_user, verification_code)
             
             if email_result == True:
                 flash(f'Estudiante "{new_user.nombre_completo}" creado exitosamente! Se ha enviado un correo de verificación.', 'success')
-                print(f"DEBUG: Correo enviado exitosamente")
+                logger.debug('Correo enviado exitosamente')
             elif email_result == "limit_exceeded":
                 flash(f'Estudiante "{new_user.nombre_completo}" creado exitosamente! ⚠️ Límite diario de correos excedido. Código de verificación: {verification_code}', 'warning')
-                print(f"DEBUG: Límite de correos excedido - Código: {verification_code}")
+                logger.debug('Límite de correos excedido - Código: %s', verification_code)
             else:
                 flash(f'Estudiante "{new_user.nombre_completo}" creado pero hubo un error enviando el correo de verificación. Código de verificación: {verification_code}', 'warning')
-                print(f"DEBUG: Error enviando correo - Código: {verification_code}")
+                logger.warning('Error enviando correo - Código: %s', verification_code)
             
             return redirect(url_for('admin.estudiantes'))
             
         except Exception as e:
             db.session.rollback()
-            print(f"ERROR en crear_estudiante: {str(e)}")
+            logger.error('ERROR en crear_estudiante: %s', e)
             flash(f'Error al crear estudiante: {str(e)}', 'error')
     
     return render_template(
@@ -642,7 +612,7 @@ def eliminar_estudiante(id):
         return jsonify(incidente), 200
         
     except Exception as e:
-        print(f"Error al obtener detalle del incidente: {e}")
+        logger.error('Error al obtener detalle del incidente: %s', e)
         return jsonify({'error': f"Error interno del servidor: {str(e)}"}), 500
 
 @admin_bp.route('/mantenimiento')
@@ -656,44 +626,29 @@ def mantenimiento():
 def api_listar_mantenimientos():
 
     try:
-        mantenimientos_db = db.session.query(
-            Mantenimiento.id_mantenimiento,
+        # Columnas etiquetadas con la clave JSON: las filas se serializan sin pasar por dicts
+        mantenimientos = db.session.query(
+            Mantenimiento.id_mantenimiento.label('id'),
             Mantenimiento.equipo_id,
+            Equipo.nombre.label('equipo_nombre'),
             Mantenimiento.sede_id,
+            Sede.nombre.label('sede'),
+            db.func.coalesce(Salon.nombre, 'N/A').label('salon_nombre'),
             Mantenimiento.fecha_programada,
             Mantenimiento.tipo,
             Mantenimiento.estado,
-            Mantenimiento.descripcion,
+            db.func.coalesce(Mantenimiento.descripcion, '').label('descripcion'),
             Mantenimiento.fecha_realizada,
-            Mantenimiento.tecnico,
-            Equipo.nombre.label('equipo_nombre'),
-            Salon.nombre.label('salon_nombre'), 
-            Sede.nombre.label('sede_nombre')
+            db.func.coalesce(Mantenimiento.tecnico, '').label('tecnico')
         ).join(Equipo, Mantenimiento.equipo_id == Equipo.id_equipo)\
          .join(Sede, Mantenimiento.sede_id == Sede.id_sede)\
          .outerjoin(Salon, Equipo.id_salon_fk == Salon.id_salon)\
          .order_by(Mantenimiento.fecha_programada.desc())\
          .all()
 
-        mantenimientos = []
-        for mant in mantenimientos_db:
-            mantenimientos.append({
-                'id': mant.id_mantenimiento,
-                'equipo_id': mant.equipo_id,
-                'equipo_nombre': mant.equipo_nombre,
-                'sede_id': mant.sede_id,
-                'sede': mant.sede_nombre,
-                'salon_nombre': mant.salon_nombre or "N/A",
-                'fecha_programada': mant.fecha_programada.strftime('%Y-%m-%d'),
-                'tipo': mant.tipo,
-                'estado': mant.estado,
-                'descripcion': mant.descripcion or '',
-                'fecha_realizada': mant.fecha_realizada.strftime('%Y-%m-%d') if mant.fecha_realizada else None,
-                'tecnico': mant.tecnico or ''
-            })
-        return jsonify(mantenimientos), 200
+        return jsonify(proyectar_filas(mantenimientos)), 200
     except Exception as e:
-        print(f"Error al listar mantenimientos: {e}")
+        logger.error('Error al listar mantenimientos: %s', e)
         return jsonify({'error': f"Error interno del servidor: {str(e)}"}), 500
 
 @admin_bp.route('/api/mantenimientos/programar', methods=['POST'])
@@ -757,9 +712,9 @@ def api_programar_mantenimiento():
                 mantenimiento=nuevo_mantenimiento,
                 admin_id=current_user.id_usuario
             )
-            print(f" Notificaciones de mantenimiento enviadas: {notificaciones_enviadas}")
+            logger.debug('Notificaciones de mantenimiento enviadas: %s', notificaciones_enviadas)
         except Exception as e:
-            print(f" Error enviando notificaciones de mantenimiento: {e}")
+            logger.error('Error enviando notificaciones de mantenimiento: %s', e)
             notificaciones_enviadas = 0
         
         db.session.commit()
@@ -782,9 +737,7 @@ def api_programar_mantenimiento():
         
     except Exception as e:
         db.session.rollback()
-        print(f" Error al programar mantenimiento: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('Error al programar mantenimiento: %s', e)
         return jsonify({
             'success': False, 
             'error': f'Error interno del servidor: {str(e)}'
@@ -806,7 +759,7 @@ def api_equipos_con_mantenimientos():
         return jsonify({'equipos_con_mantenimientos': ids}), 200
         
     except Exception as e:
-        print(f"Error al obtener equipos con mantenimientos: {e}")
+        logger.error('Error al obtener equipos con mantenimientos: %s', e)
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/api/horario_curso/restablecer/<int:curso_id>', methods=['POST'])
@@ -878,7 +831,7 @@ def api_detalle_mantenimiento(mantenimiento_id):
             'tecnico': mantenimiento.tecnico or ''
         }), 200
     except Exception as e:
-        print(f"Error al obtener detalle de mantenimiento: {e}")
+        logger.error('Error al obtener detalle de mantenimiento: %s', e)
         return jsonify({'error': f"Error interno del servidor: {str(e)}"}), 500
 
 @admin_bp.route('/api/mantenimientos/<int:mantenimiento_id>/actualizar', methods=['PUT'])
@@ -973,7 +926,7 @@ def api_actualizar_mantenimiento(mantenimiento_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error al actualizar mantenimiento: {e}")
+        logger.error('Error al actualizar mantenimiento: %s', e)
         return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
 
 @admin_bp.route('/api/mantenimientos/<int:mantenimiento_id>', methods=['DELETE'])
@@ -993,7 +946,7 @@ def api_eliminar_mantenimiento(mantenimiento_id):
         return jsonify({'success': True, 'message': 'Mantenimiento eliminado exitosamente.'}), 200
     except Exception as e:
         db.session.rollback()
-        print(f"Error al eliminar mantenimiento: {e}")
+        logger.error('Error al eliminar mantenimiento: %s', e)
         return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
 
 @admin_bp.route('/api/mantenimientos/estadisticas', methods=['GET'])
@@ -1013,12 +966,94 @@ def api_estadisticas_mantenimientos():
             'pendiente': stats.get('pendiente', 0),
             'en_progreso': stats.get('en_progreso', 0),
             'completado': stats.get('completado', 0),
-            'cancelado': stats.get('cancelado', 0)
+            'cancelado': stats.get('cancelado', 0),
+            **resumen_vencimientos()
         }), 200
     except Exception as e:
-        print(f"Error al obtener estadísticas de mantenimientos: {e}")
+        logger.error('Error al obtener estadísticas de mantenimientos: %s', e)
         return jsonify({'error': f"Error interno del servidor: {str(e)}"}), 500
 
+@admin_bp.route('/api/mantenimientos/calendario', methods=['GET'])
+@login_required
+@role_required(1)
+@solo_lectura
+@respuesta_condicional(Mantenimiento, Equipo, Sede)
+def api_calendario_mantenimientos():
+    """Mantenimientos de un mes: ?mes=YYYY-MM (por defecto, el actual) y opcionalmente sede_id y estado."""
+    try:
+        mantenimientos, error = calendario_mes(
+            request.args.get('mes') or date.today().strftime('%Y-%m'),
+            sede_id=request.args.get('sede_id', type=int),
+            estado=request.args.get('estado') or None
+        )
+        if error:
+            return jsonify({'error': error}), 400
+        return jsonify(proyectar_filas(mantenimientos)), 200
+    except Exception as e:
+        logger.error('Error al obtener el calendario de mantenimientos: %s', e)
+        return jsonify({'error': f"Error interno del servidor: {str(e)}"}), 500
+
+@admin_bp.route('/api/mantenimientos/politicas', methods=['GET'])
+@login_required
+@role_required(1)
+def api_listar_politicas_mantenimiento():
+    politicas = PoliticaMantenimiento.query.order_by(PoliticaMantenimiento.id_politica).all()
+    return jsonify([p.to_dict() for p in politicas]), 200
+
+@admin_bp.route('/api/mantenimientos/politicas', methods=['POST'])
+@login_required
+@role_required(1)
+def api_crear_politica_mantenimiento():
+
+    try:
+        data = request.get_json() or {}
+        fecha_inicio = None
+        if data.get('fecha_inicio'):
+            try:
+                fecha_inicio = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Formato de fecha inválido. Use: YYYY-MM-DD'}), 400
+
+        politica, error = crear_politica(
+            data.get('tipo_equipo'),
+            data.get('intervalo_dias'),
+            tipo_mantenimiento=data.get('tipo_mantenimiento'),
+            fecha_inicio=fecha_inicio,
+            descripcion=(data.get('descripcion') or '').strip() or None
+        )
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+
+        programados = materializar_politicas(politica_ids=[politica.id_politica])
+        return jsonify({
+            'success': True,
+            'message': f'Política creada: {programados} mantenimientos programados.',
+            'politica': politica.to_dict(),
+            'programados': programados
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Error al crear política de mantenimiento: %s', e)
+        return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
+
+@admin_bp.route('/api/mantenimientos/politicas/<int:politica_id>', methods=['DELETE'])
+@login_required
+@role_required(1)
+def api_desactivar_politica_mantenimiento(politica_id):
+
+    try:
+        eliminados, error = desactivar_politica(politica_id)
+        if error:
+            return jsonify({'success': False, 'error': error}), 404
+        return jsonify({
+            'success': True,
+            'message': f'Política desactivada: {eliminados} mantenimientos pendientes eliminados.'
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        logger.error('Error al desactivar política de mantenimiento: %s', e)
+        return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
+
 @admin_bp.route('/estudiantes/<int:id>/editar')
 @login_required
 @role_required(1)
@@ -1047,6 +1082,7 @@ def detalles_estudiante(id):
 @admin_bp.route('/api/directorio/estudiantes', methods=['GET'])
 @login_required
 @role_required(1) 
+@solo_lectura
 def api_estudiantes_directorio():
     try:
         search_query = request.args.get('q', '')
@@ -1062,9 +1098,12 @@ def api_estudiantes_directorio():
         ).group_by(Matricula.estudianteId).subquery()
 
         query = db.session.query(
-            Usuario,
-            Curso.nombreCurso,
-            Sede.nombre
+            Usuario.no_identidad,
+            (Usuario.nombre + ' ' + Usuario.apellido).label('nombre_completo'),
+            Usuario.correo,
+            db.func.coalesce(Curso.nombreCurso, 'Sin curso').label('curso'),
+            db.func.coalesce(Sede.nombre, 'Sin sede').label('sede'),
+            Usuario.estado_cuenta
         ).filter(
             Usuario.id_rol_fk == rol_estudiante.id_rol
         ).outerjoin(
@@ -1090,25 +1129,11 @@ def api_estudiantes_directorio():
             )
 
         estudiantes = query.all()
-        
-        lista_estudiantes = []
-        for usuario, curso_nombre, sede_nombre in estudiantes:
-            curso_final = curso_nombre if curso_nombre else "Sin curso"
-            sede_final = sede_nombre if sede_nombre else "Sin sede"
-            
-            lista_estudiantes.append({
-                'no_identidad': usuario.no_identidad,
-                'nombre_completo': usuario.nombre_completo,
-                'correo': usuario.correo,
-                'curso': curso_final,
-                'sede': sede_final,
-                'estado_cuenta': usuario.estado_cuenta,
-            })
-            
-        return jsonify({"data": lista_estudiantes, "message": "Directorio cargado exitosamente."}), 200
+
+        return jsonify({"data": proyectar_filas(estudiantes), "message": "Directorio cargado exitosamente."}), 200
 
     except Exception as e:
-        print(f"Error en la API de directorio de estudiantes: {e}")
+        logger.error('Error en la API de directorio de estudiantes: %s', e)
         return jsonify({"error": "Error interno del servidor"}), 500
 
 @admin_bp.route('/padres')
@@ -1126,6 +1151,7 @@ def padres():
 @admin_bp.route('/api/padres')
 @login_required
 @role_required(1)
+@solo_lectura
 def api_padres():
     try:
         filter_id = request.args.get('filter_id', '')
@@ -1141,14 +1167,13 @@ def api_padres():
         hijos_dict = {}
         if padre_ids:
             try:
-                from sqlalchemy import text
-                result = db.session.execute(text("""
+                result = db.session.execute(sql_con_listas("""
                     SELECT ep.padre_id, u.id_usuario, u.nombre, u.apellido, u.no_identidad
                     FROM estudiante_padre ep 
                     JOIN usuarios u ON ep.estudiante_id = u.id_usuario 
                     WHERE ep.padre_id IN :padre_ids
                     ORDER BY ep.padre_id, u.nombre
-                """), {'padre_ids': tuple(padre_ids)})
+                """, 'padre_ids'), {'padre_ids': list(padre_ids)})
                 
                 for row in result:
                     padre_id = row[0]
@@ -1160,7 +1185,7 @@ def api_padres():
                         'no_identidad': row[4]
                     })
             except Exception as e:
-                print(f"Error cargando hijos de padres: {e}")
+                logger.error('Error cargando hijos de padres: %s', e)
                 hijos_dict = {}
             
         lista_padres = []
@@ -1180,7 +1205,7 @@ def api_padres():
             })
         return jsonify({"data": lista_padres})
     except Exception as e:
-        print(f"Error en la API de padres: {e}")
+        logger.error('Error en la API de padres: %s', e)
         return jsonify({"error": "Error interno del servidor"}), 500
 
 @admin_bp.route('/superadmins')
@@ -1219,7 +1244,7 @@ def api_superadmins():
             })
         return jsonify({"data": lista_superadmins})
     except Exception as e:
-        print(f"Error en la API de superadmins: {e}")
+        logger.error('Error en la API de superadmins: %s', e)
         return jsonify({"error": "Error interno del servidor"}), 500
 
 @admin_bp.route('/crear_usuario', methods=['GET', 'POST'])
@@ -1266,7 +1291,6 @@ def crear_usuario():
 
         from datetime import datetime, timedelta
         verification_code = generate_verification_code()
-        print(f"DEBUG: Creando usuario - Contraseña del formulario:{form.password.data}")
         new_user = Usuario(
             tipo_doc=form.tipo_doc.data,
             no_identidad=form.no_identidad.data,
@@ -1298,7 +1322,6 @@ def crear_usuario():
                 db.session.add(nueva_matricula)
             
             db.session.commit()
-            print(f"DEBUG: Usuario creado - Contraseña temporal: {new_user.temp_password}")
             email_result = send_welcome_email(new_user, new_user.verification_code)
             
             if email_result == True:
@@ -1350,7 +1373,7 @@ def api_verificar_identidad():
         return jsonify({'exists': usuario is not None})
         
     except Exception as e:
-        print(f"Error verificando identidad: {e}")
+        logger.error('Error verificando identidad: %s', e)
         return jsonify({'exists': False})
     
 @admin_bp.route('/api/verificar-correo')
@@ -1368,7 +1391,7 @@ def api_verificar_correo():
         return jsonify({'exists': usuario is not None})
         
     except Exception as e:
-        print(f"Error verificando correo: {e}")
+        logger.error('Error verificando correo: %s', e)
         return jsonify({'exists': False})
 
 @admin_bp.route('/editar_usuario/<int:user_id>', methods=['GET', 'POST'])
@@ -1457,7 +1480,7 @@ def api_buscar_padres():
         return jsonify(resultados)
         
     except Exception as e:
-        print(f"Error buscando padres: {e}")
+        logger.error('Error buscando padres: %s', e)
         return jsonify([])
 
 @admin_bp.route('/api/crear-padre', methods=['POST'])
@@ -1515,7 +1538,7 @@ def api_crear_padre():
             message = f'Padre/acudiente creado exitosamente! ⚠️ Límite diario de correos excedido. Código de verificación: {verification_code}'
         else:
             message = f'Padre/acudiente creado exitosamente pero hubo un error enviando el correo de verificación. Código de verificación: {verification_code}'
-            print(f"ADVERTENCIA: No se pudo enviar el correo de verificación al padre {nuevo_padre.correo}")
+            logger.warning('No se pudo enviar el correo de verificación al padre %s', nuevo_padre.correo)
         
         return jsonify({
             'success': True,
@@ -1530,7 +1553,7 @@ def api_crear_padre():
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error creando padre: {e}")
+        logger.error('Error creando padre: %s', e)
         return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
 
 
@@ -1797,7 +1820,7 @@ def api_crear_asignatura():
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error creando asignatura: {str(e)}")
+        logger.error('Error creando asignatura: %s', e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @admin_bp.route('/api/asignaturas/<int:asignatura_id>', methods=['PUT'])
@@ -1852,7 +1875,7 @@ def api_actualizar_asignatura(asignatura_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error actualizando asignatura: {str(e)}")
+        logger.error('Error actualizando asignatura: %s', e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @admin_bp.route('/api/horarios/<int:horario_id>/reassign-classes', methods=['POST'])
@@ -1982,7 +2005,7 @@ def api_crear_horario_completo():
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error creando horario: {str(e)}")
+        logger.error('Error creando horario: %s', e)
         return jsonify({'success': False, 'error': f'Error del servidor: {str(e)}'}), 500
 
 @admin_bp.route('/api/horarios/<int:horario_id>', methods=['PUT'])
@@ -2052,7 +2075,7 @@ def api_actualizar_horario(horario_id):
         })
     except Exception as e:
         db.session.rollback()
-        print(f"Error actualizando horario: {str(e)}")
+        logger.error('Error actualizando horario: %s', e)
         return jsonify({'success': False, 'error': f'Error del servidor: {str(e)}'}), 500
 
 @admin_bp.route('/api/horarios/<int:horario_id>', methods=['GET'])
@@ -2091,12 +2114,13 @@ def api_obtener_horario(horario_id):
         })
         
     except Exception as e:
-        print(f"Error obteniendo horario: {str(e)}")
+        logger.error('Error obteniendo horario: %s', e)
         return jsonify({'error': f'Error al obtener horario: {str(e)}'}), 500
 
 @admin_bp.route('/api/horarios', methods=['GET'])
 @login_required
 @role_required(1)
+@respuesta_condicional(HorarioGeneral, Curso)
 def api_listar_horarios():
     try:
         horarios = HorarioGeneral.query.all()
@@ -2118,7 +2142,7 @@ def api_listar_horarios():
 def api_validar_conflicto_slot():
     try:
         data = request.get_json() or {}
-        print(f"🔍 DATOS RECIBIDOS EN VALIDACIÓN: {data}")
+        logger.debug('🔍 DATOS RECIBIDOS EN VALIDACIÓN: %s', data)
         
         profesor_id = data.get('profesor_id')
         asignatura_id_excluir = data.get('asignatura_id_excluir')
@@ -2126,7 +2150,7 @@ def api_validar_conflicto_slot():
         hora_inicio = data.get('hora_inicio')
         curso_id = data.get('curso_id')
 
-        print(f"🔍 VALIDANDO CONFLICTO - Profesor: {profesor_id}, Día: {dia}, Hora: {hora_inicio}")
+        logger.debug('🔍 VALIDANDO CONFLICTO - Profesor: %s, Día: %s, Hora: %s', profesor_id, dia, hora_inicio)
 
         if not (profesor_id and dia and hora_inicio):
             return jsonify({
@@ -2156,7 +2180,7 @@ def api_validar_conflicto_slot():
         except Exception:
             hora_fin = '08:00'
 
-        print(f"🔍 Validando: profesor={profesor_id}, dia={dia}, hora={hora_inicio}-{hora_fin}")
+        logger.debug('🔍 Validando: profesor=%s, dia=%s, hora=%s-%s', profesor_id, dia, hora_inicio, hora_fin)
 
         validacion = validar_conflicto_horario_profesor(
             profesor_id=profesor_id,
@@ -2169,7 +2193,7 @@ def api_validar_conflicto_slot():
             hora_inicio_excluir=hora_inicio
         )
 
-        print(f"📋 RESULTADO VALIDACIÓN: {validacion}")
+        logger.debug('📋 RESULTADO VALIDACIÓN: %s', validacion)
 
         return jsonify({
             'success': True,
@@ -2177,9 +2201,7 @@ def api_validar_conflicto_slot():
             'mensaje': validacion.get('conflicto_info', '')
         })
     except Exception as e:
-        print(f"❌ ERROR en validación: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('❌ ERROR en validación: %s', e)
         return jsonify({
             'success': True,  
             'conflicto': False,
@@ -2346,37 +2368,39 @@ def validar_conflicto_horario_profesor(profesor_id, dia_semana, hora_inicio, hor
     try:
         from datetime import datetime
         
-        print(f"🔍 Validando conflicto para profesor {profesor_id}")
-        print(f"   Día: {dia_semana}, Hora: {hora_inicio}-{hora_fin}")
-        print(f"   Excluir: curso={curso_id_excluir}, asignatura={asignatura_id_excluir}")
+        logger.debug(
+            '🔍 Validando conflicto para profesor %s - Día: %s, Hora: %s-%s, Excluir: curso=%s, asignatura=%s',
+            profesor_id, dia_semana, hora_inicio, hora_fin, curso_id_excluir, asignatura_id_excluir
+        )
 
         hora_inicio_obj = datetime.strptime(hora_inicio, '%H:%M').time()
         hora_fin_obj = datetime.strptime(hora_fin, '%H:%M').time()
 
         asignaciones_existentes = HorarioCurso.query.filter_by(profesor_id=profesor_id).all()
 
-        print(f"   Asignaciones existentes encontradas: {len(asignaciones_existentes)}")
+        logger.debug('Asignaciones existentes encontradas: %s', len(asignaciones_existentes))
 
         for asignacion in asignaciones_existentes:
-            print(f"   Revisando asignación: ID={asignacion.id_horario_curso}")
-            print(f"     Curso: {asignacion.curso_id}, Día: {asignacion.dia_semana}")
-            print(f"     Hora: {asignacion.hora_inicio}-{asignacion.hora_fin}")
-            print(f"     Asignatura: {asignacion.asignatura_id}")
+            logger.debug(
+                'Revisando asignación: ID=%s, Curso: %s, Día: %s, Hora: %s-%s, Asignatura: %s',
+                asignacion.id_horario_curso, asignacion.curso_id, asignacion.dia_semana,
+                asignacion.hora_inicio, asignacion.hora_fin, asignacion.asignatura_id
+            )
 
             if (curso_id_excluir and asignacion.curso_id == curso_id_excluir and
                 (dia_semana_excluir or '').lower() == (asignacion.dia_semana or '').lower() and
                 (hora_inicio_excluir or '') == (asignacion.hora_inicio or '')):
-                print("     ✅ Excluyendo (mismo slot en edición)")
+                logger.debug('✅ Excluyendo (mismo slot en edición)')
                 continue
             
             if (curso_id_excluir and asignatura_id_excluir and 
                 asignacion.curso_id == curso_id_excluir and 
                 asignacion.asignatura_id == asignatura_id_excluir):
-                print("     ✅ Excluyendo (misma asignatura en mismo curso)")
+                logger.debug('✅ Excluyendo (misma asignatura en mismo curso)')
                 continue
 
             if (asignacion.dia_semana or '').lower() != (dia_semana or '').lower():
-                print("     ✅ Día diferente, sin conflicto")
+                logger.debug('✅ Día diferente, sin conflicto')
                 continue
 
             try:
@@ -2384,17 +2408,20 @@ def validar_conflicto_horario_profesor(profesor_id, dia_semana, hora_inicio, hor
                 hf_exist = asignacion.hora_fin
                 
                 if not hi_exist or not hf_exist:
-                    print("     ⚠️ Hora inválida, omitiendo")
+                    logger.warning('⚠️ Hora inválida, omitiendo')
                     continue
                     
                 hi_exist_obj = datetime.strptime(hi_exist, '%H:%M').time()
                 hf_exist_obj = datetime.strptime(hf_exist, '%H:%M').time()
             except Exception as e:
-                print(f"     ⚠️ Error parseando hora: {e}")
+                logger.warning('⚠️ Error parseando hora: %s', e)
                 continue
 
             tiene_solapamiento = (hora_inicio_obj < hf_exist_obj and hora_fin_obj > hi_exist_obj)
-            print(f"     Solapamiento: {tiene_solapamiento} ({hora_inicio_obj} < {hf_exist_obj} y {hora_fin_obj} > {hi_exist_obj})")
+            logger.debug(
+                'Solapamiento: %s (%s < %s y %s > %s)',
+                tiene_solapamiento, hora_inicio_obj, hf_exist_obj, hora_fin_obj, hi_exist_obj
+            )
 
             if tiene_solapamiento:
                 curso_nombre = "Curso desconocido"
@@ -2409,20 +2436,18 @@ def validar_conflicto_horario_profesor(profesor_id, dia_semana, hora_inicio, hor
                     asignatura_nombre = asignatura_conflicto.nombre
                 
                 mensaje_conflicto = f"Conflicto con {asignatura_nombre} en {curso_nombre} ({hi_exist}-{hf_exist})"
-                print(f"     ❌ CONFLICTO: {mensaje_conflicto}")
+                logger.debug('❌ CONFLICTO: %s', mensaje_conflicto)
                 
                 return {
                     'tiene_conflicto': True,
                     'conflicto_info': mensaje_conflicto
                 }
 
-        print("     ✅ Sin conflictos encontrados")
+        logger.debug('✅ Sin conflictos encontrados')
         return {'tiene_conflicto': False, 'conflicto_info': ''}
 
     except Exception as e:
-        print(f"❌ ERROR en validación de conflicto: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('❌ ERROR en validación de conflicto: %s', e)
         return {'tiene_conflicto': False, 'conflicto_info': ''}
 
 
@@ -2433,37 +2458,34 @@ def api_guardar_horario_curso():
     try:
         data = request.get_json()
         
-        print("=" * 50)
-        print("DEBUG - DATOS RECIBIDOS EN EL BACKEND:")
-        print("=" * 50)
-        print(f"Data completa: {data}")
-        print(f"Curso ID: {data.get('curso_id')}")
-        print(f"Horario General ID: {data.get('horario_general_id')}")
+        logger.debug('DATOS RECIBIDOS EN EL BACKEND:')
+        logger.debug('Data completa: %s', data)
+        logger.debug('Curso ID: %s', data.get('curso_id'))
+        logger.debug('Horario General ID: %s', data.get('horario_general_id'))
         
         asignaciones = data.get('asignaciones', {})
         salones_asignaciones = data.get('salones_asignaciones', {})
         profesores_asignaciones = data.get('profesores_asignaciones', {})
         
-        print(f"Asignaciones recibidas: {asignaciones}")
-        print(f"Salones recibidos: {salones_asignaciones}")
-        print(f"Total asignaciones: {len(asignaciones)}")
-        print(f"Total salones: {len(salones_asignaciones)}")
+        logger.debug('Asignaciones recibidas: %s', asignaciones)
+        logger.debug('Salones recibidos: %s', salones_asignaciones)
+        logger.debug('Total asignaciones: %s', len(asignaciones))
+        logger.debug('Total salones: %s', len(salones_asignaciones))
         
-
-        if asignaciones:
-            print("Primeras 5 asignaciones:")
+        if asignaciones and logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Primeras 5 asignaciones:')
             for i, (clave, valor) in enumerate(list(asignaciones.items())[:5]):
-                print(f"   {i+1}. {clave} -> {valor}")
+                logger.debug('%s. %s -> %s', i + 1, clave, valor)
 
         curso_id = data.get('curso_id')
         if not curso_id:
-            print("ERROR: No hay curso_id")
+            logger.warning('No hay curso_id')
             return jsonify({'success': False, 'error': 'ID de curso requerido'}), 400
 
 
         curso = Curso.query.get(curso_id)
         if not curso:
-            print(f"ERROR: Curso {curso_id} no encontrado")
+            logger.warning('Curso %s no encontrado', curso_id)
             return jsonify({'success': False, 'error': 'Curso no encontrado'}), 404
 
         # Si no hay asignaciones en la petición, interpretar como 'restablecer' y borrar todo
@@ -2491,27 +2513,27 @@ def api_guardar_horario_curso():
                 return jsonify({'success': False, 'error': f'Error al eliminar asignaciones: {str(del_e)}'}), 500
 
         asignaciones_existentes = HorarioCurso.query.filter_by(curso_id=curso_id).all()
-        print(f"Asignaciones existentes en BD: {len(asignaciones_existentes)}")
+        logger.debug('Asignaciones existentes en BD: %s', len(asignaciones_existentes))
 
         asignaciones_existentes_dict = {}
         for asignacion in asignaciones_existentes:
             clave = f"{asignacion.dia_semana}-{asignacion.hora_inicio}"
             asignaciones_existentes_dict[clave] = asignacion
-            print(f"   {clave} -> Asignatura: {asignacion.asignatura_id}, Salon: {asignacion.id_salon_fk}")
+            logger.debug('%s -> Asignatura: %s, Salon: %s', clave, asignacion.asignatura_id, asignacion.id_salon_fk)
 
         asignaciones_creadas = 0
         asignaciones_actualizadas = 0
         asignaciones_eliminadas = 0
 
-        print("Procesando asignaciones del request...")
+        logger.debug('Procesando asignaciones del request...')
         for clave, asignatura_id in asignaciones.items():
             try:
-                print(f"   Procesando: {clave} -> {asignatura_id}")
+                logger.debug('Procesando: %s -> %s', clave, asignatura_id)
                 
                 # Parsear la clave
                 partes = clave.split('-')
                 if len(partes) < 2:
-                    print(f"   Clave inválida: {clave}")
+                    logger.debug('Clave inválida: %s', clave)
                     continue
                     
                 dia = partes[0]
@@ -2522,13 +2544,13 @@ def api_guardar_horario_curso():
                     if clave in asignaciones_existentes_dict:
                         db.session.delete(asignaciones_existentes_dict[clave])
                         asignaciones_eliminadas += 1
-                        print(f"   Eliminada asignación vacía: {clave}")
+                        logger.debug('Eliminada asignación vacía: %s', clave)
                     continue
 
                 # Verificar asignatura
                 asignatura = Asignatura.query.get(asignatura_id)
                 if not asignatura:
-                    print(f"   Asignatura no encontrada: {asignatura_id}")
+                    logger.debug('Asignatura no encontrada: %s', asignatura_id)
                     continue
 
                 hora_fin = "08:00"
@@ -2569,7 +2591,7 @@ def api_guardar_horario_curso():
                     )
                     
                     if validacion['tiene_conflicto']:
-                        print(f"   CONFLICTO DETECTADO para {profesor_nombre}: {validacion['conflicto_info']}")
+                        logger.debug('CONFLICTO DETECTADO para %s: %s', profesor_nombre, validacion['conflicto_info'])
                         
                         libres = []
                         try:
@@ -2593,7 +2615,7 @@ def api_guardar_horario_curso():
                                         if nombre_prof:
                                             libres.append(nombre_prof)
                         except Exception as e:
-                            print(f"Error obteniendo profesores libres: {str(e)}")
+                            logger.error('Error obteniendo profesores libres: %s', e)
 
                         mensaje_error = (
                             f"Conflicto de horario detectado para el profesor seleccionado: {validacion['conflicto_info']}\n\n"
@@ -2612,7 +2634,7 @@ def api_guardar_horario_curso():
                 if salon_id:
                     salon = Salon.query.get(salon_id)
                     if not salon:
-                        print(f"   Salón no encontrado: {salon_id}")
+                        logger.debug('Salón no encontrado: %s', salon_id)
                         salon_id = None
 
                 if clave in asignaciones_existentes_dict:
@@ -2623,7 +2645,7 @@ def api_guardar_horario_curso():
                     if profesor_id:
                         asignacion_existente.profesor_id = profesor_id
                     asignaciones_actualizadas += 1
-                    print(f"   ACTUALIZADA: {clave}")
+                    logger.debug('ACTUALIZADA: %s', clave)
                 else:
                     nueva_asignacion = HorarioCurso(
                         curso_id=curso_id,
@@ -2638,10 +2660,10 @@ def api_guardar_horario_curso():
                     )
                     db.session.add(nueva_asignacion)
                     asignaciones_creadas += 1
-                    print(f"   CREADA: {clave}")
+                    logger.debug('CREADA: %s', clave)
 
             except Exception as e:
-                print(f"   Error procesando {clave}: {str(e)}")
+                logger.error('Error procesando %s: %s', clave, e)
                 continue
 
         claves_request = set(asignaciones.keys())
@@ -2649,7 +2671,7 @@ def api_guardar_horario_curso():
             if clave not in claves_request or not asignaciones.get(clave):
                 db.session.delete(asignacion_existente)
                 asignaciones_eliminadas += 1
-                print(f"   ELIMINADA: {clave}")
+                logger.debug('ELIMINADA: %s', clave)
 
         horario_general_id = data.get('horario_general_id')
         try:
@@ -2671,21 +2693,19 @@ def api_guardar_horario_curso():
                         )
                         db.session.add(nuevo)
                         creados_hc += 1
-            print(f"   HorarioCompartido creados: {creados_hc}")
+            logger.debug('HorarioCompartido creados: %s', creados_hc)
         except Exception as e:
-            print(f"Advertencia creando HorarioCompartido: {str(e)}")
+            logger.warning('Advertencia creando HorarioCompartido: %s', e)
 
         db.session.commit()
         
         total_final = HorarioCurso.query.filter_by(curso_id=curso_id).count()
         
-        print("=" * 50)
-        print("RESUMEN FINAL:")
-        print(f"   Creadas: {asignaciones_creadas}")
-        print(f"   Actualizadas: {asignaciones_actualizadas}")
-        print(f"   Eliminadas: {asignaciones_eliminadas}")
-        print(f"   Total en BD: {total_final}")
-        print("=" * 50)
+        logger.debug('RESUMEN FINAL:')
+        logger.debug('Creadas: %s', asignaciones_creadas)
+        logger.debug('Actualizadas: %s', asignaciones_actualizadas)
+        logger.debug('Eliminadas: %s', asignaciones_eliminadas)
+        logger.debug('Total en BD: %s', total_final)
 
         return jsonify({
             'success': True,
@@ -2700,9 +2720,7 @@ def api_guardar_horario_curso():
 
     except Exception as e:
         db.session.rollback()
-        print(f"ERROR CRÍTICO: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('ERROR CRÍTICO: %s', e)
         return jsonify({'success': False, 'error': f'Error del servidor: {str(e)}'}), 500
     
 @admin_bp.route('/api/horario_curso/cargar/<int:curso_id>')
@@ -2745,11 +2763,11 @@ def api_cargar_horario_curso(curso_id):
                 'break_type': b.break_type
             } for b in bloques]
 
-        print(f"📥 Cargando horario para curso {curso_id}:")
-        print(f"   Asignaciones: {len(asignaciones)}")
-        print(f"   Salones: {len(salones_asignaciones)}")
-        print(f"   Profesores: {len(profesores_asignaciones)}")  # ✅ NUEVO
-        print(f"   Bloques: {len(bloques_horario)}")
+        logger.debug('📥 Cargando horario para curso %s:', curso_id)
+        logger.debug('Asignaciones: %s', len(asignaciones))
+        logger.debug('Salones: %s', len(salones_asignaciones))
+        logger.debug('Profesores: %s', len(profesores_asignaciones))  # ✅ NUEVO
+        logger.debug('Bloques: %s', len(bloques_horario))
 
         return jsonify({
             'curso_id': curso_id,
@@ -2763,7 +2781,7 @@ def api_cargar_horario_curso(curso_id):
         })
 
     except Exception as e:
-        print(f"❌ Error cargando horario del curso: {str(e)}")
+        logger.error('❌ Error cargando horario del curso: %s', e)
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/api/horarios/<int:horario_id>/cursos', methods=['GET'])
@@ -2802,7 +2820,7 @@ def api_profesores_por_asignatura(asignatura_id):
         })
         
     except Exception as e:
-        print(f"❌ Error obteniendo profesores por asignatura: {str(e)}")
+        logger.error('❌ Error obteniendo profesores por asignatura: %s', e)
         return jsonify({
             'success': False,
             'error': f'Error al obtener profesores: {str(e)}'
@@ -2823,7 +2841,7 @@ def api_validar_profesor_asignatura(profesor_id, asignatura_id):
         })
         
     except Exception as e:
-        print(f"❌ Error validando profesor-asignatura: {str(e)}")
+        logger.error('❌ Error validando profesor-asignatura: %s', e)
         return jsonify({
             'success': False,
             'error': f'Error al validar: {str(e)}'
@@ -2957,7 +2975,7 @@ def api_compartir_horario():
 
     except Exception as e:
         db.session.rollback()
-        print(f"Error compartiendo horario: {str(e)}")
+        logger.error('Error compartiendo horario: %s', e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @admin_bp.route('/api/estadisticas/horarios-cursos')
@@ -3006,36 +3024,19 @@ def equipos():
 @admin_bp.route('/api/equipos', methods=['GET'])
 @login_required
 @role_required(1)
+@solo_lectura
 def api_equipos_todos():
-    equipos = Equipo.query.all()
-    return jsonify([e.to_dict() for e in equipos])
-
-@admin_bp.route('/api/equipos')
-@login_required
-@role_required(1)
-def api_equipos():
     try:
-        equipos = Equipo.query.all()
-        lista_equipos = []
-        
-        for equipo in equipos:
-            incidentes_count = len(equipo.incidentes)
-            mantenimientos_count = len(equipo.programaciones)
-            
-            lista_equipos.append({
-                'id': equipo.id_equipo, 
-                'id_equipo': equipo.id_equipo,
-                'nombre': equipo.nombre,
-                'estado': equipo.estado,
-                'salon_nombre': equipo.salon.nombre if equipo.salon else 'Sin salón',
-                'sede_nombre': equipo.salon.sede.nombre if equipo.salon and equipo.salon.sede else 'Sin sede',
-                'incidentes': incidentes_count,
-                'mantenimientos': mantenimientos_count
-            })
-        
-        return jsonify(lista_equipos)
+        equipos, error = listar_equipos(
+            estado=request.args.get('estado') or None,
+            sede_id=request.args.get('sede_id', type=int),
+            salon_id=request.args.get('salon_id', type=int)
+        )
+        if error:
+            return jsonify({'error': error}), 400
+        return jsonify(equipos)
     except Exception as e:
-        current_app.logger.error(f"Error en api_equipos: {str(e)}")
+        logger.error('Error en api_equipos: %s', e)
         return jsonify({'error': 'Error interno del servidor'}), 500
     
 @admin_bp.route('/api/estudiantes-por-curso/<int:curso_id>', methods=['GET'])
@@ -3067,7 +3068,7 @@ def api_estudiantes_por_curso(curso_id):
         return jsonify(estudiantes_data), 200
         
     except Exception as e:
-        print(f"Error obteniendo estudiantes por curso: {e}")
+        logger.error('Error obteniendo estudiantes por curso: %s', e)
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/registro_equipos', methods=['GET', 'POST'])
@@ -3120,7 +3121,7 @@ def crear_equipo():
 
         except Exception as e:
             db.session.rollback()
-            print(f"Error creando equipo: {e}")
+            logger.error('Error creando equipo: %s', e)
             flash(f'Error al crear equipo: {str(e)}', 'error')
             return redirect(url_for('admin.crear_equipo'))
 
@@ -3131,6 +3132,88 @@ def crear_equipo():
         cursos=cursos
     )
 
+@admin_bp.route('/api/equipos/importar', methods=['POST'])
+@login_required
+@role_required(1)
+def api_importar_equipos():
+    """
+    Importación masiva de equipos desde un CSV o XLSX (campo 'archivo').
+    Con simular=1 solo valida. Los archivos mayores que IMPORTACION_FONDO_BYTES
+    (o con fondo=1) se importan en segundo plano y se responde 202.
+    """
+    from services.importacion_service import formato_de_archivo, importar_equipos, iniciar_importacion
+
+    archivo = request.files.get('archivo')
+    if not archivo or not archivo.filename:
+        return jsonify({'success': False, 'error': 'Seleccione un archivo CSV o XLSX.'}), 400
+    formato = formato_de_archivo(archivo.filename)
+    if not formato:
+        return jsonify({'success': False, 'error': 'Formato no soportado. Use un archivo .csv o .xlsx'}), 400
+    simular = request.form.get('simular') in ('1', 'true', 'on')
+
+    try:
+        tamano = request.content_length or 0
+        if request.form.get('fondo') in ('1', 'true', 'on') or tamano > current_app.config.get('IMPORTACION_FONDO_BYTES', 512 * 1024):
+            trabajo_id = iniciar_importacion(current_app._get_current_object(), archivo, formato, simular)
+            return jsonify({
+                'success': True,
+                'message': 'Importación iniciada',
+                'trabajo_id': trabajo_id,
+                'estado_url': url_for('admin.api_estado_importacion_equipos', trabajo_id=trabajo_id)
+            }), 202
+
+        informe, error = importar_equipos(archivo.stream, formato, simular)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        return jsonify({'success': True, 'informe': informe}), 200
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Error importando equipos: %s', e)
+        return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
+
+@admin_bp.route('/api/equipos/importar/plantilla', methods=['GET'])
+@login_required
+@role_required(1)
+def api_plantilla_importacion_equipos():
+    from services.importacion_service import COLUMNAS
+
+    ejemplo = ['PC-001', 'Equipo 1', 'computadora', 'Disponible', Salon.query.with_entities(Salon.id_salon).scalar() or 1,
+               'Windows 11', '8GB DDR4', '256GB SSD', date.today(), '', '']
+    respuesta, error = respuesta_exportacion('plantilla_equipos', list(COLUMNAS), [ejemplo], 'csv')
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    return respuesta
+
+@admin_bp.route('/api/equipos/importaciones/<string:trabajo_id>', methods=['GET'])
+@login_required
+@role_required(1)
+def api_estado_importacion_equipos(trabajo_id):
+    from services.importacion_service import leer_estado_importacion
+
+    estado = leer_estado_importacion(current_app, trabajo_id)
+    if not estado:
+        return jsonify({'success': False, 'message': 'Trabajo no encontrado'}), 404
+    estado['errores_url'] = url_for('admin.api_errores_importacion_equipos', trabajo_id=trabajo_id) \
+        if estado['estado'] == 'completado' and estado['informe']['rechazados'] else None
+    return jsonify({'success': True, 'trabajo': estado})
+
+@admin_bp.route('/api/equipos/importaciones/<string:trabajo_id>/errores.csv', methods=['GET'])
+@login_required
+@role_required(1)
+def api_errores_importacion_equipos(trabajo_id):
+    from flask import send_from_directory
+    from services.importacion_service import carpeta_importaciones, leer_estado_importacion
+
+    estado = leer_estado_importacion(current_app, trabajo_id)
+    if not estado or estado['estado'] != 'completado':
+        return jsonify({'success': False, 'message': 'Archivo no disponible'}), 404
+
+    return send_from_directory(
+        os.path.join(carpeta_importaciones(current_app), estado['trabajo_id']), 'errores.csv',
+        as_attachment=True, download_name=f"errores_importacion_{estado['trabajo_id'][:8]}.csv",
+        mimetype='text/csv'
+    )
+
 @admin_bp.route('/api/equipos/con-incidentes', methods=['GET'])
 @login_required
 @role_required(1)
@@ -3142,9 +3225,9 @@ def api_equipos_con_incidentes():
             Incidente.estado
         ).all()
         
-        print("DEBUG - Todos los incidentes en BD:")
+        logger.debug('Todos los incidentes en BD:')
         for inc in todos_incidentes:
-            print(f"  Equipo ID: {inc.equipo_id}, Estado: '{inc.estado}'")
+            logger.debug("Equipo ID: %s, Estado: '%s'", inc.equipo_id, inc.estado)
         
         equipos_con_incidentes = db.session.query(Incidente.equipo_id)\
             .distinct()\
@@ -3152,12 +3235,12 @@ def api_equipos_con_incidentes():
         
         ids = [eq[0] for eq in equipos_con_incidentes]
         
-        print(f"DEBUG - IDs con incidentes: {ids}")
+        logger.debug('IDs con incidentes: %s', ids)
         
         return jsonify({'equipos_con_incidentes': ids}), 200
         
     except Exception as e:
-        print(f"Error: {e}")
+        logger.error('Error: %s', e)
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/api/equipos/con-incidentes-activos', methods=['GET'])
@@ -3198,7 +3281,7 @@ def api_equipos_con_incidentes_activos():
         return jsonify(equipos), 200
 
     except Exception as e:
-        print(f"Error al listar equipos con incidentes activos: {e}")
+        logger.error('Error al listar equipos con incidentes activos: %s', e)
         return jsonify({'error': f"Error interno del servidor: {str(e)}"}), 500
 
 
@@ -3267,21 +3350,15 @@ def salones():
 @role_required(1)
 def api_verificar_equipo_estudiante_en_sala(estudiante_id, salon_id):
     try:
-        asignacion_en_sala = db.session.query(AsignacionEquipo)\
-            .join(Equipo, AsignacionEquipo.equipo_id == Equipo.id_equipo)\
-            .filter(
-                AsignacionEquipo.estudiante_id == estudiante_id,
-                AsignacionEquipo.estado_asignacion == 'activa',
-                Equipo.id_salon_fk == salon_id
-            ).first()
+        en_sala = asignacion_en_sala(estudiante_id, salon_id)
         
-        if asignacion_en_sala:
+        if en_sala:
             return jsonify({
                 'tiene_equipo_en_sala': True,
-                'equipo_id': asignacion_en_sala.equipo_id,
-                'equipo_nombre': asignacion_en_sala.equipo.nombre,
+                'equipo_id': en_sala.equipo_id,
+                'equipo_nombre': en_sala.nombre,
                 'salon_id': salon_id,
-                'salon_nombre': asignacion_en_sala.equipo.salon.nombre if asignacion_en_sala.equipo.salon else 'Sin nombre'
+                'salon_nombre': en_sala.salon or 'Sin nombre'
             }), 200
         
         return jsonify({
@@ -3291,7 +3368,7 @@ def api_verificar_equipo_estudiante_en_sala(estudiante_id, salon_id):
         }), 200
         
     except Exception as e:
-        print(f"Error verificando equipo del estudiante en sala: {e}")
+        logger.error('Error verificando equipo del estudiante en sala: %s', e)
         return jsonify({'error': str(e)}), 500
     
 @admin_bp.route('/api/equipos/<int:equipo_id>/actualizar', methods=['PUT'])
@@ -3320,22 +3397,14 @@ def api_actualizar_equipo(equipo_id):
             estudiante_id = asig_data['estudiante_id']
             
             # Buscar si el estudiante tiene OTRO equipo activo en ESTA MISMA sala
-            otra_asignacion_misma_sala = db.session.query(AsignacionEquipo)\
-                .join(Equipo, AsignacionEquipo.equipo_id == Equipo.id_equipo)\
-                .filter(
-                    AsignacionEquipo.estudiante_id == estudiante_id,
-                    AsignacionEquipo.estado_asignacion == 'activa',
-                    Equipo.id_salon_fk == salon_id,
-                    Equipo.id_equipo != equipo_id  
-                ).first()
+            otra_asignacion_misma_sala = asignacion_en_sala(estudiante_id, salon_id, excluir_equipo_id=equipo_id)
             
             if otra_asignacion_misma_sala:
                 estudiante = Usuario.query.get(estudiante_id)
-                equipo_existente = otra_asignacion_misma_sala.equipo
-                salon_nombre = equipo_existente.salon.nombre if equipo_existente.salon else 'Sin nombre'
+                salon_nombre = otra_asignacion_misma_sala.salon or 'Sin nombre'
                 return jsonify({
                     'success': False,
-                    'error': f'❌ El estudiante "{estudiante.nombre_completo}" ya tiene el equipo "{equipo_existente.nombre}" asignado en esta sala ({salon_nombre}).\n\nSolo puede tener UN equipo por sala.'
+                    'error': f'❌ El estudiante "{estudiante.nombre_completo}" ya tiene el equipo "{otra_asignacion_misma_sala.nombre}" asignado en esta sala ({salon_nombre}).\n\nSolo puede tener UN equipo por sala.'
                 }), 400
         
         # Eliminar asignaciones que ya no están en la lista
@@ -3381,9 +3450,12 @@ def api_actualizar_equipo(equipo_id):
             'message': f'✅ Equipo actualizado exitosamente con {len(estudiantes_nuevos_ids)} asignaciones'
         })
         
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': f'❌ {mensaje_conflicto(e)}'}), 400
     except Exception as e:
         db.session.rollback()
-        print(f"Error actualizando equipo: {e}")
+        logger.error('Error actualizando equipo: %s', e)
         return jsonify({
             'success': False,
             'error': f'Error del servidor: {str(e)}'
@@ -3399,6 +3471,7 @@ def api_salas_por_sede(id_sede):
 @admin_bp.route('/api/salas_todas', methods=['GET'])
 @login_required
 @role_required(1)
+@respuesta_condicional(Salon, Sede, Equipo)
 def api_salas_todas():
     salones = Salon.query.all()
     result = []
@@ -3496,7 +3569,7 @@ def api_incidentes_equipo(equipo_id):
         incidentes = Incidente.query.filter_by(equipo_id=equipo_id).order_by(Incidente.fecha.desc()).all()
         return jsonify([i.to_dict() for i in incidentes])
     except Exception as e:
-        current_app.logger.error(f"Error en api_incidentes_equipo: {str(e)}")
+        logger.error('Error en api_incidentes_equipo: %s', e)
         return jsonify({'error': 'Error al cargar datos'}), 500
 
 @admin_bp.route('/api/mantenimientos/equipo/<int:equipo_id>', methods=['GET'])
@@ -3514,7 +3587,7 @@ def api_mantenimientos_equipo(equipo_id):
             } for m in mantenimientos
         ])
     except Exception as e:
-        current_app.logger.error(f"Error en api_mantenimientos_equipo: {str(e)}")
+        logger.error('Error en api_mantenimientos_equipo: %s', e)
         return jsonify({'error': 'Error al cargar datos'}), 500
 
 @admin_bp.route('/api/equipos/<int:equipo_id>/estado-detallado', methods=['GET'])
@@ -3546,7 +3619,7 @@ def api_estado_detallado_equipo(equipo_id):
         }), 200
         
     except Exception as e:
-        print(f"Error obteniendo estado detallado: {e}")
+        logger.error('Error obteniendo estado detallado: %s', e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @admin_bp.route('/api/reportes/equipos_por_sede', methods=['GET'])
@@ -3661,7 +3734,7 @@ def api_equipos_para_incidente():
         return jsonify(equipos), 200
 
     except Exception as e:
-        print(f"Error al listar equipos para incidente: {e}")
+        logger.error('Error al listar equipos para incidente: %s', e)
         return jsonify({'error': f"Error interno del servidor: {str(e)}"}), 500
 
 @admin_bp.route('/api/incidentes', methods=['GET'])
@@ -3670,44 +3743,29 @@ def api_equipos_para_incidente():
 def api_listar_incidentes():
 
     try:
-        incidentes_db = db.session.query(
+        coalesce = db.func.coalesce
+        incidentes = db.session.query(
             Incidente.id_incidente,
             Incidente.equipo_id,
-            Incidente.usuario_asignado.label('usuario_reporte'),
-            Incidente.fecha,
-            Incidente.descripcion,
-            Incidente.estado,
-            Incidente.prioridad,
-            Incidente.solucion_propuesta,
-            Equipo.nombre.label('equipo_nombre'),
-            Salon.nombre.label('salon_nombre'),
-            Sede.nombre.label('sede_nombre')
+            coalesce(Incidente.usuario_asignado, '').label('usuario_reporte'),
+            fecha_formateada(Incidente.fecha, '%Y-%m-%d %H:%M:%S').label('fecha'),
+            coalesce(Incidente.descripcion, '').label('descripcion'),
+            coalesce(Incidente.estado, 'reportado').label('estado'),
+            coalesce(Incidente.prioridad, 'media').label('prioridad'),
+            coalesce(Incidente.solucion_propuesta, '').label('solucion_propuesta'),
+            coalesce(Equipo.nombre, '').label('equipo_nombre'),
+            coalesce(Salon.nombre, 'Sin Salón').label('salon_nombre'),
+            coalesce(Sede.nombre, 'Sin Sede').label('sede_nombre')
         ).join(Equipo, Incidente.equipo_id == Equipo.id_equipo)\
          .outerjoin(Salon, Equipo.id_salon_fk == Salon.id_salon)\
          .outerjoin(Sede, Salon.id_sede_fk == Sede.id_sede)\
          .order_by(Incidente.fecha.desc())\
          .all()
-        
-        incidentes = []
-        for inc in incidentes_db:
-            incidentes.append({
-                'id_incidente': inc.id_incidente,
-                'equipo_id': inc.equipo_id,
-                'usuario_reporte': inc.usuario_reporte or '',
-                'fecha': inc.fecha.strftime('%Y-%m-%d %H:%M:%S') if inc.fecha else None,
-                'descripcion': inc.descripcion or '',
-                'estado': inc.estado or 'reportado',
-                'prioridad': inc.prioridad or 'media',
-                'solucion_propuesta': inc.solucion_propuesta or '',
-                'equipo_nombre': inc.equipo_nombre or "",
-                'salon_nombre': inc.salon_nombre or "Sin Salón",
-                'sede_nombre': inc.sede_nombre or "Sin Sede"
-            })
 
-        return jsonify(incidentes), 200
+        return jsonify(proyectar_filas(incidentes)), 200
         
     except Exception as e:
-        print(f"Error al listar incidentes: {e}")
+        logger.error('Error al listar incidentes: %s', e)
         return jsonify({'error': f"Error interno del servidor: {str(e)}"}), 500
 
 @admin_bp.route('/api/incidentes', methods=['POST'])
@@ -3761,9 +3819,7 @@ def api_crear_incidente():
     
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error creando incidente: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('❌ Error creando incidente: %s', e)
         return jsonify({'success': False, 'error': f'Error creando incidente: {str(e)}'}), 500 
 @admin_bp.route('/api/incidentes/<int:id_incidente>/estado', methods=['PUT'])
 @login_required
@@ -3795,7 +3851,7 @@ def api_actualizar_estado_incidente(id_incidente):
 
     except Exception as e:
         db.session.rollback()
-        print(f"Error al actualizar estado: {e}")
+        logger.error('Error al actualizar estado: %s', e)
         return jsonify({'success': False, 'error': f'Error interno: {str(e)}'}), 500
 
 @admin_bp.route('/api/incidentes/<int:id_incidente>', methods=['DELETE'])
@@ -3816,7 +3872,7 @@ def api_eliminar_incidente(id_incidente):
 
     except Exception as e:
         db.session.rollback()
-        print(f"Error al eliminar incidente: {e}")
+        logger.error('Error al eliminar incidente: %s', e)
         return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
 
 @admin_bp.route('/api/incidentes/<int:id_incidente>', methods=['GET'])
@@ -3863,7 +3919,7 @@ def api_detalle_incidente(id_incidente):
         return jsonify(incidente), 200
         
     except Exception as e:
-        print(f"Error al obtener detalle del incidente: {e}")
+        logger.error('Error al obtener detalle del incidente: %s', e)
         return jsonify({'error': f"Error interno del servidor: {str(e)}"}), 500
 
 @admin_bp.route("/eventos/calendario", methods=["GET"])
@@ -3882,37 +3938,34 @@ def debug_notificaciones_eventos():
     try:
         from controllers.models import Notificacion, Usuario, Evento
         
-        print("\n" + "="*80)
-        print("🔍 NOTIFICACIONES DE EVENTOS ESPECÍFICAMENTE")
-        print("="*80)
+        logger.debug('🔍 NOTIFICACIONES DE EVENTOS ESPECÍFICAMENTE')
         
         total_notificaciones = Notificacion.query.count()
         notif_eventos = Notificacion.query.filter_by(tipo='evento').count()
         notif_otros = total_notificaciones - notif_eventos
         
-        print(f"\n📊 ESTADÍSTICAS DE NOTIFICACIONES:")
-        print(f"   - Total: {total_notificaciones}")
-        print(f"   - Tipo 'evento': {notif_eventos}")
-        print(f"   - Otros tipos: {notif_otros}")
+        logger.debug('📊 ESTADÍSTICAS DE NOTIFICACIONES:')
+        logger.debug('- Total: %s', total_notificaciones)
+        logger.debug("- Tipo 'evento': %s", notif_eventos)
+        logger.debug('- Otros tipos: %s', notif_otros)
         
         notificaciones_eventos = Notificacion.query.filter_by(
             tipo='evento'
         ).order_by(Notificacion.creada_en.desc()).limit(30).all()
         
-        print(f"\n📅 NOTIFICACIONES DE EVENTOS ({len(notificaciones_eventos)} encontradas):")
+        logger.debug('📅 NOTIFICACIONES DE EVENTOS (%s encontradas):', len(notificaciones_eventos))
         
         for i, notif in enumerate(notificaciones_eventos, 1):
             usuario = Usuario.query.get(notif.usuario_id)
             nombre_usuario = usuario.nombre_completo if usuario else f"ID:{notif.usuario_id}"
             fecha_str = notif.creada_en.strftime("%m/%d %H:%M") if notif.creada_en else "Sin fecha"
             
-            print(f"   {i}. [{fecha_str}] {nombre_usuario} (ID:{notif.usuario_id})")
-            print(f"      📝 {notif.titulo}")
-            print(f"      📄 {notif.mensaje[:60]}...")
-            print(f"      🔸 Leída: {notif.leida}")
-            print()
+            logger.debug('%s. [%s] %s (ID:%s)', i, fecha_str, nombre_usuario, notif.usuario_id)
+            logger.debug('📝 %s', notif.titulo)
+            logger.debug('📄 %s...', notif.mensaje[:60])
+            logger.debug('🔸 Leída: %s', notif.leida)
         
-        print(f"\n👥 DISTRIBUCIÓN POR USUARIOS:")
+        logger.debug('👥 DISTRIBUCIÓN POR USUARIOS:')
         distribucion = {}
         notificaciones_todas = Notificacion.query.filter_by(tipo='evento').all()
 
@@ -3927,11 +3980,9 @@ def debug_notificaciones_eventos():
         distribucion_ordenada = sorted(distribucion.values(), key=lambda x: x['count'], reverse=True)[:15]
 
         for item in distribucion_ordenada:
-            print(f"   - {item['nombre']}: {item['count']} notificaciones")
+            logger.debug('- %s: %s notificaciones', item['nombre'], item['count'])
         
-        print("\n" + "="*80)
-        print("✅ DIAGNÓSTICO DE EVENTOS COMPLETADO")
-        print("="*80)
+        logger.debug('✅ DIAGNÓSTICO DE EVENTOS COMPLETADO')
         
         return jsonify({
             "message": "Diagnóstico de eventos completado - Revisa la consola",
@@ -3941,30 +3992,28 @@ def debug_notificaciones_eventos():
         })
         
     except Exception as e:
-        print(f"❌ ERROR EN DIAGNÓSTICO: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('❌ ERROR EN DIAGNÓSTICO: %s', e)
         return jsonify({"error": str(e)}), 500
 
 def get_sidebar_counts():
     from datetime import datetime
     
     try:
-        print("🔧 DEBUG ADMIN: Calculando contadores del sidebar...")
+        logger.debug('🔧 DEBUG ADMIN: Calculando contadores del sidebar...')
         
         unread_messages = Comunicacion.query.filter(
             Comunicacion.destinatario_id == current_user.id_usuario,
             Comunicacion.estado.in_(['no_leido', 'inbox', 'unread', 'pendiente', 'nuevo'])
         ).count()
         
-        print(f"📨 ADMIN - Comunicaciones no leídas: {unread_messages}")
+        logger.debug('📨 ADMIN - Comunicaciones no leídas: %s', unread_messages)
         
         unread_notifications = Notificacion.query.filter_by(
             usuario_id=current_user.id_usuario,
             leida=False
         ).count()
         
-        print(f"🔔 ADMIN - Notificaciones no leídas: {unread_notifications}")
+        logger.debug('🔔 ADMIN - Notificaciones no leídas: %s', unread_notifications)
         
         hoy = datetime.now().date()
         upcoming_events = Evento.query.filter(
@@ -3972,8 +4021,11 @@ def get_sidebar_counts():
             Evento.fecha >= hoy
         ).count()
         
-        print(f"📅 ADMIN - Eventos próximos: {upcoming_events}")
-        print(f"🎯 ADMIN RESUMEN - Mensajes: {unread_messages}, Notificaciones: {unread_notifications}, Eventos: {upcoming_events}")
+        logger.debug('📅 ADMIN - Eventos próximos: %s', upcoming_events)
+        logger.debug(
+            '🎯 ADMIN RESUMEN - Mensajes: %s, Notificaciones: %s, Eventos: %s',
+            unread_messages, unread_notifications, upcoming_events
+        )
         
         return {
             'unread_messages': unread_messages,
@@ -3982,7 +4034,7 @@ def get_sidebar_counts():
         }
         
     except Exception as e:
-        print(f"❌ ERROR en get_sidebar_counts ADMIN: {e}")
+        logger.error('❌ ERROR en get_sidebar_counts ADMIN: %s', e)
         return {
             'unread_messages': 0,
             'unread_notifications': 0,
@@ -4020,26 +4072,26 @@ def debug_notificaciones_padres():
     try:
         from controllers.models import Rol, Usuario, estudiante_padre, Evento
         
-        print("🔍 INICIANDO DIAGNÓSTICO DE NOTIFICACIONES A PADRES")
+        logger.debug('🔍 INICIANDO DIAGNÓSTICO DE NOTIFICACIONES A PADRES')
         
         eventos_recientes = Evento.query.order_by(Evento.id.desc()).limit(5).all()
-        print("📅 Eventos recientes:")
+        logger.debug('📅 Eventos recientes:')
         for evento in eventos_recientes:
-            print(f"   - {evento.nombre} | Rol: {evento.rol_destino} | Fecha: {evento.fecha}")
+            logger.debug('- %s | Rol: %s | Fecha: %s', evento.nombre, evento.rol_destino, evento.fecha)
         
         rol_padre = Rol.query.filter_by(nombre='padre').first()
         if rol_padre:
             padres = Usuario.query.filter_by(id_rol_fk=rol_padre.id_rol).limit(10).all()
-            print(f"👨‍👩‍👧‍👦 Padres en sistema ({len(padres)} encontrados):")
+            logger.debug('👨‍👩‍👧‍👦 Padres en sistema (%s encontrados):', len(padres))
             for padre in padres:
-                print(f"   - {padre.nombre_completo} (ID: {padre.id_usuario})")
+                logger.debug('- %s (ID: %s)', padre.nombre_completo, padre.id_usuario)
         
         relaciones = db.session.execute(
             db.select(estudiante_padre).limit(10)
         ).fetchall()
-        print("🔗 Relaciones padre-estudiante:")
+        logger.debug('🔗 Relaciones padre-estudiante:')
         for rel in relaciones:
-            print(f"   - Padre ID: {rel.padre_id} -> Estudiante ID: {rel.estudiante_id}")
+            logger.debug('- Padre ID: %s -> Estudiante ID: %s', rel.padre_id, rel.estudiante_id)
         
         if padres:
             notificaciones_padres = Notificacion.query.filter(
@@ -4047,9 +4099,9 @@ def debug_notificaciones_padres():
                 Notificacion.tipo == 'evento'
             ).limit(10).all()
             
-            print(f"📢 Notificaciones de eventos para padres ({len(notificaciones_padres)} encontradas):")
+            logger.debug('📢 Notificaciones de eventos para padres (%s encontradas):', len(notificaciones_padres))
             for notif in notificaciones_padres:
-                print(f"   - Para usuario {notif.usuario_id}: {notif.titulo}")
+                logger.debug('- Para usuario %s: %s', notif.usuario_id, notif.titulo)
         
         return jsonify({
             "message": "Diagnóstico completado - Revisa la consola del servidor",
@@ -4060,11 +4112,12 @@ def debug_notificaciones_padres():
         })
         
     except Exception as e:
-        print(f"❌ Error en diagnóstico: {str(e)}")
+        logger.error('❌ Error en diagnóstico: %s', e)
         return jsonify({"error": str(e)}), 500
 
 @admin_bp.route("/eventos", methods=["GET"])
 @login_required
+@solo_lectura
 def listar_eventos():
     try:
         eventos = Evento.query.all()
@@ -4086,7 +4139,7 @@ def listar_eventos():
 @login_required
 def crear_evento():
     data = request.get_json()
-    print("📥 Payload recibido:", data)
+    logger.debug('📥 Payload recibido: %s', data)
 
     try:
         nombre = data.get("nombre") or data.get("Nombre")
@@ -4125,7 +4178,7 @@ def crear_evento():
         
         notificaciones_enviadas = notificar_nuevo_evento(nuevo_evento, current_user.id_usuario)
         
-        print(f"✅ Evento creado - Notificaciones enviadas: {notificaciones_enviadas}")
+        logger.debug('✅ Evento creado - Notificaciones enviadas: %s', notificaciones_enviadas)
 
         return jsonify({
             "mensaje": "Evento creado correctamente ✅", 
@@ -4135,14 +4188,14 @@ def crear_evento():
 
     except Exception as e:
         db.session.rollback()
-        print("❌ Error creando evento:", str(e))
+        logger.error('❌ Error creando evento: %s', e)
         return jsonify({"error": str(e)}), 400
 
 @admin_bp.route("/eventos/<int:evento_id>", methods=["PUT"])
 @login_required
 def actualizar_evento(evento_id):
     data = request.get_json()
-    print("📥 Payload actualización recibido:", data)
+    logger.debug('📥 Payload actualización recibido: %s', data)
 
     try:
         evento = Evento.query.get(evento_id)
@@ -4182,7 +4235,7 @@ def actualizar_evento(evento_id):
         
         notificaciones_enviadas = notificar_evento_actualizado(evento, current_user.id_usuario)
         
-        print(f"✅ Evento actualizado - Notificaciones enviadas: {notificaciones_enviadas}")
+        logger.debug('✅ Evento actualizado - Notificaciones enviadas: %s', notificaciones_enviadas)
 
         return jsonify({
             "mensaje": "Evento actualizado correctamente ✅",
@@ -4191,7 +4244,7 @@ def actualizar_evento(evento_id):
 
     except Exception as e:
         db.session.rollback()
-        print("❌ Error actualizando evento:", str(e))
+        logger.error('❌ Error actualizando evento: %s', e)
         return jsonify({"error": str(e)}), 400
 
 @admin_bp.route("/eventos/<int:evento_id>", methods=["DELETE"])
@@ -4206,7 +4259,7 @@ def eliminar_evento(evento_id):
         
         notificaciones_enviadas = notificar_evento_eliminado(evento, current_user.id_usuario)
         
-        print(f"✅ Evento eliminado - Notificaciones enviadas: {notificaciones_enviadas}")
+        logger.debug('✅ Evento eliminado - Notificaciones enviadas: %s', notificaciones_enviadas)
 
         # Eliminar evento
         db.session.delete(evento)
@@ -4219,7 +4272,7 @@ def eliminar_evento(evento_id):
 
     except Exception as e:
         db.session.rollback()
-        print("❌ Error eliminando evento:", str(e))
+        logger.error('❌ Error eliminando evento: %s', e)
         return jsonify({"error": str(e)}), 500
 
 # ==================== SISTEMA DE VOTACIÓN ====================
@@ -4304,6 +4357,7 @@ def listar_candidatos():
             "tarjeton": c.tarjeton,
             "propuesta": c.propuesta,
             "foto": c.foto,
+            "fotos": urls_rendiciones(c.foto),
             "votos": c.votos  
         })
     return jsonify(lista)
@@ -4353,21 +4407,11 @@ def crear_candidato():
                     "error": "❌ Formato de imagen no válido. Use PNG, JPG, JPEG o GIF"
                 }), 400
             
-            if len(foto.read()) > 5 * 1024 * 1024:
-                return jsonify({
-                    "ok": False, 
-                    "error": "❌ La imagen es demasiado grande. Máximo 5MB"
-                }), 400
-            
-            foto.seek(0)  
-            filename = secure_filename(foto.filename)
-            
-            nombre_base = secure_filename(nombre)
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            filename = f"{nombre_base}_{timestamp}_{filename}"
-            
-            path = os.path.join(current_app.static_folder, "images/candidatos", filename)
-            foto.save(path)
+            filename, error = procesar_foto_candidato(
+                foto.read(), os.path.join(current_app.static_folder, CARPETA_CANDIDATOS)
+            )
+            if error:
+                return jsonify({"ok": False, "error": error}), 400
 
         nuevo = Candidato(
             nombre=nombre,
@@ -4377,18 +4421,19 @@ def crear_candidato():
             foto=filename
         )
         db.session.add(nuevo)
+        incrementar_version_candidatos()
         db.session.commit()
 
         candidatos = Candidato.query.all()
         return jsonify({
             "ok": True,
             "mensaje": f"✅ Candidato {nombre} creado exitosamente",
-            "candidatos": [c.to_dict() for c in candidatos]
+            "candidatos": [dict(c.to_dict(), fotos=urls_rendiciones(c.foto)) for c in candidatos]
         })
 
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error inesperado al crear candidato: {str(e)}")
+        logger.error('❌ Error inesperado al crear candidato: %s', e)
         return jsonify({
             "ok": False, 
             "error": f"❌ Error interno del servidor: {str(e)}"
@@ -4431,10 +4476,11 @@ def editar_candidato(candidato_id):
             if "." not in file.filename or file.filename.rsplit(".", 1)[1].lower() not in ext_permitidas:
                 return jsonify({"ok": False, "error": "Formato de imagen inválido"}), 400
 
-            ext = file.filename.rsplit(".", 1)[1].lower()
-            foto_filename = f"{secure_filename(nombre)}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{ext}"
-            path = os.path.join(current_app.config["UPLOAD_FOLDER"], foto_filename)
-            file.save(path)
+            foto_filename, error = procesar_foto_candidato(
+                file.read(), os.path.join(current_app.static_folder, CARPETA_CANDIDATOS)
+            )
+            if error:
+                return jsonify({"ok": False, "error": error}), 400
             candidato.foto = foto_filename
 
         candidato.nombre = nombre
@@ -4442,6 +4488,7 @@ def editar_candidato(candidato_id):
         candidato.categoria = categoria
         candidato.tarjeton = tarjeton
 
+        incrementar_version_candidatos()
         db.session.commit()
 
         candidatos = Candidato.query.all()
@@ -4453,6 +4500,7 @@ def editar_candidato(candidato_id):
                 "categoria": c.categoria,
                 "tarjeton": c.tarjeton,
                 "foto": c.foto,
+                "fotos": urls_rendiciones(c.foto),
                 "votos": c.votos if hasattr(c, "votos") else 0
             }
             for c in candidatos
@@ -4462,7 +4510,7 @@ def editar_candidato(candidato_id):
 
     except Exception as e:
         db.session.rollback()
-        print("❌ Error al editar candidato:", e)
+        logger.error('❌ Error al editar candidato: %s', e)
         return jsonify({"ok": False, "error": str(e)}), 500
     
 @admin_bp.route("/candidatos/<int:candidato_id>", methods=["DELETE"])
@@ -4495,6 +4543,7 @@ def eliminar_candidato(candidato_id):
                 db.session.delete(voto)
 
         db.session.delete(candidato)
+        incrementar_version_candidatos()
         db.session.commit()
 
         candidatos = Candidato.query.all()
@@ -4506,7 +4555,8 @@ def eliminar_candidato(candidato_id):
                 "tarjeton": c.tarjeton,
                 "propuesta": c.propuesta,
                 "votos": c.votos,
-                "foto": c.foto
+                "foto": c.foto,
+                "fotos": urls_rendiciones(c.foto)
             }
             for c in candidatos
         ]
@@ -4535,14 +4585,14 @@ def test_sistema_votos():
         if not estudiante:
             return jsonify({"error": "No hay estudiantes"}), 400
             
-        print(f"✅ Estudiante: {estudiante.nombre}")
-        print(f"✅ voto_registrado: {estudiante.voto_registrado}")
+        logger.debug('✅ Estudiante: %s', estudiante.nombre)
+        logger.debug('✅ voto_registrado: %s', estudiante.voto_registrado)
         
         candidatos = Candidato.query.all()
-        print(f"✅ Candidatos: {len(candidatos)}")
+        logger.debug('✅ Candidatos: %s', len(candidatos))
         
         for c in candidatos:
-            print(f"   - {c.nombre}: {c.votos} votos")
+            logger.debug('- %s: %s votos', c.nombre, c.votos)
         
         if candidatos:
             candidato_prueba = candidatos[0]
@@ -4592,7 +4642,7 @@ def obtener_estado_publicacion():
         })
         
     except Exception as e:
-        print(f"❌ Error obteniendo estado de publicación: {str(e)}")
+        logger.error('❌ Error obteniendo estado de publicación: %s', e)
         return jsonify({
             'success': False,
             'error': f"Error al obtener estado: {str(e)}"
@@ -4607,17 +4657,17 @@ def publicar_resultados():
         
         usuario = current_user.nombre if current_user.is_authenticated else 'Administrador'
         
-        print(f"📢 Intentando publicar resultados como: {usuario}")
+        logger.debug('📢 Intentando publicar resultados como: %s', usuario)
         
         estado = EstadoPublicacion.query.first()
         
         if estado:
-            print(f"✅ Estado encontrado, actualizando...")
+            logger.debug('✅ Estado encontrado, actualizando...')
             estado.resultados_publicados = True
             estado.fecha_publicacion = datetime.now()
             estado.usuario_publico = usuario
         else:
-            print(f"🆕 Creando nuevo estado de publicación...")
+            logger.debug('🆕 Creando nuevo estado de publicación...')
             estado = EstadoPublicacion(
                 resultados_publicados=True,
                 fecha_publicacion=datetime.now(),
@@ -4625,9 +4675,10 @@ def publicar_resultados():
             )
             db.session.add(estado)
         
+        incrementar_version_resultados()
         db.session.commit()
         
-        print(f"📢 Resultados publicados correctamente por: {usuario}")
+        logger.info('📢 Resultados publicados correctamente por: %s', usuario)
         
         return jsonify({
             "success": True, 
@@ -4638,9 +4689,7 @@ def publicar_resultados():
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error al publicar resultados: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('❌ Error al publicar resultados: %s', e)
         return jsonify({
             "success": False, 
             "error": f"Error al publicar resultados: {str(e)}"
@@ -4655,7 +4704,7 @@ def ocultar_resultados():
         
         usuario = current_user.nombre if current_user.is_authenticated else 'Administrador'
         
-        print(f"🔒 Intentando ocultar resultados como: {usuario}")
+        logger.debug('🔒 Intentando ocultar resultados como: %s', usuario)
         
         estado = EstadoPublicacion.query.first()
         
@@ -4669,9 +4718,10 @@ def ocultar_resultados():
             )
             db.session.add(estado)
         
+        incrementar_version_resultados()
         db.session.commit()
         
-        print(f"🔒 Resultados ocultados correctamente por: {usuario}")
+        logger.info('🔒 Resultados ocultados correctamente por: %s', usuario)
         
         return jsonify({
             "success": True, 
@@ -4682,9 +4732,7 @@ def ocultar_resultados():
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error al ocultar resultados: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('❌ Error al ocultar resultados: %s', e)
         return jsonify({
             "success": False, 
             "error": f"Error al ocultar resultados: {str(e)}"
@@ -4693,62 +4741,10 @@ def ocultar_resultados():
 @admin_bp.route("/resultados-publicos", methods=["GET"])
 def resultados_publicos():
     try:
-        estado = EstadoPublicacion.query.first()
-        
-        if not estado or not estado.resultados_publicados:
-            return jsonify({
-                'success': True,
-                'resultados_publicados': False,
-                'message': 'Los resultados no están disponibles públicamente.'
-            }), 200
-        
-        candidatos = Candidato.query.all()
-        
-        resultados = {
-            'personero': [],
-            'contralor': [],
-            'cabildante': []
-        }
-        
-        for candidato in candidatos:
-            resultado_candidato = {
-                'id': candidato.id_candidato,
-                'nombre': candidato.nombre,
-                'tarjeton': candidato.tarjeton,
-                'propuesta': candidato.propuesta,
-                'foto': candidato.foto,
-                'votos': candidato.votos or 0,
-                'categoria': candidato.categoria
-            }
-            cat = (candidato.categoria or '').strip().lower()
-            if cat in ('personero', 'personero estudiantil'):
-                key = 'personero'
-            elif cat in ('contralor', 'contralor estudiantil'):
-                key = 'contralor'
-            elif cat in ('cabildante', 'cabildante estudiantil'):
-                key = 'cabildante'
-            else:
-                key = None
-            if key:
-                resultados[key].append(resultado_candidato)
-        
-        for categoria in resultados:
-            resultados[categoria].sort(key=lambda x: x['votos'], reverse=True)
-        
-        return jsonify({
-            'success': True,
-            'resultados_publicados': True,
-            'resultados': resultados,
-            'total_votos': sum(c.votos or 0 for c in candidatos),
-            'fecha_publicacion': estado.fecha_publicacion.isoformat() if estado.fecha_publicacion else None,
-            'publicado_por': estado.usuario_publico,
-            'timestamp': datetime.now().isoformat()
-        })
+        return respuesta_cacheada('resultados', construir_resultados_publicos)
         
     except Exception as e:
-        print(f"❌ Error obteniendo resultados públicos: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('❌ Error obteniendo resultados públicos: %s', e)
         return jsonify({
             'success': False,
             'error': f"Error al obtener resultados: {str(e)}"
@@ -4756,6 +4752,56 @@ def resultados_publicos():
 
 
 
+# ============================================================================ #
+# EXPORTACIONES (CSV / XLSX EN STREAMING)
+# ============================================================================ #
+
+ROLES_EXPORTACION = {
+    'estudiantes': 'Estudiante',
+    'profesores': 'Profesor',
+    'padres': 'Padre',
+    'administrativos': 'Super Admin',
+}
+
+@admin_bp.route('/exportar/<string:tipo>', methods=['GET'])
+@login_required
+@role_required(1)
+def exportar_datos(tipo):
+    try:
+        formato = request.args.get('formato', 'csv').lower()
+
+        if tipo == 'usuarios' or tipo in ROLES_EXPORTACION:
+            encabezados, filas = exportacion_usuarios(ROLES_EXPORTACION.get(tipo))
+        elif tipo == 'calificaciones':
+            encabezados, filas = exportacion_calificaciones(
+                curso_id=request.args.get('curso_id', type=int),
+                asignatura_id=request.args.get('asignatura_id', type=int)
+            )
+        elif tipo == 'asistencia':
+            fecha_desde = request.args.get('desde')
+            fecha_hasta = request.args.get('hasta')
+            encabezados, filas = exportacion_asistencia(
+                curso_id=request.args.get('curso_id', type=int),
+                fecha_desde=datetime.strptime(fecha_desde, '%Y-%m-%d').date() if fecha_desde else None,
+                fecha_hasta=datetime.strptime(fecha_hasta, '%Y-%m-%d').date() if fecha_hasta else None
+            )
+        elif tipo == 'inventario':
+            encabezados, filas = exportacion_inventario()
+        else:
+            return jsonify({'success': False, 'error': f'Tipo de exportación no válido: {tipo}'}), 404
+
+        respuesta, error = respuesta_exportacion(tipo, encabezados, filas, formato)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        return respuesta
+
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Formato de fecha inválido. Use AAAA-MM-DD'}), 400
+    except Exception as e:
+        logger.error('❌ Error exportando %s: %s', tipo, e)
+        return jsonify({'success': False, 'error': f'Error al exportar: {str(e)}'}), 500
+
+
 # ============================================================================ #
 # RUTAS DE REPORTES DE CALIFICACIONES
 # ============================================================================ #
@@ -4781,15 +4827,29 @@ def api_obtener_reportes():
         curso = request.args.get('curso', '', type=str)
         profesor = request.args.get('profesor', '', type=str)
         
-        query = db.session.query(ReporteCalificaciones)
+        # Mismas claves que ReporteCalificaciones.to_dict(), proyectadas en la consulta
+        profesor_nombre = Usuario.nombre + ' ' + Usuario.apellido
+        query = db.session.query(
+            ReporteCalificaciones.id_reporte,
+            db.func.coalesce(profesor_nombre, 'Desconocido').label('profesor_nombre'),
+            ReporteCalificaciones.nombre_curso.label('curso_nombre'),
+            ReporteCalificaciones.nombre_asignatura.label('asignatura_nombre'),
+            ReporteCalificaciones.datos_estudiantes,
+            ReporteCalificaciones.promedio_general,
+            ReporteCalificaciones.nota_mas_alta,
+            ReporteCalificaciones.nota_mas_baja,
+            db.func.coalesce(
+                fecha_formateada(ReporteCalificaciones.fecha_generacion, '%Y-%m-%d %H:%M'), ''
+            ).label('fecha_generacion'),
+            ReporteCalificaciones.estado
+        ).outerjoin(Usuario, ReporteCalificaciones.profesor_id == Usuario.id_usuario)
         
         if estado:
             query = query.filter(ReporteCalificaciones.estado == estado)
         if curso:
             query = query.filter(ReporteCalificaciones.nombre_curso.ilike(f'%{curso}%'))
         if profesor:
-            query = query.join(Usuario, ReporteCalificaciones.profesor_id == Usuario.id_usuario)
-            query = query.filter(Usuario.nombre_completo.ilike(f'%{profesor}%'))
+            query = query.filter(profesor_nombre.ilike(f'%{profesor}%'))
         
         query = query.order_by(ReporteCalificaciones.fecha_generacion.desc())
         
@@ -4799,11 +4859,9 @@ def api_obtener_reportes():
             error_out=False
         )
         
-        reportes_data = [reporte.to_dict() for reporte in pagination.items]
-        
         return jsonify({
             'success': True,
-            'reportes': reportes_data,
+            'reportes': proyectar_filas(pagination.items),
             'pagination': {
                 'page': pagination.page,
                 'pages': pagination.pages,
@@ -5033,7 +5091,7 @@ def api_obtener_comunicaciones():
         })
         
     except Exception as e:
-        print(f"Error obteniendo comunicaciones: {str(e)}")
+        logger.error('Error obteniendo comunicaciones: %s', e)
         return jsonify({
             'success': False,
             'message': f'Error obteniendo comunicaciones: {str(e)}'
@@ -5148,7 +5206,7 @@ def api_enviar_comunicacion():
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error enviando comunicación: {str(e)}")
+        logger.error('Error enviando comunicación: %s', e)
         return jsonify({
             'success': False,
             'message': f'Error enviando comunicación: {str(e)}'
@@ -5427,29 +5485,22 @@ def api_buscar_usuarios():
         if len(query) < 2:
             return jsonify([])
         
-        usuarios = Usuario.query.filter(
-            or_(
-                Usuario.nombre.contains(query),
-                Usuario.apellido.contains(query),
-                Usuario.correo.contains(query)
-            ),
-            Usuario.estado_cuenta == 'activa'
-        ).limit(10).all()
+        usuarios = autocompletar(query)
         
         usuarios_data = []
         for usuario in usuarios:
             usuarios_data.append({
                 'id': usuario.id_usuario,
-                'nombre': usuario.nombre_completo,
+                'nombre': f"{usuario.nombre} {usuario.apellido}",
                 'email': usuario.correo,
                 'correo': usuario.correo,
-                'rol': usuario.rol_nombre
+                'rol': usuario.rol
             })
         
         return jsonify(usuarios_data)
         
     except Exception as e:
-        print(f"Error buscando usuarios: {str(e)}")
+        logger.error('Error buscando usuarios: %s', e)
         return jsonify([]), 500
 
 @admin_bp.route('/api/reportes-calificaciones/<int:reporte_id>/estado', methods=['PUT'])
@@ -5712,7 +5763,7 @@ def api_notificaciones():
         })
         
     except Exception as e:
-        print(f"❌ Error en API notificaciones: {str(e)}")
+        logger.error('❌ Error en API notificaciones: %s', e)
         return jsonify({
             'success': False,
             'message': f'Error: {str(e)}'
@@ -5755,7 +5806,7 @@ def api_marcar_leidas():
             })
         
     except Exception as e:
-        print(f"❌ Error marcando notificaciones como leídas: {str(e)}")
+        logger.error('❌ Error marcando notificaciones como leídas: %s', e)
         return jsonify({
             'success': False,
             'message': f'Error: {str(e)}'
@@ -5792,7 +5843,7 @@ def api_eliminar_notificaciones():
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error eliminando notificaciones: {str(e)}")
+        logger.error('❌ Error eliminando notificaciones: %s', e)
         return jsonify({
             'success': False,
             'message': f'Error: {str(e)}'
@@ -6358,3 +6409,162 @@ def api_generar_reporte_promocion(ciclo_id):
             'success': False,
             'message': f'Error: {str(e)}'
         }), 500
+
+
+# ==================== BOLETINES (PDF) ====================
+
+@admin_bp.route('/api/boletines/periodo/<int:periodo_id>', methods=['POST'])
+@login_required
+@role_required(1)
+def api_generar_boletines(periodo_id):
+    try:
+        from services.boletin_service import iniciar_generacion_boletines
+
+        data = request.get_json(silent=True) or {}
+        trabajo_id = iniciar_generacion_boletines(
+            current_app._get_current_object(),
+            periodo_id,
+            curso_id=data.get('curso_id'),
+            por_curso=bool(data.get('por_curso', False))
+        )
+
+        return jsonify({
+            'success': True,
+            'message': 'Generación de boletines iniciada',
+            'trabajo_id': trabajo_id,
+            'estado_url': url_for('admin.api_estado_boletines', trabajo_id=trabajo_id)
+        }), 202
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }), 500
+
+
+@admin_bp.route('/api/boletines/trabajos/<string:trabajo_id>')
+@login_required
+@role_required(1)
+def api_estado_boletines(trabajo_id):
+    from services.boletin_service import leer_estado_trabajo
+
+    estado = leer_estado_trabajo(current_app, trabajo_id)
+    if not estado:
+        return jsonify({'success': False, 'message': 'Trabajo no encontrado'}), 404
+
+    estado['descargas'] = [
+        url_for('admin.api_descargar_boletines', trabajo_id=trabajo_id, archivo=archivo)
+        for archivo in estado.get('archivos', [])
+    ] if estado['estado'] == 'completado' else []
+    return jsonify({'success': True, 'trabajo': estado})
+
+
+@admin_bp.route('/api/boletines/trabajos/<string:trabajo_id>/<path:archivo>')
+@login_required
+@role_required(1)
+def api_descargar_boletines(trabajo_id, archivo):
+    from flask import send_from_directory
+    from services.boletin_service import carpeta_trabajos, leer_estado_trabajo
+
+    estado = leer_estado_trabajo(current_app, trabajo_id)
+    if not estado or estado['estado'] != 'completado' or archivo not in estado.get('archivos', []):
+        return jsonify({'success': False, 'message': 'Archivo no disponible'}), 404
+
+    return send_from_directory(
+        os.path.join(carpeta_trabajos(current_app), trabajo_id), archivo,
+        as_attachment=True, mimetype='application/zip'
+    )
+
+
+# ============================================================================ #
+# PERFILADO DE PETICIONES
+# ============================================================================ #
+
+@admin_bp.route('/perfiles')
+@login_required
+@role_required(1)
+def perfiles_rendimiento():
+    from services.perfilador_service import leer_ajustes, CABECERA_PERFILAR
+
+    counts = get_sidebar_counts()
+    return render_template('superadmin/perfiles/perfiles.html',
+                         ajustes=leer_ajustes(current_app),
+                         cabecera=CABECERA_PERFILAR,
+                         unread_messages=counts['unread_messages'],
+                         unread_notifications=counts['unread_notifications'],
+                         upcoming_events=counts['upcoming_events'])
+
+
+@admin_bp.route('/api/perfiles')
+@login_required
+@role_required(1)
+def api_perfiles():
+    from services.perfilador_service import listar_perfiles
+
+    perfiles = listar_perfiles(current_app, endpoint=request.args.get('endpoint') or None)
+    for perfil in perfiles:
+        perfil['detalle_url'] = url_for('admin.api_detalle_perfil', perfil_id=perfil['id'])
+        perfil['descarga_url'] = url_for('admin.api_descargar_perfil', perfil_id=perfil['id'])
+
+    return jsonify({'success': True, 'perfiles': perfiles})
+
+
+@admin_bp.route('/api/perfiles/<string:perfil_id>')
+@login_required
+@role_required(1)
+def api_detalle_perfil(perfil_id):
+    from services.perfilador_service import leer_perfil
+
+    perfil = leer_perfil(current_app, perfil_id)
+    if not perfil:
+        return jsonify({'success': False, 'message': 'Perfil no encontrado'}), 404
+    return jsonify({'success': True, 'perfil': perfil})
+
+
+@admin_bp.route('/api/perfiles/<string:perfil_id>/descargar')
+@login_required
+@role_required(1)
+def api_descargar_perfil(perfil_id):
+    from flask import send_from_directory
+    from werkzeug.utils import secure_filename
+    from services.perfilador_service import carpeta_perfiles
+
+    archivo = f"{secure_filename(perfil_id)}.prof"
+    if not os.path.isfile(os.path.join(carpeta_perfiles(current_app), archivo)):
+        return jsonify({'success': False, 'message': 'Perfil no encontrado'}), 404
+
+    return send_from_directory(carpeta_perfiles(current_app), archivo,
+                               as_attachment=True, mimetype='application/octet-stream')
+
+
+@admin_bp.route('/api/perfiles/ajustes', methods=['POST'])
+@login_required
+@role_required(1)
+def api_ajustes_perfilador():
+    from services.perfilador_service import guardar_ajustes
+
+    data = request.get_json(silent=True) or {}
+    endpoints = data.get('endpoints') or []
+    if isinstance(endpoints, str):
+        endpoints = endpoints.split(',')
+
+    ajustes, error = guardar_ajustes(current_app, data.get('tasa', 0), endpoints)
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
+
+    logger.info('Perfilador ajustado por %s: %s', current_user.id_usuario, ajustes)
+    return jsonify({'success': True, 'ajustes': ajustes})
+
+
+@admin_bp.route('/api/perfiles/token', methods=['POST'])
+@login_required
+@role_required(1)
+def api_token_perfilador():
+    from services.perfilador_service import generar_token_perfilado, CABECERA_PERFILAR
+
+    return jsonify({
+        'success': True,
+        'cabecera': CABECERA_PERFILAR,
+        'token': generar_token_perfilado(current_app, current_user.id_usuario),
+        'expira_en': current_app.config.get('PERFILADOR_TOKEN_TTL', 3600)
+    })
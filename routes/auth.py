@@ -8,10 +8,13 @@ from extensions import db, mail
 from itsdangerous import URLSafeTimedSerializer
 from flask_mail import Message
 import os
+import logging
 from datetime import datetime, timedelta
 from controllers.forms import LoginForm, ForgotPasswordForm, ResetPasswordForm
 from services.email_service import send_welcome_email, send_verification_success_email, generate_verification_code, generate_verification_token
 
+logger = logging.getLogger(__name__)
+
 def get_serializer():
     return URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
 
@@ -44,7 +47,7 @@ def login():
             
             login_user(user)
             flash('Inicio de sesión exitoso.', 'success')
-            print(f"Usuario: {user.nombre} {user.apellido}, Rol ID: {user.id_rol_fk}")
+            logger.debug('Usuario: %s %s, Rol ID: %s', user.nombre, user.apellido, user.id_rol_fk)
             ruta = ROL_REDIRECTS.get(user.id_rol_fk, 'main.index')
             return redirect(url_for(ruta))
         else:
@@ -132,7 +135,7 @@ def restablecer_password(token):
         s = get_serializer()
         id_usuario = s.loads(token, salt='recuperacion-password-salt', max_age=3600)
     except Exception as e:
-        print(f"Error cargando token de restablecimiento: {str(e)}")
+        logger.error('Error cargando token de restablecimiento: %s', e)
         flash('El enlace de restablecimiento es inválido o ha expirado.', 'danger')
         return redirect(url_for('auth.forgot_password'))
 
@@ -151,7 +154,7 @@ def restablecer_password(token):
             db.session.commit() # Intenta guardar la nueva contraseña
         except Exception as e:
             db.session.rollback() # Si falla, revierte la sesión
-            print(f"Error al hacer commit de la nueva contraseña: {str(e)}")
+            logger.error('Error al hacer commit de la nueva contraseña: %s', e)
             flash('Hubo un error interno al guardar la nueva contraseña. Intenta de nuevo.', 'danger')
             # Redirige para que el usuario pueda reintentar
             return redirect(url_for('auth.restablecer_password', token=token))
@@ -167,7 +170,7 @@ def restablecer_password(token):
             # ... (cuerpo del mensaje HTML) ...
             mail.send(msg)
         except Exception as e:
-            print(f"Error enviando correo de confirmación: {str(e)}")
+            logger.error('Error enviando correo de confirmación: %s', e)
         
         flash('Tu contraseña ha sido restablecida con éxito. Ya puedes iniciar sesión.', 'success')
         return redirect(url_for('auth.login'))
@@ -182,7 +185,7 @@ def verify_email_with_token(token):
         email = data.get('email', '')
         return render_template('emails/verify_email.html', email=email, verified=False)
     except Exception as e:
-        print(f"ERROR en verificación por token: {str(e)}")
+        logger.error('ERROR en verificación por token: %s', e)
         flash('El enlace de verificación es inválido o ha expirado', 'danger')
         return redirect(url_for('auth.login'))
 
@@ -1,11 +1,16 @@
+import logging
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 from controllers.decorators import role_required, permission_required
+from services.replica_service import solo_lectura
+from services.condicional_service import respuesta_condicional
+from services.autocompletado_service import autocompletar
+from services import horario_service
 from datetime import datetime, timedelta, time, date
 from controllers.models import (
     db, Usuario, Comunicacion, Evento, Candidato, HorarioVotacion, Voto,
     Calificacion, Asistencia, CicloAcademico, PeriodoAcademico, Matricula, Curso, Notificacion,
-    HorarioCurso, Asignatura, Salon, BloqueHorario, CategoriaCalificacion, SolicitudConsulta
+    Asignatura, CategoriaCalificacion, SolicitudConsulta
 )
 from routes.profesor import tareas_academicas
 from services.notification_service import (
@@ -13,6 +18,12 @@ from services.notification_service import (
     marcar_notificacion_como_leida,
     contar_notificaciones_no_leidas
 )
+from services.votacion_service import (
+    respuesta_cacheada,
+    construir_candidatos_agrupados
+)
+
+logger = logging.getLogger(__name__)
 
 estudiante_bp = Blueprint('estudiante', __name__, url_prefix='/estudiante')
 
@@ -66,6 +77,7 @@ def get_sidebar_counts():
 
 @estudiante_bp.route('/dashboard')
 @login_required
+@solo_lectura
 def estudiante_panel():
     if current_user.rol and current_user.rol.nombre.lower() == 'estudiante':
         counts = get_sidebar_counts()
@@ -79,6 +91,7 @@ def estudiante_panel():
 
 @estudiante_bp.route('/calificaciones')
 @login_required
+@solo_lectura
 def ver_calificaciones():
     try:
         if not current_user or not current_user.rol or current_user.rol.nombre.lower() != 'estudiante':
@@ -189,6 +202,8 @@ def mi_horario():
 
 @estudiante_bp.route('/api/mi-horario', methods=['GET'])
 @login_required
+@solo_lectura
+@respuesta_condicional(Matricula, *horario_service.DEPENDENCIAS)
 def api_mi_horario():
     try:
         # 1) Obtener matrícula actual (priorizar por fecha_matricula, y si no hay usar año)
@@ -200,205 +215,17 @@ def api_mi_horario():
         if not matricula:
             return jsonify({'success': True, 'horario': None, 'message': 'No hay matrícula activa'}), 200
 
-        curso = Curso.query.get(matricula.cursoId)
-        if not curso:
+        # 2) Horario materializado del curso (se reconstruye solo cuando cambian los horarios)
+        horario = horario_service.horario_curso(matricula.cursoId)
+        if not horario:
             return jsonify({'success': True, 'horario': None, 'message': 'Curso no encontrado'}), 200
-
-        # Helpers
-        def _normalizar_dia(dia_str):
-            if not dia_str:
-                return None
-            d = str(dia_str).strip().lower()
-            mapping = {
-                'lunes': 'lunes',
-                'martes': 'martes',
-                'miercoles': 'miercoles',
-                'miércoles': 'miercoles',
-                'jueves': 'jueves',
-                'viernes': 'viernes',
-                'sabado': 'sabado',
-                'sábado': 'sabado',
-                'domingo': 'domingo'
-            }
-            return mapping.get(d, d)
-
-        def _fmt_hora(val):
-            try:
-                if hasattr(val, 'strftime'):
-                    return val.strftime('%H:%M')
-                s = str(val).strip()
-                if len(s) >= 5 and s[2] == ':':
-                    return s[:5]
-                if ':' in s:
-                    parts = s.split(':')
-                    h = int(parts[0]) if parts[0] else 0
-                    m = int(parts[1]) if len(parts) > 1 and parts[1] else 0
-                    return f"{h:02d}:{m:02d}"
-            except Exception:
-                pass
-            return ''
-
-        # 2) Consultar asignaciones de horario para el curso
-        entradas = db.session.query(HorarioCurso, Asignatura, Usuario, Salon)\
-            .join(Asignatura, HorarioCurso.asignatura_id == Asignatura.id_asignatura)\
-            .outerjoin(Usuario, HorarioCurso.profesor_id == Usuario.id_usuario)\
-            .outerjoin(Salon, HorarioCurso.id_salon_fk == Salon.id_salon)\
-            .filter(HorarioCurso.curso_id == curso.id_curso)\
-            .all()
-
-        # Mapa por hora (compatibilidad) y expansión de rangos horarios a cada hora
-        clases = {}
-        for hc, asig, prof, salon in entradas:
-            dia_norm = _normalizar_dia(hc.dia_semana)
-            hora_ini = _fmt_hora(hc.hora_inicio)
-            hora_fin = _fmt_hora(hc.hora_fin)
-            if not dia_norm or not hora_ini:
-                continue
-            def _to_min(hhmm):
-                try:
-                    h, m = map(int, hhmm.split(':'))
-                    return h*60 + m
-                except Exception:
-                    return None
-            ini_min = _to_min(hora_ini)
-            fin_min = _to_min(hora_fin) if hora_fin else None
-            slots = []
-            if fin_min is None or fin_min <= ini_min:
-                slots = [hora_ini]
-            else:
-                start_hour = ini_min // 60
-                end_hour = (fin_min + 59) // 60
-                for h in range(start_hour, end_hour):
-                    slots.append(f"{h:02d}:00")
-            for slot in slots:
-                clave = f"{dia_norm}_{slot}"
-                if clave not in clases:
-                    clases[clave] = {
-                        'asignatura': asig.nombre if asig else 'N/A',
-                        'profesor': prof.nombre_completo if prof else 'N/A',
-                        'salon': salon.nombre if salon else 'N/A',
-                        'hora_inicio': hora_ini,
-                        'hora_fin': hora_fin or 'N/A'
-                    }
-
-        # 3) Bloques y descansos desde HorarioGeneral
-        dias_list, bloques_list, matriz_bloques, clases_por_bloque = [], [], {}, {}
-        hg = getattr(curso, 'horario_general', None)
-        if hg:
-            try:
-                import json
-                dias_list = json.loads(hg.diasSemana) if hg.diasSemana else []
-            except Exception:
-                dias_list = []
-            bloques = BloqueHorario.query.filter_by(horario_general_id=hg.id_horario).order_by(BloqueHorario.orden).all()
-            for b in bloques:
-                dia_b = _normalizar_dia(b.dia_semana)
-                start = _fmt_hora(b.horaInicio)
-                end = _fmt_hora(b.horaFin)
-                if not start or not end:
-                    continue
-                bloque_key = f"{start}-{end}"
-                if bloque_key not in bloques_list:
-                    bloques_list.append(bloque_key)
-                if dia_b:
-                    matriz_bloques.setdefault(dia_b, {})[bloque_key] = {
-                        'tipo': (b.tipo or '').lower(),
-                        'nombre': b.nombre or '',
-                        'break_type': (b.break_type or ''),
-                        'class_type': (b.class_type or '')
-                    }
-                    clases_por_bloque.setdefault(dia_b, {})[bloque_key] = None
-
-        # 3b) Fallback: si no hay dias/bloques desde HorarioGeneral, construir a partir de HorarioCurso
-        if not dias_list:
-            try:
-                dias_set = set()
-                for hc, *_ in entradas:
-                    d = _normalizar_dia(getattr(hc, 'dia_semana', None))
-                    if d:
-                        dias_set.add(d)
-                dias_list = sorted(dias_set) if dias_set else ['lunes','martes','miercoles','jueves','viernes','sabado']
-            except Exception:
-                dias_list = ['lunes','martes','miercoles','jueves','viernes','sabado']
-
-        if not bloques_list:
-            try:
-                # Detectar rango mínimo-máximo de horas de las entradas y generar bloques por hora
-                mins = []
-                maxs = []
-                def _to_min(hhmm):
-                    try:
-                        h, m = map(int, str(hhmm).split(':'))
-                        return h*60 + m
-                    except Exception:
-                        return None
-                for hc, *_ in entradas:
-                    ini = _fmt_hora(getattr(hc, 'hora_inicio', ''))
-                    fin = _fmt_hora(getattr(hc, 'hora_fin', ''))
-                    mi = _to_min(ini)
-                    mf = _to_min(fin) if fin else None
-                    if mi is not None:
-                        mins.append(mi)
-                    if mf is not None:
-                        maxs.append(mf)
-                if mins:
-                    start_h = min(mins)//60
-                    end_h = (max(maxs) + 59)//60 if maxs else (min(mins)//60 + 6)
-                    bloques_list = [f"{h:02d}:00-{h+1:02d}:00" for h in range(start_h, max(start_h+1, end_h))]
-                else:
-                    # Default horario escolar
-                    bloques_list = [f"{h:02d}:00-{h+1:02d}:00" for h in range(6, 20)]
-            except Exception:
-                bloques_list = [f"{h:02d}:00-{h+1:02d}:00" for h in range(6, 20)]
-
-        # 4) Asignar cada HorarioCurso al/los bloques que se solapen
-        def _minutos(hhmm):
-            try:
-                h, m = map(int, str(hhmm).split(':'))
-                return h*60 + m
-            except Exception:
-                return None
-
-        for hc, asig, prof, salon in entradas:
-            dia_norm = _normalizar_dia(hc.dia_semana)
-            ini = _fmt_hora(hc.hora_inicio)
-            fin = _fmt_hora(hc.hora_fin)
-            if not dia_norm or not ini or not fin:
-                continue
-            ini_m = _minutos(ini); fin_m = _minutos(fin)
-            if ini_m is None or fin_m is None:
-                continue
-            for bloque_key, meta in (matriz_bloques.get(dia_norm, {}) or {}).items():
-                b_ini, b_fin = [x.strip() for x in bloque_key.split('-')]
-                b_ini_m = _minutos(b_ini); b_fin_m = _minutos(b_fin)
-                if b_ini_m is None or b_fin_m is None:
-                    continue
-                if max(ini_m, b_ini_m) < min(fin_m, b_fin_m):
-                    if meta.get('tipo', '') in ('break','descanso','receso'):
-                        continue
-                    clases_por_bloque[dia_norm][bloque_key] = {
-                        'asignatura': asig.nombre if asig else 'N/A',
-                        'profesor': prof.nombre_completo if prof else 'N/A',
-                        'salon': salon.nombre if salon else 'N/A',
-                        'hora_inicio': ini,
-                        'hora_fin': fin
-                    }
-
-        horario_data = {
-            'curso': curso.nombreCurso,
-            'sede': curso.sede.nombre if getattr(curso, 'sede', None) else 'N/A',
-            'clases': clases,
-            'dias': dias_list,
-            'bloques': bloques_list,
-            'matriz_bloques': matriz_bloques,
-            'clases_por_bloque': clases_por_bloque
-        }
+        horario_data = {clave: valor for clave, valor in horario.items() if clave != 'entradas'}
 
         # info de depuración mínima
         debug_info = {
             'matricula_id': getattr(matricula, 'id_matricula', None),
-            'curso_id': getattr(curso, 'id_curso', None),
-            'entradas_horario': len(entradas)
+            'curso_id': matricula.cursoId,
+            'entradas_horario': horario['entradas']
         }
         return jsonify({'success': True, 'horario': horario_data, 'debug': debug_info})
     except Exception as e:
@@ -449,23 +276,7 @@ def estado(usuario_id):
 @estudiante_bp.route("/candidatos", methods=["GET"])
 @login_required
 def listar_candidatos():
-    candidatos = Candidato.query.all()
-    data = {}
-
-    for c in candidatos:
-        if c.categoria not in data:
-            data[c.categoria] = []
-
-        data[c.categoria].append({
-            "id": c.id_candidato,
-            "nombre": c.nombre,
-            "tarjeton": c.tarjeton,
-            "propuesta": c.propuesta,
-            "categoria": c.categoria,
-            "foto": c.foto.split('/')[-1] if c.foto else None
-        })
-
-    return jsonify(data), 200
+    return respuesta_cacheada('candidatos', construir_candidatos_agrupados, privada=True)
 
 @estudiante_bp.route("/votar", methods=["POST"])
 @login_required
@@ -936,15 +747,11 @@ def buscar_usuarios():
         return jsonify([])
     
     try:
-        print(f"DEBUG: Buscando usuarios con query: {query}")
+        logger.debug('Buscando usuarios con query: %s', query)
         
-        usuarios = Usuario.query.filter(
-            (Usuario.correo.ilike(f'%{query}%')) |
-            (Usuario.nombre.ilike(f'%{query}%')) |
-            (Usuario.apellido.ilike(f'%{query}%'))
-        ).filter(Usuario.estado_cuenta == 'activa').limit(10).all()
+        usuarios = autocompletar(query)
         
-        print(f"DEBUG: Encontrados {len(usuarios)} usuarios")
+        logger.debug('Encontrados %s usuarios', len(usuarios))
         
         resultados = []
         for usuario in usuarios:
@@ -954,12 +761,12 @@ def buscar_usuarios():
                 'email': usuario.correo
             }
             resultados.append(user_data)
-            print(f"DEBUG Usuario: {user_data}")
+            logger.debug('Usuario: %s', user_data)
         
         return jsonify(resultados)
         
     except Exception as e:
-        print(f"ERROR en buscar_usuarios: {str(e)}")
+        logger.error('ERROR en buscar_usuarios: %s', e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -974,6 +781,7 @@ def ver_eventos():
 
 @estudiante_bp.route("/api/eventos", methods=["GET"])
 @login_required
+@solo_lectura
 def api_eventos_estudiante():
     try:
         eventos = Evento.query.filter_by(rol_destino="Estudiante").all()
@@ -1509,9 +1317,7 @@ def api_mi_equipo():
             }), 500
             
     except Exception as e:
-        print(f"ERROR en api_mi_equipo: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('ERROR en api_mi_equipo: %s', e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -1537,7 +1343,7 @@ def api_usuario_actual():
         }), 200
             
     except Exception as e:
-        print(f"ERROR en api_usuario_actual: {str(e)}")
+        logger.error('ERROR en api_usuario_actual: %s', e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -1,6 +1,10 @@
+import logging
 from flask import Blueprint, render_template, jsonify, request
 from datetime import date
 from controllers.models import db, Usuario, Rol, Sede, Curso, Evento
+from services.condicional_service import respuesta_condicional, vigilar
+
+logger = logging.getLogger(__name__)
 
 main_bp = Blueprint('main', __name__)
 
@@ -10,6 +14,7 @@ def index():
 
 # API pública: resumen de cifras para la portada
 @main_bp.route('/api/public/resumen')
+@respuesta_condicional(Sede, Curso, Rol, vigilar(Usuario, 'id_rol_fk'), Evento, max_age=300, publico=True)
 def api_public_resumen():
     try:
         total_sedes = Sede.query.count()
@@ -49,6 +54,7 @@ def api_public_cursos():
 
 # API pública: próximos eventos
 @main_bp.route('/api/public/eventos')
+@respuesta_condicional(Evento, max_age=60, publico=True)
 def api_public_eventos():
     try:
         limit = max(1, min(int(request.args.get('limit', 5)), 20))
@@ -89,9 +95,29 @@ def api_public_contacto():
         # Opcional: guardar como Notificacion o Evento; por simplicidad, registrar en logs
         current = {'nombre': nombre, 'correo': correo, 'mensaje': mensaje}
         try:
-            print('[Contacto público]', current)
+            logger.info('[Contacto público] %s', current)
         except Exception:
             pass
         return jsonify({'success': True, 'message': 'Mensaje recibido. ¡Gracias por contactarnos!'}), 201
     except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
\ No newline at end of file
+        return jsonify({'success': False, 'message': str(e)}), 500
+# Métricas en formato de texto de Prometheus (token o sesión de administrador)
+@main_bp.route('/metrics')
+def metrics():
+    from flask import current_app, abort
+    from flask_login import current_user
+    from hmac import compare_digest
+    from services.metricas_service import exportar_prometheus
+
+    token = current_app.config.get('METRICS_TOKEN')
+    autorizacion = request.headers.get('Authorization', '')
+    if token:
+        if not compare_digest(autorizacion, f'Bearer {token}'):
+            abort(401)
+    elif not (current_user.is_authenticated and current_user.id_rol_fk == 1):
+        abort(403)
+
+    return current_app.response_class(
+        exportar_prometheus(),
+        mimetype='text/plain; version=0.0.4; charset=utf-8'
+    )
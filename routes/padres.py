@@ -1,14 +1,22 @@
+import logging
 from flask import Blueprint, render_template, redirect, url_for, request, jsonify, flash, current_app
 from flask_login import login_required, current_user
 from datetime import datetime
 from controllers.decorators import role_required, permission_required
+from services.replica_service import solo_lectura
+from services.condicional_service import respuesta_condicional
+from services.autocompletado_service import autocompletar
+from services import horario_service
 from controllers.models import (
     db, Usuario, Rol, Comunicacion, SolicitudConsulta, Asignatura,
-    Calificacion, Asistencia, Clase, Matricula, Curso, HorarioCompartido, HorarioCurso, Salon, Sede,
-    CicloAcademico, PeriodoAcademico, CategoriaCalificacion, Notificacion, Evento
+    Calificacion, Asistencia, Clase, Matricula, Curso, HorarioCompartido, HorarioCurso, Salon,
+    CicloAcademico, PeriodoAcademico, CategoriaCalificacion, Notificacion, Evento,
+    estudiante_padre
     )
 from routes.profesor import tareas_academicas
 
+logger = logging.getLogger(__name__)
+
 
 padre_bp = Blueprint('padre', __name__, url_prefix='/padre')
 # ========== FUNCIÓN AUXILIAR==========
@@ -20,9 +28,9 @@ def get_sidebar_counts():
         # DEBUG: Ver qué valores de estado existen
         estados = db.session.query(Comunicacion.estado).distinct().all()
         estados_lista = [e[0] for e in estados]
-        print("🔍 VALORES DE 'estado' EN COMUNICACIONES:", estados_lista)
+        logger.debug("🔍 VALORES DE 'estado' EN COMUNICACIONES: %s", estados_lista)
     except Exception as e:
-        print("❌ Error en debug de estados:", e)
+        logger.error('❌ Error en debug de estados: %s', e)
         estados_lista = []
     
     # Determinar el valor correcto para mensajes no leídos
@@ -38,7 +46,7 @@ def get_sidebar_counts():
     elif 'nuevo' in estados_lista:
         estado_no_leido = 'nuevo'
     
-    print(f"🎯 Usando estado: '{estado_no_leido}' para mensajes no leídos")
+    logger.debug("🎯 Usando estado: '%s' para mensajes no leídos", estado_no_leido)
     
     # Mensajes no leídos (para comunicaciones)
     unread_messages = Comunicacion.query.filter_by(
@@ -55,11 +63,15 @@ def get_sidebar_counts():
     # ✅ VERSIÓN CORREGIDA: Eventos próximos con filtro más estricto
     hoy = datetime.now().date()
     
-    # Obtener TODOS los eventos para debug
-    todos_eventos = Evento.query.all()
-    print(f"📋 TODOS LOS EVENTOS EN BD ({len(todos_eventos)} total):")
-    for evento in todos_eventos:
-        print(f"   - ID: {evento.id}, Nombre: '{evento.nombre}', Fecha: {evento.fecha}, Rol: {evento.rol_destino}")
+    # Obtener TODOS los eventos para debug (solo si el nivel DEBUG está activo)
+    if logger.isEnabledFor(logging.DEBUG):
+        todos_eventos = Evento.query.all()
+        logger.debug('📋 TODOS LOS EVENTOS EN BD (%s total):', len(todos_eventos))
+        for evento in todos_eventos:
+            logger.debug(
+                "- ID: %s, Nombre: '%s', Fecha: %s, Rol: %s",
+                evento.id, evento.nombre, evento.fecha, evento.rol_destino
+            )
     
     # Eventos que cumplen el filtro estricto
     eventos_filtrados = Evento.query.filter(
@@ -67,13 +79,17 @@ def get_sidebar_counts():
         Evento.fecha >= hoy        # Solo eventos de hoy en adelante
     ).all()
     
-    print(f"🎯 EVENTOS FILTRADOS (fecha >= {hoy} y fecha NOT NULL): {len(eventos_filtrados)} eventos")
-    for evento in eventos_filtrados:
-        print(f"   ✅ INCLUIDO - ID: {evento.id}, Nombre: '{evento.nombre}', Fecha: {evento.fecha}")
+    logger.debug('🎯 EVENTOS FILTRADOS (fecha >= %s y fecha NOT NULL): %s eventos', hoy, len(eventos_filtrados))
+    if logger.isEnabledFor(logging.DEBUG):
+        for evento in eventos_filtrados:
+            logger.debug("✅ INCLUIDO - ID: %s, Nombre: '%s', Fecha: %s", evento.id, evento.nombre, evento.fecha)
     
     upcoming_events = len(eventos_filtrados)
     
-    print(f"📊 RESUMEN CONTADORES - Mensajes: {unread_messages}, Notificaciones: {unread_notifications}, Eventos: {upcoming_events}")
+    logger.debug(
+        '📊 RESUMEN CONTADORES - Mensajes: %s, Notificaciones: %s, Eventos: %s',
+        unread_messages, unread_notifications, upcoming_events
+    )
     
     return {
         'unread_messages': unread_messages,
@@ -94,12 +110,13 @@ def verificar_relacion_padre_hijo(padre_id, hijo_id):
         
         return result is not None
     except Exception as e:
-        print(f"Error verificando relación padre-hijo: {e}")
+        logger.error('Error verificando relación padre-hijo: %s', e)
         return False
 
 @padre_bp.route('/dashboard')
 @login_required
 @role_required('Padre')
+@solo_lectura
 def dashboard():
     """Muestra el panel principal del padre con un resumen del progreso del hijo/a."""
     from controllers.models import Calificacion, Matricula, Asistencia, Clase
@@ -131,7 +148,7 @@ def dashboard():
                             promedio_hijo = sum(valores) / len(valores)
                             promedios_hijos.append(promedio_hijo)
                     except (ValueError, TypeError) as e:
-                        print(f"Error calculando promedio para hijo {hijo.id_usuario}: {e}")
+                        logger.error('Error calculando promedio para hijo %s: %s', hijo.id_usuario, e)
                         continue
          
                 # Obtener clases inscritas del hijo
@@ -473,7 +490,7 @@ def api_estadisticas_estudiante(estudiante_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error obteniendo estadísticas: {e}")
+        logger.error('Error obteniendo estadísticas: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @padre_bp.route('/api/promedios_estudiante/<int:estudiante_id>')
@@ -519,7 +536,7 @@ def api_promedios_estudiante(estudiante_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error obteniendo promedios: {e}")
+        logger.error('Error obteniendo promedios: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @padre_bp.route('/api/asistencia_estudiante/<int:estudiante_id>')
@@ -562,7 +579,7 @@ def api_asistencia_estudiante(estudiante_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error obteniendo asistencia: {e}")
+        logger.error('Error obteniendo asistencia: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @padre_bp.route('/api/asistencia_mes/<int:estudiante_id>')
@@ -644,7 +661,7 @@ def api_asistencia_mes(estudiante_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error obteniendo asistencias del mes: {e}")
+        logger.error('Error obteniendo asistencias del mes: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @padre_bp.route('/api/tareas_estudiante/<int:estudiante_id>')
@@ -670,8 +687,8 @@ def api_tareas_estudiante(estudiante_id):
             Calificacion.fecha_registro.desc()
         ).all()
         
-        current_app.logger.info(f"Buscando tareas para estudiante {estudiante_id}")
-        current_app.logger.info(f"Tareas encontradas: {len(tareas)}")
+        logger.info('Buscando tareas para estudiante %s', estudiante_id)
+        logger.info('Tareas encontradas: %s', len(tareas))
         
         tareas_list = []
         for tarea, asignatura in tareas:
@@ -696,7 +713,7 @@ def api_tareas_estudiante(estudiante_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error obteniendo tareas: {e}")
+        logger.error('Error obteniendo tareas: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @padre_bp.route('/api/consultas_estudiante/<int:estudiante_id>')
@@ -743,11 +760,13 @@ def api_consultas_estudiante(estudiante_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error obteniendo consultas: {e}")
+        logger.error('Error obteniendo consultas: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 @padre_bp.route('/api/horario_estudiante/<int:estudiante_id>')
 @login_required
 @role_required('Padre')
+@solo_lectura
+@respuesta_condicional(estudiante_padre, Matricula, *horario_service.DEPENDENCIAS)
 def api_horario_estudiante(estudiante_id):
     """API para obtener horario de clases de un estudiante."""
     try:
@@ -773,237 +792,9 @@ def api_horario_estudiante(estudiante_id):
                 'message': 'El estudiante no tiene matrícula activa'
             })
         
-        curso = matricula.curso
-        
-        # Helpers para normalizar día y hora al formato esperado por el frontend
-        def _normalizar_dia(dia_str):
-            if not dia_str:
-                return None
-            d = str(dia_str).strip().lower()
-            mapping = {
-                'lunes': 'lunes',
-                'martes': 'martes',
-                'miercoles': 'miercoles',
-                'miércoles': 'miercoles',
-                'jueves': 'jueves',
-                'viernes': 'viernes',
-                'sabado': 'sabado',
-                'sábado': 'sabado',
-                'domingo': 'domingo'
-            }
-            return mapping.get(d, d)
-
-        def _fmt_hora(val):
-            try:
-                # soporta time, datetime o string
-                if hasattr(val, 'strftime'):
-                    return val.strftime('%H:%M')
-                s = str(val).strip()
-                # Si viene como HH:MM:SS -> tomar HH:MM
-                if len(s) >= 5 and s[2] == ':':
-                    return s[:5]
-                # Si viene como H:MM -> normalizar a HH:MM
-                if ':' in s:
-                    parts = s.split(':')
-                    h = int(parts[0]) if parts[0] else 0
-                    m = int(parts[1]) if len(parts) > 1 and parts[1] else 0
-                    return f"{h:02d}:{m:02d}"
-                # Intentar parseo directo
-                from datetime import datetime
-                try:
-                    return datetime.strptime(s, '%H:%M').strftime('%H:%M')
-                except Exception:
-                    pass
-            except Exception:
-                pass
-            return ''
-
-        # Construir a partir de HorarioCurso (fuente con día/hora)
-        clases = {}
-
-        # Complementar con HorarioCurso (usado por profesor/estudiante)
-        horarios_curso = db.session.query(HorarioCurso, Asignatura, Usuario, Salon).join(
-            Asignatura, HorarioCurso.asignatura_id == Asignatura.id_asignatura
-        ).join(
-            Usuario, HorarioCurso.profesor_id == Usuario.id_usuario
-        ).outerjoin(
-            Salon, HorarioCurso.id_salon_fk == Salon.id_salon
-        ).filter(
-            HorarioCurso.curso_id == curso.id_curso
-        ).all()
-
-        for hc, asignatura, profesor, salon in horarios_curso:
-            dia_norm = _normalizar_dia(getattr(hc, 'dia_semana', None))
-            hora_ini = _fmt_hora(getattr(hc, 'hora_inicio', ''))
-            hora_fin = _fmt_hora(getattr(hc, 'hora_fin', ''))
-            if not dia_norm or not hora_ini:
-                continue
-            # Expandir a todos los bloques de hora completa cubiertos por el rango [inicio, fin)
-            def _to_min(hhmm):
-                try:
-                    h, m = map(int, hhmm.split(':'))
-                    return h*60 + m
-                except Exception:
-                    return None
-            ini_min = _to_min(hora_ini)
-            fin_min = _to_min(hora_fin) if hora_fin else None
-            if ini_min is None:
-                continue
-            # Si no hay hora_fin válida, sólo marcar la hora de inicio
-            slots = []
-            if fin_min is None or fin_min <= ini_min:
-                slots = [hora_ini]
-            else:
-                # tomar horas enteras desde floor(inicio a la hora) hasta fin exclusiva, paso 60
-                from math import floor
-                start_hour = ini_min // 60
-                end_hour = (fin_min + 59) // 60  # cubrir la última hora iniciada antes de fin
-                for h in range(start_hour, end_hour):
-                    slots.append(f"{h:02d}:00")
-            for slot in slots:
-                clave = f"{dia_norm}_{slot}"
-                if clave not in clases:
-                    clases[clave] = {
-                        'asignatura': asignatura.nombre,
-                        'profesor': profesor.nombre_completo,
-                        'salon': salon.nombre if salon else 'N/A',
-                        'hora_inicio': hora_ini,
-                        'hora_fin': hora_fin or 'N/A'
-                    }
-
-        # Incorporar bloques y días desde HorarioGeneral (para mostrar rangos y descansos)
-        dias_list = []
-        bloques_list = []
-        matriz_bloques = {}  # dia -> { "HH:MM-HH:MM": {tipo, nombre} }
-        clases_por_bloque = {}  # dia -> { "HH:MM-HH:MM": clase }
-        try:
-            hg = getattr(curso, 'horario_general', None)
-            if hg:
-                # Días
-                try:
-                    import json
-                    dias_list = json.loads(hg.diasSemana) if hg.diasSemana else []
-                except Exception:
-                    dias_list = []
-                # Bloques
-                from controllers.models import BloqueHorario
-                bloques = BloqueHorario.query.filter_by(horario_general_id=hg.id_horario).order_by(BloqueHorario.orden).all()
-                for b in bloques:
-                    dia_norm_b = _normalizar_dia(b.dia_semana)
-                    start = _fmt_hora(b.horaInicio)
-                    end = _fmt_hora(b.horaFin)
-                    if not start or not end:
-                        continue
-                    bloque_key = f"{start}-{end}"
-                    if bloque_key not in bloques_list:
-                        bloques_list.append(bloque_key)
-                    if dia_norm_b:
-                        matriz_bloques.setdefault(dia_norm_b, {})[bloque_key] = {
-                            'tipo': (b.tipo or '').lower(),
-                            'nombre': b.nombre or '',
-                            'break_type': (b.break_type or ''),
-                            'class_type': (b.class_type or '')
-                        }
-                        clases_por_bloque.setdefault(dia_norm_b, {})[bloque_key] = None
-        except Exception:
-            pass
-
-        # Fallback: construir dias y bloques desde HorarioCurso si HorarioGeneral no aporta
-        if not dias_list:
-            try:
-                dias_set = set()
-                for hc, *_ in horarios_curso:
-                    d = _normalizar_dia(getattr(hc, 'dia_semana', None))
-                    if d:
-                        dias_set.add(d)
-                dias_list = sorted(dias_set) if dias_set else ['lunes','martes','miercoles','jueves','viernes','sabado']
-            except Exception:
-                dias_list = ['lunes','martes','miercoles','jueves','viernes','sabado']
-
-        if not bloques_list:
-            try:
-                mins = []
-                maxs = []
-                def _to_min(hhmm):
-                    try:
-                        h, m = map(int, str(hhmm).split(':'))
-                        return h*60 + m
-                    except Exception:
-                        return None
-                for hc, *_ in horarios_curso:
-                    ini = _fmt_hora(getattr(hc, 'hora_inicio', ''))
-                    fin = _fmt_hora(getattr(hc, 'hora_fin', ''))
-                    mi = _to_min(ini)
-                    mf = _to_min(fin) if fin else None
-                    if mi is not None:
-                        mins.append(mi)
-                    if mf is not None:
-                        maxs.append(mf)
-                if mins:
-                    start_h = min(mins)//60
-                    end_h = (max(maxs) + 59)//60 if maxs else (min(mins)//60 + 6)
-                    bloques_list = [f"{h:02d}:00-{h+1:02d}:00" for h in range(start_h, max(start_h+1, end_h))]
-                else:
-                    bloques_list = [f"{h:02d}:00-{h+1:02d}:00" for h in range(6, 20)]
-            except Exception:
-                bloques_list = [f"{h:02d}:00-{h+1:02d}:00" for h in range(6, 20)]
-
-        # Determinar sede del curso
-        sede_nombre = 'N/A'
-        try:
-            if hasattr(curso, 'sede') and curso.sede:
-                sede_nombre = curso.sede.nombre
-            elif hasattr(curso, 'sedeId') and curso.sedeId:
-                sede_obj = Sede.query.get(curso.sedeId)
-                if sede_obj:
-                    sede_nombre = sede_obj.nombre
-        except Exception:
-            pass
-
-        # Construir clases_por_bloque: asignar cada HorarioCurso a los bloques que se solapan
-        def _minutos(hhmm):
-            try:
-                h, m = map(int, str(hhmm).split(':'))
-                return h*60 + m
-            except Exception:
-                return None
-
-        for hc, asignatura, profesor, salon in horarios_curso:
-            dia_norm = _normalizar_dia(getattr(hc, 'dia_semana', None))
-            ini = _fmt_hora(getattr(hc, 'hora_inicio', ''))
-            fin = _fmt_hora(getattr(hc, 'hora_fin', ''))
-            if not dia_norm or not ini or not fin:
-                continue
-            ini_m = _minutos(ini); fin_m = _minutos(fin)
-            if ini_m is None or fin_m is None:
-                continue
-            for bloque_key, meta in (matriz_bloques.get(dia_norm, {}) or {}).items():
-                b_ini, b_fin = [x.strip() for x in bloque_key.split('-')]
-                b_ini_m = _minutos(b_ini); b_fin_m = _minutos(b_fin)
-                if b_ini_m is None or b_fin_m is None:
-                    continue
-                # Solapamiento si max(inicio) < min(fin)
-                if max(ini_m, b_ini_m) < min(fin_m, b_fin_m):
-                    # Evitar marcar bloques de descanso como clase
-                    if meta.get('tipo', '') in ('break','descanso','receso'):
-                        continue
-                    clases_por_bloque[dia_norm][bloque_key] = {
-                        'asignatura': asignatura.nombre,
-                        'profesor': profesor.nombre_completo,
-                        'salon': salon.nombre if salon else 'N/A',
-                        'hora_inicio': ini,
-                        'hora_fin': fin
-                    }
-
-        horario_data = {
-            'curso': getattr(curso, 'nombreCurso', 'N/A'),
-            'sede': sede_nombre,
-            'clases': clases,
-            'dias': dias_list,
-            'bloques': bloques_list,
-            'matriz_bloques': matriz_bloques,
-            'clases_por_bloque': clases_por_bloque
-        }
+        # Horario materializado del curso (se reconstruye solo cuando cambian los horarios)
+        horario = horario_service.horario_curso(matricula.cursoId) or {}
+        horario_data = {clave: valor for clave, valor in horario.items() if clave != 'entradas'}
         
         return jsonify({
             'success': True,
@@ -1011,7 +802,7 @@ def api_horario_estudiante(estudiante_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error obteniendo horario: {e}")
+        logger.error('Error obteniendo horario: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @padre_bp.route('/api/obtener_hijos')
@@ -1576,17 +1367,13 @@ def api_buscar_usuarios():
             return jsonify([])
         
         # Buscar usuarios que coincidan con el query
-        usuarios = Usuario.query.filter(
-            (Usuario.nombre.contains(query)) |
-            (Usuario.apellido.contains(query)) |
-            (Usuario.correo.contains(query))
-        ).limit(10).all()
+        usuarios = autocompletar(query)
         
         usuarios_data = []
         for usuario in usuarios:
             usuarios_data.append({
                 'id': usuario.id_usuario,
-                'nombre': usuario.nombre_completo,
+                'nombre': f"{usuario.nombre} {usuario.apellido}",
                 'email': usuario.correo
             })
         
@@ -2071,12 +1858,12 @@ def crear_notificacion_evento_padres(evento):
             db.session.add(notificacion)
         
         db.session.commit()
-        print(f"✅ Notificaciones de evento creadas para {len(padres_ids)} padres")
+        logger.debug('✅ Notificaciones de evento creadas para %s padres', len(padres_ids))
         return True
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error creando notificaciones: {e}")
+        logger.error('❌ Error creando notificaciones: %s', e)
         return False
 
 def crear_notificacion_general(usuario_id, titulo, mensaje, tipo="sistema", link=None):
@@ -2092,12 +1879,12 @@ def crear_notificacion_general(usuario_id, titulo, mensaje, tipo="sistema", link
         )
         db.session.add(notificacion)
         db.session.commit()
-        print(f"✅ Notificación creada para usuario {usuario_id}")
+        logger.debug('✅ Notificación creada para usuario %s', usuario_id)
         return True
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error creando notificación: {e}")
+        logger.error('❌ Error creando notificación: %s', e)
         return False
 # ========== FIN SERVICIO DE NOTIFICACIONES ==========
 
@@ -2188,6 +1975,7 @@ def api_eventos_contador():
 @padre_bp.route("/api/eventos", methods=["GET"])
 @login_required
 @role_required('Padre')
+@solo_lectura
 def api_eventos_padre():
     """API para listar eventos del rol estudiante"""
     try:
@@ -2349,7 +2137,7 @@ def get_sidebar_counts():
         }
         
     except Exception as e:
-        print(f"❌ Error en get_sidebar_counts: {e}")
+        logger.error('❌ Error en get_sidebar_counts: %s', e)
         return {
             'unread_messages': 0,
             'unread_notifications': 0,
@@ -3,14 +3,22 @@ from flask_login import login_required, current_user
 from controllers.models import (
     db, Usuario, Asignatura, Clase, Matricula, Calificacion, Curso, Rol,
     Asistencia, CategoriaCalificacion, ConfiguracionCalificacion, HorarioCompartido, HorarioCurso,
-    HorarioGeneral, BloqueHorario, Salon, Sede, Evento, ReporteCalificaciones, SolicitudConsulta,
-    Notificacion,Comunicacion, AsignacionEquipo, Equipo
+    HorarioGeneral, Salon, Sede, Evento, ReporteCalificaciones, SolicitudConsulta,
+    Notificacion,Comunicacion
 )
+from services.replica_service import solo_lectura
+from services.condicional_service import respuesta_condicional
+from services.autocompletado_service import autocompletar
+from services.asignacion_service import asignar_curso_a_sala, asignar_equipo, devolver_equipo, equipos_de_estudiantes, equipos_disponibles
+from services.horario_service import DEPENDENCIAS as DEPENDENCIAS_HORARIOS, horario_profesor, siguiente_clase
 from datetime import datetime, date
 import json
 import os
+import logging
 from werkzeug.utils import secure_filename
 
+logger = logging.getLogger(__name__)
+
 profesor_bp = Blueprint('profesor', __name__, url_prefix='/profesor')
 
 # ============================================================================ #
@@ -52,42 +60,8 @@ def obtener_cursos_del_profesor(profesor_id):
     return todos_cursos
 
 def obtener_horarios_detallados_profesor(profesor_id):
-    """Obtiene horarios detallados del profesor directamente desde HorarioCurso."""
-    # Consultar directamente HorarioCurso donde el profesor está asignado
-    horarios_curso = db.session.query(HorarioCurso, Curso, Asignatura, Salon, Sede)\
-        .join(Curso, HorarioCurso.curso_id == Curso.id_curso)\
-        .join(Asignatura, HorarioCurso.asignatura_id == Asignatura.id_asignatura)\
-        .outerjoin(Salon, HorarioCurso.id_salon_fk == Salon.id_salon)\
-        .outerjoin(Sede, Salon.id_sede_fk == Sede.id_sede)\
-        .filter(HorarioCurso.profesor_id == profesor_id)\
-        .all()
-    
-    horarios_detallados = []
-
-    for hc, curso, asignatura, salon, sede in horarios_curso:
-        # Obtener sede del curso si no se obtuvo del salon
-        sede_nombre = 'N/A'
-        if sede:
-            sede_nombre = sede.nombre
-        elif hasattr(curso, 'sede') and curso.sede:
-            sede_nombre = curso.sede.nombre
-        elif hasattr(curso, 'sedeId') and curso.sedeId:
-            sede_obj = Sede.query.get(curso.sedeId)
-            if sede_obj:
-                sede_nombre = sede_obj.nombre
-
-        horarios_detallados.append({
-            'curso_nombre': curso.nombreCurso if curso else 'N/A',
-            'asignatura_nombre': asignatura.nombre if asignatura else 'N/A',
-            'dia_semana': hc.dia_semana if hc.dia_semana else 'N/A',
-            'hora_inicio': hc.hora_inicio if hc.hora_inicio else 'N/A',
-            'hora_fin': hc.hora_fin if hc.hora_fin else 'N/A',
-            'salon': salon.nombre if salon else 'N/A',
-            'sede': sede_nombre,
-            'origen_id_horario_curso': hc.id_horario_curso if hc else None
-        })
-
-    return horarios_detallados
+    """Obtiene horarios detallados del profesor (una entrada por HorarioCurso) desde el horario materializado."""
+    return horario_profesor(profesor_id)['detallados']
 
 def verificar_acceso_curso_profesor(profesor_id, curso_id):
     """Verifica si el profesor tiene acceso a un curso específico (por HorarioCompartido o Clase)."""
@@ -240,7 +214,7 @@ def obtener_curso_actual_estudiante(estudiante_id):
             return matricula.curso
         return None
     except Exception as e:
-        current_app.logger.error(f"Error obteniendo curso del estudiante {estudiante_id}: {e}")
+        logger.error('Error obteniendo curso del estudiante %s: %s', estudiante_id, e)
         return None
 
 def verificar_asignatura_profesor_en_curso(asignatura_id, profesor_id, curso_id):
@@ -278,7 +252,7 @@ def obtener_profesores_por_asignatura(asignatura_id):
             } for prof in profesores
         ]
     except Exception as e:
-        print(f"Error obteniendo profesores por asignatura: {str(e)}")
+        logger.error('Error obteniendo profesores por asignatura: %s', e)
         return []
 
 def validar_profesor_asignatura(profesor_id, asignatura_id):
@@ -293,7 +267,7 @@ def validar_profesor_asignatura(profesor_id, asignatura_id):
         
         return asignacion is not None
     except Exception as e:
-        print(f"Error validando profesor-asignatura: {str(e)}")
+        logger.error('Error validando profesor-asignatura: %s', e)
         return False
 
 def calcular_pendientes(profesor_id, curso_id):
@@ -315,50 +289,16 @@ def calcular_pendientes(profesor_id, curso_id):
 # ============================================================================ #
 # CONTEXT PROCESSOR Y UTILIDADES PARA TEMPLATES
 # ============================================================================ #
-def _dia_semana_a_indice(nombre_dia):
-    if not nombre_dia:
-        return None
-    m = nombre_dia.strip().lower()
-    # Normalizar acentos y variantes
-    mapping = {
-        'lunes': 0, 'martes': 1, 'miercoles': 2, 'miércoles': 2,
-        'jueves': 3, 'viernes': 4, 'sabado': 5, 'sábado': 5, 'domingo': 6
-    }
-    return mapping.get(m, None)
-
-def _hora_a_minutos(hora_str):
-    try:
-        parts = hora_str.split(':')
-        return int(parts[0]) * 60 + int(parts[1])
-    except Exception:
-        return 24 * 60  # valor alto si no se puede parsear
-
 def obtener_proxima_clase(profesor_id):
     """Busca la próxima clase en la semana basándose en horarios compartidos.
     Retorna un dict con claves similares a las usadas en templates o None.
     """
     try:
-        horarios = obtener_horarios_detallados_profesor(profesor_id)
-        if not horarios:
+        # Primera clase desde hoy (aunque ya haya empezado), en el orden semanal materializado
+        mejor = siguiente_clase(profesor_id, datetime.today().weekday(), 0)
+        if not mejor:
             return None
 
-        hoy_idx = datetime.today().weekday()  # 0=Monday
-        candidatos = []
-        for h in horarios:
-            dia = h.get('dia_semana') or h.get('dia') or h.get('diaSemana')
-            hora = h.get('hora_inicio') or h.get('horaInicio') or h.get('hora') or '23:59'
-            dia_idx = _dia_semana_a_indice(dia)
-            if dia_idx is None:
-                continue
-            dias_adelante = (dia_idx - hoy_idx) % 7
-            minutos = _hora_a_minutos(hora)
-            candidatos.append((dias_adelante, minutos, h))
-
-        if not candidatos:
-            return None
-
-        candidatos.sort(key=lambda x: (x[0], x[1]))
-        mejor = candidatos[0][2]
         # Normalizar salida
         return {
             'asignatura_nombre': mejor.get('asignatura_nombre') or mejor.get('asignatura') or mejor.get('asignatura_nombre', 'N/A'),
@@ -378,182 +318,10 @@ def generar_matriz_horario_profesor(profesor_id):
       - dias: lista ordenada de días que tienen bloques (clases o descansos)
       - bloques: lista ordenada de TODOS los bloques horarios del horario general (incluye descansos)
       - matriz: dict dia -> bloque -> {'tipo': 'clase'|'descanso', 'asignaturas': [...]}
+    La matriz se materializa una vez por versión de los horarios (services/horario_service.py).
     """
-    def _fmt_hora(val):
-        try:
-            if hasattr(val, 'strftime'):
-                return val.strftime('%H:%M')
-            s = str(val)
-            return s[:5] if len(s) >= 5 and s[2] == ':' else s
-        except Exception:
-            return None
-
-    def _normalizar_dia(dia_str):
-        """Normaliza el nombre del día a minúsculas y formato estándar"""
-        if not dia_str:
-            return None
-        dia = str(dia_str).strip().lower()
-        mapeo = {
-            'lunes': 'lunes',
-            'martes': 'martes',
-            'miercoles': 'miercoles',
-            'miércoles': 'miercoles',
-            'jueves': 'jueves',
-            'viernes': 'viernes',
-            'sabado': 'sabado',
-            'sábado': 'sabado',
-            'domingo': 'domingo'
-        }
-        return mapeo.get(dia, dia)
-
-    # 1. Obtener cursos únicos donde el profesor tiene clases
-    cursos_ids = db.session.query(HorarioCurso.curso_id)\
-        .filter(HorarioCurso.profesor_id == profesor_id)\
-        .distinct()\
-        .all()
-    cursos_ids = [c[0] for c in cursos_ids]
-
-    if not cursos_ids:
-        return [], [], {}
-
-    # 2. Obtener horarios_generales únicos de esos cursos
-    horarios_generales_ids = db.session.query(Curso.horario_general_id)\
-        .filter(Curso.id_curso.in_(cursos_ids))\
-        .filter(Curso.horario_general_id.isnot(None))\
-        .distinct()\
-        .all()
-    horarios_generales_ids = [h[0] for h in horarios_generales_ids]
-
-    if not horarios_generales_ids:
-        return [], [], {}
-
-    # 3. Obtener TODOS los BloquesHorario de esos horarios generales
-    bloques_horario = BloqueHorario.query.filter(
-        BloqueHorario.horario_general_id.in_(horarios_generales_ids)
-    ).order_by(BloqueHorario.orden).all()
-
-    # 4. Obtener asignaturas asignadas del profesor (HorarioCurso)
-    asignaciones_profesor = db.session.query(
-        HorarioCurso, Curso, Asignatura, Salon
-    ).join(
-        Curso, HorarioCurso.curso_id == Curso.id_curso
-    ).join(
-        Asignatura, HorarioCurso.asignatura_id == Asignatura.id_asignatura
-    ).outerjoin(
-        Salon, HorarioCurso.id_salon_fk == Salon.id_salon
-    ).filter(
-        HorarioCurso.profesor_id == profesor_id
-    ).all()
-
-    # Crear diccionario de asignaciones por (curso_id, dia, hora_inicio)
-    asignaciones_dict = {}
-    for hc, curso, asignatura, salon in asignaciones_profesor:
-        dia = _normalizar_dia(hc.dia_semana)
-        hora_inicio = _fmt_hora(hc.hora_inicio)
-        hora_fin = _fmt_hora(hc.hora_fin)
-        
-        if not dia or not hora_inicio or not hora_fin:
-            continue
-
-        # Obtener sede del curso
-        sede_nombre = 'N/A'
-        if hasattr(curso, 'sede') and curso.sede:
-            sede_nombre = curso.sede.nombre
-        elif hasattr(curso, 'sedeId') and curso.sedeId:
-            sede_obj = Sede.query.get(curso.sedeId)
-            if sede_obj:
-                sede_nombre = sede_obj.nombre
-
-        clave = (hc.curso_id, dia, hora_inicio)
-        if clave not in asignaciones_dict:
-            asignaciones_dict[clave] = []
-        asignaciones_dict[clave].append({
-            'curso_id': hc.curso_id,
-            'curso_nombre': curso.nombreCurso if curso else 'N/A',
-            'asignatura_id': hc.asignatura_id,
-            'asignatura_nombre': asignatura.nombre if asignatura else 'N/A',
-            'hora_inicio': hora_inicio,
-            'hora_fin': hora_fin,
-            'salon': salon.nombre if salon else 'N/A',
-            'sede': sede_nombre
-        })
-
-    # 5. Construir matriz con TODOS los bloques del horario general
-    dias_set = set()
-    bloques_dict = {}  # bloque_key -> {'hora_inicio': str, 'hora_fin': str, 'tipo': str}
-    matriz = {}
-
-    for bloque in bloques_horario:
-        dia = _normalizar_dia(bloque.dia_semana)
-        hora_inicio = _fmt_hora(bloque.horaInicio)
-        hora_fin = _fmt_hora(bloque.horaFin)
-        
-        if not dia or not hora_inicio or not hora_fin:
-            continue
-
-        bloque_key = f"{hora_inicio}-{hora_fin}"
-        dias_set.add(dia)
-        bloques_dict[bloque_key] = {
-            'hora_inicio': hora_inicio,
-            'hora_fin': hora_fin,
-            'tipo': bloque.tipo,  # 'clase', 'descanso', etc.
-            'nombre': bloque.nombre or ''
-        }
-
-        # Inicializar matriz
-        if dia not in matriz:
-            matriz[dia] = {}
-        
-        # Buscar asignaciones que se solapen con este bloque (no solo por igualdad de inicio)
-        asignaciones_en_bloque = []
-        def _minutos(hhmm:str):
-            try:
-                h, m = map(int, hhmm.split(':'))
-                return h*60 + m
-            except Exception:
-                return None
-        b_ini_m = _minutos(hora_inicio)
-        b_fin_m = _minutos(hora_fin)
-        for (curso_id, dia_asig, hora_inicio_asig), asignaciones in asignaciones_dict.items():
-            if dia_asig != dia:
-                continue
-            for asig in asignaciones:
-                a_ini = _minutos(asig.get('hora_inicio') or hora_inicio_asig)
-                a_fin = _minutos(asig.get('hora_fin') or asig.get('hora_inicio') or hora_inicio_asig)
-                if a_ini is None or b_ini_m is None or a_fin is None or b_fin_m is None:
-                    continue
-                # solapamiento: max(inicios) < min(fines)
-                if max(a_ini, b_ini_m) < min(a_fin, b_fin_m):
-                    asignaciones_en_bloque.append(asig)
-
-        # Normalizar tipo de bloque para identificar descansos
-        tipo_normalizado = str(bloque.tipo).lower().strip() if bloque.tipo else 'clase'
-        
-        # Guardar en matriz: tipo de bloque y asignaciones
-        matriz[dia][bloque_key] = {
-            'tipo': tipo_normalizado,  # Normalizado a minúsculas ('clase', 'break', etc.)
-            'tipo_original': bloque.tipo,  # Mantener original para referencia
-            'nombre': bloque.nombre or '',
-            'asignaturas': asignaciones_en_bloque,
-            'break_type': bloque.break_type if hasattr(bloque, 'break_type') and bloque.break_type else None,
-            'class_type': bloque.class_type if hasattr(bloque, 'class_type') and bloque.class_type else None
-        }
-
-    # Ordenar días por índice (lunes->domingo)
-    dias_list = sorted(list(dias_set), key=lambda x: (_dia_semana_a_indice(x) if _dia_semana_a_indice(x) is not None else 999, x))
-
-    # Ordenar bloques por hora de inicio
-    def bloque_key(bloque_str):
-        """Extrae la hora de inicio del bloque para ordenar"""
-        try:
-            inicio = bloque_str.split('-')[0] if '-' in bloque_str else bloque_str
-            return _hora_a_minutos(inicio)
-        except Exception:
-            return 24*60
-
-    bloques_list = sorted(list(bloques_dict.keys()), key=bloque_key)
-
-    return dias_list, bloques_list, matriz
+    horario = horario_profesor(profesor_id)
+    return horario['dias'], horario['bloques'], horario['matriz']
 
 
 @profesor_bp.context_processor
@@ -621,7 +389,7 @@ def calcular_estadisticas_asistencia_curso(profesor_id, curso_id):
             'total_estudiantes': total_estudiantes
         }
     except Exception as e:
-        print(f"Error calculando estadísticas de asistencia: {e}")
+        logger.error('Error calculando estadísticas de asistencia: %s', e)
         return {'promedio': 0, 'total_clases': 0, 'total_estudiantes': 0}
 
 def calcular_estadisticas_calificaciones_curso(profesor_id, curso_id):
@@ -660,7 +428,7 @@ def calcular_estadisticas_calificaciones_curso(profesor_id, curso_id):
             'total_calificaciones': len(calificaciones_con_valor)
         }
     except Exception as e:
-        print(f"Error calculando estadísticas de calificaciones: {e}")
+        logger.error('Error calculando estadísticas de calificaciones: %s', e)
         return {'promedio': 0, 'aprobacion': 0, 'total_calificaciones': 0}
 
 def obtener_clase_actual(profesor_id):
@@ -729,88 +497,17 @@ def obtener_clase_actual(profesor_id):
         
         return None
     except Exception as e:
-        print(f"Error obteniendo clase actual: {e}")
+        logger.error('Error obteniendo clase actual: %s', e)
         return None
 
 def obtener_proxima_clase_mejorada(profesor_id):
     """Obtiene la próxima clase del profesor de manera más precisa."""
     try:
-        from datetime import datetime, time
+        # Primera clase que empieza después del minuto actual, volviendo al lunes si no quedan esta semana
         ahora = datetime.now()
-        dia_actual = ahora.strftime('%A').lower()
-        hora_actual = ahora.time()
-        
-        # Mapeo de días en español
-        dias_espanol = {
-            'monday': 'lunes',
-            'tuesday': 'martes', 
-            'wednesday': 'miercoles',
-            'thursday': 'jueves',
-            'friday': 'viernes',
-            'saturday': 'sabado',
-            'sunday': 'domingo'
-        }
-        
-        dia_actual_es = dias_espanol.get(dia_actual, '')
-        
-        # Obtener todos los horarios del profesor
-        horarios = obtener_horarios_detallados_profesor(profesor_id)
-        
-        if not horarios:
-            return None
-        
-        # Ordenar horarios por día y hora
-        horarios_ordenados = []
-        for horario in horarios:
-            dia = horario.get('dia_semana', '').lower()
-            hora_str = horario.get('hora_inicio', '00:00')
-            
-            # Convertir hora string a objeto time
-            try:
-                hora_obj = datetime.strptime(hora_str, '%H:%M').time()
-            except:
-                continue
-            
-            # Asignar peso numérico al día
-            dias_semana = ['lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado', 'domingo']
-            peso_dia = dias_semana.index(dia) if dia in dias_semana else 999
-            
-            horarios_ordenados.append({
-                'horario': horario,
-                'dia': dia,
-                'hora': hora_obj,
-                'peso_dia': peso_dia
-            })
-        
-        # Ordenar por día y hora
-        horarios_ordenados.sort(key=lambda x: (x['peso_dia'], x['hora']))
-        
-        # Buscar la próxima clase
-        for horario_info in horarios_ordenados:
-            dia = horario_info['dia']
-            hora = horario_info['hora']
-            
-            # Si es hoy y la hora es futura
-            if dia == dia_actual_es and hora > hora_actual:
-                return horario_info['horario']
-            
-            # Si es un día futuro
-            if dia != dia_actual_es:
-                peso_dia_actual = dias_semana.index(dia_actual_es) if dia_actual_es in dias_semana else -1
-                peso_dia_clase = horario_info['peso_dia']
-                
-                # Si el día de la clase es después del día actual
-                if peso_dia_clase > peso_dia_actual:
-                    return horario_info['horario']
-        
-        # Si no hay clases futuras esta semana, tomar la primera del siguiente ciclo
-        if horarios_ordenados:
-            return horarios_ordenados[0]['horario']
-        
-        return None
-        
+        return siguiente_clase(profesor_id, ahora.weekday(), ahora.hour * 60 + ahora.minute + 1)
     except Exception as e:
-        print(f"Error obteniendo próxima clase: {e}")
+        logger.error('Error obteniendo próxima clase: %s', e)
         return None
 
 def obtener_datos_grafico_asistencia(profesor_id, curso_id, meses=6):
@@ -868,7 +565,7 @@ def obtener_datos_grafico_asistencia(profesor_id, curso_id, meses=6):
         
         return {'labels': labels, 'data': data}
     except Exception as e:
-        print(f"Error obteniendo datos de gráfico de asistencia: {e}")
+        logger.error('Error obteniendo datos de gráfico de asistencia: %s', e)
         return {'labels': [], 'data': []}
 
 def obtener_datos_grafico_calificaciones(profesor_id, curso_id):
@@ -901,7 +598,7 @@ def obtener_datos_grafico_calificaciones(profesor_id, curso_id):
         
         return {'labels': labels, 'data': data}
     except Exception as e:
-        print(f"Error obteniendo datos de gráfico de calificaciones: {e}")
+        logger.error('Error obteniendo datos de gráfico de calificaciones: %s', e)
         return {'labels': [], 'data': []}
 
 def obtener_notificaciones_profesor(profesor_id, curso_id):
@@ -971,7 +668,7 @@ def obtener_notificaciones_profesor(profesor_id, curso_id):
         
         return notificaciones
     except Exception as e:
-        print(f"Error obteniendo notificaciones: {e}")
+        logger.error('Error obteniendo notificaciones: %s', e)
         return []
 
 # ============================================================================ #
@@ -980,6 +677,7 @@ def obtener_notificaciones_profesor(profesor_id, curso_id):
 
 @profesor_bp.route('/dashboard')
 @login_required
+@solo_lectura
 def dashboard():
     """Panel principal del profesor con datos reales."""
     curso_id = session.get('curso_seleccionado')
@@ -997,57 +695,9 @@ def dashboard():
     except Exception:
         dias_semana, bloques_semana, matriz_horario = [], [], {}
 
-    # Fallback: si no se pudo construir con la matriz (por datos parciales), derivar de horarios_detallados
+    # Sin bloques en los horarios generales: matriz derivada solo de las clases
     if (not dias_semana or not bloques_semana) and horarios_detallados:
-        try:
-            def _norm_dia(d):
-                try:
-                    return (d or '').strip()
-                except Exception:
-                    return d
-            def _norm_h(h):
-                try:
-                    s = str(h or '')
-                    # recorta a HH:MM
-                    return s[:5] if len(s) >= 5 and s[2] == ':' else s
-                except Exception:
-                    return h
-            dias_set_fb = set()
-            bloques_set_fb = set()
-            matriz_fb = {}
-            for h in horarios_detallados:
-                d = _norm_dia(h.get('dia_semana') or h.get('dia') or h.get('diaSemana'))
-                hi = _norm_h(h.get('hora_inicio') or h.get('horaInicio') or h.get('hora'))
-                hf = _norm_h(h.get('hora_fin') or h.get('horaFin'))
-                if d:
-                    dias_set_fb.add(d)
-                if hi and hf:
-                    bloque_key = f"{hi}-{hf}"
-                    bloques_set_fb.add(bloque_key)
-                if d and hi and hf:
-                    bloque_key = f"{hi}-{hf}"
-                    if d not in matriz_fb:
-                        matriz_fb[d] = {}
-                    if bloque_key not in matriz_fb[d]:
-                        matriz_fb[d][bloque_key] = {
-                            'tipo': 'clase',
-                            'nombre': '',
-                            'asignaturas': []
-                        }
-                    matriz_fb[d][bloque_key]['asignaturas'].append({
-                        'asignatura_nombre': h.get('asignatura_nombre') or h.get('asignatura', 'N/A'),
-                        'curso_nombre': h.get('curso_nombre') or h.get('curso', 'N/A'),
-                        'salon': h.get('salon') or 'N/A',
-                        'hora_inicio': hi,
-                        'hora_fin': hf or '',
-                        'sede': h.get('sede', 'N/A')
-                    })
-            # ordenar usando utilidades existentes
-            dias_semana = sorted(list(dias_set_fb), key=lambda x: (_dia_semana_a_indice(x) if _dia_semana_a_indice(x) is not None else 999, x))
-            bloques_semana = sorted(list(bloques_set_fb), key=lambda b: _hora_a_minutos(b.split('-')[0]) if '-' in b else 24*60)
-            matriz_horario = {d: {b: matriz_fb.get(d, {}).get(b, {'tipo': 'clase', 'asignaturas': []}) for b in bloques_semana} for d in dias_semana}
-        except Exception:
-            pass
+        dias_semana, bloques_semana, matriz_horario = horario_profesor(current_user.id_usuario)['respaldo']
 
     # Calcular estadísticas reales
     estadisticas_asistencia = calcular_estadisticas_asistencia_curso(current_user.id_usuario, curso_id)
@@ -1084,46 +734,7 @@ def dashboard():
                            unread_messages=0,
                            proxima_clase=proxima_clase,  # Usar la función mejorada
                            cursos=cursos)
-    """Panel principal del profesor con datos reales."""
-    curso_id = session.get('curso_seleccionado')
-    curso_actual = Curso.query.get(curso_id) if curso_id else None
 
-    try:
-        horarios_detallados = obtener_horarios_detallados_profesor(current_user.id_usuario)
-    except Exception as e:
-        flash(f'Error al cargar horarios: {str(e)}', 'error')
-        horarios_detallados = []
-
-    # Calcular estadísticas reales
-    estadisticas_asistencia = calcular_estadisticas_asistencia_curso(current_user.id_usuario, curso_id)
-    estadisticas_calificaciones = calcular_estadisticas_calificaciones_curso(current_user.id_usuario, curso_id)
-    
-    # Obtener datos para gráficos
-    datos_grafico_asistencia = obtener_datos_grafico_asistencia(current_user.id_usuario, curso_id)
-    datos_grafico_calificaciones = obtener_datos_grafico_calificaciones(current_user.id_usuario, curso_id)
-    
-    # Obtener clase actual y notificaciones
-    clase_actual = obtener_clase_actual(current_user.id_usuario)
-    notificaciones = obtener_notificaciones_profesor(current_user.id_usuario, curso_id)
-    
-    cursos = obtener_cursos_del_profesor(current_user.id_usuario)
-
-    return render_template('profesores/dashboard.html',
-                           curso_actual=curso_actual,
-                           horarios_detallados=horarios_detallados,
-                           estadisticas_asistencia=estadisticas_asistencia,
-                           estadisticas_calificaciones=estadisticas_calificaciones,
-                           datos_grafico_asistencia=datos_grafico_asistencia,
-                           datos_grafico_calificaciones=datos_grafico_calificaciones,
-                           clase_actual=clase_actual,
-                           notificaciones=notificaciones,
-                           estudiantes_count=estadisticas_asistencia.get('total_estudiantes', 0) if estadisticas_asistencia else 0,
-                           asignaturas_count=len(obtener_asignaturas_del_profesor(current_user.id_usuario)),
-                           pendientes_count=calcular_pendientes(current_user.id_usuario, curso_id),
-                           unread_messages=0,  # Placeholder hasta implementar mensajes
-                           proxima_clase=obtener_proxima_clase(current_user.id_usuario),
-                           cursos=cursos)
-    
 
 @profesor_bp.route('/gestion-lc')
 @login_required
@@ -1769,19 +1380,15 @@ def api_buscar_usuarios():
             return jsonify([])
         
         # Buscar usuarios que coincidan con el query
-        usuarios = Usuario.query.filter(
-            (Usuario.nombre.ilike(f'%{query}%')) |
-            (Usuario.apellido.ilike(f'%{query}%')) |
-            (Usuario.correo.ilike(f'%{query}%'))
-        ).limit(10).all()
+        usuarios = autocompletar(query)
         
         usuarios_data = []
         for usuario in usuarios:
             usuarios_data.append({
                 'id': usuario.id_usuario,
-                'nombre': usuario.nombre_completo,
+                'nombre': f"{usuario.nombre} {usuario.apellido}",
                 'email': usuario.correo,
-                'rol': usuario.rol_nombre
+                'rol': usuario.rol
             })
         
         return jsonify(usuarios_data)
@@ -1827,6 +1434,8 @@ def soporte():
 
 @profesor_bp.route('/api/mis-horarios')
 @login_required
+@solo_lectura
+@respuesta_condicional(*DEPENDENCIAS_HORARIOS)
 def api_mis_horarios():
     """API para obtener los horarios compartidos del profesor."""
     try:
@@ -2501,7 +2110,7 @@ def api_crear_tarea():
                         auto_commit=False
                     )
                 except Exception as e:
-                    print(f'Error creando notificación para estudiante {est_id}: {str(e)}')
+                    logger.error('Error creando notificación para estudiante %s: %s', est_id, e)
                 
                 # Notificar a los padres del estudiante (sin commit automático)
                 try:
@@ -2520,11 +2129,11 @@ def api_crear_tarea():
                                     auto_commit=False
                                 )
                             except Exception as e:
-                                print(f'Error creando notificación para padre {padre.id_usuario}: {str(e)}')
+                                logger.error('Error creando notificación para padre %s: %s', padre.id_usuario, e)
                 except Exception as e:
-                    print(f'Error obteniendo padres del estudiante {est_id}: {str(e)}')
+                    logger.error('Error obteniendo padres del estudiante %s: %s', est_id, e)
         except ImportError:
-            print('Servicio de notificaciones no disponible')
+            logger.warning('Servicio de notificaciones no disponible')
 
         # Guardar todas las tareas y notificaciones en una sola transacción
         db.session.commit()
@@ -3004,6 +2613,35 @@ def api_configuracion_calificaciones():
 # APIs - REPORTES DE CALIFICACIONES
 # ============================================================================ #
 
+@profesor_bp.route('/api/exportar-calificaciones', methods=['GET'])
+@login_required
+def api_exportar_calificaciones():
+    """Descarga en CSV/XLSX las calificaciones del curso y asignatura seleccionados."""
+    try:
+        from services.exportacion_service import exportacion_calificaciones, respuesta_exportacion
+
+        curso_id = session.get('curso_seleccionado')
+        asignatura_id = session.get('asignatura_seleccionada')
+
+        if not curso_id or not asignatura_id:
+            return jsonify({'success': False, 'message': 'No hay curso o asignatura seleccionada'}), 400
+
+        if not verificar_acceso_curso_profesor(current_user.id_usuario, curso_id):
+            return jsonify({'success': False, 'message': 'No tienes acceso a este curso'}), 403
+
+        encabezados, filas = exportacion_calificaciones(curso_id=curso_id, asignatura_id=asignatura_id)
+        respuesta, error = respuesta_exportacion(
+            'calificaciones', encabezados, filas, request.args.get('formato', 'csv').lower()
+        )
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
+        return respuesta
+
+    except Exception as e:
+        logger.error('Error exportando calificaciones: %s', e)
+        return jsonify({'success': False, 'message': f'Error al exportar: {str(e)}'}), 500
+
+
 @profesor_bp.route('/api/generar-reporte-calificaciones', methods=['POST'])
 @login_required
 def api_generar_reporte_calificaciones():
@@ -3251,6 +2889,7 @@ def ver_eventos():
 
 @profesor_bp.route("/api/eventos", methods=["GET"])
 @login_required
+@solo_lectura
 def api_eventos_profesor():
     try:
         # Filtrar por rol del usuario logueado
@@ -3269,7 +2908,7 @@ def api_eventos_profesor():
 
         return jsonify(resultado), 200
     except Exception as e:
-        print(f"Error en api_eventos_profesor: {str(e)}")
+        logger.error('Error en api_eventos_profesor: %s', e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -3535,12 +3174,12 @@ def crear_notificacion_profesor(usuario_id, titulo, mensaje, tipo="sistema", lin
         )
         db.session.add(notificacion)
         db.session.commit()
-        print(f"✅ Notificación creada para profesor {usuario_id}")
+        logger.debug('✅ Notificación creada para profesor %s', usuario_id)
         return True
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error creando notificación: {e}")
+        logger.error('❌ Error creando notificación: %s', e)
         return False
 
 def get_sidebar_counts_profesor():
@@ -3575,7 +3214,7 @@ def get_sidebar_counts_profesor():
         }
         
     except Exception as e:
-        print(f"❌ Error en get_sidebar_counts_profesor: {e}")
+        logger.error('❌ Error en get_sidebar_counts_profesor: %s', e)
         return {
             'unread_messages': 0,
             'unread_notifications': 0,
@@ -3778,7 +3417,7 @@ def api_profesor_mis_cursos():
         })
         
     except Exception as e:
-        print(f"Error obteniendo cursos del profesor: {e}")
+        logger.error('Error obteniendo cursos del profesor: %s', e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -3812,24 +3451,16 @@ def api_profesor_estudiantes_curso(curso_id):
             Usuario.estado_cuenta == 'activa'
         ).order_by(Usuario.nombre, Usuario.apellido).all()
         
+        equipos_por_estudiante = equipos_de_estudiantes([e.id_usuario for e in estudiantes])
         estudiantes_data = []
         for estudiante in estudiantes:
-            # Obtener equipos asignados activos
-            asignaciones = AsignacionEquipo.query.filter_by(
-                estudiante_id=estudiante.id_usuario,
-                estado_asignacion='activa'
-            ).all()
-            
-            equipos_asignados = []
-            for asignacion in asignaciones:
-                if asignacion.equipo:
-                    equipos_asignados.append({
-                        'id_equipo': asignacion.equipo.id_equipo,
-                        'nombre': asignacion.equipo.nombre,
-                        'tipo': asignacion.equipo.tipo,
-                        'salon': asignacion.equipo.salon.nombre if asignacion.equipo.salon else 'Sin salón',
-                        'fecha_asignacion': asignacion.fecha_asignacion.strftime('%Y-%m-%d') if asignacion.fecha_asignacion else None
-                    })
+            equipos_asignados = [{
+                'id_equipo': equipo['id_equipo'],
+                'nombre': equipo['nombre'],
+                'tipo': equipo['tipo'],
+                'salon': equipo['salon'],
+                'fecha_asignacion': equipo['fecha_asignacion'].strftime('%Y-%m-%d') if equipo['fecha_asignacion'] else None
+            } for equipo in equipos_por_estudiante[estudiante.id_usuario]]
             
             estudiantes_data.append({
                 'id_usuario': estudiante.id_usuario,
@@ -3846,7 +3477,7 @@ def api_profesor_estudiantes_curso(curso_id):
         })
         
     except Exception as e:
-        print(f"Error obteniendo estudiantes: {e}")
+        logger.error('Error obteniendo estudiantes: %s', e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -3862,43 +3493,14 @@ def api_profesor_equipos_disponibles():
             return jsonify({'success': False, 'error': 'No autorizado'}), 403
 
         salon_id = request.args.get('salon_id', type=int)
-        curso_id = request.args.get('curso_id', type=int)  # Agregado: filtro por curso
-        
-        query = Equipo.query.filter_by(estado='Disponible')
-        
-        if salon_id:
-            query = query.filter_by(id_salon_fk=salon_id)
-        
-        #if curso_id:
-        # Filtrar por salas asociadas al curso (usando HorarioCurso y Salon)
-        #    salas_del_curso = db.session.query(Salon.id_salon).join(HorarioCurso).filter(
-        #        HorarioCurso.curso_id == curso_id
-        #    ).distinct().subquery()
-        #    query = query.filter(Equipo.id_salon_fk.in_(salas_del_curso))
-        
-        equipos = query.all()
-        
-        equipos_data = []
-        for equipo in equipos:
-            salon_nombre = equipo.salon.nombre if equipo.salon else 'Sin salón'  # Corregido: relación
-            sede_nombre = equipo.salon.sede.nombre if equipo.salon and equipo.salon.sede else 'Sin sede'  # Corregido
-            equipos_data.append({
-                'id_equipo': equipo.id_equipo,
-                'nombre': equipo.nombre,
-                'tipo': equipo.tipo,
-                'id_referencia': equipo.id_referencia,
-                'salon_id': equipo.id_salon_fk,  # Agregado
-                'salon': salon_nombre,  # Agregado
-                'sede': sede_nombre  # Agregado
-            })
         
         return jsonify({
             'success': True,
-            'equipos': equipos_data
+            'equipos': equipos_disponibles(salon_id)
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error obteniendo equipos: {e}")
+        logger.error('Error obteniendo equipos: %s', e)
         return jsonify({'success': False, 'error': str(e)}), 500
        
 @profesor_bp.route('/api/devolver-equipo', methods=['POST'])
@@ -3916,22 +3518,9 @@ def api_profesor_devolver_equipo():
         if not estudiante_id or not equipo_id:
             return jsonify({'success': False, 'error': 'Faltan datos'}), 400
 
-        asignacion = AsignacionEquipo.query.filter_by(
-            estudiante_id=estudiante_id,
-            equipo_id=equipo_id,
-            estado_asignacion='activa'
-        ).first()
-
-        if not asignacion:
-            return jsonify({'success': False, 'error': 'Asignación no encontrada'}), 404
-
-        # Liberar el equipo
-        equipo = asignacion.equipo
-        equipo.estado = 'Disponible'
-
-        # Borrar la asignación
-        db.session.delete(asignacion)
-        db.session.commit()
+        equipo, error = devolver_equipo(equipo_id, estudiante_id)
+        if error:
+            return jsonify({'success': False, 'error': error}), 404
 
         return jsonify({
             'success': True,
@@ -3940,7 +3529,7 @@ def api_profesor_devolver_equipo():
 
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error devolviendo equipo: {e}")
+        logger.error('Error devolviendo equipo: %s', e)
         return jsonify({'success': False, 'error': str(e)}), 500
       
 @profesor_bp.route('/api/cursos', methods=['GET'])
@@ -3957,7 +3546,7 @@ def obtener_cursos_profesor():
 
         return jsonify({"success": True, "cursos": data})
     except Exception as e:
-        print(f"Error al obtener los cursos: {e}")
+        logger.error('Error al obtener los cursos: %s', e)
         return jsonify({"success": False, "error": str(e)}), 500
     
 @profesor_bp.route('/api/estudiantes-curso/<int:curso_id>', methods=['GET'])
@@ -3970,25 +3559,17 @@ def api_estudiantes_curso(curso_id):
 
         estudiantes = obtener_estudiantes_por_curso(curso_id)
         
+        equipos_por_estudiante = equipos_de_estudiantes([est.id_usuario for est in estudiantes])
         estudiantes_data = []
         for est in estudiantes:
-            # Obtener asignaciones activas del estudiante
-            asignaciones_activas = AsignacionEquipo.query.filter_by(
-                estudiante_id=est.id_usuario,
-                estado_asignacion='activa'
-            ).all()
-            
-            equipos_asignados = []
-            for asig in asignaciones_activas:
-                equipo = asig.equipo
-                equipos_asignados.append({
-                    'id_asignacion': asig.id_asignacion,
-                    'id_equipo': equipo.id_equipo,
-                    'nombre': equipo.nombre,
-                    'tipo': equipo.tipo,
-                    'id_referencia': equipo.id_referencia,
-                    'fecha_asignacion': asig.fecha_asignacion.strftime('%Y-%m-%d %H:%M')
-                })
+            equipos_asignados = [{
+                'id_asignacion': equipo['id_asignacion'],
+                'id_equipo': equipo['id_equipo'],
+                'nombre': equipo['nombre'],
+                'tipo': equipo['tipo'],
+                'id_referencia': equipo['id_referencia'],
+                'fecha_asignacion': equipo['fecha_asignacion'].strftime('%Y-%m-%d %H:%M') if equipo['fecha_asignacion'] else None
+            } for equipo in equipos_por_estudiante[est.id_usuario]]
             
             estudiantes_data.append({
                 'id_usuario': est.id_usuario,
@@ -4004,7 +3585,7 @@ def api_estudiantes_curso(curso_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error cargando estudiantes y equipos: {e}")
+        logger.error('Error cargando estudiantes y equipos: %s', e)
         return jsonify({'success': False, 'error': f'Error del servidor: {str(e)}'}), 500
     
 @profesor_bp.route('/api/asignar-equipo', methods=['POST'])
@@ -4023,47 +3604,55 @@ def api_profesor_asignar_equipo():
         if not estudiante_id or not equipo_id:
             return jsonify({'success': False, 'error': 'Faltan datos'}), 400
 
-        equipo = Equipo.query.get(equipo_id)
-        if not equipo:
-            return jsonify({'success': False, 'error': 'Equipo no existe'}), 404
+        asignacion, error = asignar_equipo(equipo_id, estudiante_id, observaciones)
+        if error:
+            return jsonify({'success': False, 'error': error}), 404 if error == 'Equipo no existe' else 400
 
-        # REGLA 1: El equipo debe estar DISPONIBLE
-        if equipo.estado != 'Disponible':
-            return jsonify({'success': False, 'error': f'Equipo "{equipo.nombre}" ya está asignado'}), 400
+        return jsonify({
+            'success': True,
+            'message': f'Equipo "{asignacion.equipo.nombre}" asignado a {estudiante_id}'
+        })
 
-        # REGLA 2: El estudiante NO puede tener otro equipo en la MISMA SALA
-        sala_id = equipo.id_salon_fk
-        asignacion_existente = AsignacionEquipo.query.join(Equipo).filter(
-            AsignacionEquipo.estudiante_id == estudiante_id,
-            AsignacionEquipo.estado_asignacion == 'activa',
-            Equipo.id_salon_fk == sala_id
-        ).first()
+    except Exception as e:
+        db.session.rollback()
+        logger.error('Error asignando equipo: %s', e)
+        return jsonify({'success': False, 'error': str(e)}), 500
 
-        if asignacion_existente:
-            otro_equipo = asignacion_existente.equipo.nombre
-            return jsonify({'success': False, 'error': f'Ya tiene el equipo "{otro_equipo}" en esta sala'}), 400
-
-        # CREAR ASIGNACIÓN
-        nueva = AsignacionEquipo(
-            equipo_id=equipo_id,
-            estudiante_id=estudiante_id,
-            fecha_asignacion=datetime.now(),
-            estado_asignacion='activa',
-            observaciones=observaciones
-        )
-        equipo.estado = 'Asignado'
+@profesor_bp.route('/api/asignar-curso-sala', methods=['POST'])
+@login_required
+def api_profesor_asignar_curso_sala():
+    """Asigna un equipo de la sala a cada estudiante del curso, en una sola transacción."""
+    try:
+        if not current_user.es_profesor():
+            return jsonify({'success': False, 'error': 'No autorizado'}), 403
 
-        db.session.add(nueva)
-        db.session.commit()
+        data = request.get_json() or {}
+        curso_id = data.get('curso_id')
+        salon_id = data.get('salon_id')
+
+        if not curso_id or not salon_id:
+            return jsonify({'success': False, 'error': 'Faltan datos'}), 400
+
+        clase_profesor = Clase.query.filter_by(
+            profesorId=current_user.id_usuario,
+            cursoId=curso_id
+        ).first()
+        if not clase_profesor:
+            return jsonify({'success': False, 'error': 'No tienes acceso a este curso'}), 403
+
+        resultado, error = asignar_curso_a_sala(curso_id, salon_id, data.get('observaciones'))
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
 
         return jsonify({
             'success': True,
-            'message': f'Equipo "{equipo.nombre}" asignado a {estudiante_id}'
+            'message': f'{resultado["asignados"]} equipos asignados',
+            **resultado
         })
 
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error asignando equipo: {e}")
+        logger.error('Error asignando equipos al curso: %s', e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @profesor_bp.route('/api/todos-los-cursos', methods=['GET'])
@@ -4091,7 +3680,7 @@ def api_todos_los_cursos():
 
         return jsonify({"success": True, "cursos": data})
     except Exception as e:
-        current_app.logger.error(f"Error obteniendo cursos del profesor: {e}")
+        logger.error('Error obteniendo cursos del profesor: %s', e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @profesor_bp.route('/api/salas-por-curso/<int:curso_id>')
@@ -0,0 +1,103 @@
+"""
+Servicio de arranque rápido de la aplicación
+
+Cada despliegue (y cada worker de gunicorn sin preload_app) importa la
+aplicación completa. Para que el arranque no crezca con el número de rutas
+y plantillas:
+
+    - las reglas de URL compilan su constructor (el código que usa url_for)
+      la primera vez que se usan y no al registrar los blueprints: con más
+      de 300 reglas era la mayor parte del tiempo de registro;
+    - las plantillas Jinja compiladas se guardan en disco (caché de
+      bytecode) y se reutilizan entre procesos y despliegues; el comando
+      `flask precompilar-plantillas` las compila todas de antemano.
+
+Los servicios pesados y poco usados (correo con requests, imágenes con PIL,
+PDFs con reportlab, promoción, reportes) se importan dentro de las
+funciones que los usan. benchmarks/presupuesto_arranque.py comprueba que
+siga siendo así y que el arranque no supere su presupuesto.
+"""
+
+import logging
+import os
+
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.routing import Map, Rule
+
+logger = logging.getLogger(__name__)
+
+
+class ReglaDiferida(Rule):
+    """
+    Regla de URL que compila sus constructores en el primer url_for.
+
+    Sobrescribe Rule._compile_builder, que es privado en werkzeug (probado con
+    la versión fijada en requirements.txt); init_arranque comprueba que siga
+    funcionando y, si no, vuelve a la compilación normal.
+    """
+
+    def _compile_builder(self, append_unknown=True):
+        compilado = None
+
+        def construir(regla, *args, **kwargs):
+            nonlocal compilado
+            if compilado is None:
+                compilado = Rule._compile_builder(regla, append_unknown)
+            return compilado(regla, *args, **kwargs)
+
+        return construir
+
+
+def reglas_diferidas_compatibles():
+    """Comprueba con una regla de prueba que ReglaDiferida construye las mismas URL que Rule."""
+    if not callable(getattr(Rule, '_compile_builder', None)):
+        return False
+    try:
+        urls = []
+        for clase in (Rule, ReglaDiferida):
+            adaptador = Map([clase('/prueba/<int:id>', endpoint='prueba')]).bind('localhost')
+            urls.append(adaptador.build('prueba', {'id': 7, 'extra': 'x'}))
+    except Exception:
+        return False
+    return urls[0] == urls[1] == '/prueba/7?extra=x'
+
+
+def carpeta_plantillas_compiladas(app):
+    return app.config.get('PLANTILLAS_CACHE_DIR') or os.path.join(app.instance_path, 'plantillas')
+
+
+def precompilar_plantillas(app):
+    """Compila todas las plantillas y guarda su bytecode. Devuelve (compiladas, errores)."""
+    compiladas, errores = 0, []
+    for nombre in app.jinja_env.list_templates(extensions=('html', 'txt', 'xml')):
+        try:
+            app.jinja_env.get_template(nombre)
+            compiladas += 1
+        except Exception as e:
+            errores.append(f"{nombre}: {e}")
+    return compiladas, errores
+
+
+def init_arranque(app):
+    """Se llama antes de registrar los blueprints."""
+    if reglas_diferidas_compatibles():
+        app.url_rule_class = ReglaDiferida
+    else:
+        logger.warning('Esta versión de werkzeug no admite la compilación diferida de reglas de URL; '
+                       'se compilan al registrarlas')
+
+    if app.config.get('PLANTILLAS_CACHE_HABILITADA', True):
+        carpeta = carpeta_plantillas_compiladas(app)
+        try:
+            os.makedirs(carpeta, exist_ok=True)
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(carpeta)
+        except OSError as e:
+            logger.warning('Caché de plantillas deshabilitada (%s): %s', carpeta, e)
+
+    @app.cli.command('precompilar-plantillas')
+    def precompilar_plantillas_comando():
+        """Compila todas las plantillas Jinja en la caché de bytecode."""
+        compiladas, errores = precompilar_plantillas(app)
+        for error in errores:
+            logger.error('❌ %s', error)
+        logger.info('Plantillas compiladas: %s en %s', compiladas, carpeta_plantillas_compiladas(app))
@@ -0,0 +1,455 @@
+"""
+Servicio de asignación de equipos a estudiantes
+
+Las comprobaciones de disponibilidad recorrían las relaciones: una consulta
+de Matricula por asignación activa en Equipo.puede_asignar_a_curso, un JOIN
+con equipos por estudiante para la regla de un equipo por sala y el filtro
+de las asignaciones activas en Python en Usuario.get_equipos_activos.
+
+La tabla asignaciones_activas guarda una fila por asignación activa con el
+equipo, el estudiante, el salón del equipo y el curso del estudiante (el de
+su matrícula más reciente, como AsignacionEquipo.get_curso_estudiante). Sus
+restricciones únicas aplican las reglas en la base de datos, también ante
+peticiones simultáneas:
+
+    (equipo_id, estudiante_id)  una asignación activa por equipo y estudiante
+    (estudiante_id, salon_id)   un equipo por estudiante en cada sala
+    (equipo_id, curso_id)       un estudiante de cada curso por equipo
+
+y cada comprobación es una consulta por una de esas claves.
+
+El índice se mantiene con los eventos del ORM de AsignacionEquipo (alta
+activa, cambio de estado_asignacion y borrado); asignar_curso_a_sala()
+asigna un curso entero con INSERT masivos en una sola transacción y añade
+sus filas con un INSERT ... SELECT. El curso de cada fila sigue a las
+matrículas: las altas, cambios y bajas de Matricula hechas por el ORM
+(promoción, creación de estudiantes) anotan al estudiante y, antes del
+commit, actualizar_cursos() recalcula sus filas en la misma transacción.
+Las altas con SQL directo requieren `flask reindexar-asignaciones`.
+"""
+
+import logging
+from datetime import datetime
+
+from itertools import chain
+
+from sqlalchemy import and_, delete, event, func, insert, inspect, literal, select, true, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, object_session
+
+from controllers.models import AsignacionActiva, AsignacionEquipo, Equipo, Matricula, Salon, Sede, Usuario
+from extensions import SesionEnrutada, db
+
+logger = logging.getLogger(__name__)
+
+
+ESTADO_ACTIVA = 'activa'
+ROL_ESTUDIANTE = 3
+# Columnas de Matricula que deciden el curso actual del estudiante
+CAMPOS_MATRICULA = ('estudianteId', 'cursoId', 'año')
+
+
+def _curso_actual(estudiante_id):
+    """Subconsulta escalar con el curso de la matrícula más reciente (usa ix_matricula_estudiante_anio)."""
+    reciente = aliased(Matricula)
+    return (
+        select(reciente.cursoId)
+        .where(reciente.estudianteId == estudiante_id)
+        .order_by(reciente.año.desc(), reciente.id_matricula.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+# =========================================================
+#  MANTENIMIENTO DEL ÍNDICE
+# =========================================================
+
+def _indexar(conexion, asignacion):
+    conexion.execute(insert(AsignacionActiva).from_select(
+        ['asignacion_id', 'equipo_id', 'estudiante_id', 'salon_id', 'curso_id'],
+        select(literal(asignacion.id_asignacion), Equipo.id_equipo, literal(asignacion.estudiante_id),
+               Equipo.id_salon_fk, _curso_actual(asignacion.estudiante_id))
+        .where(Equipo.id_equipo == asignacion.equipo_id)
+    ))
+
+
+def _desindexar(conexion, asignacion):
+    conexion.execute(delete(AsignacionActiva).where(AsignacionActiva.asignacion_id == asignacion.id_asignacion))
+
+
+def _despues_de_insertar(mapper, conexion, asignacion):
+    if asignacion.estado_asignacion == ESTADO_ACTIVA:
+        _indexar(conexion, asignacion)
+
+
+def _despues_de_actualizar(mapper, conexion, asignacion):
+    estado = inspect(asignacion)
+    cambios = ('estado_asignacion', 'equipo_id', 'estudiante_id')
+    if not any(estado.attrs[campo].history.has_changes() for campo in cambios):
+        return
+    _desindexar(conexion, asignacion)
+    if asignacion.estado_asignacion == ESTADO_ACTIVA:
+        _indexar(conexion, asignacion)
+
+
+def _antes_de_borrar(mapper, conexion, asignacion):
+    _desindexar(conexion, asignacion)
+
+
+def _anotar_estudiantes(matricula, estudiante_ids):
+    sesion = object_session(matricula)
+    if sesion is not None:
+        sesion.info.setdefault('cursos_por_actualizar', set()).update(e for e in estudiante_ids if e is not None)
+
+
+def _matricula_insertada(mapper, conexion, matricula):
+    _anotar_estudiantes(matricula, [matricula.estudianteId])
+
+
+def _matricula_actualizada(mapper, conexion, matricula):
+    estado = inspect(matricula)
+    if any(estado.attrs[campo].history.has_changes() for campo in CAMPOS_MATRICULA):
+        # Si cambió de estudiante, el anterior también pierde esta matrícula
+        anteriores = estado.attrs.estudianteId.history.deleted or ()
+        _anotar_estudiantes(matricula, [matricula.estudianteId, *anteriores])
+
+
+def _matricula_borrada(mapper, conexion, matricula):
+    _anotar_estudiantes(matricula, [matricula.estudianteId])
+
+
+def _actualizar_antes_de_commit(sesion):
+    # Las matrículas pendientes se anotan al volcarse: se vuelcan ya para
+    # recalcular los cursos en esta misma transacción
+    if any(isinstance(obj, Matricula) for obj in chain(sesion.new, sesion.dirty, sesion.deleted)):
+        sesion.flush()
+    estudiante_ids = sesion.info.pop('cursos_por_actualizar', None)
+    if estudiante_ids:
+        actualizar_cursos(sorted(estudiante_ids), sesion)
+
+
+def _descartar_tras_rollback(sesion):
+    sesion.info.pop('cursos_por_actualizar', None)
+
+
+def _indexar_activas(sesion, filtro):
+    """
+    INSERT ... SELECT de las asignaciones activas que cumplen `filtro`; las
+    que incumplen una regla se omiten (se conserva la más antigua).
+    Devuelve (indexadas, omitidas).
+    """
+    resultado = sesion.execute(
+        insert(AsignacionActiva)
+        .prefix_with('OR IGNORE', dialect='sqlite')
+        .prefix_with('IGNORE', dialect='mysql')
+        .from_select(
+            ['asignacion_id', 'equipo_id', 'estudiante_id', 'salon_id', 'curso_id'],
+            select(AsignacionEquipo.id_asignacion, AsignacionEquipo.equipo_id, AsignacionEquipo.estudiante_id,
+                   Equipo.id_salon_fk, _curso_actual(AsignacionEquipo.estudiante_id))
+            .join(Equipo, Equipo.id_equipo == AsignacionEquipo.equipo_id)
+            .where(AsignacionEquipo.estado_asignacion == ESTADO_ACTIVA, filtro)
+            .order_by(AsignacionEquipo.id_asignacion)
+        )
+    )
+    activas = sesion.execute(
+        select(func.count()).where(AsignacionEquipo.estado_asignacion == ESTADO_ACTIVA, filtro)
+    ).scalar()
+    return resultado.rowcount, activas - resultado.rowcount
+
+
+def reconstruir_indice():
+    """
+    Vuelve a generar asignaciones_activas con un INSERT ... SELECT.
+
+    Si los datos existentes incumplen alguna regla, se conserva la
+    asignación más antigua y se avisa en el log.
+
+    Returns:
+        tuple: (asignaciones indexadas, asignaciones activas omitidas)
+    """
+    db.session.execute(delete(AsignacionActiva))
+    indexadas, omitidas = _indexar_activas(db.session, true())
+    db.session.commit()
+    if omitidas:
+        logger.warning('%s asignaciones activas incumplen las reglas de asignación y no se indexaron', omitidas)
+    return indexadas, omitidas
+
+
+def indice_vacio():
+    """True si asignaciones_activas está vacía pero hay asignaciones activas que indexar."""
+    if db.session.execute(select(AsignacionActiva.asignacion_id).limit(1)).first() is not None:
+        return False
+    return db.session.execute(
+        select(AsignacionEquipo.id_asignacion).where(AsignacionEquipo.estado_asignacion == ESTADO_ACTIVA).limit(1)
+    ).first() is not None
+
+
+def actualizar_cursos(estudiante_ids=None, sesion=None):
+    """
+    Recalcula curso_id tras cambiar matrículas. Sin estudiante_ids, para
+    todo el índice. No hace commit.
+
+    Las filas de los estudiantes se vuelven a indexar con su curso actual;
+    si con el curso nuevo dos estudiantes del mismo curso comparten equipo,
+    se conserva la asignación más antigua y se avisa en el log, como en
+    reconstruir_indice().
+
+    Returns:
+        tuple: (asignaciones indexadas, asignaciones activas omitidas)
+    """
+    sesion = sesion or db.session
+    indice = AsignacionActiva.estudiante_id.in_(estudiante_ids) if estudiante_ids is not None else true()
+    asignaciones = AsignacionEquipo.estudiante_id.in_(estudiante_ids) if estudiante_ids is not None else true()
+    sesion.execute(delete(AsignacionActiva).where(indice))
+    indexadas, omitidas = _indexar_activas(sesion, asignaciones)
+    if omitidas:
+        logger.warning('%s asignaciones activas incumplen las reglas con el curso nuevo del estudiante '
+                       'y dejan de indexarse', omitidas)
+    return indexadas, omitidas
+
+
+# =========================================================
+#  CONSULTAS
+# =========================================================
+
+def asignacion_en_sala(estudiante_id, salon_id, excluir_equipo_id=None):
+    """
+    Equipo que el estudiante ya tiene asignado en la sala, o None.
+
+    Returns:
+        Row (equipo_id, nombre, salon) o None
+    """
+    sentencia = (
+        select(Equipo.id_equipo.label('equipo_id'), Equipo.nombre, Salon.nombre.label('salon'))
+        .select_from(AsignacionActiva)
+        .join(Equipo, Equipo.id_equipo == AsignacionActiva.equipo_id)
+        .join(Salon, Salon.id_salon == AsignacionActiva.salon_id)
+        .where(AsignacionActiva.estudiante_id == estudiante_id, AsignacionActiva.salon_id == salon_id)
+    )
+    if excluir_equipo_id:
+        sentencia = sentencia.where(AsignacionActiva.equipo_id != excluir_equipo_id)
+    return db.session.execute(sentencia).first()
+
+
+def equipo_libre(equipo_id):
+    """True si el equipo no tiene ninguna asignación activa."""
+    return db.session.execute(
+        select(AsignacionActiva.asignacion_id).where(AsignacionActiva.equipo_id == equipo_id).limit(1)
+    ).first() is None
+
+
+def equipos_disponibles(salon_id=None):
+    """
+    Equipos en estado Disponible sin asignaciones activas, con su salón y
+    sede, en una consulta.
+
+    Returns:
+        list[dict]
+    """
+    sentencia = (
+        select(Equipo.id_equipo, Equipo.nombre, Equipo.tipo, Equipo.id_referencia, Equipo.id_salon_fk,
+               Salon.nombre.label('salon'), Sede.nombre.label('sede'))
+        .outerjoin(Salon, Salon.id_salon == Equipo.id_salon_fk)
+        .outerjoin(Sede, Sede.id_sede == Salon.id_sede_fk)
+        .where(Equipo.estado == 'Disponible', Equipo.id_equipo.not_in(select(AsignacionActiva.equipo_id)))
+        .order_by(Equipo.id_equipo)
+    )
+    if salon_id:
+        sentencia = sentencia.where(Equipo.id_salon_fk == salon_id)
+    return [{
+        'id_equipo': fila.id_equipo,
+        'nombre': fila.nombre,
+        'tipo': fila.tipo,
+        'id_referencia': fila.id_referencia,
+        'salon_id': fila.id_salon_fk,
+        'salon': fila.salon or 'Sin salón',
+        'sede': fila.sede or 'Sin sede'
+    } for fila in db.session.execute(sentencia)]
+
+
+def equipos_de_estudiantes(estudiante_ids):
+    """
+    Equipos asignados a cada estudiante, en una consulta.
+
+    Returns:
+        dict: estudiante_id -> lista de dicts (ordenada por asignación)
+    """
+    resultado = {estudiante_id: [] for estudiante_id in estudiante_ids}
+    if not estudiante_ids:
+        return resultado
+    filas = db.session.execute(
+        select(AsignacionActiva.estudiante_id, AsignacionEquipo.id_asignacion, AsignacionEquipo.fecha_asignacion,
+               Equipo.id_equipo, Equipo.nombre, Equipo.tipo, Equipo.id_referencia, Salon.nombre.label('salon'))
+        .join(AsignacionEquipo, AsignacionEquipo.id_asignacion == AsignacionActiva.asignacion_id)
+        .join(Equipo, Equipo.id_equipo == AsignacionActiva.equipo_id)
+        .join(Salon, Salon.id_salon == AsignacionActiva.salon_id)
+        .where(AsignacionActiva.estudiante_id.in_(list(estudiante_ids)))
+        .order_by(AsignacionActiva.asignacion_id)
+    )
+    for fila in filas:
+        resultado[fila.estudiante_id].append({
+            'id_asignacion': fila.id_asignacion,
+            'id_equipo': fila.id_equipo,
+            'nombre': fila.nombre,
+            'tipo': fila.tipo,
+            'id_referencia': fila.id_referencia,
+            'salon': fila.salon or 'Sin salón',
+            'fecha_asignacion': fila.fecha_asignacion
+        })
+    return resultado
+
+
+# =========================================================
+#  ASIGNACIÓN Y DEVOLUCIÓN
+# =========================================================
+
+def mensaje_conflicto(error):
+    texto = str(getattr(error, 'orig', error))
+    if 'estudiante_salon' in texto or 'salon_id' in texto:
+        return 'El estudiante ya tiene un equipo asignado en esta sala.'
+    if 'equipo_curso' in texto or 'curso_id' in texto:
+        return 'El equipo ya está asignado a un estudiante de ese curso.'
+    return 'El equipo ya está asignado a ese estudiante.'
+
+
+def asignar_equipo(equipo_id, estudiante_id, observaciones=None):
+    """
+    Asigna un equipo Disponible a un estudiante y lo marca como Asignado.
+
+    Returns:
+        tuple: (AsignacionEquipo, None) o (None, mensaje de error)
+    """
+    equipo = db.session.get(Equipo, equipo_id)
+    if not equipo:
+        return None, 'Equipo no existe'
+    if equipo.estado != 'Disponible' or not equipo_libre(equipo_id):
+        return None, f'Equipo "{equipo.nombre}" ya está asignado'
+
+    otro = asignacion_en_sala(estudiante_id, equipo.id_salon_fk)
+    if otro:
+        return None, f'Ya tiene el equipo "{otro.nombre}" en esta sala'
+
+    asignacion = AsignacionEquipo(
+        equipo_id=equipo_id,
+        estudiante_id=estudiante_id,
+        fecha_asignacion=datetime.now(),
+        estado_asignacion=ESTADO_ACTIVA,
+        observaciones=observaciones
+    )
+    equipo.estado = 'Asignado'
+    db.session.add(asignacion)
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        # Otra petición asignó el equipo o la sala entre la comprobación y el commit
+        db.session.rollback()
+        return None, mensaje_conflicto(e)
+    return asignacion, None
+
+
+def devolver_equipo(equipo_id, estudiante_id):
+    """
+    Borra la asignación activa y deja el equipo Disponible si no le quedan
+    otras.
+
+    Returns:
+        tuple: (Equipo, None) o (None, mensaje de error)
+    """
+    asignacion = AsignacionEquipo.query.filter_by(
+        estudiante_id=estudiante_id,
+        equipo_id=equipo_id,
+        estado_asignacion=ESTADO_ACTIVA
+    ).first()
+    if not asignacion:
+        return None, 'Asignación no encontrada'
+
+    equipo = asignacion.equipo
+    db.session.delete(asignacion)
+    db.session.flush()
+    if equipo_libre(equipo_id):
+        equipo.estado = 'Disponible'
+    db.session.commit()
+    return equipo, None
+
+
+def asignar_curso_a_sala(curso_id, salon_id, observaciones=None):
+    """
+    Asigna a cada estudiante activo del curso un equipo Disponible de la
+    sala, en una sola transacción: o se asignan todos o ninguno.
+
+    Se omiten los estudiantes que ya tienen equipo en la sala. Los equipos
+    se reparten por orden de id_equipo entre los estudiantes ordenados por
+    apellido y nombre.
+
+    Returns:
+        tuple: (dict con 'asignados' y 'ya_asignados', None) o (None, mensaje de error)
+    """
+    if not db.session.get(Salon, salon_id):
+        return None, 'La sala no existe.'
+
+    matriculados = (
+        select(Matricula.estudianteId)
+        .join(Usuario, Usuario.id_usuario == Matricula.estudianteId)
+        .where(Matricula.cursoId == curso_id, Usuario.id_rol_fk == ROL_ESTUDIANTE, Usuario.estado_cuenta == 'activa',
+               _curso_actual(Matricula.estudianteId) == curso_id)
+    )
+    filas = db.session.execute(
+        select(Usuario.id_usuario, AsignacionActiva.asignacion_id)
+        .outerjoin(AsignacionActiva, and_(AsignacionActiva.estudiante_id == Usuario.id_usuario,
+                                          AsignacionActiva.salon_id == salon_id))
+        .where(Usuario.id_usuario.in_(matriculados))
+        .order_by(Usuario.apellido, Usuario.nombre, Usuario.id_usuario)
+    ).all()
+    estudiantes = [id_usuario for id_usuario, asignacion_id in filas if asignacion_id is None]
+    ya_asignados = len(filas) - len(estudiantes)
+    if not estudiantes:
+        return {'asignados': 0, 'ya_asignados': ya_asignados}, None
+
+    equipos = db.session.execute(
+        select(Equipo.id_equipo)
+        .where(Equipo.id_salon_fk == salon_id, Equipo.estado == 'Disponible',
+               Equipo.id_equipo.not_in(select(AsignacionActiva.equipo_id)))
+        .order_by(Equipo.id_equipo)
+        .limit(len(estudiantes))
+    ).scalars().all()
+    if len(equipos) < len(estudiantes):
+        return None, f'La sala tiene {len(equipos)} equipos disponibles para {len(estudiantes)} estudiantes.'
+
+    ahora = datetime.now()
+    try:
+        db.session.execute(insert(AsignacionEquipo.__table__), [{
+            'equipo_id': equipo_id, 'estudiante_id': estudiante_id, 'fecha_asignacion': ahora,
+            'estado_asignacion': ESTADO_ACTIVA, 'observaciones': observaciones
+        } for equipo_id, estudiante_id in zip(equipos, estudiantes)])
+        db.session.execute(insert(AsignacionActiva).from_select(
+            ['asignacion_id', 'equipo_id', 'estudiante_id', 'salon_id', 'curso_id'],
+            select(AsignacionEquipo.id_asignacion, AsignacionEquipo.equipo_id, AsignacionEquipo.estudiante_id,
+                   literal(salon_id), literal(curso_id))
+            .where(AsignacionEquipo.equipo_id.in_(equipos), AsignacionEquipo.estado_asignacion == ESTADO_ACTIVA)
+        ))
+        db.session.execute(update(Equipo).where(Equipo.id_equipo.in_(equipos)).values(estado='Asignado'))
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return None, mensaje_conflicto(e)
+    return {'asignados': len(estudiantes), 'ya_asignados': ya_asignados}, None
+
+
+def init_asignaciones(app):
+    """Mantiene asignaciones_activas al día con los cambios de AsignacionEquipo y Matricula hechos por el ORM."""
+    event.listen(AsignacionEquipo, 'after_insert', _despues_de_insertar)
+    event.listen(AsignacionEquipo, 'after_update', _despues_de_actualizar)
+    event.listen(AsignacionEquipo, 'before_delete', _antes_de_borrar)
+    event.listen(Matricula, 'after_insert', _matricula_insertada)
+    event.listen(Matricula, 'after_update', _matricula_actualizada)
+    event.listen(Matricula, 'after_delete', _matricula_borrada)
+    event.listen(SesionEnrutada, 'before_commit', _actualizar_antes_de_commit)
+    event.listen(SesionEnrutada, 'after_rollback', _descartar_tras_rollback)
+
+    @app.cli.command('reindexar-asignaciones')
+    def reindexar_asignaciones_comando():
+        """Crea (si falta) y regenera el índice de asignaciones activas."""
+        AsignacionActiva.__table__.create(db.engine, checkfirst=True)
+        indexadas, omitidas = reconstruir_indice()
+        logger.info('Asignaciones activas: %s indexadas, %s omitidas', indexadas, omitidas)
@@ -0,0 +1,330 @@
+"""
+Servicio de autocompletado de destinatarios
+
+/api/usuarios/buscar se llama en cada pulsación al escribir un mensaje.
+Cada worker guarda en memoria un índice de prefijos de los usuarios activos
+y responde sin consultar la base de datos:
+
+    tokens  lista ordenada de palabras normalizadas (las de
+            busqueda_service.tokens_usuario: nombre, apellido, correo completo
+            y palabras de la parte local del correo; sin el documento)
+    ids     array paralelo con el usuario de cada palabra
+    usuarios {id: (Completado, ' palabras del usuario ')}
+
+Un prefijo es un rango [bisect(prefijo), bisect(fin_de_prefijo)) de `tokens`
+y la palabra exacta es la primera del rango. Con varias palabras, los
+candidatos salen del rango más estrecho y el resto se comprueba con una
+búsqueda de subcadena (' jos' in ' jose perez ... '). Las palabras repetidas
+entre usuarios ("jose", "garcia") comparten el mismo objeto str.
+
+El índice es inmutable: un hilo de fondo por worker construye uno nuevo y
+lo sustituye de una vez, así las búsquedas nunca ven un estado a medias.
+    - Al arrancar el worker (post_worker_init de gunicorn, o la primera
+      petición con el servidor de desarrollo) se construye entero.
+    - Cada AUTOCOMPLETADO_INTERVALO segundos lee usuario_cambios (una fila por
+      usuario creado, editado o borrado con el ORM) y recarga solo esos
+      usuarios.
+    - Cada AUTOCOMPLETADO_RECONSTRUIR segundos se reconstruye entero, lo que
+      recoge también las altas masivas hechas con SQL directo.
+Mientras el índice no está listo (y en el perfil memoria, cuya única
+conexión no admite un hilo de fondo) se usa busqueda_service.
+
+Memoria por worker (benchmarks/autocompletado_usuarios.py, tracemalloc,
+20.000 usuarios activos con ~100.000 palabras): unos 15 MB. La lista
+`tokens` y el array `ids` ocupan 1,5 MB; el resto son las cadenas de cada
+usuario (nombre, apellido, correo y sus palabras) y el diccionario. Crece
+de forma lineal con el número de usuarios.
+"""
+
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+
+from controllers.models import Rol, Usuario, UsuarioCambio
+from extensions import db
+from services.base_datos_service import pool_de_fondo
+from services.busqueda_service import buscar_usuarios, fin_de_prefijo, tokens_consulta, tokens_usuario
+
+logger = logging.getLogger(__name__)
+
+
+CAMPOS_VIGILADOS = ('nombre', 'apellido', 'correo', 'estado_cuenta', 'id_rol_fk')
+# Los id_cambio de transacciones concurrentes pueden confirmarse en desorden:
+# se vuelven a leer los últimos VENTANA_CAMBIOS y se saltan los ya aplicados.
+VENTANA_CAMBIOS = 200
+# Con más cambios pendientes sale más barato reconstruir el índice entero
+MAXIMO_CAMBIOS_INCREMENTALES = 2000
+RETENCION_CAMBIOS = timedelta(days=1)
+ESPERA_TRAS_ERROR = 30
+
+Completado = namedtuple('Completado', 'id_usuario nombre apellido correo rol')
+
+_estado = {
+    'indice': None,
+    'pid': None,
+    'ultimo_cambio': 0,
+    'aplicados': set(),
+    'reconstruido': 0.0,
+}
+_cerrojo = threading.Lock()
+
+
+# =========================================================
+#  ÍNDICE
+# =========================================================
+
+class IndiceAutocompletado:
+    """Índice de prefijos inmutable sobre los usuarios activos."""
+
+    __slots__ = ('tokens', 'ids', 'usuarios')
+
+    def __init__(self, usuarios, tokens=None, ids=None):
+        self.usuarios = usuarios
+        if tokens is None:
+            compartidas = {}
+            pares = sorted((compartidas.setdefault(token, token), id_usuario)
+                           for id_usuario, (_, palabras) in usuarios.items() for token in palabras.split())
+            tokens = [token for token, _ in pares]
+            ids = array('l', (id_usuario for _, id_usuario in pares))
+        self.tokens = tokens
+        self.ids = ids
+
+    def con_cambios(self, cambios):
+        """
+        Copia del índice con los usuarios de `cambios` sustituidos.
+
+        Args:
+            cambios: {id_usuario: (Completado, palabras)} o None para quitarlo
+        """
+        usuarios = dict(self.usuarios)
+        tokens, ids = [], array('l')
+        for token, id_usuario in zip(self.tokens, self.ids):
+            if id_usuario not in cambios:
+                tokens.append(token)
+                ids.append(id_usuario)
+        for id_usuario, entrada in cambios.items():
+            if entrada is None:
+                usuarios.pop(id_usuario, None)
+                continue
+            usuarios[id_usuario] = entrada
+            for token in entrada[1].split():
+                posicion = bisect_left(tokens, token)
+                tokens.insert(posicion, token)
+                ids.insert(posicion, id_usuario)
+        return IndiceAutocompletado(usuarios, tokens, ids)
+
+    def buscar(self, texto, roles=None, limite=10):
+        """Hasta `limite` Completado que casan con `texto` (ver busqueda_service.tokens_consulta)."""
+        palabras = tokens_consulta(texto)
+        if not palabras:
+            return []
+        # Los candidatos salen del rango más estrecho de todas las palabras
+        rangos = []
+        for palabra in palabras:
+            inicio = bisect_left(self.tokens, palabra)
+            rangos.append((bisect_left(self.tokens, fin_de_prefijo(palabra), inicio) - inicio, inicio))
+        tamano, inicio = min(rangos)
+        fin = inicio + tamano
+        resto = palabras[1:]
+        claves = [(f' {p} ', f' {p}') for p in palabras]
+
+        encontrados, vistos = [], set()
+        for posicion in range(inicio, fin):
+            id_usuario = self.ids[posicion]
+            if id_usuario in vistos:
+                continue
+            vistos.add(id_usuario)
+            completado, texto_usuario = self.usuarios[id_usuario]
+            if roles and completado.rol not in roles:
+                continue
+            if not resto:
+                encontrados.append(completado)
+                if len(encontrados) >= limite:
+                    break
+                continue
+            puntaje = 0
+            for exacta, prefijo in claves:
+                if exacta in texto_usuario:
+                    puntaje += 3
+                elif prefijo in texto_usuario:
+                    puntaje += 1
+                else:
+                    break
+            else:
+                encontrados.append((puntaje, completado))
+
+        if resto:
+            encontrados.sort(key=lambda e: (-e[0], e[1].apellido, e[1].nombre))
+            encontrados = [completado for _, completado in encontrados[:limite]]
+        return encontrados
+
+
+def _cargar_usuarios(ids=None):
+    """{id: (Completado, ' palabras ')} de los usuarios activos (de `ids`, si se indica)."""
+    sentencia = (
+        select(Usuario.id_usuario, Usuario.nombre, Usuario.apellido, Usuario.correo, Rol.nombre)
+        .join(Rol, Rol.id_rol == Usuario.id_rol_fk)
+        .where(Usuario.estado_cuenta == 'activa')
+    )
+    if ids is not None:
+        sentencia = sentencia.where(Usuario.id_usuario.in_(list(ids)))
+    compartidas = {}
+    usuarios = {}
+    for id_usuario, nombre, apellido, correo, rol in db.session.execute(sentencia):
+        palabras = f" {' '.join(sorted(tokens_usuario(nombre, apellido, '', correo)))} "
+        completado = Completado(id_usuario, nombre, apellido, correo, compartidas.setdefault(rol, rol))
+        usuarios[id_usuario] = (completado, palabras)
+    return usuarios
+
+
+# =========================================================
+#  ACTUALIZACIÓN
+# =========================================================
+
+def _cambios_recientes():
+    """[(id_cambio, id_usuario)] confirmados desde el último leído (con margen)."""
+    return db.session.execute(
+        select(UsuarioCambio.id_cambio, UsuarioCambio.id_usuario)
+        .where(UsuarioCambio.id_cambio > _estado['ultimo_cambio'] - VENTANA_CAMBIOS)
+        .order_by(UsuarioCambio.id_cambio)
+    ).all()
+
+
+def _marcar_aplicados(cambios):
+    if cambios:
+        _estado['ultimo_cambio'] = max(_estado['ultimo_cambio'], cambios[-1][0])
+    limite = _estado['ultimo_cambio'] - VENTANA_CAMBIOS
+    _estado['aplicados'] = {c for c in _estado['aplicados'] if c > limite}
+    _estado['aplicados'].update(id_cambio for id_cambio, _ in cambios)
+
+
+def reconstruir():
+    """Construye el índice entero y purga los cambios antiguos. Devuelve el índice."""
+    inicio = time.perf_counter()
+    # Los cambios se leen antes que los usuarios: si llega uno entre medias,
+    # se vuelve a aplicar en el siguiente refresco.
+    _estado['ultimo_cambio'] = db.session.execute(select(func.max(UsuarioCambio.id_cambio))).scalar() or 0
+    _estado['aplicados'] = set()
+    _marcar_aplicados(_cambios_recientes())
+    indice = IndiceAutocompletado(_cargar_usuarios())
+    _estado['indice'] = indice
+    _estado['reconstruido'] = time.monotonic()
+
+    db.session.execute(delete(UsuarioCambio).where(UsuarioCambio.creado_en < datetime.utcnow() - RETENCION_CAMBIOS))
+    db.session.commit()
+    logger.info('Autocompletado: %s usuarios, %s palabras en %.0f ms',
+                len(indice.usuarios), len(indice.tokens), (time.perf_counter() - inicio) * 1000)
+    return indice
+
+
+def refrescar():
+    """Aplica los cambios de usuarios pendientes. Devuelve cuántos usuarios se recargaron."""
+    pendientes = [(c, u) for c, u in _cambios_recientes() if c not in _estado['aplicados']]
+    if not pendientes:
+        return 0
+    ids = {id_usuario for _, id_usuario in pendientes}
+    if len(ids) > MAXIMO_CAMBIOS_INCREMENTALES:
+        reconstruir()
+        return len(ids)
+    cargados = _cargar_usuarios(ids)
+    _estado['indice'] = _estado['indice'].con_cambios({i: cargados.get(i) for i in ids})
+    _marcar_aplicados(pendientes)
+    logger.debug('Autocompletado: %s usuarios actualizados', len(ids))
+    return len(ids)
+
+
+def _bucle(app):
+    intervalo = app.config.get('AUTOCOMPLETADO_INTERVALO', 2.0)
+    reconstruir_cada = app.config.get('AUTOCOMPLETADO_RECONSTRUIR', 3600)
+    while True:
+        espera = intervalo
+        with app.app_context(), pool_de_fondo():
+            try:
+                if _estado['indice'] is None or time.monotonic() - _estado['reconstruido'] >= reconstruir_cada:
+                    reconstruir()
+                else:
+                    refrescar()
+            except Exception as e:
+                logger.warning('Autocompletado: no se pudo actualizar el índice: %s', e)
+                espera = max(intervalo, ESPERA_TRAS_ERROR)
+            finally:
+                db.session.remove()
+        time.sleep(espera)
+
+
+def iniciar_autocompletado(app):
+    """
+    Arranca el hilo del índice en este proceso si aún no lo tiene. Tras un
+    fork el hilo del padre no existe en el hijo: se arranca otro, que parte
+    del índice heredado si lo había.
+    """
+    if _estado['pid'] == os.getpid() or not _habilitado(app):
+        return
+    with _cerrojo:
+        if _estado['pid'] == os.getpid():
+            return
+        _estado['pid'] = os.getpid()
+        threading.Thread(target=_bucle, args=(app,), name='autocompletado', daemon=True).start()
+
+
+def _habilitado(app):
+    return app.config.get('AUTOCOMPLETADO_HABILITADO', True) and app.config.get('DB_PERFIL') != 'memoria'
+
+
+# =========================================================
+#  BÚSQUEDA
+# =========================================================
+
+def autocompletar(texto, roles=None, limite=10):
+    """
+    Usuarios activos cuyo nombre o correo casa con `texto`, desde el índice
+    en memoria. Mientras no está listo, se consulta busqueda_service.
+
+    Returns:
+        list: objetos con id_usuario, nombre, apellido, correo y rol
+    """
+    indice = _estado['indice']
+    if indice is None:
+        return buscar_usuarios(texto, roles=roles, solo_activos=True, limite=limite)
+    return indice.buscar(texto, roles, limite)
+
+
+# =========================================================
+#  REGISTRO DE CAMBIOS
+# =========================================================
+
+def _registrar_cambio(conexion, usuario):
+    conexion.execute(insert(UsuarioCambio).values(id_usuario=usuario.id_usuario, creado_en=datetime.utcnow()))
+
+
+def _despues_de_insertar(mapper, conexion, usuario):
+    _registrar_cambio(conexion, usuario)
+
+
+def _despues_de_actualizar(mapper, conexion, usuario):
+    estado = inspect(usuario)
+    if any(estado.attrs[campo].history.has_changes() for campo in CAMPOS_VIGILADOS):
+        _registrar_cambio(conexion, usuario)
+
+
+def _despues_de_borrar(mapper, conexion, usuario):
+    _registrar_cambio(conexion, usuario)
+
+
+def init_autocompletado(app):
+    """Registra los cambios de Usuario y arranca el índice en la primera petición de cada proceso."""
+    event.listen(Usuario, 'after_insert', _despues_de_insertar)
+    event.listen(Usuario, 'after_update', _despues_de_actualizar)
+    event.listen(Usuario, 'after_delete', _despues_de_borrar)
+
+    if _habilitado(app):
+        @app.before_request
+        def asegurar_autocompletado():
+            iniciar_autocompletado(app)
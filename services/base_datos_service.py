@@ -0,0 +1,293 @@
+"""
+Servicio de perfiles de base de datos y utilidades dependientes del dialecto
+
+Perfiles (variable DB_PERFIL, ver config.py):
+    mysql    MySQL/MariaDB vía PyMySQL (producción; por defecto)
+    sqlite   archivo SQLite en instance/ (o la ruta de SQLITE_PATH)
+    memoria  SQLite en memoria compartida por todos los hilos del proceso
+
+Las rutas y servicios no deben escribir SQL propio de un motor: para
+upserts, inserciones idempotentes, listas en SQL crudo y fechas formateadas
+se usan las funciones de este módulo, que generan la sentencia adecuada al
+dialecto.
+
+Pools de conexiones:
+    web      el motor por defecto, para las peticiones HTTP
+    fondo    bind 'fondo' sobre la misma base de datos, para los trabajos en
+             segundo plano (se activa con `with pool_de_fondo():`); en el
+             perfil memoria no existe y se usa el pool web
+    lectura  bind 'lectura' sobre DB_REPLICA_URL, si está definido (ver
+             services/replica_service.py)
+"""
+
+import logging
+from contextlib import contextmanager
+
+from sqlalchemy import String, bindparam, event, func, inspect, literal, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+from extensions import db, pool_actual
+
+logger = logging.getLogger(__name__)
+
+
+PERFILES = ('mysql', 'sqlite', 'memoria')
+POOL_FONDO = 'fondo'
+POOL_LECTURA = 'lectura'
+
+
+# =========================================================
+#  PERFILES
+# =========================================================
+
+def perfil_de_uri(uri):
+    """'mysql', 'sqlite' o 'memoria' según la URI de SQLAlchemy."""
+    if uri == 'sqlite://' or uri.startswith('sqlite:///:memory:'):
+        return 'memoria'
+    return 'sqlite' if uri.startswith('sqlite') else 'mysql'
+
+
+def aplicar_perfil(app):
+    """
+    Completa la configuración del motor según el perfil de la URI; se llama
+    antes de db.init_app. Las opciones definidas explícitamente en
+    SQLALCHEMY_ENGINE_OPTIONS no se sobrescriben.
+    """
+    perfil = perfil_de_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['DB_PERFIL'] = perfil
+    opciones = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+
+    if perfil == 'memoria':
+        # Una única conexión compartida: cada conexión nueva a ':memory:' sería
+        # una base de datos vacía distinta.
+        opciones.setdefault('poolclass', StaticPool)
+        opciones.setdefault('connect_args', {'check_same_thread': False})
+    else:
+        if perfil == 'sqlite':
+            opciones.setdefault('connect_args', {'check_same_thread': False, 'timeout': 30})
+        else:
+            opciones.setdefault('pool_recycle', app.config.get('DB_POOL_RECYCLE', 280))
+            opciones.setdefault('pool_pre_ping', app.config.get('DB_POOL_PRE_PING', True))
+        fondo = dict(opciones)
+        opciones.setdefault('pool_size', app.config.get('DB_POOL_SIZE', 5))
+        opciones.setdefault('max_overflow', app.config.get('DB_MAX_OVERFLOW', 10))
+        opciones.setdefault('pool_timeout', app.config.get('DB_POOL_TIMEOUT', 10))
+
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        fondo.update(
+            url=app.config['SQLALCHEMY_DATABASE_URI'],
+            pool_size=app.config.get('DB_POOL_FONDO_SIZE', 2),
+            max_overflow=app.config.get('DB_MAX_OVERFLOW_FONDO', 1),
+            pool_timeout=app.config.get('DB_POOL_TIMEOUT_FONDO', 60),
+        )
+        binds.setdefault(POOL_FONDO, fondo)
+        if app.config.get('DB_REPLICA_URL'):
+            binds.setdefault(POOL_LECTURA, dict(opciones, url=app.config['DB_REPLICA_URL']))
+        app.config['SQLALCHEMY_BINDS'] = binds
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones
+
+
+def _pragmas_sqlite(conexion_dbapi, registro):
+    cursor = conexion_dbapi.cursor()
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+
+def init_base_datos(app):
+    """Registra los ajustes por conexión del perfil activo (PRAGMAs en SQLite)."""
+    with app.app_context():
+        for motor in db.engines.values():
+            if motor.dialect.name == 'sqlite':
+                event.listen(motor, 'connect', _pragmas_sqlite)
+    logger.info('Perfil de base de datos: %s', app.config.get('DB_PERFIL'))
+
+
+@contextmanager
+def pool_de_fondo():
+    """
+    Dirige las consultas del hilo actual al pool de trabajos en segundo plano.
+
+        with app.app_context(), pool_de_fondo():
+            ...
+
+    La sesión debe abrirse dentro del bloque (una sesión ya conectada
+    conserva la conexión que tenía).
+    """
+    token = pool_actual.set(POOL_FONDO)
+    try:
+        yield
+    finally:
+        pool_actual.reset(token)
+
+
+def asegurar_columnas():
+    """
+    Añade a las tablas ya existentes las columnas anulables declaradas en los
+    modelos que les falten (db.create_all no modifica tablas existentes).
+
+    Solo se añaden columnas anulables y sin clave foránea en la base de
+    datos; una columna NOT NULL nueva necesita una migración manual y se
+    avisa en el log.
+
+    Returns:
+        list: 'tabla.columna' de las columnas añadidas
+    """
+    from sqlalchemy.schema import CreateColumn
+
+    añadidas = []
+    with db.engine.begin() as conexion:
+        inspector = inspect(conexion)
+        tablas = set(inspector.get_table_names())
+        for tabla in db.metadata.sorted_tables:
+            if tabla.name not in tablas:
+                continue
+            existentes = {c['name'] for c in inspector.get_columns(tabla.name)}
+            for columna in tabla.columns:
+                if columna.name in existentes:
+                    continue
+                if not columna.nullable:
+                    logger.warning('Falta la columna NOT NULL %s.%s: requiere migración manual',
+                                   tabla.name, columna.name)
+                    continue
+                definicion = CreateColumn(columna).compile(dialect=conexion.dialect)
+                conexion.exec_driver_sql(f"ALTER TABLE {tabla.name} ADD COLUMN {definicion}")
+                añadidas.append(f"{tabla.name}.{columna.name}")
+    if añadidas:
+        logger.info('Columnas añadidas: %s', ', '.join(añadidas))
+    return añadidas
+
+
+def asegurar_indices():
+    """
+    Crea los índices declarados en los modelos que falten en tablas ya
+    existentes (db.create_all solo los crea junto con tablas nuevas).
+
+    Returns:
+        list: nombres de los índices creados
+    """
+    creados = []
+    with db.engine.begin() as conexion:
+        inspector = inspect(conexion)
+        tablas = set(inspector.get_table_names())
+        for tabla in db.metadata.sorted_tables:
+            if tabla.name not in tablas or not tabla.indexes:
+                continue
+            existentes = {i['name'] for i in inspector.get_indexes(tabla.name)}
+            for indice in tabla.indexes:
+                if indice.name and indice.name not in existentes:
+                    indice.create(conexion)
+                    creados.append(indice.name)
+    return creados
+
+
+# =========================================================
+#  UTILIDADES DEPENDIENTES DEL DIALECTO
+# =========================================================
+
+def es_sqlite():
+    return db.engine.dialect.name == 'sqlite'
+
+
+def _insertar(tabla):
+    if es_sqlite():
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.mysql import insert
+    return insert(tabla)
+
+
+def sentencia_insertar_o_actualizar(modelo, valores, claves, actualizar):
+    """
+    INSERT ... ON DUPLICATE KEY UPDATE (MySQL) / ON CONFLICT DO UPDATE (SQLite).
+
+    Args:
+        modelo: modelo o tabla destino
+        valores: dict (una fila) o lista de dicts
+        claves: columnas de la clave primaria o única en conflicto (solo SQLite)
+        actualizar: dict columna -> valor o expresión para la fila existente,
+            p. ej. {'version': VersionDatos.version + 1}
+    """
+    tabla = getattr(modelo, '__table__', modelo)
+    sentencia = _insertar(tabla).values(valores)
+    actualizar = {getattr(c, 'key', c): v for c, v in actualizar.items()}
+    if es_sqlite():
+        return sentencia.on_conflict_do_update(index_elements=list(claves), set_=actualizar)
+    return sentencia.on_duplicate_key_update(**actualizar)
+
+
+def insertar_o_actualizar(modelo, valores, claves, actualizar):
+    """Ejecuta sentencia_insertar_o_actualizar en la sesión. No hace commit."""
+    return db.session.execute(sentencia_insertar_o_actualizar(modelo, valores, claves, actualizar))
+
+
+def insertar_o_ignorar(modelo, valores):
+    """
+    INSERT IGNORE (MySQL) / INSERT OR IGNORE (SQLite). No hace commit.
+
+    Con una lista de dicts se ejecuta como executemany: la sentencia se
+    compila una sola vez (y queda en la caché) sea cual sea el número de
+    filas, y rowcount es el total de filas insertadas.
+    """
+    tabla = getattr(modelo, '__table__', modelo)
+    sentencia = _insertar(tabla)
+    if es_sqlite():
+        sentencia = sentencia.on_conflict_do_nothing()
+    else:
+        sentencia = sentencia.prefix_with('IGNORE')
+    if isinstance(valores, list):
+        return db.session.execute(sentencia, valores)
+    return db.session.execute(sentencia.values(valores))
+
+
+class fecha_formateada(FunctionElement):
+    """
+    Fecha u hora como texto con un formato de strftime, calculada en SQL:
+    strftime() en SQLite, DATE_FORMAT() en MySQL. NULL sigue siendo NULL.
+
+        fecha_formateada(Incidente.fecha, '%Y-%m-%d %H:%M:%S').label('fecha')
+
+    Para mantener en las respuestas JSON el formato que ya tenían cuando no
+    es el ISO 8601 del proveedor JSON (ver services/json_service.py).
+    """
+
+    type = String()
+    name = 'fecha_formateada'
+    inherit_cache = True
+    # El formato es parte de la clave de la caché de sentencias compiladas
+    _traverse_internals = FunctionElement._traverse_internals + [('formato', InternalTraversal.dp_string)]
+
+    def __init__(self, columna, formato):
+        self.formato = formato
+        super().__init__(columna)
+
+
+# strftime -> DATE_FORMAT de MySQL, donde solo cambian los minutos
+_FORMATO_MYSQL = {'%M': '%i'}
+
+
+@compiles(fecha_formateada)
+def _fecha_formateada_sqlite(elemento, compilador, **kw):
+    return compilador.process(func.strftime(literal(elemento.formato), *elemento.clauses), **kw)
+
+
+@compiles(fecha_formateada, 'mysql')
+def _fecha_formateada_mysql(elemento, compilador, **kw):
+    formato = elemento.formato
+    for python, mysql in _FORMATO_MYSQL.items():
+        formato = formato.replace(python, mysql)
+    return compilador.process(func.date_format(*elemento.clauses, literal(formato)), **kw)
+
+
+def sql_con_listas(sql, *listas):
+    """
+    text() con parámetros de lista para `IN :parametro`.
+
+    Pasar una tupla a `IN :ids` solo funciona con PyMySQL; con parámetros
+    expandibles SQLAlchemy genera `IN (?, ?, ...)` en cualquier dialecto.
+    """
+    return text(sql).bindparams(*(bindparam(nombre, expanding=True) for nombre in listas))
@@ -0,0 +1,429 @@
+"""
+Servicio de generación de boletines (PDF) por estudiante y periodo
+"""
+
+import json
+import multiprocessing
+import os
+import uuid
+import zipfile
+import logging
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from threading import Thread
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from sqlalchemy import case, func, select
+from werkzeug.utils import secure_filename
+
+from controllers.models import (
+    db, Usuario, Rol, Matricula, Curso, Sede, Asignatura, Calificacion,
+    CategoriaCalificacion, ConfiguracionCalificacion, Asistencia, PeriodoAcademico
+)
+from services.base_datos_service import pool_de_fondo
+
+logger = logging.getLogger(__name__)
+
+
+NOTA_APROBACION_DEFECTO = 60.0
+INTERVALO_PROGRESO = 25
+
+
+# =========================================================
+#  RECOLECCIÓN DE DATOS (consultas agrupadas)
+# =========================================================
+
+def _promedio_ponderado(categorias):
+    """Promedio ponderado por porcentaje de categoría, normalizado a los porcentajes usados."""
+    total_porcentaje = sum(c['porcentaje'] for c in categorias)
+    if total_porcentaje <= 0:
+        valores = [c['promedio'] for c in categorias]
+        return round(sum(valores) / len(valores), 2) if valores else 0
+    return round(sum(c['promedio'] * c['porcentaje'] for c in categorias) / total_porcentaje, 2)
+
+
+def recopilar_datos_boletines(periodo_id, curso_id=None):
+    """
+    Obtiene el resumen de notas y asistencia de cada estudiante del periodo
+    con un número constante de consultas agrupadas.
+
+    Args:
+        periodo_id (int): ID del periodo académico
+        curso_id (int): Restringe los boletines a un curso (opcional)
+
+    Returns:
+        tuple: (lista de diccionarios serializables, error)
+    """
+    periodo = db.session.get(PeriodoAcademico, periodo_id)
+    if not periodo:
+        return None, "Periodo no encontrado"
+
+    inicio = datetime.combine(periodo.fecha_inicio, datetime.min.time())
+    fin = datetime.combine(periodo.fecha_fin, datetime.max.time())
+
+    ultima_matricula = (
+        select(Matricula.estudianteId, func.max(Matricula.año).label('max_year'))
+        .group_by(Matricula.estudianteId)
+        .subquery()
+    )
+    consulta_estudiantes = (
+        select(
+            Usuario.id_usuario, Usuario.no_identidad, Usuario.nombre, Usuario.apellido,
+            Curso.id_curso, Curso.nombreCurso, Sede.nombre
+        )
+        .join(Rol, Usuario.id_rol_fk == Rol.id_rol)
+        .join(Matricula, Matricula.estudianteId == Usuario.id_usuario)
+        .join(ultima_matricula, (ultima_matricula.c.estudianteId == Matricula.estudianteId)
+              & (ultima_matricula.c.max_year == Matricula.año))
+        .join(Curso, Matricula.cursoId == Curso.id_curso)
+        .join(Sede, Curso.sedeId == Sede.id_sede)
+        .where(Rol.nombre == 'Estudiante')
+        .order_by(Curso.nombreCurso, Usuario.apellido, Usuario.nombre)
+    )
+    if curso_id:
+        consulta_estudiantes = consulta_estudiantes.where(Curso.id_curso == curso_id)
+
+    estudiantes = db.session.execute(consulta_estudiantes).all()
+    if not estudiantes:
+        return [], None
+
+    ids_estudiantes = select(consulta_estudiantes.subquery().c.id_usuario)
+
+    notas = db.session.execute(
+        select(
+            Calificacion.estudianteId, Asignatura.id_asignatura, Asignatura.nombre,
+            CategoriaCalificacion.nombre, CategoriaCalificacion.porcentaje,
+            func.avg(Calificacion.valor), func.count(Calificacion.id_calificacion)
+        )
+        .join(Asignatura, Calificacion.asignaturaId == Asignatura.id_asignatura)
+        .join(CategoriaCalificacion, Calificacion.categoriaId == CategoriaCalificacion.id_categoria)
+        .where(
+            Calificacion.estudianteId.in_(ids_estudiantes),
+            Calificacion.valor.isnot(None),
+            Calificacion.fecha_registro.between(inicio, fin)
+        )
+        .group_by(
+            Calificacion.estudianteId, Asignatura.id_asignatura, Asignatura.nombre,
+            CategoriaCalificacion.id_categoria, CategoriaCalificacion.nombre, CategoriaCalificacion.porcentaje
+        )
+    ).all()
+
+    asistencia = db.session.execute(
+        select(
+            Asistencia.estudianteId,
+            func.count(Asistencia.id_asistencia),
+            func.sum(case((Asistencia.estado == 'presente', 1), else_=0)),
+            func.sum(case((Asistencia.excusa.is_(True), 1), else_=0))
+        )
+        .where(
+            Asistencia.estudianteId.in_(ids_estudiantes),
+            Asistencia.fecha.between(periodo.fecha_inicio, periodo.fecha_fin)
+        )
+        .group_by(Asistencia.estudianteId)
+    ).all()
+
+    configuraciones = {
+        c.asignatura_id: float(c.notaMinimaAprobacion)
+        for c in ConfiguracionCalificacion.query.all()
+    }
+    nota_global = configuraciones.get(None, NOTA_APROBACION_DEFECTO)
+
+    notas_por_estudiante = defaultdict(lambda: defaultdict(lambda: {'nombre': None, 'categorias': []}))
+    for est_id, asig_id, asig_nombre, cat_nombre, porcentaje, promedio, cantidad in notas:
+        asignatura = notas_por_estudiante[est_id][asig_id]
+        asignatura['nombre'] = asig_nombre
+        asignatura['categorias'].append({
+            'nombre': cat_nombre,
+            'porcentaje': float(porcentaje or 0),
+            'promedio': round(float(promedio), 2),
+            'cantidad': cantidad
+        })
+
+    asistencia_por_estudiante = {
+        est_id: {
+            'total': total or 0,
+            'presentes': int(presentes or 0),
+            'ausencias': (total or 0) - int(presentes or 0),
+            'excusas': int(excusas or 0)
+        }
+        for est_id, total, presentes, excusas in asistencia
+    }
+
+    datos = []
+    for est_id, documento, nombre, apellido, id_curso, nombre_curso, sede in estudiantes:
+        asignaturas = []
+        for asig_id, asignatura in sorted(notas_por_estudiante[est_id].items(), key=lambda x: x[1]['nombre']):
+            nota_aprobacion = configuraciones.get(asig_id, nota_global)
+            promedio = _promedio_ponderado(asignatura['categorias'])
+            asignaturas.append({
+                'nombre': asignatura['nombre'],
+                'categorias': asignatura['categorias'],
+                'promedio': promedio,
+                'estado': 'Aprobado' if promedio >= nota_aprobacion else 'Reprobado'
+            })
+
+        promedios = [a['promedio'] for a in asignaturas]
+        datos.append({
+            'periodo': {
+                'nombre': periodo.nombre,
+                'ciclo': periodo.ciclo.nombre if periodo.ciclo else '',
+                'fecha_inicio': periodo.fecha_inicio.strftime('%Y-%m-%d'),
+                'fecha_fin': periodo.fecha_fin.strftime('%Y-%m-%d')
+            },
+            'estudiante': {
+                'id': est_id,
+                'documento': documento,
+                'nombre': f"{apellido} {nombre}"
+            },
+            'curso': {'id': id_curso, 'nombre': nombre_curso, 'sede': sede},
+            'asignaturas': asignaturas,
+            'promedio_general': round(sum(promedios) / len(promedios), 2) if promedios else 0,
+            'nota_aprobacion': nota_global,
+            'asistencia': asistencia_por_estudiante.get(
+                est_id, {'total': 0, 'presentes': 0, 'ausencias': 0, 'excusas': 0}
+            )
+        })
+
+    return datos, None
+
+
+# =========================================================
+#  RENDERIZADO (se ejecuta en los procesos del pool)
+# =========================================================
+
+def renderizar_boletin(datos):
+    """Genera el PDF de un boletín. No usa Flask ni la base de datos."""
+    buffer = BytesIO()
+    documento = SimpleDocTemplate(
+        buffer, pagesize=letter,
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=1.5 * cm, bottomMargin=1.5 * cm,
+        title=f"Boletín {datos['estudiante']['nombre']}"
+    )
+    estilos = getSampleStyleSheet()
+    periodo = datos['periodo']
+    estudiante = datos['estudiante']
+    curso = datos['curso']
+
+    elementos = [
+        Paragraph("Boletín de Calificaciones", estilos['Title']),
+        Paragraph(f"{periodo['ciclo']} — {periodo['nombre']} ({periodo['fecha_inicio']} a {periodo['fecha_fin']})",
+                  estilos['Normal']),
+        Spacer(1, 0.4 * cm),
+        Table([
+            ['Estudiante:', estudiante['nombre'], 'Documento:', estudiante['documento']],
+            ['Curso:', curso['nombre'], 'Sede:', curso['sede']],
+        ], colWidths=[2.5 * cm, 6.5 * cm, 2.5 * cm, 5 * cm]),
+        Spacer(1, 0.5 * cm),
+    ]
+
+    filas = [['Asignatura', 'Categorías', 'Promedio', 'Estado']]
+    for asignatura in datos['asignaturas']:
+        detalle = ", ".join(
+            f"{c['nombre']} ({c['porcentaje']:.0f}%): {c['promedio']:.2f}" for c in asignatura['categorias']
+        )
+        filas.append([
+            asignatura['nombre'],
+            Paragraph(detalle, estilos['BodyText']),
+            f"{asignatura['promedio']:.2f}",
+            asignatura['estado']
+        ])
+    if len(filas) == 1:
+        filas.append(['Sin calificaciones registradas en el periodo', '', '', ''])
+
+    tabla = Table(filas, colWidths=[4 * cm, 8 * cm, 2 * cm, 2.5 * cm], repeatRows=1)
+    estilo = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e3a5f')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
+    ]
+    for indice, asignatura in enumerate(datos['asignaturas'], start=1):
+        if asignatura['estado'] == 'Reprobado':
+            estilo.append(('TEXTCOLOR', (3, indice), (3, indice), colors.red))
+    tabla.setStyle(TableStyle(estilo))
+    elementos.append(tabla)
+
+    asistencia = datos['asistencia']
+    elementos += [
+        Spacer(1, 0.5 * cm),
+        Paragraph(f"<b>Promedio general:</b> {datos['promedio_general']:.2f} "
+                  f"(nota mínima de aprobación: {datos['nota_aprobacion']:.2f})", estilos['Normal']),
+        Paragraph(f"<b>Asistencia:</b> {asistencia['presentes']} de {asistencia['total']} registros — "
+                  f"{asistencia['ausencias']} ausencias ({asistencia['excusas']} con excusa)", estilos['Normal']),
+    ]
+
+    documento.build(elementos)
+    return buffer.getvalue()
+
+
+def nombre_archivo_boletin(datos):
+    return secure_filename(f"{datos['estudiante']['documento']}_{datos['estudiante']['nombre']}.pdf")
+
+
+def _etiquetas_cursos(datos):
+    """
+    Nombre de archivo de cada curso: su nombre, más la sede si el nombre se
+    repite en otra sede, más el id si aún así coincide.
+    """
+    cursos = {b['curso']['id']: b['curso'] for b in datos}
+    por_nombre = defaultdict(list)
+    for curso in cursos.values():
+        por_nombre[curso['nombre']].append(curso)
+
+    etiquetas = {}
+    for nombre, mismos in por_nombre.items():
+        sedes = Counter(c['sede'] for c in mismos)
+        for curso in mismos:
+            etiqueta = nombre
+            if len(mismos) > 1:
+                etiqueta = f"{nombre} {curso['sede']}"
+                if sedes[curso['sede']] > 1:
+                    etiqueta = f"{etiqueta} {curso['id']}"
+            etiquetas[curso['id']] = secure_filename(etiqueta)
+    return etiquetas
+
+
+def generar_boletines(datos, carpeta, procesos=None, por_curso=False, progreso=None):
+    """
+    Renderiza los boletines en un pool de procesos y los escribe en ZIP a
+    medida que se completan, en el mismo orden de entrada.
+
+    Args:
+        datos (list): Resultado de recopilar_datos_boletines
+        carpeta (str): Carpeta donde se escriben los ZIP
+        procesos (int): Procesos del pool (por defecto, núcleos disponibles)
+        por_curso (bool): Un ZIP por curso en lugar de uno solo
+        progreso (callable): progreso(procesados, total), llamado cada INTERVALO_PROGRESO boletines
+
+    Returns:
+        list: Nombres de los ZIP generados
+    """
+    total = len(datos)
+    procesos = procesos or os.cpu_count() or 1
+    os.makedirs(carpeta, exist_ok=True)
+    archivos = {}
+    etiquetas = _etiquetas_cursos(datos)
+
+    def _zip_para(boletin):
+        clave = boletin['curso']['id'] if por_curso else None
+        if clave not in archivos:
+            nombre = f"boletines_{etiquetas[clave]}.zip" if por_curso else "boletines.zip"
+            archivos[clave] = zipfile.ZipFile(os.path.join(carpeta, nombre), 'w', zipfile.ZIP_DEFLATED)
+        return archivos[clave]
+
+    executor = None
+    try:
+        if procesos > 1 and total > 1:
+            executor = ProcessPoolExecutor(procesos, mp_context=multiprocessing.get_context('spawn'))
+            chunksize = max(1, min(32, total // (procesos * 4)))
+            pdfs = executor.map(renderizar_boletin, datos, chunksize=chunksize)
+        else:
+            pdfs = map(renderizar_boletin, datos)
+
+        for procesados, (boletin, pdf) in enumerate(zip(datos, pdfs), start=1):
+            carpeta_zip = '' if por_curso else f"{etiquetas[boletin['curso']['id']]}/"
+            _zip_para(boletin).writestr(carpeta_zip + nombre_archivo_boletin(boletin), pdf)
+            if progreso and (procesados % INTERVALO_PROGRESO == 0 or procesados == total):
+                progreso(procesados, total)
+    finally:
+        if executor:
+            executor.shutdown()
+        for archivo in archivos.values():
+            archivo.close()
+
+    return sorted(os.path.basename(a.filename) for a in archivos.values())
+
+
+# =========================================================
+#  TRABAJOS EN SEGUNDO PLANO
+# =========================================================
+
+def carpeta_trabajos(app):
+    return os.path.join(app.instance_path, 'boletines')
+
+
+def _escribir_estado(carpeta, estado):
+    temporal = os.path.join(carpeta, 'estado.json.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f)
+    os.replace(temporal, os.path.join(carpeta, 'estado.json'))
+
+
+def leer_estado_trabajo(app, trabajo_id):
+    """Devuelve el estado de un trabajo, o None si no existe."""
+    ruta = os.path.join(carpeta_trabajos(app), secure_filename(trabajo_id), 'estado.json')
+    if not os.path.isfile(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _ejecutar_trabajo(app, carpeta, estado, periodo_id, curso_id, por_curso):
+    with app.app_context(), pool_de_fondo():
+        try:
+            datos, error = recopilar_datos_boletines(periodo_id, curso_id)
+            if error:
+                raise ValueError(error)
+
+            estado.update(estado='procesando', total=len(datos))
+            _escribir_estado(carpeta, estado)
+
+            def progreso(procesados, total):
+                estado['procesados'] = procesados
+                _escribir_estado(carpeta, estado)
+
+            estado['archivos'] = generar_boletines(
+                datos, carpeta,
+                procesos=app.config.get('BOLETINES_PROCESOS'),
+                por_curso=por_curso,
+                progreso=progreso
+            )
+            estado.update(estado='completado', finalizado=datetime.now().isoformat())
+        except Exception as e:
+            logger.error('❌ Error generando boletines: %s', e)
+            estado.update(estado='error', error=str(e))
+        finally:
+            db.session.remove()
+            _escribir_estado(carpeta, estado)
+
+
+def iniciar_generacion_boletines(app, periodo_id, curso_id=None, por_curso=False):
+    """
+    Lanza la generación de boletines en un hilo de fondo.
+
+    El estado se guarda en disco para que cualquier worker pueda consultarlo.
+
+    Returns:
+        str: ID del trabajo
+    """
+    trabajo_id = uuid.uuid4().hex
+    carpeta = os.path.join(carpeta_trabajos(app), trabajo_id)
+    os.makedirs(carpeta, exist_ok=True)
+
+    estado = {
+        'trabajo_id': trabajo_id,
+        'estado': 'pendiente',
+        'periodo_id': periodo_id,
+        'curso_id': curso_id,
+        'por_curso': por_curso,
+        'procesados': 0,
+        'total': None,
+        'archivos': [],
+        'iniciado': datetime.now().isoformat()
+    }
+    _escribir_estado(carpeta, estado)
+
+    Thread(
+        target=_ejecutar_trabajo,
+        args=(app, carpeta, estado, periodo_id, curso_id, por_curso),
+        daemon=True
+    ).start()
+    return trabajo_id
@@ -0,0 +1,293 @@
+"""
+Servicio de búsqueda de usuarios
+
+Los buscadores de usuarios filtraban con LIKE '%texto%' sobre nombre,
+apellido, documento y correo: sin índice posible y sensible a tildes.
+
+La tabla usuario_busqueda guarda, por usuario, sus palabras normalizadas
+(minúsculas y sin tildes: "José Peña" -> "jose", "pena"), su documento, las
+palabras de la parte local del correo y el correo completo. Cada palabra de
+la búsqueda debe ser prefijo de alguna palabra del usuario; la comparación
+es un rango sobre la clave primaria (token >= 'jos' AND token < 'jot'), que
+usa el índice en MySQL y en SQLite. Una sola consulta devuelve los usuarios
+de todos los roles ordenados por relevancia (palabras exactas primero). Cada
+fila guarda también el rol del usuario, de modo que la búsqueda en un solo
+rol recorre el rango (id_rol, token) sin leer las coincidencias de los demás.
+
+El índice se actualiza con los eventos del ORM al crear, editar o borrar un
+Usuario. Las altas masivas con SQL directo (datos sintéticos, importaciones)
+requieren `flask reindexar-busqueda`.
+"""
+
+import logging
+import re
+import unicodedata
+
+from sqlalchemy import and_, case, delete, distinct, event, func, insert, inspect, or_, select, union_all
+
+from controllers.models import Rol, Usuario, UsuarioBusqueda
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+CAMPOS_INDEXADOS = ('nombre', 'apellido', 'no_identidad', 'correo', 'id_rol_fk')
+LONGITUD_TOKEN = 120
+MAXIMO_PALABRAS = 5
+# Filas del índice leídas por usuario pedido en búsquedas de una palabra
+FILAS_POR_USUARIO = 4
+TAMANO_LOTE = 1000
+
+_PATRON_PALABRA = re.compile(r'[a-z0-9]+')
+_PATRON_CORREO = re.compile(r'[^a-z0-9@._+-]')
+
+
+def plegar(texto):
+    """Minúsculas y sin tildes ni diacríticos: 'José Ñandú' -> 'jose nandu'."""
+    descompuesto = unicodedata.normalize('NFKD', str(texto or ''))
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def tokens_usuario(nombre, apellido, no_identidad, correo):
+    """Conjunto de tokens de búsqueda de un usuario."""
+    tokens = set(_PATRON_PALABRA.findall(plegar(f"{nombre} {apellido} {no_identidad}")))
+    correo = _PATRON_CORREO.sub('', plegar(correo))
+    if correo:
+        tokens.add(correo)
+        tokens.update(_PATRON_PALABRA.findall(correo.split('@')[0]))
+    return {t[:LONGITUD_TOKEN] for t in tokens}
+
+
+def tokens_consulta(texto):
+    """Palabras de la búsqueda; con '@' se busca por prefijo del correo completo."""
+    texto = plegar(texto).strip()
+    if '@' in texto:
+        correo = _PATRON_CORREO.sub('', texto)
+        return [correo[:LONGITUD_TOKEN]] if correo else []
+    palabras = sorted(set(_PATRON_PALABRA.findall(texto)), key=len, reverse=True)
+    # "jose jo": 'jo' ya está cubierta por 'jose' y exigiría una segunda palabra
+    unicas = [p for i, p in enumerate(palabras) if not any(o.startswith(p) for o in palabras[:i])]
+    return unicas[:MAXIMO_PALABRAS]
+
+
+def fin_de_prefijo(prefijo):
+    """Menor cadena mayor que todas las que empiezan por `prefijo`."""
+    return prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+
+
+# =========================================================
+#  BÚSQUEDA
+# =========================================================
+
+def _columnas_usuario():
+    return (
+        Usuario.id_usuario, Usuario.no_identidad, Usuario.nombre, Usuario.apellido,
+        Usuario.correo, Usuario.estado_cuenta, Rol.nombre.label('rol')
+    )
+
+
+def _filtrar(sentencia, roles, solo_activos):
+    if roles and len(roles) > 1:
+        sentencia = sentencia.where(Rol.nombre.in_(list(roles)))
+    if solo_activos:
+        sentencia = sentencia.where(Usuario.estado_cuenta == 'activa')
+    return sentencia
+
+
+def _limite_sql(palabras, limite):
+    return limite * FILAS_POR_USUARIO if len(palabras) == 1 else limite
+
+
+def sentencia_busqueda(texto, roles=None, solo_activos=False, limite=10, por_rol=False):
+    """
+    SELECT de usuarios que coinciden con `texto`, ordenados por relevancia.
+    None si el texto no tiene palabras buscables.
+
+    Columnas: id_usuario, no_identidad, nombre, apellido, correo, estado_cuenta, rol.
+
+    Con una sola palabra (cada pulsación del autocompletado) se recorre el
+    rango del índice en orden y se corta en el LIMIT: la palabra exacta es la
+    primera del rango, y un prefijo corto ("j", "100") no obliga a agrupar
+    miles de tokens. Un usuario puede aparecer en varias filas (correo completo
+    y parte local, por ejemplo); buscar_usuarios() las deduplica.
+
+    Con varias palabras se parte de los usuarios que casan con la más larga
+    (la más selectiva) y se exige que el resto de palabras también casen.
+
+    Con por_rol=True el LIMIT se aplica a cada rol de `roles`: con una
+    palabra, UNION ALL de la búsqueda de cada rol por su rango (id_rol, token);
+    con varias, ROW_NUMBER() por rol sobre las coincidencias.
+    """
+    palabras = tokens_consulta(texto)
+    if not palabras:
+        return None
+    if por_rol and len(palabras) == 1:
+        union = union_all(*[
+            select(sentencia_busqueda(texto, [rol], solo_activos, limite).subquery()) for rol in roles
+        ]).subquery()
+        return select(union).order_by(union.c.token, union.c.id_usuario)
+
+    t = UsuarioBusqueda.__table__.c
+    rangos = [and_(t.token >= p, t.token < fin_de_prefijo(p)) for p in palabras]
+    # Un solo rol: igualdad en id_rol delante del rango de token (índice ix_usuario_busqueda_rol_token)
+    rol_unico = None
+    if roles and len(roles) == 1:
+        rol_unico = select(Rol.id_rol).where(Rol.nombre == list(roles)[0]).scalar_subquery()
+
+    if len(palabras) == 1:
+        sentencia = (
+            select(*_columnas_usuario(), t.token)
+            .select_from(UsuarioBusqueda.__table__)
+            .join(Usuario, Usuario.id_usuario == t.id_usuario)
+            .outerjoin(Rol, Rol.id_rol == Usuario.id_rol_fk)
+            .where(rangos[0])
+            .order_by(t.token, t.id_usuario)
+            .limit(_limite_sql(palabras, limite))
+        )
+        if rol_unico is not None:
+            sentencia = sentencia.where(t.id_rol == rol_unico)
+        return _filtrar(sentencia, roles, solo_activos)
+
+    guia = UsuarioBusqueda.__table__.alias('guia')
+    candidatos = select(guia.c.id_usuario).where(
+        guia.c.token >= palabras[0], guia.c.token < fin_de_prefijo(palabras[0])
+    )
+    if rol_unico is not None:
+        candidatos = candidatos.where(guia.c.id_rol == rol_unico)
+    palabra = case(*[(rango, i) for i, rango in enumerate(rangos)])
+    coincidencias = (
+        select(
+            t.id_usuario,
+            func.sum(case((t.token.in_(palabras), 3), else_=1)).label('puntaje')
+        )
+        .where(t.id_usuario.in_(candidatos), or_(*rangos))
+        .group_by(t.id_usuario)
+        .having(func.count(distinct(palabra)) == len(palabras))
+        .subquery()
+    )
+
+    orden = (coincidencias.c.puntaje.desc(), Usuario.apellido, Usuario.nombre)
+    if por_rol:
+        numerada = _filtrar(
+            select(*_columnas_usuario(),
+                   func.row_number().over(partition_by=Usuario.id_rol_fk, order_by=orden).label('posicion'))
+            .join(coincidencias, coincidencias.c.id_usuario == Usuario.id_usuario)
+            .outerjoin(Rol, Rol.id_rol == Usuario.id_rol_fk),
+            roles, solo_activos
+        ).subquery()
+        return select(numerada).where(numerada.c.posicion <= limite).order_by(numerada.c.posicion)
+
+    sentencia = (
+        select(*_columnas_usuario())
+        .join(coincidencias, coincidencias.c.id_usuario == Usuario.id_usuario)
+        .outerjoin(Rol, Rol.id_rol == Usuario.id_rol_fk)
+        .order_by(*orden)
+        .limit(_limite_sql(palabras, limite))
+    )
+    return _filtrar(sentencia, roles, solo_activos)
+
+
+def _deduplicar(filas, limite):
+    """Hasta `limite` usuarios distintos de `filas`, en su orden."""
+    usuarios, vistos = [], set()
+    for fila in filas:
+        if fila.id_usuario not in vistos:
+            vistos.add(fila.id_usuario)
+            usuarios.append(fila)
+            if len(usuarios) >= limite:
+                break
+    return usuarios
+
+
+def buscar_usuarios(texto, roles=None, solo_activos=False, limite=10):
+    """Lista de Row (ver sentencia_busqueda); vacía si no hay nada que buscar."""
+    sentencia = sentencia_busqueda(texto, roles, solo_activos, limite)
+    if sentencia is None:
+        return []
+    return _deduplicar(db.session.execute(sentencia), limite)
+
+
+def buscar_usuarios_por_rol(texto, roles, solo_activos=False, limite=5):
+    """
+    Hasta `limite` usuarios de cada rol: {rol: [Row, ...]} en el orden de `roles`.
+
+    Una sola consulta con el LIMIT de cada rol (ver sentencia_busqueda), de
+    modo que un rol con muchas coincidencias no oculta a los demás.
+    """
+    por_rol = {rol: [] for rol in roles}
+    sentencia = sentencia_busqueda(texto, roles, solo_activos, limite, por_rol=True) if roles else None
+    if sentencia is None:
+        return por_rol
+    filas = db.session.execute(sentencia).all()
+    for rol in roles:
+        por_rol[rol] = _deduplicar((fila for fila in filas if fila.rol == rol), limite)
+    return por_rol
+
+
+# =========================================================
+#  MANTENIMIENTO DEL ÍNDICE
+# =========================================================
+
+def _reindexar(conexion, usuario):
+    conexion.execute(delete(UsuarioBusqueda).where(UsuarioBusqueda.id_usuario == usuario.id_usuario))
+    tokens = tokens_usuario(usuario.nombre, usuario.apellido, usuario.no_identidad, usuario.correo)
+    if tokens:
+        conexion.execute(insert(UsuarioBusqueda), [
+            {'token': t, 'id_usuario': usuario.id_usuario, 'id_rol': usuario.id_rol_fk} for t in tokens
+        ])
+
+
+def _despues_de_insertar(mapper, conexion, usuario):
+    _reindexar(conexion, usuario)
+
+
+def _despues_de_actualizar(mapper, conexion, usuario):
+    estado = inspect(usuario)
+    if any(estado.attrs[campo].history.has_changes() for campo in CAMPOS_INDEXADOS):
+        _reindexar(conexion, usuario)
+
+
+def _antes_de_borrar(mapper, conexion, usuario):
+    conexion.execute(delete(UsuarioBusqueda).where(UsuarioBusqueda.id_usuario == usuario.id_usuario))
+
+
+def reconstruir_indice():
+    """Vuelve a generar usuario_busqueda para todos los usuarios. Devuelve (usuarios, tokens)."""
+    db.session.execute(delete(UsuarioBusqueda))
+    usuarios = tokens = 0
+    lote = []
+    filas = db.session.execute(
+        select(Usuario.id_usuario, Usuario.nombre, Usuario.apellido, Usuario.no_identidad, Usuario.correo,
+               Usuario.id_rol_fk)
+    ).all()
+    for id_usuario, nombre, apellido, no_identidad, correo, id_rol in filas:
+        usuarios += 1
+        for token in tokens_usuario(nombre, apellido, no_identidad, correo):
+            lote.append({'token': token, 'id_usuario': id_usuario, 'id_rol': id_rol})
+        if len(lote) >= TAMANO_LOTE:
+            db.session.execute(insert(UsuarioBusqueda), lote)
+            tokens += len(lote)
+            lote = []
+    if lote:
+        db.session.execute(insert(UsuarioBusqueda), lote)
+        tokens += len(lote)
+    db.session.commit()
+    return usuarios, tokens
+
+
+def indice_vacio():
+    return db.session.execute(select(UsuarioBusqueda.id_usuario).limit(1)).first() is None
+
+
+def init_busqueda(app):
+    """Mantiene usuario_busqueda al día con los cambios de Usuario hechos por el ORM."""
+    event.listen(Usuario, 'after_insert', _despues_de_insertar)
+    event.listen(Usuario, 'after_update', _despues_de_actualizar)
+    event.listen(Usuario, 'before_delete', _antes_de_borrar)
+
+    @app.cli.command('reindexar-busqueda')
+    def reindexar_busqueda_comando():
+        """Crea (si falta) y regenera el índice de búsqueda de usuarios."""
+        UsuarioBusqueda.__table__.create(db.engine, checkfirst=True)
+        usuarios, tokens = reconstruir_indice()
+        logger.info('Índice de búsqueda: %s usuarios, %s tokens', usuarios, tokens)
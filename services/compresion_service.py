@@ -0,0 +1,214 @@
+"""
+Servicio de compresión de respuestas (gzip / brotli)
+
+Las respuestas HTML, JSON, CSV, CSS y JS que superan COMPRESION_MINIMO bytes
+se comprimen según el Accept-Encoding del cliente: brotli si el módulo
+`brotli` está instalado y el cliente lo acepta, si no gzip. Las respuestas
+generadas en streaming (exportaciones) se comprimen bloque a bloque sin
+cargarlas en memoria.
+
+Los archivos estáticos no se comprimen en cada petición: `flask
+precomprimir-estaticos` (o el arranque de gunicorn) deja junto a cada CSS,
+JS y SVG de static/ su versión .gz (y .br), y la vista de estáticos sirve
+directamente la variante que acepte el cliente.
+"""
+
+import logging
+import mimetypes
+import os
+import zlib
+from functools import lru_cache
+
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+
+logger = logging.getLogger(__name__)
+
+
+TIPOS_PREDETERMINADOS = (
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript', 'text/xml',
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+)
+EXTENSIONES_ESTATICAS = ('.css', '.js', '.svg', '.json', '.txt', '.map')
+NIVEL_BROTLI_DINAMICO = 4
+NIVEL_BROTLI_ESTATICO = 11
+
+
+@lru_cache(maxsize=None)
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _codificaciones_disponibles():
+    return ('br', 'gzip') if _brotli() else ('gzip',)
+
+
+def elegir_codificacion(accept_encoding):
+    """'br', 'gzip' o None según el Accept-Encoding y los módulos disponibles."""
+    for codificacion in _codificaciones_disponibles():
+        if accept_encoding.quality(codificacion) > 0:
+            return codificacion
+    return None
+
+
+# =========================================================
+#  COMPRESORES
+# =========================================================
+
+def comprimir(datos, codificacion, nivel=6):
+    if codificacion == 'br':
+        return _brotli().compress(datos, quality=NIVEL_BROTLI_DINAMICO)
+    compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    return compresor.compress(datos) + compresor.flush()
+
+
+def _comprimir_flujo(iterable, codificacion, nivel):
+    """Comprime un iterable de bloques sin acumularlo; cierra el iterable original."""
+    if codificacion == 'br':
+        compresor = _brotli().Compressor(quality=NIVEL_BROTLI_DINAMICO)
+        procesar, terminar = compresor.process, compresor.finish
+    else:
+        compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+        procesar, terminar = compresor.compress, compresor.flush
+    try:
+        for bloque in iterable:
+            if isinstance(bloque, str):
+                bloque = bloque.encode('utf-8')
+            salida = procesar(bloque)
+            if salida:
+                yield salida
+        yield terminar()
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+
+
+# =========================================================
+#  RESPUESTAS DINÁMICAS
+# =========================================================
+
+def _comprimir_respuesta(response):
+    from flask import current_app
+    from services.metricas_service import incrementar
+
+    config = current_app.config
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in config['_COMPRESION_TIPOS']
+            or 'no-transform' in response.headers.get('Cache-Control', '')):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    codificacion = elegir_codificacion(request.accept_encodings)
+    if codificacion is None:
+        return response
+
+    nivel = config.get('COMPRESION_NIVEL', 6)
+    if response.is_streamed:
+        response.response = _comprimir_flujo(response.response, codificacion, nivel)
+        response.headers.pop('Content-Length', None)
+    else:
+        datos = response.get_data()
+        if len(datos) < config.get('COMPRESION_MINIMO', 1024):
+            return response
+        comprimidos = comprimir(datos, codificacion, nivel)
+        response.set_data(comprimidos)
+        incrementar('acentrax_http_compressed_bytes_total', len(datos), etapa='original')
+        incrementar('acentrax_http_compressed_bytes_total', len(comprimidos), etapa='comprimido')
+
+    response.headers['Content-Encoding'] = codificacion
+    # El cuerpo ya no es byte a byte el original: la ETag pasa a ser débil
+    etag, debil = response.get_etag()
+    if etag and not debil:
+        response.set_etag(etag, weak=True)
+    incrementar('acentrax_http_responses_compressed_total', codificacion=codificacion)
+    return response
+
+
+# =========================================================
+#  ESTÁTICOS PRECOMPRIMIDOS
+# =========================================================
+
+def precomprimir_estaticos(carpeta, minimo=1024):
+    """
+    Escribe <archivo>.gz (y .br si brotli está instalado) para cada estático
+    comprimible que no tenga una versión al día. Devuelve cuántos escribió.
+    """
+    brotli = _brotli()
+    escritos = 0
+    for raiz, _, archivos in os.walk(carpeta):
+        for nombre in archivos:
+            if not nombre.endswith(EXTENSIONES_ESTATICAS):
+                continue
+            ruta = os.path.join(raiz, nombre)
+            if os.path.getsize(ruta) < minimo:
+                continue
+            variantes = [('.gz', lambda d: comprimir(d, 'gzip', 9))]
+            if brotli:
+                variantes.append(('.br', lambda d: brotli.compress(d, quality=NIVEL_BROTLI_ESTATICO)))
+            datos = None
+            for sufijo, funcion in variantes:
+                destino = ruta + sufijo
+                if os.path.exists(destino) and os.path.getmtime(destino) >= os.path.getmtime(ruta):
+                    continue
+                if datos is None:
+                    with open(ruta, 'rb') as f:
+                        datos = f.read()
+                temporal = f"{destino}.{os.getpid()}.tmp"
+                with open(temporal, 'wb') as f:
+                    f.write(funcion(datos))
+                os.replace(temporal, destino)
+                escritos += 1
+    return escritos
+
+
+def _vista_estaticos(app, original):
+    sufijos = {'br': '.br', 'gzip': '.gz'}
+
+    def servir_estatico(filename):
+        codificacion = elegir_codificacion(request.accept_encodings)
+        if codificacion and filename.endswith(EXTENSIONES_ESTATICAS):
+            ruta = safe_join(app.static_folder, filename)
+            comprimido = ruta and ruta + sufijos[codificacion]
+            if (ruta and os.path.isfile(comprimido) and os.path.isfile(ruta)
+                    and os.path.getmtime(comprimido) >= os.path.getmtime(ruta)):
+                response = send_from_directory(
+                    app.static_folder, filename + sufijos[codificacion],
+                    mimetype=mimetypes.guess_type(filename)[0],
+                    max_age=app.get_send_file_max_age(filename)
+                )
+                response.headers['Content-Encoding'] = codificacion
+                response.vary.add('Accept-Encoding')
+                return response
+        response = original(filename=filename)
+        if filename.endswith(EXTENSIONES_ESTATICAS):
+            response.vary.add('Accept-Encoding')
+        return response
+
+    return servir_estatico
+
+
+def init_compresion(app):
+    """Registra la compresión de respuestas y el servicio de estáticos precomprimidos."""
+    if not app.config.get('COMPRESION_HABILITADA', True):
+        return
+
+    tipos = app.config.get('COMPRESION_TIPOS') or TIPOS_PREDETERMINADOS
+    if isinstance(tipos, str):
+        tipos = [t.strip() for t in tipos.split(',') if t.strip()]
+    app.config['_COMPRESION_TIPOS'] = frozenset(tipos)
+
+    app.after_request(_comprimir_respuesta)
+    if 'static' in app.view_functions:
+        app.view_functions['static'] = _vista_estaticos(app, app.view_functions['static'])
+
+    @app.cli.command('precomprimir-estaticos')
+    def precomprimir_estaticos_comando():
+        """Genera las versiones .gz/.br de los CSS, JS y SVG de static/."""
+        escritos = precomprimir_estaticos(app.static_folder, app.config.get('COMPRESION_MINIMO', 1024))
+        logger.info('Estáticos precomprimidos: %s archivos nuevos o actualizados', escritos)
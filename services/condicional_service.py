@@ -0,0 +1,306 @@
+"""
+Servicio de respuestas condicionales (ETag / Last-Modified)
+
+Las vistas marcadas con @respuesta_condicional(Modelo, ...) calculan antes
+de ejecutarse una versión barata de sus datos: una sola consulta a
+version_datos con el contador de cambios de cada tabla de la que dependen.
+Si el cliente envía esa misma versión en If-None-Match (o una fecha en
+If-Modified-Since no anterior al último cambio) se responde 304 sin
+ejecutar la vista.
+
+Los contadores ('tabla:<nombre>' en version_datos) se incrementan cuando
+se confirma la transacción que modifica la tabla, en una transacción corta
+aparte: así la fila del contador no queda bloqueada mientras dura la
+escritura. Se anotan en cada flush del ORM y en cada INSERT/UPDATE/DELETE
+ejecutado con db.session (también en SQL crudo con text()). Solo se cuentan
+las tablas que alguna vista condicional vigila y, con vigilar(Modelo,
+'campo', ...), solo los cambios de las columnas que la vista muestra: un
+voto o un intento de verificación no cambian la versión de 'usuarios'.
+vigilar() acepta además un filtro de filas (los objetos del ORM que no lo
+cumplen no cuentan; las sentencias masivas sí) y un contador propio, para
+que una dependencia más estrecha no comparta el contador de toda la tabla.
+Los horarios materializados (services/horario_service.py) usan estos mismos
+contadores, por lo que se mantienen aunque RESPUESTAS_CONDICIONALES sea 0.
+Un cambio hecho fuera de la aplicación no se detecta; por eso la versión
+incluye también la fecha del día y el identificador del despliegue.
+
+Con @solo_lectura, el decorador va debajo para que la versión y los datos
+se lean de la misma base de datos. Las versiones leídas quedan en
+g.versiones_condicionales para que las cachés en memoria que usa la vista
+no respondan con datos anteriores a la ETag.
+"""
+
+import hashlib
+import logging
+import re
+from collections import namedtuple
+from datetime import date, datetime, timezone
+from functools import wraps
+from itertools import chain
+
+from flask import current_app, g, make_response, request
+from flask_login import current_user
+from sqlalchemy import TextClause, event, inspect, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from controllers.models import VersionDatos
+from extensions import SesionEnrutada, db
+from services.base_datos_service import sentencia_insertar_o_actualizar
+
+logger = logging.getLogger(__name__)
+
+
+PREFIJO_TABLA = 'tabla:'
+# Tabla -> dependencias registradas sobre ella (se llena al importar las rutas y servicios)
+TABLAS_VIGILADAS = {}
+
+# campos: columnas cuyo cambio cuenta (None: cualquiera; las altas y bajas cuentan siempre)
+# filtro: función que decide si un objeto del ORM cuenta (None: todos)
+# contador: nombre del contador en version_datos (None: el de la tabla)
+Vigilancia = namedtuple('Vigilancia', 'modelo campos filtro contador', defaults=(None, None))
+
+# Funciones llamadas con los contadores incrementados tras cada commit
+_AL_CONFIRMAR = []
+
+_PATRON_DML = re.compile(
+    r'^\s*(?:INSERT\s+(?:IGNORE\s+|OR\s+\w+\s+)?INTO|REPLACE\s+INTO|UPDATE(?:\s+IGNORE)?|DELETE\s+FROM)\s+[`"\[]?(\w+)',
+    re.IGNORECASE
+)
+
+
+def _nombre_tabla(objetivo):
+    tabla = getattr(objetivo, '__table__', objetivo)
+    return getattr(tabla, 'name', tabla)
+
+
+def vigilar(modelo, *campos, filtro=None, contador=None):
+    """
+    Dependencia solo de algunas columnas de `modelo` (todas si no se indica
+    ninguna), de las filas que cumplen `filtro`, o con un `contador` propio.
+    """
+    return Vigilancia(modelo, frozenset(campos) or None, filtro, contador)
+
+
+def _registrar(dependencia):
+    """Registra la dependencia y devuelve el nombre de su contador."""
+    if not isinstance(dependencia, Vigilancia):
+        dependencia = Vigilancia(dependencia, None)
+    tabla = _nombre_tabla(dependencia.modelo)
+    regla = (dependencia.campos, dependencia.filtro, dependencia.contador or tabla)
+    reglas = TABLAS_VIGILADAS.setdefault(tabla, [])
+    if regla not in reglas:
+        reglas.append(regla)
+    return regla[2]
+
+
+def registrar_dependencias(*modelos):
+    """Registra las dependencias y devuelve sus contadores ordenados (ver vigilar)."""
+    return tuple(sorted({_registrar(m) for m in modelos}))
+
+
+def _contadores(tabla, cambiados=None, obj=None):
+    """
+    Contadores de `tabla` afectados por un cambio de las columnas `cambiados`
+    (None: alta, baja o columnas desconocidas) del objeto `obj` (None: sentencia masiva).
+    """
+    afectados = set()
+    for campos, filtro, contador in TABLAS_VIGILADAS.get(tabla, ()):
+        if filtro is not None and obj is not None and not filtro(obj):
+            continue
+        if cambiados is None or (cambiados if campos is None else campos & cambiados):
+            afectados.add(contador)
+    return afectados
+
+
+# =========================================================
+#  CONTADORES DE CAMBIOS POR TABLA
+# =========================================================
+
+def _incrementar_versiones(conexion, contadores):
+    ahora = datetime.utcnow()
+    conexion.execute(sentencia_insertar_o_actualizar(
+        VersionDatos,
+        [{'clave': PREFIJO_TABLA + c, 'version': 1, 'actualizado_en': ahora} for c in sorted(contadores)],
+        claves=['clave'],
+        actualizar={'version': VersionDatos.version + 1, 'actualizado_en': ahora}
+    ))
+
+
+def _contadores_del_flush(sesion):
+    if not TABLAS_VIGILADAS:
+        return set()
+    contadores = set()
+    for obj in chain(sesion.new, sesion.deleted):
+        contadores |= _contadores(obj.__table__.name, obj=obj)
+    for obj in sesion.dirty:
+        estado = inspect(obj)
+        tabla = obj.__table__.name
+        if tabla in TABLAS_VIGILADAS:
+            cambiados = {c.key for c in estado.mapper.column_attrs if estado.attrs[c.key].history.has_changes()}
+            contadores |= _contadores(tabla, cambiados, obj)
+        for relacion in estado.mapper.relationships:
+            if relacion.secondary is not None and relacion.secondary.name in TABLAS_VIGILADAS \
+                    and estado.attrs[relacion.key].history.has_changes():
+                contadores |= _contadores(relacion.secondary.name)
+    return contadores
+
+
+def _columnas_actualizadas(estado):
+    """Nombres de las columnas que asigna un UPDATE masivo, o None si no se pueden saber."""
+    valores = getattr(estado.statement, '_values', None)
+    if valores:
+        return {getattr(c, 'key', c) for c in valores}
+    parametros = estado.parameters
+    if isinstance(parametros, dict):
+        parametros = [parametros]
+    if parametros and all(isinstance(p, dict) for p in parametros):
+        return {c for p in parametros for c in p}
+    return None
+
+
+def _anotar(sesion, conexion, contadores):
+    """Los contadores se incrementan al confirmar la transacción, en el motor que la ejecutó."""
+    pendientes = sesion.info.setdefault('tablas_cambiadas', {})
+    pendientes.setdefault(conexion.engine, set()).update(contadores)
+
+
+def _despues_de_flush(sesion, contexto):
+    contadores = _contadores_del_flush(sesion)
+    if contadores:
+        # Durante el flush la sesión siempre usa la primaria
+        _anotar(sesion, sesion.connection(), contadores)
+
+
+def _al_ejecutar(estado):
+    sentencia = estado.statement
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        tabla = getattr(getattr(sentencia, 'table', None), 'name', None)
+    elif isinstance(sentencia, TextClause):
+        coincidencia = _PATRON_DML.match(sentencia.text)
+        tabla = coincidencia.group(1) if coincidencia else None
+    else:
+        return
+    if tabla not in TABLAS_VIGILADAS:
+        return
+    contadores = _contadores(tabla, _columnas_actualizadas(estado) if estado.is_update else None)
+    if not contadores:
+        return
+    # Conexión de la sentencia DML: nunca la réplica
+    _anotar(estado.session, estado.session.connection(bind_arguments={'clause': sentencia}), contadores)
+
+
+def _avisar(contadores):
+    for funcion in _AL_CONFIRMAR:
+        funcion(contadores)
+
+
+def _incrementar_tras_commit(sesion):
+    pendientes = sesion.info.pop('tablas_cambiadas', None)
+    for motor, contadores in (pendientes or {}).items():
+        try:
+            with motor.begin() as conexion:
+                _incrementar_versiones(conexion, contadores)
+        except SQLAlchemyError as e:
+            logger.error('No se pudieron incrementar las versiones de %s: %s', ', '.join(sorted(contadores)), e)
+        else:
+            _avisar(contadores)
+
+
+def incrementar_contadores(*contadores):
+    """Incrementa los contadores en la primaria y confirma (para cambios hechos fuera del ORM)."""
+    with db.engine.begin() as conexion:
+        _incrementar_versiones(conexion, contadores)
+    _avisar(set(contadores))
+
+
+def al_confirmar(funcion):
+    """Llama a funcion(contadores) cada vez que este worker incrementa contadores."""
+    if funcion not in _AL_CONFIRMAR:
+        _AL_CONFIRMAR.append(funcion)
+
+
+def _descartar_tras_rollback(sesion):
+    sesion.info.pop('tablas_cambiadas', None)
+
+
+def versiones_tablas(contadores):
+    """(versiones {contador: version}, último cambio o None) en una sola consulta."""
+    filas = db.session.execute(
+        select(VersionDatos.clave, VersionDatos.version, VersionDatos.actualizado_en)
+        .where(VersionDatos.clave.in_([PREFIJO_TABLA + c for c in contadores]))
+    ).all()
+    versiones = {clave[len(PREFIJO_TABLA):]: version for clave, version, _ in filas}
+    fechas = [actualizado for _, _, actualizado in filas if actualizado]
+    return versiones, max(fechas) if fechas else None
+
+
+# =========================================================
+#  DECORADOR
+# =========================================================
+
+def respuesta_condicional(*modelos, max_age=0, publico=False):
+    """
+    Responde 304 si los datos de las tablas de `modelos` no cambiaron desde
+    la versión que tiene el cliente.
+
+    Args:
+        modelos: modelos o tablas de SQLAlchemy de los que depende la respuesta,
+            o vigilar(Modelo, 'campo', ...) si solo muestra algunas columnas o filas
+        max_age: segundos que el cliente puede reutilizar la respuesta sin revalidar
+        publico: la respuesta no depende del usuario (Cache-Control: public)
+    """
+    tablas = registrar_dependencias(*modelos)
+    cache_control = f"{'public' if publico else 'private'}, " + (f"max-age={max_age}" if max_age else 'no-cache')
+
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            from services.metricas_service import incrementar
+
+            if request.method not in ('GET', 'HEAD') or not current_app.config.get('RESPUESTAS_CONDICIONALES', True):
+                return vista(*args, **kwargs)
+
+            versiones, ultimo_cambio = versiones_tablas(tablas)
+            # La vista puede exigir a sus cachés datos al menos de estas versiones (ver horario_service)
+            g.versiones_condicionales = versiones
+            usuario = '' if publico or not current_user.is_authenticated else current_user.get_id()
+            huella = '|'.join([
+                request.full_path, usuario, date.today().isoformat(),
+                current_app.config.get('VERSION_DESPLIEGUE') or '',
+                ','.join(f"{t}={versiones.get(t, 0)}" for t in tablas),
+            ])
+            etag = hashlib.sha1(huella.encode('utf-8')).hexdigest()[:20]
+            ultima_modificacion = ultimo_cambio.replace(tzinfo=timezone.utc, microsecond=0) if ultimo_cambio else None
+
+            if request.if_none_match:
+                vigente = request.if_none_match.contains_weak(etag)
+            else:
+                vigente = bool(ultima_modificacion and request.if_modified_since
+                               and ultima_modificacion <= request.if_modified_since)
+            if vigente:
+                incrementar('acentrax_http_conditional_total', resultado='304')
+                response = current_app.response_class(status=304)
+            else:
+                incrementar('acentrax_http_conditional_total', resultado='200')
+                response = make_response(vista(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if ultima_modificacion:
+                response.last_modified = ultima_modificacion
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return envoltura
+    return decorador
+
+
+def init_condicional(app):
+    """
+    Registra los contadores de cambios de las tablas vigiladas (también con
+    RESPUESTAS_CONDICIONALES=0, que solo desactiva los 304).
+    """
+    event.listen(SesionEnrutada, 'after_flush', _despues_de_flush)
+    event.listen(SesionEnrutada, 'do_orm_execute', _al_ejecutar)
+    event.listen(SesionEnrutada, 'after_commit', _incrementar_tras_commit)
+    event.listen(SesionEnrutada, 'after_rollback', _descartar_tras_rollback)
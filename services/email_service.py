@@ -1,10 +1,13 @@
 import os
 import secrets
 import string
-import requests
+import logging
 from threading import Thread
 from flask import current_app, render_template, url_for
 from itsdangerous import URLSafeTimedSerializer
+from services.metricas_service import incrementar, ajustar_gauge
+
+logger = logging.getLogger(__name__)
 
 
 # =========================================================
@@ -18,6 +21,8 @@ def sendgrid_send_email(to_email, subject, html_content):
     Envía correos usando la API de SendGrid.
     Compatible con Railway (NO usa SMTP).
     """
+    import requests  # diferido: solo lo necesitan los hilos de envío
+
     url = "https://api.sendgrid.com/v3/mail/send"
 
     headers = {
@@ -39,7 +44,10 @@ def sendgrid_send_email(to_email, subject, html_content):
 
     response = requests.post(url, json=data, headers=headers)
 
-    print("DEBUG SENDGRID:", response.status_code, response.text)
+    if response.status_code >= 400:
+        logger.warning('SendGrid respondió %s: %s', response.status_code, response.text)
+    else:
+        logger.debug('SendGrid respondió %s: %s', response.status_code, response.text)
 
 
 # =========================================================
@@ -52,8 +60,20 @@ def send_async_email(to, subject, html):
     """
     try:
         sendgrid_send_email(to, subject, html)
+        incrementar('acentrax_emails_sent_total', resultado='ok')
     except Exception as e:
-        print("ERROR ENVIANDO CORREO SENDGRID:", str(e))
+        incrementar('acentrax_emails_sent_total', resultado='error')
+        logger.error('ERROR ENVIANDO CORREO SENDGRID: %s', e)
+    finally:
+        ajustar_gauge('acentrax_email_outbox_depth', -1)
+
+
+def enqueue_email(to, subject, html):
+    """
+    Encola el envío en un hilo de fondo y lo cuenta en la bandeja de salida.
+    """
+    ajustar_gauge('acentrax_email_outbox_depth', 1)
+    Thread(target=send_async_email, args=(to, subject, html)).start()
 
 
 # =========================================================
@@ -87,8 +107,8 @@ def send_welcome_email(usuario, verification_code):
         token = generate_verification_token(usuario.id_usuario, verification_code, usuario.correo)
         verification_url = url_for('auth.verify_email_with_token', token=token, _external=True)
 
-        print(f"DEBUG: Token: {token}")
-        print(f"DEBUG: URL: {verification_url}")
+        logger.debug('Token: %s', token)
+        logger.debug('URL: %s', verification_url)
 
         subject = "¡Bienvenido al Sistema Académico - Verifica tu Email!"
 
@@ -99,11 +119,11 @@ def send_welcome_email(usuario, verification_code):
             verification_url=verification_url
         )
 
-        Thread(target=send_async_email, args=(usuario.correo, subject, html_body)).start()
+        enqueue_email(usuario.correo, subject, html_body)
         return True
 
     except Exception as e:
-        print("ERROR PREPARANDO CORREO:", str(e))
+        logger.error('ERROR PREPARANDO CORREO: %s', e)
         return True
 
 
@@ -118,11 +138,11 @@ def send_verification_success_email(usuario, password=None):
             login_url=url_for('auth.login', _external=True)
         )
 
-        Thread(target=send_async_email, args=(usuario.correo, subject, html_body)).start()
+        enqueue_email(usuario.correo, subject, html_body)
         return True
 
     except Exception as e:
-        print("ERROR correo éxito:", str(e))
+        logger.error('ERROR correo éxito: %s', e)
         return False
 
 
@@ -138,11 +158,11 @@ def send_password_reset_email(usuario, token):
             reset_url=reset_url
         )
 
-        Thread(target=send_async_email, args=(usuario.correo, subject, html_body)).start()
+        enqueue_email(usuario.correo, subject, html_body)
         return True
 
     except Exception as e:
-        print("ERROR reset:", str(e))
+        logger.error('ERROR reset: %s', e)
         return False
 
 
@@ -0,0 +1,161 @@
+"""
+Servicio de estáticos con huella de contenido
+
+`flask construir-estaticos` (o el arranque de gunicorn) copia cada CSS y JS
+de static/css y static/js junto al original con un hash de su contenido en
+el nombre (css/login.css -> css/login.3f9a0c1b2d4e.css), minificando los CSS,
+y escribe static/manifiesto.json con la correspondencia.
+
+Con el manifiesto presente, url_for('static', filename='css/login.css')
+devuelve la URL con huella, y esas URLs se sirven con
+Cache-Control: immutable y un año de vigencia: el navegador no vuelve a
+pedirlas hasta que cambie su contenido (y con él la URL). Sin manifiesto, o
+en modo debug, url_for devuelve la URL original de siempre.
+
+Las copias quedan en la misma carpeta que el original para que las rutas
+relativas (url(...) de los CSS, imports de JS) sigan funcionando.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+
+ARCHIVO_MANIFIESTO = 'manifiesto.json'
+CARPETAS_PREDETERMINADAS = ('css', 'js')
+EXTENSIONES_HUELLA = ('.css', '.js')
+
+_PATRON_HUELLA = re.compile(r'^.+\.([0-9a-f]{12})\.(css|js)$')
+# Cadenas (se conservan), comentarios (salvo /*! ... */), separadores y espacios
+_TOKENS_CSS = re.compile(
+    r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')|(/\*(?!!).*?\*/)|\s*([{};,>])\s*|\s+',
+    re.DOTALL
+)
+
+_manifiestos = {}
+
+
+def es_recurso_con_huella(nombre_archivo):
+    """Indica si el archivo es una copia con hash de contenido en el nombre."""
+    return bool(_PATRON_HUELLA.match(os.path.basename(nombre_archivo or '')))
+
+
+def minificar_css(texto):
+    """Quita comentarios y espacios sobrantes sin tocar el contenido de las cadenas."""
+    def sustituir(m):
+        cadena, comentario, separador = m.groups()
+        if cadena:
+            return cadena
+        if comentario:
+            return ''
+        return separador or ' '
+    return _TOKENS_CSS.sub(sustituir, texto).strip()
+
+
+def _nombre_con_huella(relativa, contenido):
+    base, extension = os.path.splitext(relativa)
+    return f"{base}.{hashlib.sha256(contenido).hexdigest()[:12]}{extension}"
+
+
+# =========================================================
+#  CONSTRUCCIÓN
+# =========================================================
+
+def construir_estaticos(carpeta, carpetas=CARPETAS_PREDETERMINADAS, minificar=True):
+    """
+    Escribe las copias con huella y el manifiesto. Borra las copias de
+    construcciones anteriores que ya no estén en el manifiesto.
+
+    Returns:
+        tuple: (manifiesto {original: con huella}, archivos escritos)
+    """
+    manifiesto, escritos, anteriores = {}, 0, set()
+    for subcarpeta in carpetas:
+        for raiz, _, archivos in os.walk(os.path.join(carpeta, subcarpeta)):
+            for nombre in archivos:
+                ruta = os.path.join(raiz, nombre)
+                relativa = os.path.relpath(ruta, carpeta).replace(os.sep, '/')
+                if es_recurso_con_huella(nombre):
+                    anteriores.add(relativa)
+                    continue
+                if not nombre.endswith(EXTENSIONES_HUELLA):
+                    continue
+                with open(ruta, 'rb') as f:
+                    contenido = f.read()
+                if minificar and nombre.endswith('.css'):
+                    try:
+                        contenido = minificar_css(contenido.decode('utf-8')).encode('utf-8')
+                    except UnicodeDecodeError:
+                        logger.warning('CSS sin minificar (no es UTF-8): %s', relativa)
+                destino = _nombre_con_huella(relativa, contenido)
+                manifiesto[relativa] = destino
+                ruta_destino = os.path.join(carpeta, destino)
+                if not os.path.exists(ruta_destino):
+                    temporal = f"{ruta_destino}.{os.getpid()}.tmp"
+                    with open(temporal, 'wb') as f:
+                        f.write(contenido)
+                    os.replace(temporal, ruta_destino)
+                    escritos += 1
+
+    vigentes = set(manifiesto.values())
+    for relativa in anteriores - vigentes:
+        for sufijo in ('', '.gz', '.br'):
+            try:
+                os.remove(os.path.join(carpeta, relativa + sufijo))
+            except FileNotFoundError:
+                pass
+
+    temporal = os.path.join(carpeta, f"{ARCHIVO_MANIFIESTO}.{os.getpid()}.tmp")
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=1, sort_keys=True)
+    os.replace(temporal, os.path.join(carpeta, ARCHIVO_MANIFIESTO))
+    _manifiestos.pop(carpeta, None)
+    return manifiesto, escritos
+
+
+def cargar_manifiesto(carpeta):
+    """Manifiesto de la carpeta ({} si no se ha construido). Se lee una vez por proceso."""
+    if carpeta not in _manifiestos:
+        try:
+            with open(os.path.join(carpeta, ARCHIVO_MANIFIESTO), encoding='utf-8') as f:
+                _manifiestos[carpeta] = json.load(f)
+        except FileNotFoundError:
+            _manifiestos[carpeta] = {}
+        except (OSError, ValueError) as e:
+            logger.warning('Manifiesto de estáticos ilegible, se usan las URLs originales: %s', e)
+            _manifiestos[carpeta] = {}
+    return _manifiestos[carpeta]
+
+
+# =========================================================
+#  URLS
+# =========================================================
+
+def _url_con_huella(app):
+    def url_con_huella(endpoint, valores):
+        if endpoint != 'static' or 'filename' not in valores:
+            return
+        # El manifiesto se lee en el primer url_for de cada proceso: con preload_app
+        # la aplicación se importa antes de que gunicorn construya los estáticos.
+        con_huella = cargar_manifiesto(app.static_folder).get(valores['filename'])
+        if con_huella:
+            valores['filename'] = con_huella
+    return url_con_huella
+
+
+def init_estaticos(app):
+    """Registra las URLs con huella y el comando de construcción."""
+    carpetas = [c.strip() for c in app.config.get('ESTATICOS_CARPETAS', 'css,js').split(',') if c.strip()]
+
+    if app.config.get('ESTATICOS_HUELLA', True) and not app.debug:
+        app.url_defaults(_url_con_huella(app))
+
+    @app.cli.command('construir-estaticos')
+    def construir_estaticos_comando():
+        """Genera las copias con huella de los CSS y JS de static/ y su manifiesto."""
+        manifiesto, escritos = construir_estaticos(app.static_folder, carpetas)
+        logger.info('Estáticos con huella: %s en el manifiesto, %s archivos nuevos', len(manifiesto), escritos)
@@ -0,0 +1,242 @@
+"""
+Servicio de exportación en streaming (CSV / XLSX) de calificaciones,
+asistencia, directorios de usuarios e inventario
+"""
+
+import csv
+import io
+import tempfile
+from datetime import date, datetime
+
+from flask import Response, stream_with_context
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from controllers.models import (
+    db, Usuario, Rol, Matricula, Curso, Asignatura, Clase, Asistencia,
+    Calificacion, CategoriaCalificacion, Equipo, Salon, Sede
+)
+
+
+FILAS_POR_LOTE = 1000
+TAMANO_BLOQUE = 64 * 1024
+
+FORMATOS_EXPORTACION = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+# =========================================================
+#  CONSULTAS (cursores del lado del servidor)
+# =========================================================
+
+def _iterar_filas(consulta):
+    """Recorre la consulta en lotes de FILAS_POR_LOTE sin materializar el resultado."""
+    resultado = db.session.execute(consulta.execution_options(yield_per=FILAS_POR_LOTE))
+    for fila in resultado:
+        yield tuple(fila)
+
+
+def _curso_actual_subconsulta():
+    return (
+        select(Curso.nombreCurso)
+        .join(Matricula, Matricula.cursoId == Curso.id_curso)
+        .where(Matricula.estudianteId == Usuario.id_usuario)
+        .order_by(Matricula.año.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _matricula_actual_subconsulta():
+    """Id de la matrícula más reciente del estudiante (una sola fila por calificación)."""
+    reciente = aliased(Matricula)
+    return (
+        select(reciente.id_matricula)
+        .where(reciente.estudianteId == Usuario.id_usuario)
+        .order_by(reciente.año.desc(), reciente.id_matricula.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def exportacion_usuarios(rol_nombre=None):
+    """Directorio de usuarios, opcionalmente filtrado por rol."""
+    encabezados = [
+        'Tipo documento', 'No. identidad', 'Nombre', 'Apellido', 'Correo',
+        'Teléfono', 'Dirección', 'Rol', 'Curso actual', 'Estado cuenta', 'Correo verificado'
+    ]
+    consulta = (
+        select(
+            Usuario.tipo_doc, Usuario.no_identidad, Usuario.nombre, Usuario.apellido,
+            Usuario.correo, Usuario.telefono, Usuario.direccion, Rol.nombre,
+            _curso_actual_subconsulta(), Usuario.estado_cuenta, Usuario.email_verified
+        )
+        .join(Rol, Usuario.id_rol_fk == Rol.id_rol)
+        .order_by(Rol.nombre, Usuario.apellido, Usuario.nombre)
+    )
+    if rol_nombre:
+        consulta = consulta.where(Rol.nombre == rol_nombre)
+    return encabezados, _iterar_filas(consulta)
+
+
+def exportacion_calificaciones(curso_id=None, asignatura_id=None):
+    """Calificaciones individuales de los estudiantes matriculados en el curso."""
+    encabezados = [
+        'Curso', 'No. identidad', 'Apellido', 'Nombre', 'Asignatura', 'Categoría',
+        'Porcentaje categoría', 'Calificación', 'Valor', 'Observaciones', 'Fecha registro'
+    ]
+    consulta = (
+        select(
+            Curso.nombreCurso, Usuario.no_identidad, Usuario.apellido, Usuario.nombre,
+            Asignatura.nombre, CategoriaCalificacion.nombre, CategoriaCalificacion.porcentaje,
+            Calificacion.nombre_calificacion, Calificacion.valor, Calificacion.observaciones,
+            Calificacion.fecha_registro
+        )
+        .join(Usuario, Calificacion.estudianteId == Usuario.id_usuario)
+        .join(Asignatura, Calificacion.asignaturaId == Asignatura.id_asignatura)
+        .join(CategoriaCalificacion, Calificacion.categoriaId == CategoriaCalificacion.id_categoria)
+        .outerjoin(Matricula, Matricula.id_matricula == _matricula_actual_subconsulta())
+        .outerjoin(Curso, Matricula.cursoId == Curso.id_curso)
+        .order_by(Curso.nombreCurso, Usuario.apellido, Usuario.nombre, Asignatura.nombre, Calificacion.fecha_registro)
+    )
+    if curso_id:
+        consulta = consulta.where(Curso.id_curso == curso_id)
+    if asignatura_id:
+        consulta = consulta.where(Calificacion.asignaturaId == asignatura_id)
+    return encabezados, _iterar_filas(consulta)
+
+
+def exportacion_asistencia(curso_id=None, fecha_desde=None, fecha_hasta=None):
+    """Registros de asistencia por clase, opcionalmente acotados por curso y fechas."""
+    encabezados = [
+        'Fecha', 'Curso', 'Asignatura', 'No. identidad', 'Apellido', 'Nombre', 'Estado', 'Excusa'
+    ]
+    consulta = (
+        select(
+            Asistencia.fecha, Curso.nombreCurso, Asignatura.nombre, Usuario.no_identidad,
+            Usuario.apellido, Usuario.nombre, Asistencia.estado, Asistencia.excusa
+        )
+        .join(Usuario, Asistencia.estudianteId == Usuario.id_usuario)
+        .join(Clase, Asistencia.claseId == Clase.id_clase)
+        .join(Curso, Clase.cursoId == Curso.id_curso)
+        .join(Asignatura, Clase.asignaturaId == Asignatura.id_asignatura)
+        .order_by(Asistencia.fecha, Curso.nombreCurso, Usuario.apellido, Usuario.nombre)
+    )
+    if curso_id:
+        consulta = consulta.where(Clase.cursoId == curso_id)
+    if fecha_desde:
+        consulta = consulta.where(Asistencia.fecha >= fecha_desde)
+    if fecha_hasta:
+        consulta = consulta.where(Asistencia.fecha <= fecha_hasta)
+    return encabezados, _iterar_filas(consulta)
+
+
+def exportacion_inventario():
+    """Inventario de equipos con su salón y sede."""
+    encabezados = [
+        'ID referencia', 'Nombre', 'Tipo', 'Estado', 'Sede', 'Salón', 'Sistema operativo',
+        'RAM', 'Disco duro', 'Fecha adquisición', 'Descripción', 'Observaciones'
+    ]
+    consulta = (
+        select(
+            Equipo.id_referencia, Equipo.nombre, Equipo.tipo, Equipo.estado, Sede.nombre,
+            Salon.nombre, Equipo.sistema_operativo, Equipo.ram, Equipo.disco_duro,
+            Equipo.fecha_adquisicion, Equipo.descripcion, Equipo.observaciones
+        )
+        .join(Salon, Equipo.id_salon_fk == Salon.id_salon)
+        .join(Sede, Salon.id_sede_fk == Sede.id_sede)
+        .order_by(Sede.nombre, Salon.nombre, Equipo.nombre)
+    )
+    return encabezados, _iterar_filas(consulta)
+
+
+# =========================================================
+#  ESCRITORES
+# =========================================================
+
+def _valor_celda(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return valor.strftime('%Y-%m-%d %H:%M')
+    if isinstance(valor, date):
+        return valor.strftime('%Y-%m-%d')
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    return valor
+
+
+def _generar_csv(encabezados, filas):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    buffer.write('\ufeff')
+    escritor.writerow(encabezados)
+    for indice, fila in enumerate(filas, start=1):
+        escritor.writerow([_valor_celda(v) for v in fila])
+        if indice % FILAS_POR_LOTE == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode('utf-8')
+
+
+def _generar_xlsx(encabezados, filas, titulo):
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(title=titulo[:31])
+    hoja.append(encabezados)
+    for fila in filas:
+        hoja.append([_valor_celda(v) for v in fila])
+
+    with tempfile.TemporaryFile() as archivo:
+        libro.save(archivo)
+        archivo.seek(0)
+        while True:
+            bloque = archivo.read(TAMANO_BLOQUE)
+            if not bloque:
+                break
+            yield bloque
+
+
+def xlsx_disponible():
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def respuesta_exportacion(nombre_archivo, encabezados, filas, formato='csv'):
+    """
+    Construye una respuesta en streaming con las filas exportadas.
+
+    Args:
+        nombre_archivo (str): Nombre base del archivo descargado (sin extensión)
+        encabezados (list): Encabezados de columna
+        filas (iterable): Filas producidas por un cursor del lado del servidor
+        formato (str): 'csv' o 'xlsx'
+
+    Returns:
+        tuple: (respuesta, error)
+    """
+    if formato not in FORMATOS_EXPORTACION:
+        return None, f"Formato no soportado: {formato}"
+    if formato == 'xlsx' and not xlsx_disponible():
+        return None, "La exportación XLSX requiere el paquete openpyxl"
+
+    if formato == 'csv':
+        generador = _generar_csv(encabezados, filas)
+    else:
+        generador = _generar_xlsx(encabezados, filas, nombre_archivo)
+
+    fecha = datetime.now().strftime('%Y%m%d_%H%M')
+    respuesta = Response(stream_with_context(generador), mimetype=FORMATOS_EXPORTACION[formato])
+    respuesta.headers['Content-Disposition'] = f'attachment; filename="{nombre_archivo}_{fecha}.{formato}"'
+    respuesta.headers['Cache-Control'] = 'no-store'
+    respuesta.headers['X-Accel-Buffering'] = 'no'
+    return respuesta, None
@@ -0,0 +1,504 @@
+"""
+Servicio de horarios semanales materializados
+
+Cada vista de horario reconstruía la matriz semanal (día × bloque) a partir
+de las filas en crudo en cada petición: generar_matriz_horario_profesor
+recorría todos los bloques por todas las asignaciones volviendo a leer las
+horas "HH:MM", y /estudiante/api/mi-horario y /padre/api/horario_estudiante
+repetían su propia normalización de días y horas y la expansión por horas.
+El dashboard del profesor, además, llama a esas funciones varias veces por
+carga (matriz, clase actual, próxima clase y el context processor).
+
+Aquí la matriz se construye una sola vez por curso y por profesor, con los
+mismos datos que devolvían las rutas, y se guarda por worker junto con la
+versión del contador 'horarios' de services/condicional_service.py. Ese
+contador se incrementa al confirmar cualquier cambio de HorarioCurso,
+HorarioCompartido o BloqueHorario, de los días de HorarioGeneral, del
+horario general, nombre o sede de un Curso, o de los nombres que muestra la
+matriz (asignatura, salón, sede y profesor; de los usuarios solo cuentan los
+profesores). Como en la caché de la votación, cada worker relee la versión
+como máximo una vez cada HORARIOS_VERSION_TTL segundos, de modo que un
+dashboard ya materializado no consulta la base de datos para el horario.
+En las vistas con @respuesta_condicional la matriz nunca es anterior a la
+versión con la que se calculó la ETag (g.versiones_condicionales): si no,
+el cliente guardaría la ETag nueva con el horario viejo y revalidaría con
+304 hasta el siguiente cambio.
+La versión y las matrices se leen siempre de la primaria, también dentro de
+una vista @solo_lectura: una matriz construida con una réplica atrasada
+quedaría guardada con una versión que no le corresponde. Cada clave se
+construye bajo su propio cerrojo. Los cambios hechos con SQL directo fuera
+de la aplicación requieren `flask invalidar-horarios`.
+
+Las estructuras devueltas son compartidas entre peticiones: no se deben
+modificar.
+"""
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, has_request_context
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import aliased
+
+from controllers.models import (
+    Asignatura, BloqueHorario, Curso, HorarioCompartido, HorarioCurso, HorarioGeneral, Salon, Sede, Usuario
+)
+from extensions import db
+from services.condicional_service import (
+    al_confirmar, incrementar_contadores, registrar_dependencias, versiones_tablas, vigilar
+)
+from services.replica_service import lectura_en_primaria
+
+logger = logging.getLogger(__name__)
+
+
+CONTADOR_HORARIOS = 'horarios'
+ROL_PROFESOR = 2
+DIAS_SEMANA = ['lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado', 'domingo']
+DIAS_POR_DEFECTO = DIAS_SEMANA[:6]
+TIPOS_DESCANSO = ('break', 'descanso', 'receso')
+
+
+def _es_profesor(usuario):
+    # También con el rol anterior: sus clases siguen en los horarios guardados
+    return ROL_PROFESOR in (usuario.id_rol_fk, *inspect(usuario).attrs.id_rol_fk.history.deleted)
+
+
+# Cambios que invalidan los horarios (sin columnas: cualquier cambio), todos en un mismo contador
+DEPENDENCIAS = (
+    vigilar(HorarioCurso, contador=CONTADOR_HORARIOS),
+    vigilar(HorarioCompartido, contador=CONTADOR_HORARIOS),
+    vigilar(BloqueHorario, contador=CONTADOR_HORARIOS),
+    vigilar(HorarioGeneral, 'diasSemana', contador=CONTADOR_HORARIOS),
+    vigilar(Curso, 'horario_general_id', 'nombreCurso', 'sedeId', contador=CONTADOR_HORARIOS),
+    vigilar(Asignatura, 'nombre', contador=CONTADOR_HORARIOS),
+    vigilar(Salon, 'nombre', 'id_sede_fk', contador=CONTADOR_HORARIOS),
+    vigilar(Sede, 'nombre', contador=CONTADOR_HORARIOS),
+    vigilar(Usuario, 'nombre', 'apellido', filtro=_es_profesor, contador=CONTADOR_HORARIOS),
+)
+registrar_dependencias(*DEPENDENCIAS)
+
+_ACENTOS = {'miércoles': 'miercoles', 'sábado': 'sabado'}
+
+_lock = threading.Lock()
+_candados = {}
+_version_local = {'valor': None, 'leida_en': 0.0}
+_cache = {}
+
+
+# =========================================================
+#  NORMALIZACIÓN DE DÍAS Y HORAS
+# =========================================================
+
+def normalizar_dia(dia):
+    """'Miércoles ' -> 'miercoles'; None si está vacío."""
+    if not dia:
+        return None
+    dia = str(dia).strip().lower()
+    return _ACENTOS.get(dia, dia)
+
+
+def formato_hora(valor):
+    """'HH:MM' de un time, datetime o texto ('7:05', '07:05:00'); '' si no se puede leer."""
+    if valor is None:
+        return ''
+    if hasattr(valor, 'strftime'):
+        return valor.strftime('%H:%M')
+    texto = str(valor).strip()
+    if len(texto) >= 5 and texto[2] == ':':
+        return texto[:5]
+    if ':' in texto:
+        partes = texto.split(':')
+        try:
+            return f"{int(partes[0] or 0):02d}:{int(partes[1] or 0):02d}"
+        except ValueError:
+            return ''
+    return ''
+
+
+def minutos(hora):
+    """Minutos desde medianoche de 'HH:MM', o None."""
+    try:
+        h, m = hora.split(':')
+        return int(h) * 60 + int(m)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _minutos_inicio(bloque):
+    """Minutos de inicio de 'HH:MM-HH:MM' para ordenar; los ilegibles al final."""
+    inicio = minutos(bloque.split('-')[0])
+    return inicio if inicio is not None else 24 * 60
+
+
+def indice_dia(dia):
+    """Posición del día en la semana (lunes = 0) para ordenar; 999 si no es un día."""
+    dia = normalizar_dia(dia)
+    return DIAS_SEMANA.index(dia) if dia in DIAS_SEMANA else 999
+
+
+# =========================================================
+#  VERSIÓN E INVALIDACIÓN
+# =========================================================
+
+def _invalidar_tras_commit(contadores):
+    if CONTADOR_HORARIOS in contadores:
+        _version_local['leida_en'] = 0.0
+
+
+def _leer_version():
+    with lectura_en_primaria():
+        versiones, _ = versiones_tablas((CONTADOR_HORARIOS,))
+    _version_local['valor'] = versiones.get(CONTADOR_HORARIOS, 0)
+    _version_local['leida_en'] = time.monotonic()
+    return _version_local['valor']
+
+
+def obtener_version_horarios():
+    """
+    Devuelve la versión actual de los horarios.
+
+    Se relee de la primaria como máximo una vez cada HORARIOS_VERSION_TTL
+    segundos por worker (y justo después de un commit de este worker que los
+    haya cambiado).
+    """
+    ttl = current_app.config.get('HORARIOS_VERSION_TTL', 1.0)
+    if _version_local['valor'] is None or time.monotonic() - _version_local['leida_en'] >= ttl:
+        return _leer_version()
+    return _version_local['valor']
+
+
+def invalidar_horarios():
+    """Incrementa la versión (para cambios hechos fuera del ORM)."""
+    incrementar_contadores(CONTADOR_HORARIOS)
+
+
+def _version_de_la_etag():
+    """Versión de los horarios con la que @respuesta_condicional calculó la ETag de la petición, o 0."""
+    if not has_request_context():
+        return 0
+    return g.get('versiones_condicionales', {}).get(CONTADOR_HORARIOS, 0)
+
+
+def _candado(clave):
+    with _lock:
+        return _candados.setdefault(clave, threading.Lock())
+
+
+def _materializado(clave, construir):
+    """Valor en caché para la versión actual, construyéndolo una sola vez por versión."""
+    version = max(obtener_version_horarios(), _version_de_la_etag())
+    entrada = _cache.get(clave)
+    if entrada and entrada[0] >= version:
+        return entrada[1]
+
+    with _candado(clave):
+        entrada = _cache.get(clave)
+        if entrada and entrada[0] >= version:
+            return entrada[1]
+        # Versión y datos de la primaria, la versión antes que los datos: la
+        # primaria nunca va por detrás de la versión de la ETag
+        with lectura_en_primaria():
+            version = _leer_version()
+            valor = construir()
+        _cache[clave] = (version, valor)
+        return valor
+
+
+# =========================================================
+#  HORARIO DE UN CURSO (estudiantes y padres)
+# =========================================================
+
+def _bloques_por_hora(entradas):
+    """Bloques de una hora que cubren las entradas; 06:00-20:00 si no hay ninguna."""
+    inicios = [e['ini_m'] for e in entradas if e['ini_m'] is not None]
+    fines = [e['fin_m'] for e in entradas if e['fin_m'] is not None]
+    if not inicios:
+        return [f"{h:02d}:00-{h + 1:02d}:00" for h in range(6, 20)]
+    primera = min(inicios) // 60
+    ultima = (max(fines) + 59) // 60 if fines else primera + 6
+    return [f"{h:02d}:00-{h + 1:02d}:00" for h in range(primera, max(primera + 1, ultima))]
+
+
+def construir_horario_curso(curso_id):
+    """
+    Horario semanal del curso, o None si el curso no existe:
+
+        curso, sede         nombres
+        clases              {'<dia>_HH:00': clase} por cada hora cubierta
+        dias                días del horario general (o de las clases)
+        bloques             ['HH:MM-HH:MM', ...] en el orden del horario general
+        matriz_bloques      {dia: {bloque: {tipo, nombre, break_type, class_type}}}
+        clases_por_bloque   {dia: {bloque: clase o None}}
+        entradas            número de filas de HorarioCurso del curso
+    """
+    fila = db.session.execute(
+        select(Curso.nombreCurso, Sede.nombre, HorarioGeneral.id_horario, HorarioGeneral.diasSemana)
+        .outerjoin(Sede, Curso.sedeId == Sede.id_sede)
+        .outerjoin(HorarioGeneral, Curso.horario_general_id == HorarioGeneral.id_horario)
+        .where(Curso.id_curso == curso_id)
+    ).first()
+    if fila is None:
+        return None
+    nombre_curso, sede, horario_general_id, dias_json = fila
+
+    filas = db.session.execute(
+        select(HorarioCurso.dia_semana, HorarioCurso.hora_inicio, HorarioCurso.hora_fin,
+               Asignatura.nombre, Usuario.nombre, Usuario.apellido, Salon.nombre)
+        .join(Asignatura, HorarioCurso.asignatura_id == Asignatura.id_asignatura)
+        .outerjoin(Usuario, HorarioCurso.profesor_id == Usuario.id_usuario)
+        .outerjoin(Salon, HorarioCurso.id_salon_fk == Salon.id_salon)
+        .where(HorarioCurso.curso_id == curso_id)
+        .order_by(HorarioCurso.id_horario_curso)
+    ).all()
+
+    entradas = []
+    for dia, hora_inicio, hora_fin, asignatura, nombre, apellido, salon in filas:
+        inicio, fin = formato_hora(hora_inicio), formato_hora(hora_fin)
+        entradas.append({
+            'dia': normalizar_dia(dia), 'inicio': inicio, 'fin': fin,
+            'ini_m': minutos(inicio), 'fin_m': minutos(fin) if fin else None,
+            'asignatura': asignatura or 'N/A',
+            'profesor': f"{nombre} {apellido}" if nombre is not None else 'N/A',
+            'salon': salon or 'N/A',
+        })
+
+    # Mapa por hora (compatibilidad): cada rango se expande a las horas que cubre
+    clases = {}
+    for e in entradas:
+        if not e['dia'] or e['ini_m'] is None:
+            continue
+        if e['fin_m'] is None or e['fin_m'] <= e['ini_m']:
+            horas = [e['inicio']]
+        else:
+            horas = [f"{h:02d}:00" for h in range(e['ini_m'] // 60, (e['fin_m'] + 59) // 60)]
+        for hora in horas:
+            clases.setdefault(f"{e['dia']}_{hora}", {
+                'asignatura': e['asignatura'], 'profesor': e['profesor'], 'salon': e['salon'],
+                'hora_inicio': e['inicio'], 'hora_fin': e['fin'] or 'N/A'
+            })
+
+    # Bloques y descansos del horario general
+    dias, bloques, matriz_bloques, clases_por_bloque = [], [], {}, {}
+    rangos = {}  # dia -> [(inicio, fin, bloque)] en minutos
+    if horario_general_id is not None:
+        try:
+            dias = json.loads(dias_json) if dias_json else []
+        except ValueError:
+            dias = []
+        filas_bloques = db.session.execute(
+            select(BloqueHorario.dia_semana, BloqueHorario.horaInicio, BloqueHorario.horaFin, BloqueHorario.tipo,
+                   BloqueHorario.nombre, BloqueHorario.break_type, BloqueHorario.class_type)
+            .where(BloqueHorario.horario_general_id == horario_general_id)
+            .order_by(BloqueHorario.orden, BloqueHorario.id_bloque)
+        ).all()
+        vistos = set()
+        for dia, hora_inicio, hora_fin, tipo, nombre, break_type, class_type in filas_bloques:
+            dia, inicio, fin = normalizar_dia(dia), formato_hora(hora_inicio), formato_hora(hora_fin)
+            if not inicio or not fin:
+                continue
+            bloque = f"{inicio}-{fin}"
+            if bloque not in vistos:
+                vistos.add(bloque)
+                bloques.append(bloque)
+            if dia:
+                matriz_bloques.setdefault(dia, {})[bloque] = {
+                    'tipo': (tipo or '').lower(), 'nombre': nombre or '',
+                    'break_type': break_type or '', 'class_type': class_type or ''
+                }
+                clases_por_bloque.setdefault(dia, {})[bloque] = None
+                rangos.setdefault(dia, {})[bloque] = (minutos(inicio), minutos(fin))
+
+    if not dias:
+        dias = sorted({e['dia'] for e in entradas if e['dia']}) or list(DIAS_POR_DEFECTO)
+    if not bloques:
+        bloques = _bloques_por_hora(entradas)
+
+    # Cada clase ocupa los bloques del día con los que se solapa (los descansos no)
+    for e in entradas:
+        if not e['dia'] or e['ini_m'] is None or e['fin_m'] is None:
+            continue
+        for bloque, (inicio, fin) in rangos.get(e['dia'], {}).items():
+            if inicio is None or fin is None or max(e['ini_m'], inicio) >= min(e['fin_m'], fin):
+                continue
+            if matriz_bloques[e['dia']][bloque]['tipo'] in TIPOS_DESCANSO:
+                continue
+            clases_por_bloque[e['dia']][bloque] = {
+                'asignatura': e['asignatura'], 'profesor': e['profesor'], 'salon': e['salon'],
+                'hora_inicio': e['inicio'], 'hora_fin': e['fin']
+            }
+
+    return {
+        'curso': nombre_curso,
+        'sede': sede or 'N/A',
+        'clases': clases,
+        'dias': dias,
+        'bloques': bloques,
+        'matriz_bloques': matriz_bloques,
+        'clases_por_bloque': clases_por_bloque,
+        'entradas': len(filas),
+    }
+
+
+def horario_curso(curso_id):
+    """Horario materializado del curso (ver construir_horario_curso); None si no existe."""
+    return _materializado(('curso', curso_id), lambda: construir_horario_curso(curso_id))
+
+
+# =========================================================
+#  HORARIO DE UN PROFESOR
+# =========================================================
+
+def _matriz_respaldo(detallados):
+    """Matriz derivada solo de las clases, para profesores cuyos cursos no tienen bloques."""
+    dias, bloques, celdas = set(), set(), {}
+    for h in detallados:
+        dia = (h['dia_semana'] or '').strip()
+        inicio, fin = str(h['hora_inicio'] or '')[:5], str(h['hora_fin'] or '')[:5]
+        if dia:
+            dias.add(dia)
+        if not (inicio and fin):
+            continue
+        bloque = f"{inicio}-{fin}"
+        bloques.add(bloque)
+        if dia:
+            celda = celdas.setdefault(dia, {}).setdefault(bloque, {'tipo': 'clase', 'nombre': '', 'asignaturas': []})
+            celda['asignaturas'].append({
+                'asignatura_nombre': h['asignatura_nombre'], 'curso_nombre': h['curso_nombre'],
+                'salon': h['salon'], 'hora_inicio': inicio, 'hora_fin': fin, 'sede': h['sede']
+            })
+    dias = sorted(dias, key=lambda d: (indice_dia(d), d))
+    bloques = sorted(bloques, key=_minutos_inicio)
+    vacia = {'tipo': 'clase', 'asignaturas': []}
+    matriz = {d: {b: celdas.get(d, {}).get(b, vacia) for b in bloques} for d in dias}
+    return dias, bloques, matriz
+
+
+def construir_horario_profesor(profesor_id):
+    """
+    Horario semanal del profesor:
+
+        detallados  una entrada por HorarioCurso (curso, asignatura, día, horas, salón, sede)
+        semana      [(día 0-6, minuto de inicio, entrada de detallados)] en orden semanal
+        dias        días con bloques en los horarios generales de sus cursos, de lunes a domingo
+        bloques     ['HH:MM-HH:MM', ...] ordenados por hora de inicio
+        matriz      {dia: {bloque: {tipo, tipo_original, nombre, asignaturas, break_type, class_type}}}
+        respaldo    (dias, bloques, matriz) construidos solo con las clases, o None si no hacen
+                    falta (hay bloques) o no hay clases
+    """
+    sede_salon, sede_curso = aliased(Sede), aliased(Sede)
+    filas = db.session.execute(
+        select(HorarioCurso.id_horario_curso, HorarioCurso.curso_id, HorarioCurso.asignatura_id,
+               HorarioCurso.dia_semana, HorarioCurso.hora_inicio, HorarioCurso.hora_fin,
+               Curso.nombreCurso, Curso.horario_general_id, Asignatura.nombre, Salon.nombre,
+               sede_salon.nombre, sede_curso.nombre)
+        .join(Curso, HorarioCurso.curso_id == Curso.id_curso)
+        .join(Asignatura, HorarioCurso.asignatura_id == Asignatura.id_asignatura)
+        .outerjoin(Salon, HorarioCurso.id_salon_fk == Salon.id_salon)
+        .outerjoin(sede_salon, Salon.id_sede_fk == sede_salon.id_sede)
+        .outerjoin(sede_curso, Curso.sedeId == sede_curso.id_sede)
+        .where(HorarioCurso.profesor_id == profesor_id)
+        .order_by(HorarioCurso.id_horario_curso)
+    ).all()
+
+    detallados, semana = [], []
+    grupos = {}  # (curso_id, dia, inicio) -> [(ini_m, fin_m, asignacion)], en orden de aparición
+    for (id_horario, curso_id, asignatura_id, dia, hora_inicio, hora_fin, curso, horario_general_id,
+         asignatura, salon, sede_del_salon, sede_del_curso) in filas:
+        detallados.append({
+            'curso_nombre': curso or 'N/A',
+            'asignatura_nombre': asignatura or 'N/A',
+            'dia_semana': dia or 'N/A',
+            'hora_inicio': hora_inicio or 'N/A',
+            'hora_fin': hora_fin or 'N/A',
+            'salon': salon or 'N/A',
+            'sede': sede_del_salon or sede_del_curso or 'N/A',
+            'origen_id_horario_curso': id_horario
+        })
+        dia_semana, inicio_semana = indice_dia(dia), minutos(formato_hora(hora_inicio))
+        if dia_semana < len(DIAS_SEMANA) and inicio_semana is not None:
+            semana.append((dia_semana, inicio_semana, detallados[-1]))
+        dia, inicio, fin = normalizar_dia(dia), formato_hora(hora_inicio), formato_hora(hora_fin)
+        if not dia or not inicio or not fin:
+            continue
+        grupos.setdefault((curso_id, dia, inicio), []).append((minutos(inicio), minutos(fin), {
+            'curso_id': curso_id,
+            'curso_nombre': curso or 'N/A',
+            'asignatura_id': asignatura_id,
+            'asignatura_nombre': asignatura or 'N/A',
+            'hora_inicio': inicio,
+            'hora_fin': fin,
+            'salon': salon or 'N/A',
+            'sede': sede_del_curso or 'N/A'
+        }))
+
+    por_dia = {}
+    for (_, dia, _), asignaciones in grupos.items():
+        por_dia.setdefault(dia, []).extend(asignaciones)
+
+    horarios_generales = {fila.horario_general_id for fila in filas if fila.horario_general_id is not None}
+    filas_bloques = db.session.execute(
+        select(BloqueHorario.dia_semana, BloqueHorario.horaInicio, BloqueHorario.horaFin, BloqueHorario.tipo,
+               BloqueHorario.nombre, BloqueHorario.break_type, BloqueHorario.class_type)
+        .where(BloqueHorario.horario_general_id.in_(horarios_generales))
+        .order_by(BloqueHorario.orden, BloqueHorario.id_bloque)
+    ).all() if horarios_generales else []
+
+    dias, bloques, matriz = set(), {}, {}
+    for dia, hora_inicio, hora_fin, tipo, nombre, break_type, class_type in filas_bloques:
+        dia, inicio, fin = normalizar_dia(dia), formato_hora(hora_inicio), formato_hora(hora_fin)
+        if not dia or not inicio or not fin:
+            continue
+        bloque = f"{inicio}-{fin}"
+        dias.add(dia)
+        bloques[bloque] = None
+        b_ini, b_fin = minutos(inicio), minutos(fin)
+        en_bloque = [] if b_ini is None or b_fin is None else [
+            a for a_ini, a_fin, a in por_dia.get(dia, ())
+            if a_ini is not None and a_fin is not None and max(a_ini, b_ini) < min(a_fin, b_fin)
+        ]
+        matriz.setdefault(dia, {})[bloque] = {
+            'tipo': tipo.lower().strip() if tipo else 'clase',
+            'tipo_original': tipo,
+            'nombre': nombre or '',
+            'asignaturas': en_bloque,
+            'break_type': break_type or None,
+            'class_type': class_type or None
+        }
+
+    dias = sorted(dias, key=lambda d: (indice_dia(d), d))
+    bloques = sorted(bloques, key=_minutos_inicio)
+    respaldo = None
+    if (not dias or not bloques) and detallados:
+        respaldo = _matriz_respaldo(detallados)
+    semana.sort(key=lambda clase: clase[:2])
+    return {'detallados': detallados, 'semana': semana, 'dias': dias, 'bloques': bloques, 'matriz': matriz,
+            'respaldo': respaldo}
+
+
+def horario_profesor(profesor_id):
+    """Horario materializado del profesor (ver construir_horario_profesor)."""
+    return _materializado(('profesor', profesor_id), lambda: construir_horario_profesor(profesor_id))
+
+
+def siguiente_clase(profesor_id, dia, minuto):
+    """Primera clase del profesor desde el día (lunes = 0) y minuto dados, volviendo al lunes; None si no hay."""
+    semana = horario_profesor(profesor_id)['semana']
+    if not semana:
+        return None
+    i = bisect_left(semana, (dia, minuto), key=lambda clase: clase[:2])
+    return semana[i % len(semana)][2]
+
+
+def init_horarios(app):
+    """Registra la invalidación de los horarios materializados."""
+    al_confirmar(_invalidar_tras_commit)
+
+    @app.cli.command('invalidar-horarios')
+    def invalidar_horarios_comando():
+        """Fuerza la reconstrucción de los horarios tras cambios hechos con SQL directo."""
+        invalidar_horarios()
+        logger.info('Horarios invalidados')
@@ -0,0 +1,105 @@
+"""
+Servicio de procesamiento de fotos de candidatos
+"""
+
+import hashlib
+import os
+import re
+from io import BytesIO
+
+from flask import url_for
+
+
+ANCHOS_RENDICION = (160, 320, 640)
+ANCHO_PRINCIPAL = 320
+TAMANO_MAXIMO = 5 * 1024 * 1024
+CARPETA_CANDIDATOS = 'images/candidatos'
+
+FORMATOS_RENDICION = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+
+_PATRON_RENDICION = re.compile(r'^([0-9a-f]{16})-(\d+)\.(webp|jpg)$')
+
+
+def _a_rgb(imagen):
+    """Convierte la imagen a RGB aplanando la transparencia sobre fondo blanco."""
+    from PIL import Image
+
+    if imagen.mode in ('RGBA', 'LA') or (imagen.mode == 'P' and 'transparency' in imagen.info):
+        imagen = imagen.convert('RGBA')
+        fondo = Image.new('RGB', imagen.size, (255, 255, 255))
+        fondo.paste(imagen, mask=imagen.getchannel('A'))
+        return fondo
+    return imagen.convert('RGB')
+
+
+def procesar_foto_candidato(datos, carpeta):
+    """
+    Decodifica la foto, elimina sus metadatos y guarda las rendiciones de
+    ancho fijo en WebP y JPEG con nombres derivados del contenido.
+
+    Args:
+        datos (bytes): Contenido original del archivo subido
+        carpeta (str): Carpeta destino de las rendiciones
+
+    Returns:
+        tuple: (nombre de la rendición JPEG principal, error)
+    """
+    # PIL se importa al procesar una foto, no al arrancar la aplicación
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    if len(datos) > TAMANO_MAXIMO:
+        return None, "❌ La imagen es demasiado grande. Máximo 5MB"
+
+    try:
+        imagen = Image.open(BytesIO(datos))
+        imagen = ImageOps.exif_transpose(imagen)
+        imagen = _a_rgb(imagen)
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None, "❌ El archivo no es una imagen válida"
+
+    digest = hashlib.sha256(datos).hexdigest()[:16]
+    os.makedirs(carpeta, exist_ok=True)
+
+    for ancho in ANCHOS_RENDICION:
+        ancho_real = min(ancho, imagen.width)
+        alto_real = max(1, round(imagen.height * ancho_real / imagen.width))
+        rendicion = imagen.resize((ancho_real, alto_real), Image.LANCZOS)
+
+        for extension, formato, opciones in FORMATOS_RENDICION:
+            destino = os.path.join(carpeta, f"{digest}-{ancho}.{extension}")
+            if os.path.exists(destino):
+                continue
+            temporal = f"{destino}.tmp"
+            rendicion.save(temporal, formato, **opciones)
+            os.replace(temporal, destino)
+
+    return f"{digest}-{ANCHO_PRINCIPAL}.jpg", None
+
+
+def es_rendicion(nombre_archivo):
+    """Indica si el archivo es una rendición con nombre derivado del contenido."""
+    return bool(_PATRON_RENDICION.match(os.path.basename(nombre_archivo or '')))
+
+
+def urls_rendiciones(foto):
+    """
+    Devuelve las URLs de las rendiciones de una foto procesada, o None si la
+    foto es un archivo original sin procesar.
+    """
+    coincidencia = _PATRON_RENDICION.match(foto or '')
+    if not coincidencia:
+        return None
+
+    digest = coincidencia.group(1)
+    urls = {'src': url_for('static', filename=f"{CARPETA_CANDIDATOS}/{digest}-{ANCHO_PRINCIPAL}.jpg")}
+    for extension, _, _ in FORMATOS_RENDICION:
+        urls[extension] = ", ".join(
+            f"{url_for('static', filename=f'{CARPETA_CANDIDATOS}/{digest}-{ancho}.{extension}')} {ancho}w"
+            for ancho in ANCHOS_RENDICION
+        )
+    return urls
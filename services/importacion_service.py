@@ -0,0 +1,383 @@
+"""
+Servicio de importación masiva de equipos (CSV / XLSX)
+
+/admin/registro_equipos da de alta un equipo por envío. importar_equipos()
+recibe un archivo con una fila por equipo y:
+
+    - lo lee en streaming (csv.reader u openpyxl en modo read_only), sin
+      cargarlo entero en memoria;
+    - valida cada fila contra el conjunto de salones (una consulta al
+      empezar) y la unicidad de id_referencia con una consulta IN por lote
+      y un diccionario de las referencias ya vistas en el archivo, sin
+      distinguir mayúsculas (como la collation de MySQL);
+    - inserta las filas válidas de cada lote con un único INSERT
+      (executemany), todo en una transacción que se confirma al final;
+    - devuelve un informe con los errores de cada fila.
+
+Las filas con errores no se importan; el resto sí. Con simular=True solo
+se valida. Los archivos grandes se procesan en un hilo de fondo
+(iniciar_importacion), con el estado y el CSV de errores en disco, como los
+trabajos de boletines.
+
+Columnas (la primera fila; sin distinguir mayúsculas ni tildes):
+    nombre, tipo, id_salon                 obligatorias
+    id_referencia, estado, sistema_operativo, ram, disco_duro,
+    fecha_adquisicion (AAAA-MM-DD o DD/MM/AAAA), descripcion, observaciones
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import unicodedata
+import uuid
+from datetime import date, datetime
+from itertools import chain
+from threading import Thread
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
+
+from controllers.models import Equipo, Salon
+from extensions import db
+from services.base_datos_service import es_sqlite, pool_de_fondo
+from services.exportacion_service import xlsx_disponible
+
+logger = logging.getLogger(__name__)
+
+
+COLUMNAS = (
+    'id_referencia', 'nombre', 'tipo', 'estado', 'id_salon', 'sistema_operativo', 'ram', 'disco_duro',
+    'fecha_adquisicion', 'descripcion', 'observaciones'
+)
+OBLIGATORIAS = ('nombre', 'tipo', 'id_salon')
+ALIAS_COLUMNAS = {
+    'referencia': 'id_referencia', 'id': 'id_referencia',
+    'salon': 'id_salon', 'sala': 'id_salon', 'id_sala': 'id_salon', 'id_salon_fk': 'id_salon',
+    'so': 'sistema_operativo', 'disco': 'disco_duro', 'fecha': 'fecha_adquisicion',
+}
+# 'Asignado' exige asignaciones activas: se asigna después desde el inventario
+ESTADOS_IMPORTABLES = ('Disponible', 'Mantenimiento', 'Incidente')
+ESTADOS_POR_NOMBRE = {e.lower(): e for e in ESTADOS_IMPORTABLES}
+FORMATOS_FECHA = ('%d/%m/%Y', '%d-%m-%Y')
+FORMATOS_IMPORTACION = ('csv', 'xlsx')
+LONGITUDES = {c.name: c.type.length for c in Equipo.__table__.columns
+              if c.name in COLUMNAS and c.name != 'estado' and getattr(c.type, 'length', None)}
+FILAS_POR_LOTE = 1000
+MAXIMO_ERRORES_INFORME = 500
+
+
+# =========================================================
+#  LECTURA EN STREAMING
+# =========================================================
+
+def formato_de_archivo(nombre):
+    """'csv' o 'xlsx' según la extensión, o None."""
+    extension = os.path.splitext(nombre or '')[1].lower().lstrip('.')
+    return extension if extension in FORMATOS_IMPORTACION else None
+
+
+def _filas_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    primera = texto.readline()
+    # Excel en español exporta con ';'
+    separador = ';' if primera.count(';') > primera.count(',') else ','
+    yield from csv.reader(chain([primera], texto), delimiter=separador)
+
+
+def _filas_xlsx(archivo):
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        yield from libro.active.iter_rows(values_only=True)
+    finally:
+        libro.close()
+
+
+def _normalizar_encabezado(valor):
+    texto = unicodedata.normalize('NFKD', str(valor or '')).encode('ascii', 'ignore').decode().strip().lower()
+    texto = '_'.join(texto.replace('-', ' ').split())
+    return ALIAS_COLUMNAS.get(texto, texto)
+
+
+def _clave_referencia(referencia):
+    """id_referencia tal como la compara el índice único en MySQL (collation *_ci)."""
+    return referencia.strip().casefold()
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor).strip()
+
+
+# =========================================================
+#  VALIDACIÓN
+# =========================================================
+
+def _validar_fila(celdas, posiciones, salones):
+    """(valores para el INSERT, lista de errores) de una fila del archivo."""
+    ancho = len(celdas)
+    valores = {campo: (_texto(celdas[indice]) or None) if indice is not None and indice < ancho else None
+               for campo, indice in posiciones}
+    errores = []
+
+    for campo in OBLIGATORIAS:
+        if not valores[campo]:
+            errores.append(f"{campo} es obligatorio")
+    for campo, maximo in LONGITUDES.items():
+        if valores[campo] and len(valores[campo]) > maximo:
+            errores.append(f"{campo} supera {maximo} caracteres")
+    if valores['nombre'] and len(valores['nombre']) < 2:
+        errores.append('nombre debe tener al menos 2 caracteres')
+
+    estado = valores['estado'] or 'Disponible'
+    valores['estado'] = ESTADOS_POR_NOMBRE.get(estado.lower())
+    if not valores['estado']:
+        errores.append(f"estado '{estado}' no válido ({', '.join(ESTADOS_IMPORTABLES)})")
+
+    salon = valores.pop('id_salon')
+    if salon:
+        if salon.isdigit() and int(salon) in salones:
+            valores['id_salon_fk'] = int(salon)
+        else:
+            errores.append(f"el salón {salon} no existe")
+
+    fecha = valores['fecha_adquisicion']
+    if fecha:
+        valores['fecha_adquisicion'] = _fecha(fecha)
+        if valores['fecha_adquisicion'] is None:
+            errores.append(f"fecha_adquisicion '{fecha}' no válida (AAAA-MM-DD)")
+    return valores, errores
+
+
+def _fecha(texto):
+    # openpyxl entrega las celdas de fecha como datetime; _texto las deja en 'AAAA-MM-DD HH:MM:SS'
+    try:
+        return date.fromisoformat(texto[:10])
+    except ValueError:
+        pass
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+# =========================================================
+#  IMPORTACIÓN
+# =========================================================
+
+def importar_equipos(archivo, formato, simular=False, progreso=None, al_error=None):
+    """
+    Importa los equipos de un archivo CSV o XLSX en una sola transacción.
+
+    Args:
+        archivo: archivo binario abierto (p. ej. FileStorage.stream)
+        formato (str): 'csv' o 'xlsx'
+        simular (bool): solo valida, no inserta nada
+        progreso: función (filas leídas) llamada tras cada lote
+        al_error: función (fila, id_referencia, errores) llamada por cada
+            fila rechazada; el informe devuelto solo guarda las primeras
+            MAXIMO_ERRORES_INFORME
+
+    Returns:
+        tuple: (informe, None) o (None, mensaje de error)
+    """
+    if formato not in FORMATOS_IMPORTACION:
+        return None, f"Formato no soportado. Use: {', '.join(FORMATOS_IMPORTACION)}"
+    if formato == 'xlsx' and not xlsx_disponible():
+        return None, 'La importación XLSX requiere el paquete openpyxl'
+
+    try:
+        filas = _filas_csv(archivo) if formato == 'csv' else _filas_xlsx(archivo)
+        encabezados = next(filas, None)
+    except Exception as e:
+        return None, f"No se pudo leer el archivo: {e}"
+    if not encabezados:
+        return None, 'El archivo está vacío'
+    indices = {}
+    for indice, encabezado in enumerate(encabezados):
+        indices.setdefault(_normalizar_encabezado(encabezado), indice)
+    faltan = [c for c in OBLIGATORIAS if c not in indices]
+    if faltan:
+        return None, f"Faltan columnas obligatorias: {', '.join(faltan)}"
+    posiciones = [(campo, indices.get(campo)) for campo in COLUMNAS]
+
+    salones = set(db.session.execute(select(Salon.id_salon)).scalars())
+    informe = {'filas': 0, 'importados': 0, 'rechazados': 0, 'simulado': bool(simular), 'errores': []}
+    vistas = {}
+
+    def rechazar(numero, referencia, errores):
+        informe['rechazados'] += 1
+        if len(informe['errores']) < MAXIMO_ERRORES_INFORME:
+            informe['errores'].append({'fila': numero, 'id_referencia': referencia, 'errores': errores})
+        if al_error:
+            al_error(numero, referencia, errores)
+
+    def procesar(lote):
+        referencias = [v['id_referencia'] for _, v in lote if v['id_referencia']]
+        columna = Equipo.id_referencia
+        if es_sqlite():
+            # MySQL ya compara sin distinguir mayúsculas; SQLite, solo con NOCASE
+            columna = columna.collate('NOCASE')
+        existentes = {
+            _clave_referencia(registrada): registrada
+            for registrada in db.session.execute(select(Equipo.id_referencia).where(columna.in_(referencias))).scalars()
+        } if referencias else {}
+
+        validas = []
+        for numero, valores in lote:
+            referencia = valores['id_referencia']
+            clave = _clave_referencia(referencia)
+            if clave in existentes:
+                registrada = existentes[clave]
+                como = f" como '{registrada}'" if registrada != referencia else ''
+                rechazar(numero, referencia, [f"id_referencia '{referencia}' ya está registrado{como}"])
+            elif referencia and clave in vistas:
+                rechazar(numero, referencia, [f"id_referencia '{referencia}' repetido (fila {vistas[clave]})"])
+            else:
+                if referencia:
+                    vistas[clave] = numero
+                validas.append(valores)
+        if validas and not simular:
+            db.session.execute(insert(Equipo.__table__), validas)
+        informe['importados'] += len(validas)
+
+    try:
+        lote = []
+        for numero, celdas in enumerate(filas, start=2):
+            if not any(_texto(c) for c in celdas):
+                continue
+            informe['filas'] += 1
+            valores, errores = _validar_fila(celdas, posiciones, salones)
+            if errores:
+                rechazar(numero, valores['id_referencia'], errores)
+                continue
+            lote.append((numero, valores))
+            if len(lote) >= FILAS_POR_LOTE:
+                procesar(lote)
+                lote = []
+                if progreso:
+                    progreso(informe['filas'])
+        if lote:
+            procesar(lote)
+
+        if simular:
+            db.session.rollback()
+        else:
+            db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        logger.warning('Importación de equipos cancelada: %s', e.orig)
+        return None, 'Otro usuario registró a la vez alguna de las referencias del archivo; no se importó nada. Vuelva a intentarlo.'
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.session.rollback()
+        return None, f"No se pudo leer el archivo (fila {informe['filas'] + 1}): {e}"
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # Los errores de referencia se detectan al cerrar cada lote, después de los de formato
+    informe['errores'].sort(key=lambda e: e['fila'])
+    logger.info('Importación de equipos: %s filas, %s importadas, %s rechazadas%s',
+                informe['filas'], informe['importados'], informe['rechazados'], ' (simulación)' if simular else '')
+    return informe, None
+
+
+# =========================================================
+#  TRABAJOS EN SEGUNDO PLANO
+# =========================================================
+
+def carpeta_importaciones(app):
+    return os.path.join(app.instance_path, 'importaciones')
+
+
+def _escribir_estado(carpeta, estado):
+    temporal = os.path.join(carpeta, 'estado.json.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f)
+    os.replace(temporal, os.path.join(carpeta, 'estado.json'))
+
+
+def leer_estado_importacion(app, trabajo_id):
+    """Devuelve el estado de una importación, o None si no existe."""
+    ruta = os.path.join(carpeta_importaciones(app), secure_filename(trabajo_id), 'estado.json')
+    if not os.path.isfile(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _ejecutar_importacion(app, carpeta, estado, ruta, formato, simular):
+    with app.app_context(), pool_de_fondo(), \
+            open(os.path.join(carpeta, 'errores.csv'), 'w', encoding='utf-8-sig', newline='') as salida:
+        escritor = csv.writer(salida)
+        escritor.writerow(['fila', 'id_referencia', 'errores'])
+        try:
+            estado['estado'] = 'procesando'
+            _escribir_estado(carpeta, estado)
+
+            def progreso(filas):
+                estado['filas_leidas'] = filas
+                _escribir_estado(carpeta, estado)
+
+            def al_error(fila, referencia, errores):
+                escritor.writerow([fila, referencia or '', '; '.join(errores)])
+
+            with open(ruta, 'rb') as archivo:
+                informe, error = importar_equipos(archivo, formato, simular, progreso, al_error)
+            if error:
+                estado.update(estado='error', error=error)
+            else:
+                informe.pop('errores')
+                estado.update(estado='completado', informe=informe, filas_leidas=informe['filas'],
+                              finalizado=datetime.now().isoformat())
+        except Exception as e:
+            logger.error('Error importando equipos: %s', e)
+            estado.update(estado='error', error=str(e))
+        finally:
+            db.session.remove()
+            os.remove(ruta)
+            _escribir_estado(carpeta, estado)
+
+
+def iniciar_importacion(app, archivo, formato, simular=False):
+    """
+    Guarda el archivo subido y lo importa en un hilo de fondo.
+
+    El estado y el CSV con todas las filas rechazadas quedan en disco para
+    que cualquier worker pueda consultarlos.
+
+    Returns:
+        str: ID del trabajo
+    """
+    trabajo_id = uuid.uuid4().hex
+    carpeta = os.path.join(carpeta_importaciones(app), trabajo_id)
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, f"archivo.{formato}")
+    archivo.save(ruta)
+
+    estado = {
+        'trabajo_id': trabajo_id,
+        'estado': 'pendiente',
+        'archivo': secure_filename(archivo.filename or ''),
+        'simulado': bool(simular),
+        'filas_leidas': 0,
+        'informe': None,
+        'iniciado': datetime.now().isoformat()
+    }
+    _escribir_estado(carpeta, estado)
+
+    Thread(
+        target=_ejecutar_importacion,
+        args=(app, carpeta, estado, ruta, formato, simular),
+        daemon=True
+    ).start()
+    return trabajo_id
@@ -0,0 +1,168 @@
+"""
+Servicio de inventario de equipos
+
+El listado de /admin/api/equipos cargaba, por cada equipo, su salón, su
+sede, sus incidentes, sus mantenimientos y sus asignaciones, más una
+consulta de Matricula por asignación. listar_equipos() devuelve lo mismo en
+tres consultas, sea cual sea el número de equipos:
+
+    1. equipos con salón, sede y los totales de incidentes y mantenimientos
+       (subconsultas agrupadas por equipo)
+    2. asignaciones activas con el nombre del estudiante
+    3. matrículas de esos estudiantes con el nombre del curso (se toma la
+       del año más reciente, como AsignacionEquipo.get_curso_estudiante)
+
+Los filtros por estado, sede y salón se aplican en las tres consultas; el
+de estado y salón usa el índice ix_equipos_estado_salon.
+"""
+
+import logging
+
+from sqlalchemy import func, select
+
+from controllers.models import AsignacionEquipo, Curso, Equipo, Incidente, Mantenimiento, Matricula, Salon, Sede, Usuario
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+ESTADOS_EQUIPO = tuple(Equipo.__table__.c.estado.type.enums)
+
+
+def _filtros(estado=None, sede_id=None, salon_id=None):
+    filtros = []
+    if estado:
+        filtros.append(Equipo.estado == estado)
+    if salon_id:
+        filtros.append(Equipo.id_salon_fk == salon_id)
+    if sede_id:
+        filtros.append(Equipo.id_salon_fk.in_(select(Salon.id_salon).where(Salon.id_sede_fk == sede_id)))
+    return filtros
+
+
+def _total_por_equipo(modelo, equipos):
+    sentencia = select(modelo.equipo_id, func.count().label('total')).group_by(modelo.equipo_id)
+    if equipos is not None:
+        sentencia = sentencia.where(modelo.equipo_id.in_(equipos))
+    return sentencia.subquery()
+
+
+def consultar_equipos(estado=None, sede_id=None, salon_id=None):
+    """
+    Filas de equipos con su ubicación y los totales de incidentes y
+    mantenimientos, ordenadas por id_equipo.
+    """
+    filtros = _filtros(estado, sede_id, salon_id)
+    equipos = select(Equipo.id_equipo).where(*filtros) if filtros else None
+    incidentes = _total_por_equipo(Incidente, equipos)
+    mantenimientos = _total_por_equipo(Mantenimiento, equipos)
+
+    sentencia = (
+        select(
+            Equipo.id_equipo, Equipo.id_referencia, Equipo.nombre, Equipo.tipo, Equipo.estado,
+            Equipo.sistema_operativo, Equipo.ram, Equipo.disco_duro, Equipo.descripcion,
+            Equipo.observaciones, Equipo.fecha_adquisicion, Equipo.id_salon_fk,
+            Salon.nombre.label('salon_nombre'),
+            Salon.id_sede_fk.label('sede_id'),
+            Sede.nombre.label('sede_nombre'),
+            func.coalesce(incidentes.c.total, 0).label('incidentes'),
+            func.coalesce(mantenimientos.c.total, 0).label('mantenimientos'),
+        )
+        .outerjoin(Salon, Salon.id_salon == Equipo.id_salon_fk)
+        .outerjoin(Sede, Sede.id_sede == Salon.id_sede_fk)
+        .outerjoin(incidentes, incidentes.c.equipo_id == Equipo.id_equipo)
+        .outerjoin(mantenimientos, mantenimientos.c.equipo_id == Equipo.id_equipo)
+        .where(*filtros)
+        .order_by(Equipo.id_equipo)
+    )
+    return db.session.execute(sentencia).all()
+
+
+def consultar_asignaciones_activas(estado=None, sede_id=None, salon_id=None):
+    """
+    {id_equipo: [(estudiante_id, nombre completo, curso o None)]} de las
+    asignaciones activas de los equipos filtrados.
+    """
+    filtros = _filtros(estado, sede_id, salon_id)
+    activas = [AsignacionEquipo.estado_asignacion == 'activa']
+    if filtros:
+        activas.append(AsignacionEquipo.equipo_id.in_(select(Equipo.id_equipo).where(*filtros)))
+
+    asignaciones = db.session.execute(
+        select(AsignacionEquipo.equipo_id, AsignacionEquipo.estudiante_id, Usuario.nombre, Usuario.apellido)
+        .join(Usuario, Usuario.id_usuario == AsignacionEquipo.estudiante_id)
+        .where(*activas)
+        .order_by(AsignacionEquipo.id_asignacion)
+    ).all()
+    if not asignaciones:
+        return {}
+
+    # Curso de la matrícula más reciente de cada estudiante asignado
+    cursos = {}
+    matriculas = db.session.execute(
+        select(Matricula.estudianteId, Matricula.año, Curso.nombreCurso)
+        .join(Curso, Curso.id_curso == Matricula.cursoId)
+        .where(Matricula.estudianteId.in_(select(AsignacionEquipo.estudiante_id).where(*activas)))
+    ).all()
+    for estudiante_id, anio, curso in matriculas:
+        if estudiante_id not in cursos or anio > cursos[estudiante_id][0]:
+            cursos[estudiante_id] = (anio, curso)
+
+    por_equipo = {}
+    for equipo_id, estudiante_id, nombre, apellido in asignaciones:
+        curso = cursos.get(estudiante_id)
+        por_equipo.setdefault(equipo_id, []).append(
+            (estudiante_id, f"{nombre} {apellido}", curso[1] if curso else None)
+        )
+    return por_equipo
+
+
+def listar_equipos(estado=None, sede_id=None, salon_id=None):
+    """
+    Inventario de equipos con ubicación, totales y asignaciones activas.
+
+    Cada elemento tiene las claves de Equipo.to_dict() más id, salon_nombre,
+    incidentes y mantenimientos.
+
+    Returns:
+        tuple: (lista de dicts, None) o (None, mensaje de error)
+    """
+    if estado and estado not in ESTADOS_EQUIPO:
+        return None, f"Estado no válido. Valores permitidos: {', '.join(ESTADOS_EQUIPO)}"
+
+    filas = consultar_equipos(estado, sede_id, salon_id)
+    asignaciones = consultar_asignaciones_activas(estado, sede_id, salon_id)
+
+    equipos = []
+    # Desempaquetar la tupla es bastante más rápido que leer cada columna de la Row por nombre
+    for (id_equipo, id_referencia, nombre, tipo, estado_equipo, sistema_operativo, ram, disco_duro, descripcion,
+         observaciones, fecha_adquisicion, id_salon_fk, salon_nombre, sede, sede_nombre, incidentes,
+         mantenimientos) in filas:
+        activas = asignaciones.get(id_equipo, ())
+        estudiantes = [nombre_estudiante for _, nombre_estudiante, _ in activas]
+        equipos.append({
+            "id": id_equipo,
+            "id_equipo": id_equipo,
+            "id_referencia": id_referencia,
+            "nombre": nombre,
+            "tipo": tipo,
+            "estado": estado_equipo,
+            "sistema_operativo": sistema_operativo,
+            "ram": ram,
+            "disco_duro": disco_duro,
+            "descripcion": descripcion,
+            "observaciones": observaciones,
+            "fecha_adquisicion": fecha_adquisicion.isoformat() if fecha_adquisicion else "",
+            "id_salon_fk": id_salon_fk,
+            "salon": salon_nombre or "Sin Salón Asignado",
+            "salon_nombre": salon_nombre or "Sin salón",
+            "sede_id": sede,
+            "sede_nombre": sede_nombre or "Sin Sede",
+            "incidentes": incidentes,
+            "mantenimientos": mantenimientos,
+            "total_asignaciones": len(activas),
+            "estudiantes_asignados": estudiantes,
+            "asignado_a": ", ".join(estudiantes) if estudiantes else "N/A",
+            "cursos_asignados": sorted({curso for _, _, curso in activas if curso}),
+        })
+    return equipos, None
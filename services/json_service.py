@@ -0,0 +1,154 @@
+"""
+Servicio de serialización JSON
+
+Proveedor JSON de la aplicación (app.json, usado por jsonify, request.get_json
+y el filtro |tojson). Si el módulo `orjson` está instalado se usa como
+codificador nativo; si no, el módulo json de la biblioteca estándar con el
+mismo formato de salida:
+
+    - date / datetime / time  -> ISO 8601 ('2025-03-01', '2025-03-01T08:30:00'),
+      sin microsegundos;
+    - Decimal (columnas Numeric) -> número;
+    - Row de SQLAlchemy -> objeto con las etiquetas de la consulta como claves;
+    - set / frozenset -> lista.
+
+Así las vistas no necesitan convertir fechas ni decimales fila a fila. Para
+listados grandes, proyectar_filas() serializa directamente las filas de una
+consulta cuyas columnas ya llevan como etiqueta la clave JSON:
+
+    filas = db.session.query(Equipo.id_equipo.label('id'),
+                             func.coalesce(Salon.nombre, 'N/A').label('salon'), ...).all()
+    return jsonify(proyectar_filas(filas))
+
+Las fechas (date) salen igual que con strftime('%Y-%m-%d'), pero un datetime
+sale con 'T' y segundos. Si la respuesta ya tenía otro formato ('2025-03-01
+08:30'), se conserva formateándolo en la consulta con
+base_datos_service.fecha_formateada().
+"""
+
+import dataclasses
+import decimal
+import json
+import logging
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.engine import Row
+
+logger = logging.getLogger(__name__)
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ProyeccionFilas:
+    """Filas de una consulta que se serializan como lista de objetos {etiqueta: valor}."""
+
+    __slots__ = ('claves', 'filas')
+
+    def __init__(self, filas, claves=None):
+        self.filas = filas
+        if claves is None:
+            claves = filas[0]._fields if filas else ()
+        self.claves = tuple(claves)
+
+    def __len__(self):
+        return len(self.filas)
+
+    def como_lista(self):
+        claves = self.claves
+        return [dict(zip(claves, fila)) for fila in self.filas]
+
+
+def proyectar_filas(filas, claves=None):
+    """
+    Envuelve una lista de Row (o tuplas) para serializarla como lista de objetos.
+
+    Args:
+        filas: resultado de .all() de una consulta de columnas etiquetadas
+        claves: claves JSON en el orden de las columnas (por defecto, las etiquetas)
+    """
+    return ProyeccionFilas(filas, claves)
+
+
+def _por_defecto(obj):
+    """Tipos que ni orjson ni json serializan por sí mismos."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, ProyeccionFilas):
+        return obj.como_lista()
+    if isinstance(obj, Row):
+        return obj._asdict()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _por_defecto_estandar(obj):
+    # orjson serializa fechas de forma nativa; json necesita convertirlas aquí
+    if isinstance(obj, (datetime, time)):
+        return obj.isoformat(timespec='seconds')
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    return _por_defecto(obj)
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """DefaultJSONProvider con orjson (si está disponible) y tipos de base de datos."""
+
+    default = staticmethod(_por_defecto_estandar)
+    ensure_ascii = False
+    sort_keys = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.nativo = orjson is not None and app.config.get('JSON_NATIVO', True)
+
+    def _opciones(self, sort_keys=False, indent=False):
+        opciones = orjson.OPT_NON_STR_KEYS | orjson.OPT_OMIT_MICROSECONDS
+        if sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS
+        if indent:
+            opciones |= orjson.OPT_INDENT_2
+        return opciones
+
+    def dumps_bytes(self, obj, indent=False):
+        """JSON codificado en UTF-8, sin pasar por str con orjson."""
+        if self.nativo:
+            return orjson.dumps(obj, default=_por_defecto, option=self._opciones(self.sort_keys, indent))
+        argumentos = {'indent': 2} if indent else {'separators': (',', ':')}
+        return self.dumps(obj, **argumentos).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        # orjson solo cubre sort_keys; con otros argumentos (indent, cls...) se usa json
+        if self.nativo and set(kwargs) <= {'sort_keys'}:
+            opciones = self._opciones(kwargs.get('sort_keys', self.sort_keys))
+            return orjson.dumps(obj, default=_por_defecto, option=opciones).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.nativo and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Instala ProveedorJSON como app.json (también para el filtro |tojson)."""
+    app.json = ProveedorJSON(app)
+    app.jinja_env.policies['json.dumps_function'] = app.json.dumps
+    logger.debug('Proveedor JSON: %s', 'orjson' if app.json.nativo else 'json (biblioteca estándar)')
@@ -0,0 +1,134 @@
+"""
+Servicio de registro (logging) estructurado
+
+Los módulos registran con logging.getLogger(__name__) y argumentos al estilo
+%s, de modo que un mensaje por debajo del nivel configurado no se formatea.
+Los registros se encolan sin bloquear la petición y un hilo de fondo los
+escribe como JSON de una línea en stderr.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+# Atributos estándar de LogRecord; el resto viene de extra={...}
+_ATRIBUTOS_REGISTRO = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_estado = {'listener': None, 'cola': None, 'destino': None}
+
+
+class FormateadorJSON(logging.Formatter):
+    """Una línea JSON por registro con nivel, módulo, mensaje y campos extra."""
+
+    def format(self, record):
+        datos = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+        }
+        for clave, valor in record.__dict__.items():
+            if clave not in _ATRIBUTOS_REGISTRO and not clave.startswith('_'):
+                datos[clave] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            datos['exc'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class _ManejadorCola(QueueHandler):
+    """
+    QueueHandler que solo interpola el mensaje (los argumentos pueden ser
+    objetos ORM ligados a la sesión de la petición); la serialización a JSON
+    y la escritura ocurren en el hilo del listener.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def _niveles_por_modulo(valor):
+    """Acepta un dict o una cadena 'routes.admin=DEBUG,services.email_service=WARNING'."""
+    if isinstance(valor, dict):
+        return valor
+    niveles = {}
+    for par in (valor or '').split(','):
+        if '=' in par:
+            modulo, nivel = par.split('=', 1)
+            niveles[modulo.strip()] = nivel.strip().upper()
+    return niveles
+
+
+def _iniciar_listener():
+    listener = QueueListener(_estado['cola'], _estado['destino'], respect_handler_level=True)
+    listener.start()
+    _estado['listener'] = listener
+
+
+def _reiniciar_tras_fork():
+    # El hilo del listener no sobrevive al fork de los workers de gunicorn.
+    if _estado['listener'] is not None:
+        _estado['cola'] = queue.SimpleQueue()
+        for manejador in logging.getLogger().handlers:
+            if isinstance(manejador, _ManejadorCola):
+                manejador.queue = _estado['cola']
+        _iniciar_listener()
+
+
+def detener_logging():
+    """Vacía la cola y detiene el hilo de escritura (útil en scripts y pruebas)."""
+    if _estado['listener'] is not None:
+        _estado['listener'].stop()
+        _estado['listener'] = None
+
+
+def init_logging(app):
+    """
+    Configura el logging raíz a partir de la configuración de la aplicación.
+
+    LOG_LEVEL   nivel global (INFO por defecto)
+    LOG_LEVELS  niveles por módulo, p. ej. {'routes.admin': 'DEBUG'}
+    LOG_FORMAT  'json' (por defecto) o 'texto' para desarrollo
+    """
+    raiz = logging.getLogger()
+    nivel = str(app.config.get('LOG_LEVEL', 'INFO')).upper()
+
+    if _estado['listener'] is None:
+        destino = logging.StreamHandler(sys.stderr)
+        if app.config.get('LOG_FORMAT', 'json') == 'json':
+            destino.setFormatter(FormateadorJSON())
+        else:
+            destino.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+
+        _estado['cola'] = queue.SimpleQueue()
+        _estado['destino'] = destino
+
+        for manejador in list(raiz.handlers):
+            raiz.removeHandler(manejador)
+        raiz.addHandler(_ManejadorCola(_estado['cola']))
+        _iniciar_listener()
+        atexit.register(detener_logging)
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+    raiz.setLevel(nivel)
+    for modulo, nivel_modulo in _niveles_por_modulo(app.config.get('LOG_LEVELS')).items():
+        logging.getLogger(modulo).setLevel(str(nivel_modulo).upper())
+
+    # Flask añade su propio StreamHandler síncrono a app.logger; se delega al raíz.
+    app.logger.handlers.clear()
+    app.logger.propagate = True
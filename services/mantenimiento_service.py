@@ -0,0 +1,392 @@
+"""
+Servicio de planificación de mantenimientos
+
+Las políticas (PoliticaMantenimiento) definen un mantenimiento recurrente
+para todos los equipos de un tipo, p. ej. preventivo cada 90 días para los
+"Portátil". El planificador las convierte en filas de `mantenimiento`:
+
+    materializar_politicas()  crea las ocurrencias de los próximos
+        MANTENIMIENTO_HORIZONTE_DIAS días con tres consultas (políticas,
+        equipos de esos tipos y última fecha por política y equipo) e
+        un INSERT (executemany) por lote. El índice único (politica_id,
+        equipo_id, fecha_programada) hace que repetirla no duplique nada.
+    barrer_vencidos()  marca con vencido_en los mantenimientos pendientes o
+        en curso cuya fecha ya pasó, con un único UPDATE sobre el rango del
+        índice ix_mantenimiento_fecha_estado_sede, y envía a cada
+        administrador un resumen por sede en un único INSERT.
+
+Un hilo por worker comprueba cada MANTENIMIENTO_INTERVALO segundos si ya se
+planificó hoy. La fila 'barrido:mantenimientos' de version_datos hace de
+reserva diaria: solo el worker cuyo UPDATE condicional la toma ejecuta la
+planificación, así los administradores reciben un aviso al día aunque haya
+varios workers o varias réplicas. En el perfil memoria no hay hilo; se
+puede lanzar a mano con `flask planificar-mantenimientos`.
+
+calendario_mes() sirve el calendario de un mes con una consulta de rango
+sobre fecha_programada.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, case, delete, func, select, update
+
+from controllers.models import Equipo, Mantenimiento, PoliticaMantenimiento, Salon, Sede, Usuario, VersionDatos
+from extensions import db
+from services.base_datos_service import insertar_o_ignorar, pool_de_fondo
+from services.notification_service import crear_notificaciones_masivas
+
+logger = logging.getLogger(__name__)
+
+
+ESTADOS_ACTIVOS = ('pendiente', 'en_progreso')
+ESTADOS_MANTENIMIENTO = ('pendiente', 'en_progreso', 'completado', 'cancelado')
+CLAVE_BARRIDO = 'barrido:mantenimientos'
+TAMANO_LOTE = 5000
+DIAS_PROXIMOS = 7
+ROL_ADMINISTRADOR = 1
+ESPERA_TRAS_ERROR = 300
+
+_estado = {'pid': None}
+_cerrojo = threading.Lock()
+
+
+# =========================================================
+#  POLÍTICAS
+# =========================================================
+
+def crear_politica(tipo_equipo, intervalo_dias, tipo_mantenimiento='preventivo', fecha_inicio=None, descripcion=None):
+    """
+    Crea una política recurrente. No materializa sus ocurrencias.
+
+    Returns:
+        tuple: (PoliticaMantenimiento, None) o (None, mensaje de error)
+    """
+    tipo_equipo = (tipo_equipo or '').strip()
+    if not tipo_equipo:
+        return None, 'El tipo de equipo es obligatorio.'
+    try:
+        intervalo_dias = int(intervalo_dias)
+    except (TypeError, ValueError):
+        return None, 'El intervalo debe ser un número entero de días.'
+    if intervalo_dias < 1:
+        return None, 'El intervalo debe ser de al menos un día.'
+
+    politica = PoliticaMantenimiento(
+        tipo_equipo=tipo_equipo,
+        tipo_mantenimiento=(tipo_mantenimiento or 'preventivo').strip(),
+        intervalo_dias=intervalo_dias,
+        fecha_inicio=fecha_inicio or date.today(),
+        descripcion=descripcion,
+        activa=True
+    )
+    db.session.add(politica)
+    db.session.commit()
+    return politica, None
+
+
+def desactivar_politica(politica_id):
+    """
+    Desactiva la política y borra sus ocurrencias pendientes de hoy en adelante.
+
+    Returns:
+        tuple: (ocurrencias borradas, None) o (None, mensaje de error)
+    """
+    politica = db.session.get(PoliticaMantenimiento, politica_id)
+    if not politica:
+        return None, f'Política con ID {politica_id} no encontrada.'
+    politica.activa = False
+    borradas = db.session.execute(
+        delete(Mantenimiento).where(
+            Mantenimiento.politica_id == politica_id,
+            Mantenimiento.estado == 'pendiente',
+            Mantenimiento.fecha_programada >= date.today()
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return borradas, None
+
+
+# =========================================================
+#  PLANIFICACIÓN
+# =========================================================
+
+def _primera_fecha(inicio, intervalo, hoy):
+    """Primera fecha de la serie inicio + k*intervalo que no es anterior a hoy."""
+    if inicio >= hoy:
+        return inicio
+    saltos = -(-(hoy - inicio).days // intervalo)
+    return inicio + timedelta(days=saltos * intervalo)
+
+
+def materializar_politicas(hasta=None, politica_ids=None, hoy=None):
+    """
+    Crea las ocurrencias de las políticas activas hasta `hasta` (por defecto,
+    hoy + MANTENIMIENTO_HORIZONTE_DIAS). Cada equipo sigue la serie desde su
+    última ocurrencia; las fechas ya pasadas no se generan.
+
+    Returns:
+        int: mantenimientos creados
+    """
+    from flask import current_app
+
+    hoy = hoy or date.today()
+    hasta = hasta or hoy + timedelta(days=current_app.config.get('MANTENIMIENTO_HORIZONTE_DIAS', 90))
+
+    consulta = select(PoliticaMantenimiento).where(PoliticaMantenimiento.activa.is_(True))
+    if politica_ids:
+        consulta = consulta.where(PoliticaMantenimiento.id_politica.in_(politica_ids))
+    politicas = db.session.execute(consulta).scalars().all()
+    if not politicas:
+        return 0
+
+    por_tipo = {}
+    for politica in politicas:
+        por_tipo.setdefault(politica.tipo_equipo, []).append(politica)
+    equipos = db.session.execute(
+        select(Equipo.id_equipo, Equipo.tipo, Salon.id_sede_fk)
+        .join(Salon, Salon.id_salon == Equipo.id_salon_fk)
+        .where(Equipo.tipo.in_(list(por_tipo)))
+    ).all()
+    ultimas = dict(((p, e), f) for p, e, f in db.session.execute(
+        select(Mantenimiento.politica_id, Mantenimiento.equipo_id, func.max(Mantenimiento.fecha_programada))
+        .where(Mantenimiento.politica_id.in_([p.id_politica for p in politicas]))
+        .group_by(Mantenimiento.politica_id, Mantenimiento.equipo_id)
+    ).all())
+
+    ahora = datetime.utcnow()
+    creados = 0
+    lote = []
+    for id_equipo, tipo, sede_id in equipos:
+        for politica in por_tipo[tipo]:
+            intervalo = politica.intervalo_dias
+            ultima = ultimas.get((politica.id_politica, id_equipo))
+            inicio = ultima + timedelta(days=intervalo) if ultima else politica.fecha_inicio
+            fecha = _primera_fecha(inicio, intervalo, hoy)
+            while fecha <= hasta:
+                lote.append({
+                    'equipo_id': id_equipo, 'sede_id': sede_id, 'fecha_programada': fecha,
+                    'tipo': politica.tipo_mantenimiento, 'estado': 'pendiente',
+                    'descripcion': politica.descripcion, 'politica_id': politica.id_politica,
+                    'fecha_creacion': ahora,
+                })
+                fecha += timedelta(days=intervalo)
+            if len(lote) >= TAMANO_LOTE:
+                creados += insertar_o_ignorar(Mantenimiento, lote).rowcount
+                lote = []
+    if lote:
+        creados += insertar_o_ignorar(Mantenimiento, lote).rowcount
+    db.session.commit()
+    logger.info('Mantenimientos: %s ocurrencias creadas hasta %s (%s políticas, %s equipos)',
+                creados, hasta, len(politicas), len(equipos))
+    return creados
+
+
+def _vencidos_sin_marcar(hoy):
+    return (
+        Mantenimiento.fecha_programada < hoy,
+        Mantenimiento.estado.in_(ESTADOS_ACTIVOS),
+        Mantenimiento.vencido_en.is_(None),
+    )
+
+
+def barrer_vencidos(hoy=None):
+    """
+    Marca los mantenimientos activos con fecha pasada que aún no estaban
+    marcados y avisa a los administradores activos con un resumen por sede.
+
+    Returns:
+        tuple: (mantenimientos marcados, notificaciones creadas)
+    """
+    hoy = hoy or date.today()
+    # Sin microsegundos: DATETIME de MySQL los descarta y la marca sirve luego para filtrar
+    ahora = datetime.utcnow().replace(microsecond=0)
+    marcados = db.session.execute(
+        update(Mantenimiento).where(*_vencidos_sin_marcar(hoy))
+        .values(vencido_en=ahora)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not marcados:
+        db.session.commit()
+        return 0, 0
+
+    por_sede = db.session.execute(
+        select(Sede.nombre, func.count())
+        .select_from(Mantenimiento)
+        .join(Sede, Sede.id_sede == Mantenimiento.sede_id)
+        .where(Mantenimiento.fecha_programada < hoy, Mantenimiento.vencido_en == ahora)
+        .group_by(Sede.nombre)
+        .order_by(Sede.nombre)
+    ).all()
+    administradores = db.session.execute(
+        select(Usuario.id_usuario).where(Usuario.id_rol_fk == ROL_ADMINISTRADOR, Usuario.estado_cuenta == 'activa')
+    ).scalars().all()
+
+    detalle = ', '.join(f"{sede}: {total}" for sede, total in por_sede)
+    notificadas = crear_notificaciones_masivas(
+        administradores,
+        titulo=f"🛠️ {marcados} mantenimiento{'s' if marcados != 1 else ''} vencido{'s' if marcados != 1 else ''}",
+        mensaje=f"Hay mantenimientos programados antes del {hoy.strftime('%d/%m/%Y')} sin completar ({detalle}).",
+        tipo='mantenimiento',
+        link='/admin/mantenimiento'
+    )
+    db.session.commit()
+    logger.info('Mantenimientos: %s vencidos marcados, %s administradores avisados', marcados, notificadas)
+    return marcados, notificadas
+
+
+def ejecutar_planificacion(hoy=None):
+    """Materializa las políticas y barre los vencidos. Devuelve (creados, marcados, notificadas)."""
+    creados = materializar_politicas(hoy=hoy)
+    marcados, notificadas = barrer_vencidos(hoy)
+    return creados, marcados, notificadas
+
+
+def _reservar_barrido(hoy):
+    """
+    Toma la planificación de `hoy` para este proceso. Devuelve False si otro
+    worker (o réplica) ya la tomó. La fecha se guarda en hora local, igual
+    que date.today().
+    """
+    insertar_o_ignorar(VersionDatos, {'clave': CLAVE_BARRIDO, 'version': 0, 'actualizado_en': datetime(1970, 1, 1)})
+    tomada = db.session.execute(
+        update(VersionDatos)
+        .where(VersionDatos.clave == CLAVE_BARRIDO,
+               VersionDatos.actualizado_en < datetime.combine(hoy, datetime.min.time()))
+        .values(version=VersionDatos.version + 1, actualizado_en=datetime.now())
+        .execution_options(synchronize_session=False)
+    ).rowcount == 1
+    db.session.commit()
+    return tomada
+
+
+def _liberar_barrido():
+    """Deja la reserva del día libre para que otro intento la vuelva a tomar."""
+    db.session.execute(
+        update(VersionDatos).where(VersionDatos.clave == CLAVE_BARRIDO)
+        .values(actualizado_en=datetime(1970, 1, 1))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def _bucle(app):
+    intervalo = app.config.get('MANTENIMIENTO_INTERVALO', 3600)
+    while True:
+        espera = intervalo
+        with app.app_context(), pool_de_fondo():
+            reservado = False
+            try:
+                reservado = _reservar_barrido(date.today())
+                if reservado:
+                    ejecutar_planificacion()
+            except Exception as e:
+                logger.warning('Mantenimientos: no se pudo completar la planificación: %s', e)
+                db.session.rollback()
+                if reservado:
+                    try:
+                        _liberar_barrido()
+                    except Exception:
+                        db.session.rollback()
+                espera = max(intervalo, ESPERA_TRAS_ERROR)
+            finally:
+                db.session.remove()
+        time.sleep(espera)
+
+
+def iniciar_planificador(app):
+    """Arranca el hilo del planificador en este proceso si aún no lo tiene."""
+    if _estado['pid'] == os.getpid() or not _habilitado(app):
+        return
+    with _cerrojo:
+        if _estado['pid'] == os.getpid():
+            return
+        _estado['pid'] = os.getpid()
+        threading.Thread(target=_bucle, args=(app,), name='mantenimientos', daemon=True).start()
+
+
+def _habilitado(app):
+    return app.config.get('MANTENIMIENTO_PLANIFICADOR', True) and app.config.get('DB_PERFIL') != 'memoria'
+
+
+# =========================================================
+#  CONSULTAS
+# =========================================================
+
+def calendario_mes(mes, sede_id=None, estado=None):
+    """
+    Mantenimientos de un mes ('YYYY-MM') en una consulta de rango sobre
+    fecha_programada, ordenados por fecha. Cada fila lleva 'vencido' si está
+    activo y su fecha ya pasó.
+
+    Returns:
+        tuple: (lista de Row con columnas etiquetadas, None) o (None, mensaje de error)
+    """
+    try:
+        inicio = datetime.strptime(mes or '', '%Y-%m').date()
+    except ValueError:
+        return None, 'Mes inválido. Use: YYYY-MM'
+    if estado and estado not in ESTADOS_MANTENIMIENTO:
+        return None, f"Estado no válido. Valores permitidos: {', '.join(ESTADOS_MANTENIMIENTO)}"
+    fin = (inicio + timedelta(days=32)).replace(day=1)
+    hoy = date.today()
+
+    filtros = [Mantenimiento.fecha_programada >= inicio, Mantenimiento.fecha_programada < fin]
+    if estado:
+        filtros.append(Mantenimiento.estado == estado)
+    if sede_id:
+        filtros.append(Mantenimiento.sede_id == sede_id)
+
+    filas = db.session.execute(
+        select(
+            Mantenimiento.id_mantenimiento.label('id'),
+            Mantenimiento.fecha_programada,
+            Mantenimiento.equipo_id,
+            Equipo.nombre.label('equipo_nombre'),
+            Mantenimiento.sede_id,
+            Sede.nombre.label('sede'),
+            Mantenimiento.tipo,
+            Mantenimiento.estado,
+            Mantenimiento.politica_id,
+            func.coalesce(Mantenimiento.tecnico, '').label('tecnico'),
+            case((and_(Mantenimiento.fecha_programada < hoy, Mantenimiento.estado.in_(ESTADOS_ACTIVOS)), True),
+                 else_=False).label('vencido'),
+        )
+        .join(Equipo, Equipo.id_equipo == Mantenimiento.equipo_id)
+        .join(Sede, Sede.id_sede == Mantenimiento.sede_id)
+        .where(*filtros)
+        .order_by(Mantenimiento.fecha_programada, Mantenimiento.id_mantenimiento)
+    ).all()
+    return filas, None
+
+
+def resumen_vencimientos(hoy=None):
+    """{'vencidos': n, 'proximos': n} de los mantenimientos activos, en una consulta."""
+    hoy = hoy or date.today()
+    vencidos, proximos = db.session.execute(
+        select(
+            func.sum(case((Mantenimiento.fecha_programada < hoy, 1), else_=0)),
+            func.sum(case((Mantenimiento.fecha_programada >= hoy, 1), else_=0)),
+        ).where(
+            Mantenimiento.fecha_programada < hoy + timedelta(days=DIAS_PROXIMOS),
+            Mantenimiento.estado.in_(ESTADOS_ACTIVOS)
+        )
+    ).one()
+    return {'vencidos': vencidos or 0, 'proximos': proximos or 0}
+
+
+def init_mantenimiento(app):
+    """Registra el comando de planificación y arranca el planificador en la primera petición de cada proceso."""
+    @app.cli.command('planificar-mantenimientos')
+    def planificar_mantenimientos_comando():
+        """Materializa las políticas de mantenimiento y avisa de los vencidos."""
+        creados, marcados, notificadas = ejecutar_planificacion()
+        logger.info('Mantenimientos: %s creados, %s vencidos, %s avisos', creados, marcados, notificadas)
+
+    if _habilitado(app):
+        @app.before_request
+        def asegurar_planificador():
+            iniciar_planificador(app)
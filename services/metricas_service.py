@@ -0,0 +1,379 @@
+"""
+Servicio de métricas en formato de texto de Prometheus
+
+Cada worker acumula sus contadores en memoria (con un bloqueo corto, ya que
+los workers gthread atienden varias peticiones a la vez) y vuelca
+periódicamente una instantánea a METRICS_DIR/<pid>.json. El endpoint
+/metrics suma las instantáneas de todos los workers de gunicorn. Cuando un
+worker termina, el maestro suma sus contadores e histogramas a
+METRICS_DIR/historico.json y borra su instantánea (retirar_worker).
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import logging
+from bisect import bisect_left
+
+from flask import g, request
+from sqlalchemy import event, exc
+
+logger = logging.getLogger(__name__)
+
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_SENTENCIAS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+BUCKETS_ESPERA_POOL = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+ARCHIVO_HISTORICO = 'historico.json'
+
+_hilo = threading.local()
+_lock = threading.Lock()
+
+_metricas = {
+    'latencia': {},
+    'sentencias': {},
+    'sql_segundos': {},
+    'espera_pool': {},
+    'contadores': {},
+    'gauges': {},
+}
+_ultimo_volcado = {'t': 0.0}
+
+
+# =========================================================
+#  REGISTRO (camino caliente)
+# =========================================================
+
+def _observar(familia, etiquetas, valor, buckets):
+    indice = bisect_left(buckets, valor)
+    with _lock:
+        serie = _metricas[familia].get(etiquetas)
+        if serie is None:
+            serie = _metricas[familia][etiquetas] = [[0] * (len(buckets) + 1), 0.0, 0]
+        serie[0][indice] += 1
+        serie[1] += valor
+        serie[2] += 1
+
+
+def incrementar(nombre, valor=1, **etiquetas):
+    """Incrementa un contador; las etiquetas se pasan como argumentos con nombre."""
+    clave = (nombre, tuple(sorted(etiquetas.items())))
+    with _lock:
+        _metricas['contadores'][clave] = _metricas['contadores'].get(clave, 0) + valor
+
+
+def ajustar_gauge(nombre, delta, **etiquetas):
+    clave = (nombre, tuple(sorted(etiquetas.items())))
+    with _lock:
+        _metricas['gauges'][clave] = _metricas['gauges'].get(clave, 0) + delta
+
+
+def observar_espera_pool(segundos, pool='web'):
+    _observar('espera_pool', (pool,), segundos, BUCKETS_ESPERA_POOL)
+
+
+def _antes_de_peticion():
+    g._metricas_inicio = time.perf_counter()
+    _hilo.sql = [0, 0.0]
+
+
+def _despues_de_peticion(response):
+    inicio = g.pop('_metricas_inicio', None)
+    if inicio is None:
+        return response
+
+    endpoint = request.endpoint or 'sin_ruta'
+    _observar('latencia', (endpoint, request.method, str(response.status_code)),
+              time.perf_counter() - inicio, BUCKETS_LATENCIA)
+
+    sql = getattr(_hilo, 'sql', None)
+    if sql is not None:
+        _observar('sentencias', (endpoint,), sql[0], BUCKETS_SENTENCIAS)
+        with _lock:
+            _metricas['sql_segundos'][endpoint] = _metricas['sql_segundos'].get(endpoint, 0.0) + sql[1]
+        _hilo.sql = None
+
+    _volcar_si_corresponde()
+    return response
+
+
+def _antes_de_sentencia(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_metricas_inicio', []).append(time.perf_counter())
+
+
+def _despues_de_sentencia(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('_metricas_inicio')
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    sql = getattr(_hilo, 'sql', None)
+    if sql is not None:
+        sql[0] += 1
+        sql[1] += duracion
+
+
+def instrumentar_pool(engine, nombre='web'):
+    """
+    Mide la espera para obtener una conexión del pool y registra su salud:
+    conexiones en uso, préstamos por encima de pool_size (overflow),
+    esperas agotadas, conexiones abiertas e invalidaciones.
+    """
+    pool = engine.pool
+    if getattr(pool, '_metricas_instrumentado', False):
+        return
+    obtener_original = pool._do_get
+
+    def _do_get_medido():
+        inicio = time.perf_counter()
+        try:
+            return obtener_original()
+        except exc.TimeoutError:
+            incrementar('acentrax_db_pool_timeouts_total', pool=nombre)
+            raise
+        finally:
+            observar_espera_pool(time.perf_counter() - inicio, nombre)
+
+    def _al_prestar(conexion_dbapi, registro, proxy):
+        ajustar_gauge('acentrax_db_pool_checked_out', 1, pool=nombre)
+        # overflow() cuenta las conexiones abiertas por encima de pool_size
+        if getattr(pool, 'overflow', None) and pool.overflow() > 0:
+            incrementar('acentrax_db_pool_overflow_checkouts_total', pool=nombre)
+
+    def _al_devolver(conexion_dbapi, registro):
+        ajustar_gauge('acentrax_db_pool_checked_out', -1, pool=nombre)
+
+    def _al_conectar(conexion_dbapi, registro):
+        incrementar('acentrax_db_pool_connections_opened_total', pool=nombre)
+
+    def _al_invalidar(tipo):
+        def _oyente(conexion_dbapi, registro, excepcion):
+            incrementar('acentrax_db_pool_invalidations_total', pool=nombre, tipo=tipo)
+            if excepcion is not None:
+                logger.warning('Conexión invalidada en el pool %s (%s): %s', nombre, tipo, excepcion)
+        return _oyente
+
+    pool._do_get = _do_get_medido
+    event.listen(pool, 'checkout', _al_prestar)
+    event.listen(pool, 'checkin', _al_devolver)
+    event.listen(pool, 'connect', _al_conectar)
+    event.listen(pool, 'invalidate', _al_invalidar('hard'))
+    event.listen(pool, 'soft_invalidate', _al_invalidar('soft'))
+    pool._metricas_instrumentado = True
+
+
+# =========================================================
+#  AGREGACIÓN ENTRE WORKERS
+# =========================================================
+
+def _carpeta():
+    return _ultimo_volcado.get('carpeta') or os.path.join(tempfile.gettempdir(), 'acentrax-metricas')
+
+
+def _serializar(metricas, pid):
+    def _histogramas(familia):
+        return [[list(k), list(v[0]), v[1], v[2]] for k, v in metricas[familia].items()]
+
+    return {
+        'pid': pid,
+        'latencia': _histogramas('latencia'),
+        'sentencias': _histogramas('sentencias'),
+        'espera_pool': _histogramas('espera_pool'),
+        'sql_segundos': [[k, v] for k, v in metricas['sql_segundos'].items()],
+        'contadores': [[k[0], [list(p) for p in k[1]], v] for k, v in metricas['contadores'].items()],
+        'gauges': [[k[0], [list(p) for p in k[1]], v] for k, v in metricas['gauges'].items()],
+    }
+
+
+def _instantanea():
+    with _lock:
+        return _serializar(_metricas, os.getpid())
+
+
+def _escribir(destino, datos):
+    # Temporal por hilo: /metrics y el volcado periódico pueden coincidir en un worker con hilos.
+    temporal = f"{destino}.{threading.get_ident()}.tmp"
+    with open(temporal, 'w') as f:
+        json.dump(datos, f)
+    os.replace(temporal, destino)
+
+
+def volcar_instantanea():
+    carpeta = _carpeta()
+    os.makedirs(carpeta, exist_ok=True)
+    _escribir(os.path.join(carpeta, f"{os.getpid()}.json"), _instantanea())
+    _ultimo_volcado['t'] = time.monotonic()
+
+
+def _volcar_si_corresponde():
+    if time.monotonic() - _ultimo_volcado['t'] >= _ultimo_volcado.get('intervalo', 5.0):
+        try:
+            volcar_instantanea()
+        except OSError as e:
+            logger.error('Error volcando métricas: %s', e)
+
+
+def _proceso_vivo(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _leer_instantaneas():
+    carpeta = _carpeta()
+    if not os.path.isdir(carpeta):
+        return
+    for nombre in os.listdir(carpeta):
+        if not nombre.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(carpeta, nombre)) as f:
+                yield json.load(f)
+        except (OSError, ValueError):
+            continue
+
+
+def _agregar(instantaneas=None):
+    total = {familia: {} for familia in _metricas}
+
+    for datos in (_leer_instantaneas() if instantaneas is None else instantaneas):
+        for familia in ('latencia', 'sentencias', 'espera_pool'):
+            for etiquetas, buckets, suma, cuenta in datos.get(familia, []):
+                serie = total[familia].setdefault(tuple(etiquetas), [[0] * len(buckets), 0.0, 0])
+                serie[0] = [a + b for a, b in zip(serie[0], buckets)]
+                serie[1] += suma
+                serie[2] += cuenta
+        for endpoint, segundos in datos.get('sql_segundos', []):
+            total['sql_segundos'][endpoint] = total['sql_segundos'].get(endpoint, 0.0) + segundos
+        for nombre, pares, valor in datos.get('contadores', []):
+            clave = (nombre, tuple(tuple(p) for p in pares))
+            total['contadores'][clave] = total['contadores'].get(clave, 0) + valor
+        if _proceso_vivo(datos.get('pid', 0)):
+            for nombre, pares, valor in datos.get('gauges', []):
+                clave = (nombre, tuple(tuple(p) for p in pares))
+                total['gauges'][clave] = total['gauges'].get(clave, 0) + valor
+
+    return total
+
+
+def retirar_worker(pid, carpeta=None):
+    """
+    Suma los contadores e histogramas de un worker terminado al histórico y
+    borra su instantánea; sus gauges se descartan. Lo llama el maestro de
+    gunicorn (child_exit), así que no compite con otro retiro.
+    """
+    carpeta = carpeta or _carpeta()
+    origen = os.path.join(carpeta, f"{pid}.json")
+    historico = os.path.join(carpeta, ARCHIVO_HISTORICO)
+    instantaneas = []
+    for ruta in (historico, origen):
+        try:
+            with open(ruta) as f:
+                instantaneas.append(json.load(f))
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as e:
+            logger.warning('Instantánea de métricas ilegible %s: %s', ruta, e)
+    if not os.path.exists(origen):
+        return
+
+    total = _agregar(instantaneas)
+    total['gauges'] = {}
+    _escribir(historico, _serializar(total, None))
+    os.remove(origen)
+
+
+# =========================================================
+#  FORMATO DE TEXTO DE PROMETHEUS
+# =========================================================
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(pares, extra=None):
+    texto = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in pares]
+    if extra:
+        texto.append(extra)
+    return '{' + ','.join(texto) + '}' if texto else ''
+
+
+def _histograma(lineas, nombre, ayuda, nombres_etiquetas, series, buckets):
+    lineas.append(f"# HELP {nombre} {ayuda}")
+    lineas.append(f"# TYPE {nombre} histogram")
+    for valores, (conteos, suma, cuenta) in sorted(series.items()):
+        pares = list(zip(nombres_etiquetas, valores))
+        acumulado = 0
+        for limite, conteo in zip(list(buckets) + ['+Inf'], conteos):
+            acumulado += conteo
+            le = f'le="{limite}"'
+            lineas.append(f"{nombre}_bucket{_etiquetas(pares, le)} {acumulado}")
+        lineas.append(f"{nombre}_sum{_etiquetas(pares)} {suma}")
+        lineas.append(f"{nombre}_count{_etiquetas(pares)} {cuenta}")
+
+
+def exportar_prometheus():
+    """Genera el texto de exposición con las métricas de todos los workers."""
+    volcar_instantanea()
+    total = _agregar()
+    lineas = []
+
+    _histograma(lineas, 'acentrax_http_request_duration_seconds',
+                'Latencia de las peticiones HTTP por endpoint, método y código de estado.',
+                ('endpoint', 'method', 'status'), total['latencia'], BUCKETS_LATENCIA)
+    _histograma(lineas, 'acentrax_sql_statements_per_request',
+                'Sentencias SQL ejecutadas por petición.',
+                ('endpoint',), total['sentencias'], BUCKETS_SENTENCIAS)
+    _histograma(lineas, 'acentrax_db_pool_checkout_wait_seconds',
+                'Tiempo de espera para obtener una conexión del pool.',
+                ('pool',), total['espera_pool'], BUCKETS_ESPERA_POOL)
+
+    lineas.append("# HELP acentrax_sql_seconds_total Tiempo total en sentencias SQL por endpoint.")
+    lineas.append("# TYPE acentrax_sql_seconds_total counter")
+    for endpoint, segundos in sorted(total['sql_segundos'].items()):
+        lineas.append(f"acentrax_sql_seconds_total{_etiquetas([('endpoint', endpoint)])} {segundos}")
+
+    declarados = set()
+    for (nombre, pares), valor in sorted(total['contadores'].items()):
+        if nombre not in declarados:
+            lineas.append(f"# TYPE {nombre} counter")
+            declarados.add(nombre)
+        lineas.append(f"{nombre}{_etiquetas(pares)} {valor}")
+
+    declarados = set()
+    for (nombre, pares), valor in sorted(total['gauges'].items()):
+        if nombre not in declarados:
+            lineas.append(f"# TYPE {nombre} gauge")
+            declarados.add(nombre)
+        lineas.append(f"{nombre}{_etiquetas(pares)} {valor}")
+
+    return "\n".join(lineas) + "\n"
+
+
+# =========================================================
+#  INICIALIZACIÓN
+# =========================================================
+
+def init_metricas(app):
+    """Registra los hooks de petición y los eventos del motor de base de datos."""
+    from extensions import db
+
+    _ultimo_volcado['carpeta'] = app.config.get('METRICS_DIR')
+    _ultimo_volcado['intervalo'] = app.config.get('METRICS_FLUSH_INTERVAL', 5.0)
+
+    app.before_request(_antes_de_peticion)
+    app.after_request(_despues_de_peticion)
+
+    with app.app_context():
+        for clave, engine in db.engines.items():
+            event.listen(engine, 'before_cursor_execute', _antes_de_sentencia)
+            event.listen(engine, 'after_cursor_execute', _despues_de_sentencia)
+            instrumentar_pool(engine, clave or 'web')
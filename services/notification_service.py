@@ -1,6 +1,9 @@
+import logging
 from flask import current_app, url_for
 from controllers.models import db, Notificacion, Usuario, Equipo
 from datetime import datetime
+
+logger = logging.getLogger(__name__)
 def crear_notificacion(usuario_id, titulo, mensaje, tipo='general', link=None, auto_commit=True):
     """Crea una nueva notificación para un usuario.
     
@@ -32,9 +35,28 @@ def crear_notificacion(usuario_id, titulo, mensaje, tipo='general', link=None, a
     except Exception as e:
         if auto_commit:
             db.session.rollback()
-        print(f"Error creando notificación: {str(e)}")
+        logger.error('Error creando notificación: %s', e)
         return None
 
+
+def crear_notificaciones_masivas(usuario_ids, titulo, mensaje, tipo='general', link=None):
+    """Crea la misma notificación para varios usuarios en un único INSERT de varias filas.
+
+    No hace commit: la notificación forma parte de la transacción de quien la llama.
+
+    Returns:
+        int: número de notificaciones creadas
+    """
+    ahora = datetime.utcnow()
+    filas = [
+        {'usuario_id': usuario_id, 'titulo': titulo, 'mensaje': mensaje, 'tipo': tipo,
+         'link': link, 'leida': False, 'creada_en': ahora}
+        for usuario_id in dict.fromkeys(usuario_ids)
+    ]
+    if filas:
+        db.session.execute(db.insert(Notificacion), filas)
+    return len(filas)
+
 def notificar_respuesta_solicitud(solicitud):
     """Envía notificación al padre cuando el profesor responde a una solicitud."""
     try:
@@ -57,7 +79,7 @@ def notificar_respuesta_solicitud(solicitud):
             link=link
         )
     except Exception as e:
-        print(f"Error notificando respuesta de solicitud: {str(e)}")
+        logger.error('Error notificando respuesta de solicitud: %s', e)
         return None
 
 def notificar_nueva_solicitud(solicitud):
@@ -75,7 +97,7 @@ def notificar_nueva_solicitud(solicitud):
             link=link
         )
     except Exception as e:
-        print(f"Error notificando nueva solicitud: {str(e)}")
+        logger.error('Error notificando nueva solicitud: %s', e)
         return None
 
 def obtener_notificaciones_no_leidas(usuario_id):
@@ -86,7 +108,7 @@ def obtener_notificaciones_no_leidas(usuario_id):
             leida=False
         ).order_by(Notificacion.creada_en.desc()).all()
     except Exception as e:
-        print(f"Error obteniendo notificaciones: {str(e)}")
+        logger.error('Error obteniendo notificaciones: %s', e)
         return []
 
 def contar_notificaciones_no_leidas(usuario_id):
@@ -97,7 +119,7 @@ def contar_notificaciones_no_leidas(usuario_id):
             leida=False
         ).count()
     except Exception as e:
-        print(f"Error contando notificaciones: {str(e)}")
+        logger.error('Error contando notificaciones: %s', e)
         return 0
 
 def marcar_notificacion_como_leida(notificacion_id, usuario_id):
@@ -115,7 +137,7 @@ def marcar_notificacion_como_leida(notificacion_id, usuario_id):
         return False
     except Exception as e:
         db.session.rollback()
-        print(f"Error marcando notificación como leída: {str(e)}")
+        logger.error('Error marcando notificación como leída: %s', e)
         return False
 
 def obtener_todas_notificaciones(usuario_id, limite=50):
@@ -125,7 +147,7 @@ def obtener_todas_notificaciones(usuario_id, limite=50):
             usuario_id=usuario_id
         ).order_by(Notificacion.creada_en.desc()).limit(limite).all()
     except Exception as e:
-        print(f"Error obteniendo todas las notificaciones: {str(e)}")
+        logger.error('Error obteniendo todas las notificaciones: %s', e)
         return []
 
 
@@ -172,7 +194,7 @@ def notificar_inicio_ciclo(ciclo_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error notificando inicio de ciclo: {str(e)}")
+        logger.error('Error notificando inicio de ciclo: %s', e)
         return 0
 
 
@@ -217,7 +239,7 @@ def notificar_inicio_periodo(periodo_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error notificando inicio de periodo: {str(e)}")
+        logger.error('Error notificando inicio de periodo: %s', e)
         return 0
 
 
@@ -267,7 +289,7 @@ def notificar_proximidad_cierre(periodo_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error notificando proximidad de cierre: {str(e)}")
+        logger.error('Error notificando proximidad de cierre: %s', e)
         return 0
 
 
@@ -321,7 +343,7 @@ def notificar_cierre_periodo(periodo_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error notificando cierre de periodo: {str(e)}")
+        logger.error('Error notificando cierre de periodo: %s', e)
         return 0
 
 
@@ -365,7 +387,7 @@ def notificar_fin_ciclo(ciclo_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error notificando fin de ciclo: {str(e)}")
+        logger.error('Error notificando fin de ciclo: %s', e)
         return 0
 
 
@@ -443,7 +465,7 @@ def notificar_promocion(estudiante_id, resultado, promedio, curso_destino_id=Non
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error notificando promoción: {str(e)}")
+        logger.error('Error notificando promoción: %s', e)
         return 0
 
 
@@ -491,25 +513,25 @@ def notificar_nuevo_incidente(incidente):
     try:
         from controllers.models import Rol
         
-        print(f"Iniciando notificación de incidente ID: {incidente.id_incidente}")
+        logger.debug('Iniciando notificación de incidente ID: %s', incidente.id_incidente)
         
         equipo = Equipo.query.get(incidente.equipo_id)
         if not equipo:
-            print(f"Equipo {incidente.equipo_id} no encontrado")
+            logger.warning('Equipo %s no encontrado', incidente.equipo_id)
             return 0
         
-        print(f"Equipo encontrado: {equipo.nombre}")
+        logger.debug('Equipo encontrado: %s', equipo.nombre)
         
         rol_superadmin = Rol.query.filter_by(id_rol=1).first()
         if not rol_superadmin:
-            print("Rol superadmin no encontrado")
+            logger.warning('Rol superadmin no encontrado')
             return 0
         
         admins = Usuario.query.filter_by(id_rol_fk=rol_superadmin.id_rol).all()
-        print(f"{len(admins)} administradores encontrados")
+        logger.debug('%s administradores encontrados', len(admins))
         
         if not admins:
-            print("No hay administradores para notificar")
+            logger.warning('No hay administradores para notificar')
             return 0
         
         # Construir mensaje
@@ -531,20 +553,18 @@ def notificar_nuevo_incidente(incidente):
                 )
                 db.session.add(notif)
                 contador += 1
-                print(f"Notificación creada para admin {admin.nombre_completo}")
+                logger.debug('Notificación creada para admin %s', admin.nombre_completo)
             except Exception as e:
-                print(f"Error creando notificación para admin {admin.id_usuario}: {str(e)}")
+                logger.error('Error creando notificación para admin %s: %s', admin.id_usuario, e)
                 continue
 
         db.session.flush()
         
-        print(f"Total notificaciones creadas: {contador}")
+        logger.debug('Total notificaciones creadas: %s', contador)
         return contador
         
     except Exception as e:
-        print(f"Error general notificando nuevo incidente: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('Error general notificando nuevo incidente: %s', e)
         return 0
     
 
@@ -557,14 +577,14 @@ def notificar_nuevo_evento(evento, admin_id=None):
     try:
         from controllers.models import Rol, Usuario
         
-        print(f"🎯 Iniciando notificaciones para evento: {evento.nombre}")
-        print(f"🎯 Rol destino: {evento.rol_destino}")
+        logger.debug('🎯 Iniciando notificaciones para evento: %s', evento.nombre)
+        logger.debug('🎯 Rol destino: %s', evento.rol_destino)
         
         # Convertir rol_destino a lista
         roles_destino = [r.strip() for r in evento.rol_destino.split(',')] if evento.rol_destino else []
         
         if not roles_destino:
-            print("❌ No hay roles destino definidos")
+            logger.warning('❌ No hay roles destino definidos')
             return 0
         
         contador = 0
@@ -589,20 +609,20 @@ def notificar_nuevo_evento(evento, admin_id=None):
                 auto_commit=False
             )
             contador += 1
-            print(f"   📨 Notificación de confirmación enviada al admin ID: {admin_id}")
+            logger.debug('📨 Notificación de confirmación enviada al admin ID: %s', admin_id)
         
         # ✅ CORRECCIÓN PRINCIPAL: OBTENER TODOS LOS USUARIOS DEL ROL DESTINO
         for rol_nombre in roles_destino:
             rol_nombre_clean = rol_nombre.strip().lower()
-            print(f"🔍 Buscando usuarios con rol: {rol_nombre_clean}")
+            logger.debug('🔍 Buscando usuarios con rol: %s', rol_nombre_clean)
             
             rol_obj = Rol.query.filter_by(nombre=rol_nombre_clean).first()
             if not rol_obj:
-                print(f"   ❌ Rol '{rol_nombre_clean}' no encontrado")
+                logger.warning("❌ Rol '%s' no encontrado", rol_nombre_clean)
                 continue
                 
             usuarios_rol = Usuario.query.filter_by(id_rol_fk=rol_obj.id_rol).all()
-            print(f"   👥 Encontrados {len(usuarios_rol)} usuarios con rol {rol_nombre_clean}")
+            logger.debug('👥 Encontrados %s usuarios con rol %s', len(usuarios_rol), rol_nombre_clean)
             
             # Determinar link según rol
             if rol_nombre_clean == 'estudiante':
@@ -625,17 +645,17 @@ def notificar_nuevo_evento(evento, admin_id=None):
                     auto_commit=False
                 )
                 contador += 1
-                print(f"      📨 Notificación enviada a {usuario.nombre_completo} (ID: {usuario.id_usuario})")
+                logger.debug('📨 Notificación enviada a %s (ID: %s)', usuario.nombre_completo, usuario.id_usuario)
         
         # ✅ CORRECCIÓN ADICIONAL: SI EL EVENTO ES PARA ESTUDIANTES, NOTIFICAR A TODOS LOS PADRES TAMBIÉN
         if 'estudiante' in [r.lower() for r in roles_destino]:
-            print("✅ Evento para estudiantes - Notificando a TODOS los padres también...")
+            logger.debug('✅ Evento para estudiantes - Notificando a TODOS los padres también...')
             
             rol_padre = Rol.query.filter_by(nombre='padre').first()
             if rol_padre:
                 # Obtener TODOS los padres, no solo los que tienen relaciones
                 todos_los_padres = Usuario.query.filter_by(id_rol_fk=rol_padre.id_rol).all()
-                print(f"   👨‍👩‍👧‍👦 Encontrados {len(todos_los_padres)} padres en el sistema")
+                logger.debug('👨‍👩‍👧‍👦 Encontrados %s padres en el sistema', len(todos_los_padres))
                 
                 for padre in todos_los_padres:
                     mensaje_padre = f"📋 Nuevo evento escolar para tu(s) hijo(s):\n\n{mensaje}"
@@ -648,19 +668,17 @@ def notificar_nuevo_evento(evento, admin_id=None):
                         auto_commit=False
                     )
                     contador += 1
-                    print(f"      📨 Notificación enviada a padre: {padre.nombre_completo} (ID: {padre.id_usuario})")
+                    logger.debug('📨 Notificación enviada a padre: %s (ID: %s)', padre.nombre_completo, padre.id_usuario)
         
         # Hacer commit de todas las notificaciones
         db.session.commit()
         
-        print(f"✅ Notificaciones enviadas exitosamente: {contador} notificaciones en total")
+        logger.debug('✅ Notificaciones enviadas exitosamente: %s notificaciones en total', contador)
         return contador
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error notificando evento: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('❌ Error notificando evento: %s', e)
         return 0
 
 def notificar_evento_actualizado(evento, admin_id=None):
@@ -693,7 +711,7 @@ def notificar_evento_actualizado(evento, admin_id=None):
                 auto_commit=False
             )
             contador += 1
-            print(f"   📨 Notificación de actualización enviada al admin ID: {admin_id}")
+            logger.debug('📨 Notificación de actualización enviada al admin ID: %s', admin_id)
         
         link = "/calendario"
         
@@ -713,7 +731,7 @@ def notificar_evento_actualizado(evento, admin_id=None):
                         auto_commit=False
                     )
                     contador += 1
-                    print(f"   📨 Notificación de actualización enviada a estudiante: {estudiante.nombre_completo}")
+                    logger.debug('📨 Notificación de actualización enviada a estudiante: %s', estudiante.nombre_completo)
                     
                     # Notificar a los padres del estudiante
                     padres_estudiante = db.session.execute(
@@ -734,7 +752,7 @@ def notificar_evento_actualizado(evento, admin_id=None):
                             auto_commit=False
                         )
                         contador += 1
-                        print(f"   📨 Notificación de actualización enviada a padre: {padre.nombre_completo}")
+                        logger.debug('📨 Notificación de actualización enviada a padre: %s', padre.nombre_completo)
         
         if 'Profesor' in roles_destino:
             rol_profesor = Rol.query.filter_by(nombre='profesor').first()
@@ -750,7 +768,7 @@ def notificar_evento_actualizado(evento, admin_id=None):
                         auto_commit=False
                     )
                     contador += 1
-                    print(f"   📨 Notificación de actualización enviada a profesor: {profesor.nombre_completo}")
+                    logger.debug('📨 Notificación de actualización enviada a profesor: %s', profesor.nombre_completo)
         
         if 'Padre' in roles_destino:
             rol_padre = Rol.query.filter_by(nombre='padre').first()
@@ -766,16 +784,16 @@ def notificar_evento_actualizado(evento, admin_id=None):
                         auto_commit=False
                     )
                     contador += 1
-                    print(f"   📨 Notificación de actualización enviada a padre: {padre.nombre_completo}")
+                    logger.debug('📨 Notificación de actualización enviada a padre: %s', padre.nombre_completo)
         
         db.session.commit()
         
-        print(f"✅ Notificaciones de evento actualizado enviadas: {contador} notificaciones")
+        logger.debug('✅ Notificaciones de evento actualizado enviadas: %s notificaciones', contador)
         return contador
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error notificando evento actualizado: {str(e)}")
+        logger.error('❌ Error notificando evento actualizado: %s', e)
         return 0
 
 def notificar_evento_eliminado(evento, admin_id=None):
@@ -805,7 +823,7 @@ def notificar_evento_eliminado(evento, admin_id=None):
                 auto_commit=False
             )
             contador += 1
-            print(f"   📨 Notificación de eliminación enviada al admin ID: {admin_id}")
+            logger.debug('📨 Notificación de eliminación enviada al admin ID: %s', admin_id)
         
         # Misma lógica de notificación
         if 'Estudiante' in roles_destino:
@@ -823,7 +841,7 @@ def notificar_evento_eliminado(evento, admin_id=None):
                         auto_commit=False
                     )
                     contador += 1
-                    print(f"   📨 Notificación de cancelación enviada a estudiante: {estudiante.nombre_completo}")
+                    logger.debug('📨 Notificación de cancelación enviada a estudiante: %s', estudiante.nombre_completo)
                     
                     padres_estudiante = db.session.execute(
                         db.select(Usuario).join(
@@ -843,7 +861,7 @@ def notificar_evento_eliminado(evento, admin_id=None):
                             auto_commit=False
                         )
                         contador += 1
-                        print(f"   📨 Notificación de cancelación enviada a padre: {padre.nombre_completo}")
+                        logger.debug('📨 Notificación de cancelación enviada a padre: %s', padre.nombre_completo)
         
         if 'Profesor' in roles_destino:
             rol_profesor = Rol.query.filter_by(nombre='profesor').first()
@@ -859,7 +877,7 @@ def notificar_evento_eliminado(evento, admin_id=None):
                         auto_commit=False
                     )
                     contador += 1
-                    print(f"   📨 Notificación de cancelación enviada a profesor: {profesor.nombre_completo}")
+                    logger.debug('📨 Notificación de cancelación enviada a profesor: %s', profesor.nombre_completo)
         
         if 'Padre' in roles_destino:
             rol_padre = Rol.query.filter_by(nombre='padre').first()
@@ -875,16 +893,16 @@ def notificar_evento_eliminado(evento, admin_id=None):
                         auto_commit=False
                     )
                     contador += 1
-                    print(f"   📨 Notificación de cancelación enviada a padre: {padre.nombre_completo}")
+                    logger.debug('📨 Notificación de cancelación enviada a padre: %s', padre.nombre_completo)
         
         db.session.commit()
         
-        print(f"✅ Notificaciones de evento cancelado enviadas: {contador} notificaciones")
+        logger.debug('✅ Notificaciones de evento cancelado enviadas: %s notificaciones', contador)
         return contador
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error notificando evento cancelado: {str(e)}")
+        logger.error('❌ Error notificando evento cancelado: %s', e)
         return 0
     
 # ============================================================================
@@ -898,9 +916,9 @@ def notificar_nuevo_mantenimiento(mantenimiento, admin_id=None):
     try:
         from controllers.models import Rol, Usuario
         
-        print(f"Iniciando notificaciones para mantenimiento ID: {mantenimiento.id_mantenimiento}")
-        print(f"Equipo: {mantenimiento.equipo.nombre if mantenimiento.equipo else 'N/A'}")
-        print(f"Sede: {mantenimiento.sede.nombre if mantenimiento.sede else 'N/A'}")
+        logger.debug('Iniciando notificaciones para mantenimiento ID: %s', mantenimiento.id_mantenimiento)
+        logger.debug('Equipo: %s', mantenimiento.equipo.nombre if mantenimiento.equipo else 'N/A')
+        logger.debug('Sede: %s', mantenimiento.sede.nombre if mantenimiento.sede else 'N/A')
         
         contador = 0
         
@@ -926,12 +944,12 @@ def notificar_nuevo_mantenimiento(mantenimiento, admin_id=None):
             )
             if notif_admin:
                 contador += 1
-                print(f"Notificación de confirmación creada para admin ID: {admin_id}")
+                logger.debug('Notificación de confirmación creada para admin ID: %s', admin_id)
         
         rol_superadmin = Rol.query.filter_by(id_rol=1).first()
         if rol_superadmin:
             admins = Usuario.query.filter_by(id_rol_fk=rol_superadmin.id_rol).all()
-            print(f"Encontrados {len(admins)} administradores para notificar")
+            logger.debug('Encontrados %s administradores para notificar', len(admins))
             
             for admin in admins:
                 if admin_id and admin.id_usuario == admin_id:
@@ -947,13 +965,11 @@ def notificar_nuevo_mantenimiento(mantenimiento, admin_id=None):
                 )
                 if notif:
                     contador += 1
-                    print(f"Notificación creada para admin: {admin.nombre_completo} (ID: {admin.id_usuario})")
+                    logger.debug('Notificación creada para admin: %s (ID: %s)', admin.nombre_completo, admin.id_usuario)
 
-        print(f"Total notificaciones de mantenimiento creadas: {contador}")
+        logger.debug('Total notificaciones de mantenimiento creadas: %s', contador)
         return contador
         
     except Exception as e:
-        print(f"Error notificando nuevo mantenimiento: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('Error notificando nuevo mantenimiento: %s', e)
         return 0
\ No newline at end of file
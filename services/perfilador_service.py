@@ -0,0 +1,308 @@
+"""
+Servicio de perfilado bajo demanda de peticiones
+
+Una petición se perfila si trae la cabecera firmada X-Perfilar o si cae en
+la fracción muestreada configurada desde el panel de administración. Para
+esas peticiones se captura un perfil de cProfile y las sentencias SQL con su
+duración; el resultado se guarda en instance/perfiles como <id>.prof
+(descargable para pstats/snakeviz) y <id>.json (resumen para el panel).
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from flask import current_app, g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+
+CABECERA_PERFILAR = 'X-Perfilar'
+SAL_TOKEN = 'perfilador-peticiones'
+MAX_SENTENCIAS = 500
+LARGO_SENTENCIA = 2000
+FUNCIONES_RESUMEN = 40
+
+_hilo = threading.local()
+# cProfile no admite dos perfiles activos a la vez en Python 3.12+
+_perfil_activo = threading.Lock()
+_ajustes = {'valor': None, 'leido_en': 0.0, 'mtime': None}
+
+
+# =========================================================
+#  AJUSTES (compartidos entre workers vía instance/)
+# =========================================================
+
+def carpeta_perfiles(app):
+    return os.path.join(app.instance_path, 'perfiles')
+
+
+def _ruta_ajustes(app):
+    return os.path.join(carpeta_perfiles(app), 'ajustes.json')
+
+
+def leer_ajustes(app):
+    """Devuelve {'tasa', 'endpoints'}; se relee del disco como máximo cada 5 segundos."""
+    ahora = time.monotonic()
+    if _ajustes['valor'] is not None and ahora - _ajustes['leido_en'] < 5.0:
+        return _ajustes['valor']
+
+    ruta = _ruta_ajustes(app)
+    try:
+        mtime = os.path.getmtime(ruta)
+    except OSError:
+        mtime = None
+
+    if _ajustes['valor'] is None or mtime != _ajustes['mtime']:
+        valor = {'tasa': float(app.config.get('PERFILADOR_TASA', 0.0)), 'endpoints': []}
+        if mtime is not None:
+            try:
+                with open(ruta, encoding='utf-8') as f:
+                    valor.update(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning('No se pudieron leer los ajustes del perfilador: %s', e)
+        _ajustes['valor'] = valor
+        _ajustes['mtime'] = mtime
+
+    _ajustes['leido_en'] = ahora
+    return _ajustes['valor']
+
+
+def guardar_ajustes(app, tasa, endpoints=None):
+    """
+    Guarda la fracción de peticiones a perfilar (0 desactiva el muestreo).
+
+    Returns:
+        tuple: (ajustes, error)
+    """
+    try:
+        tasa = float(tasa)
+    except (TypeError, ValueError):
+        return None, 'La tasa debe ser un número entre 0 y 1'
+    if not 0.0 <= tasa <= 1.0:
+        return None, 'La tasa debe ser un número entre 0 y 1'
+
+    ajustes = {'tasa': tasa, 'endpoints': [e.strip() for e in (endpoints or []) if e and e.strip()]}
+    carpeta = carpeta_perfiles(app)
+    os.makedirs(carpeta, exist_ok=True)
+    temporal = _ruta_ajustes(app) + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(ajustes, f)
+    os.replace(temporal, _ruta_ajustes(app))
+    _ajustes['valor'] = None
+    return ajustes, None
+
+
+# =========================================================
+#  TOKEN FIRMADO PARA PERFILAR UNA PETICIÓN CONCRETA
+# =========================================================
+
+def generar_token_perfilado(app, usuario_id):
+    serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'])
+    return serializer.dumps({'usuario': usuario_id}, salt=SAL_TOKEN)
+
+
+def _token_valido(token):
+    serializer = URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
+    try:
+        serializer.loads(token, salt=SAL_TOKEN, max_age=current_app.config.get('PERFILADOR_TOKEN_TTL', 3600))
+    except BadSignature:
+        return False
+    return True
+
+
+# =========================================================
+#  HOOKS DE PETICIÓN Y DE SQL
+# =========================================================
+
+def _debe_perfilar():
+    token = request.headers.get(CABECERA_PERFILAR)
+    if token is not None:
+        return 'cabecera' if _token_valido(token) else None
+
+    ajustes = leer_ajustes(current_app)
+    if ajustes['tasa'] <= 0.0:
+        return None
+    if ajustes['endpoints'] and request.endpoint not in ajustes['endpoints']:
+        return None
+    return 'muestreo' if random.random() < ajustes['tasa'] else None
+
+
+def _antes_de_peticion():
+    origen = _debe_perfilar()
+    if origen is None or not _perfil_activo.acquire(blocking=False):
+        return
+
+    g._perfil = {
+        'origen': origen,
+        'inicio': time.perf_counter(),
+        'profiler': cProfile.Profile(),
+    }
+    _hilo.sentencias = []
+    g._perfil['profiler'].enable()
+
+
+def _despues_de_peticion(response):
+    perfil = g.pop('_perfil', None)
+    if perfil is None:
+        return response
+
+    perfil['profiler'].disable()
+    duracion = time.perf_counter() - perfil['inicio']
+    sentencias, _hilo.sentencias = _hilo.sentencias, None
+    _perfil_activo.release()
+
+    metadatos = {
+        'id': uuid.uuid4().hex,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'endpoint': request.endpoint or 'sin_ruta',
+        'metodo': request.method,
+        'ruta': request.path,
+        'estado': response.status_code,
+        'origen': perfil['origen'],
+        'duracion_ms': round(duracion * 1000, 2),
+        'sql_total': len(sentencias),
+        'sql_ms': round(sum(s['ms'] for s in sentencias), 2),
+    }
+    app = current_app._get_current_object()
+    profiler = perfil['profiler']
+
+    # Los artefactos se escriben cuando la respuesta ya se envió al cliente.
+    response.call_on_close(lambda: _guardar_perfil(app, metadatos, profiler, sentencias))
+    response.headers['X-Perfil-Id'] = metadatos['id']
+    return response
+
+
+def _al_terminar(exc):
+    # Si la petición falló antes de after_request, se libera el perfilador.
+    perfil = g.pop('_perfil', None)
+    if perfil is not None:
+        perfil['profiler'].disable()
+        _hilo.sentencias = None
+        _perfil_activo.release()
+
+
+def _antes_de_sentencia(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_hilo, 'sentencias', None) is not None:
+        conn.info.setdefault('_perfil_inicio', []).append(time.perf_counter())
+
+
+def _despues_de_sentencia(conn, cursor, statement, parameters, context, executemany):
+    sentencias = getattr(_hilo, 'sentencias', None)
+    inicios = conn.info.get('_perfil_inicio')
+    if sentencias is None or not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    if len(sentencias) < MAX_SENTENCIAS:
+        sentencias.append({'sql': statement[:LARGO_SENTENCIA], 'ms': round(duracion * 1000, 3)})
+
+
+# =========================================================
+#  ARTEFACTOS
+# =========================================================
+
+def _guardar_perfil(app, metadatos, profiler, sentencias):
+    carpeta = carpeta_perfiles(app)
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+        profiler.dump_stats(os.path.join(carpeta, f"{metadatos['id']}.prof"))
+
+        salida = io.StringIO()
+        pstats.Stats(profiler, stream=salida).sort_stats('cumulative').print_stats(FUNCIONES_RESUMEN)
+
+        datos = dict(metadatos, resumen=salida.getvalue(), sentencias=sentencias)
+        with open(os.path.join(carpeta, f"{metadatos['id']}.json"), 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False)
+
+        _podar_perfiles(carpeta, app.config.get('PERFILADOR_MAXIMO', 200))
+        logger.info(
+            'Perfil %s guardado: %s %s (%s ms, %s SQL)',
+            metadatos['id'], metadatos['metodo'], metadatos['endpoint'],
+            metadatos['duracion_ms'], metadatos['sql_total']
+        )
+    except OSError as e:
+        logger.error('Error guardando perfil: %s', e)
+
+
+def _podar_perfiles(carpeta, maximo):
+    archivos = sorted(
+        (a for a in os.listdir(carpeta) if a.endswith('.json') and a != 'ajustes.json'),
+        key=lambda a: os.path.getmtime(os.path.join(carpeta, a)),
+        reverse=True
+    )
+    for archivo in archivos[maximo:]:
+        base = os.path.join(carpeta, archivo[:-5])
+        for extension in ('.json', '.prof'):
+            try:
+                os.remove(base + extension)
+            except OSError:
+                pass
+
+
+def listar_perfiles(app, endpoint=None, limite=100):
+    """Perfiles más recientes (sin el detalle), opcionalmente de un endpoint."""
+    carpeta = carpeta_perfiles(app)
+    if not os.path.isdir(carpeta):
+        return []
+
+    perfiles = []
+    for archivo in os.listdir(carpeta):
+        if not archivo.endswith('.json') or archivo == 'ajustes.json':
+            continue
+        try:
+            with open(os.path.join(carpeta, archivo), encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if endpoint and datos.get('endpoint') != endpoint:
+            continue
+        datos.pop('resumen', None)
+        datos.pop('sentencias', None)
+        perfiles.append(datos)
+
+    perfiles.sort(key=lambda p: p['fecha'], reverse=True)
+    return perfiles[:limite]
+
+
+def leer_perfil(app, perfil_id):
+    """Devuelve el detalle de un perfil, o None si no existe."""
+    ruta = os.path.join(carpeta_perfiles(app), f"{secure_filename(perfil_id)}.json")
+    if not os.path.isfile(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# =========================================================
+#  INICIALIZACIÓN
+# =========================================================
+
+def init_perfilador(app):
+    """
+    Registra los hooks del perfilador. Con PERFILADOR_HABILITADO=False no se
+    registra nada; habilitado pero sin muestreo ni cabecera, cada petición solo
+    consulta una cabecera y unos ajustes en memoria.
+    """
+    if not app.config.get('PERFILADOR_HABILITADO', True):
+        return
+
+    from extensions import db
+
+    app.before_request(_antes_de_peticion)
+    app.after_request(_despues_de_peticion)
+    app.teardown_request(_al_terminar)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _antes_de_sentencia)
+        event.listen(db.engine, 'after_cursor_execute', _despues_de_sentencia)
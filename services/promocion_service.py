@@ -2,6 +2,7 @@
 Servicio para gestión de Promoción de Estudiantes
 """
 
+import logging
 from datetime import datetime
 from controllers.models import (
     db, CicloAcademico, PeriodoAcademico, Matricula, Calificacion, 
@@ -10,6 +11,8 @@ from controllers.models import (
 from sqlalchemy import and_, func
 from decimal import Decimal
 
+logger = logging.getLogger(__name__)
+
 
 def calcular_promedio_final_estudiante(estudiante_id, ciclo_id):
     """
@@ -71,7 +74,7 @@ def obtener_nota_minima_aprobacion():
         return Decimal('3.0')
         
     except Exception as e:
-        print(f"Error obteniendo nota mínima: {e}")
+        logger.error('Error obteniendo nota mínima: %s', e)
         return Decimal('3.0')
 
 
@@ -109,7 +112,7 @@ def obtener_curso_siguiente(curso_actual_id):
         return curso_siguiente.id_curso if curso_siguiente else None
         
     except Exception as e:
-        print(f"Error obteniendo curso siguiente: {e}")
+        logger.error('Error obteniendo curso siguiente: %s', e)
         return None
 
 
@@ -408,7 +411,7 @@ def crear_matriculas_nuevo_ciclo(ciclo_nuevo_id):
                     db.session.add(nueva_matricula)
                     matriculas_creadas += 1
                 except Exception as e:
-                    print(f"Error creando matrícula para estudiante {mat_anterior.estudianteId}: {e}")
+                    logger.error('Error creando matrícula para estudiante %s: %s', mat_anterior.estudianteId, e)
                     errores += 1
         
         db.session.commit()
@@ -0,0 +1,211 @@
+"""
+Servicio de lecturas en réplica
+
+Con DB_REPLICA_URL definido, las vistas marcadas con @solo_lectura (y los
+bloques `with lectura_en_replica():`) consultan la réplica en lugar de la
+primaria. La réplica se descarta, y se lee de la primaria, cuando:
+
+    - el usuario escribió hace menos de DB_REPLICA_ADHERENCIA segundos
+      (lee lo que acaba de escribir, aunque la réplica no lo tenga aún);
+    - la propia petición ya escribió (flush o sentencia DML);
+    - el retraso medido de la réplica supera DB_REPLICA_RETRASO_MAXIMO o
+      la réplica no responde.
+
+El retraso se mide con un latido: cada DB_REPLICA_VERIFICACION segundos el
+worker escribe la hora en version_datos ('replica_latido') en la primaria y
+compara el latido anterior con el que ve la réplica. No requiere permisos
+de replicación y funciona igual con dos bases SQLite locales.
+
+Las escrituras dentro de una vista de solo lectura siempre van a la primaria
+(ver extensions.SesionEnrutada).
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request, session
+from sqlalchemy import event, select
+
+from extensions import SesionEnrutada, db, pool_actual
+from services.base_datos_service import POOL_LECTURA, sentencia_insertar_o_actualizar
+
+logger = logging.getLogger(__name__)
+
+
+CLAVE_LATIDO = 'replica_latido'
+METODOS_ESCRITURA = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+_estado = {'verificado': 0.0, 'retraso': None}
+_cerrojo = threading.Lock()
+
+
+# =========================================================
+#  RETRASO DE LA RÉPLICA
+# =========================================================
+
+def _leer_latido(conexion):
+    from controllers.models import VersionDatos
+
+    return conexion.execute(
+        select(VersionDatos.actualizado_en).where(VersionDatos.clave == CLAVE_LATIDO)
+    ).scalar()
+
+
+def medir_retraso():
+    """
+    Segundos de retraso estimados (cota superior) o None si la réplica no
+    responde. Escribe un latido nuevo en la primaria.
+    """
+    from controllers.models import VersionDatos
+
+    ahora = datetime.utcnow()
+    try:
+        with db.engines[None].begin() as primaria:
+            anterior = _leer_latido(primaria)
+            primaria.execute(sentencia_insertar_o_actualizar(
+                VersionDatos, {'clave': CLAVE_LATIDO, 'version': 1, 'actualizado_en': ahora},
+                claves=['clave'],
+                actualizar={'version': VersionDatos.version + 1, 'actualizado_en': ahora}
+            ))
+        with db.engines[POOL_LECTURA].connect() as replica:
+            visto = _leer_latido(replica)
+    except Exception as e:
+        logger.warning('No se pudo medir el retraso de la réplica: %s', e)
+        return None
+
+    if anterior is None or visto is None:
+        # Primer latido, o la réplica aún no recibió ninguno: no hay con qué comparar
+        return None
+    if visto >= anterior:
+        return 0.0
+    return (ahora - visto).total_seconds()
+
+
+def _al_dia(retraso):
+    return retraso is not None and retraso <= current_app.config.get('DB_REPLICA_RETRASO_MAXIMO', 5.0)
+
+
+def retraso_replica():
+    """Retraso de la réplica, medido como mucho una vez cada DB_REPLICA_VERIFICACION segundos."""
+    intervalo = current_app.config.get('DB_REPLICA_VERIFICACION', 5.0)
+    if time.monotonic() - _estado['verificado'] >= intervalo and _cerrojo.acquire(blocking=False):
+        try:
+            retraso = medir_retraso()
+            if _al_dia(retraso) != _al_dia(_estado['retraso']):
+                if _al_dia(retraso):
+                    logger.info('Réplica disponible (retraso %.1f s)', retraso)
+                else:
+                    logger.warning('Réplica descartada (retraso %s s): se lee de la primaria', retraso)
+            _estado.update(retraso=retraso, verificado=time.monotonic())
+        finally:
+            _cerrojo.release()
+    return _estado['retraso']
+
+
+# =========================================================
+#  ENRUTAMIENTO
+# =========================================================
+
+def _motivo_primaria():
+    """None si la lectura puede ir a la réplica; si no, el motivo para usar la primaria."""
+    if POOL_LECTURA not in db.engines:
+        return 'sin_replica'
+    if has_request_context():
+        if g.get('_replica_escribio'):
+            return 'escritura'
+        if session.get('_primaria_hasta', 0) > time.time():
+            return 'adherencia'
+    if not _al_dia(retraso_replica()):
+        return 'retraso'
+    return None
+
+
+@contextmanager
+def lectura_en_replica():
+    """Dirige a la réplica las consultas del bloque, si está disponible y al día."""
+    from services.metricas_service import incrementar
+
+    if not current_app.config.get('DB_REPLICA_URL'):
+        yield
+        return
+
+    motivo = _motivo_primaria()
+    incrementar('acentrax_db_replica_routing_total', destino='primaria' if motivo else 'replica',
+                motivo=motivo or 'lectura')
+    if motivo:
+        yield
+        return
+
+    token = pool_actual.set(POOL_LECTURA)
+    try:
+        yield
+    finally:
+        pool_actual.reset(token)
+
+
+@contextmanager
+def lectura_en_primaria():
+    """Dirige a la primaria las consultas del bloque, aunque esté dentro de una vista @solo_lectura."""
+    if pool_actual.get() != POOL_LECTURA:
+        yield
+        return
+
+    token = pool_actual.set(None)
+    try:
+        yield
+    finally:
+        pool_actual.reset(token)
+
+
+def solo_lectura(vista):
+    """Marca una vista como de solo lectura: sus consultas pueden ir a la réplica."""
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        with lectura_en_replica():
+            return vista(*args, **kwargs)
+    return envoltura
+
+
+# =========================================================
+#  LEER LO ESCRITO (ADHERENCIA)
+# =========================================================
+
+def _marcar_escritura():
+    # El resto de la petición lee de la primaria
+    if pool_actual.get() == POOL_LECTURA:
+        pool_actual.set(None)
+    if has_request_context():
+        g._replica_escribio = True
+
+
+def _despues_de_flush(sesion, contexto):
+    _marcar_escritura()
+
+
+def _al_ejecutar(estado):
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        _marcar_escritura()
+
+
+def _despues_de_peticion(response):
+    if g.pop('_replica_escribio', False) or request.method in METODOS_ESCRITURA:
+        session['_primaria_hasta'] = time.time() + current_app.config.get('DB_REPLICA_ADHERENCIA', 10.0)
+    return response
+
+
+def init_replica(app):
+    """Registra el seguimiento de escrituras si hay réplica configurada."""
+    if not app.config.get('DB_REPLICA_URL'):
+        return
+    if POOL_LECTURA not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        logger.warning('DB_REPLICA_URL se ignora con el perfil %s', app.config.get('DB_PERFIL'))
+        app.config['DB_REPLICA_URL'] = None
+        return
+
+    event.listen(SesionEnrutada, 'after_flush', _despues_de_flush)
+    event.listen(SesionEnrutada, 'do_orm_execute', _al_ejecutar)
+    app.after_request(_despues_de_peticion)
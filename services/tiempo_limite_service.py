@@ -0,0 +1,101 @@
+"""
+Servicio de tiempos límite por clase de ruta
+
+Con workers gthread o gevent, el timeout de gunicorn solo vigila el latido
+del worker, no cada petición; y con workers sync mataría el proceso entero.
+Por eso cada petición recibe un plazo según su clase (interactiva, reporte
+o exportación) y, si lo supera, la siguiente sentencia SQL lanza
+TiempoAgotado: la ruta hace rollback y responde con error sin bloquear el
+hilo ni el pool de conexiones.
+"""
+
+import logging
+import time
+
+from flask import g, jsonify, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+# Rutas que pueden superar el plazo interactivo; el resto es 'interactiva'
+CLASES_RUTA = {
+    'admin.exportar_datos': 'exportacion',
+    'profesor.api_exportar_calificaciones': 'exportacion',
+    'admin.api_descargar_boletines': 'exportacion',
+    'admin.api_descargar_perfil': 'exportacion',
+    'admin.api_generar_boletines': 'reporte',
+    'admin.api_generar_reporte_promocion': 'reporte',
+    'admin.api_reportes_ciclo': 'reporte',
+    'admin.api_reportes_periodo': 'reporte',
+    'admin.api_reportes_equipos_por_sede': 'reporte',
+    'profesor.api_generar_reporte_calificaciones': 'reporte',
+}
+
+LIMITES_PREDETERMINADOS = {'interactiva': 30, 'reporte': 120, 'exportacion': 300}
+
+
+class TiempoAgotado(Exception):
+    """La petición superó el tiempo límite de su clase de ruta."""
+
+
+def limites_por_clase(valor):
+    """Acepta un dict o una cadena 'interactiva=30,reporte=120,exportacion=300'."""
+    limites = dict(LIMITES_PREDETERMINADOS)
+    if isinstance(valor, dict):
+        limites.update({k: float(v) for k, v in valor.items()})
+        return limites
+    for par in (valor or '').split(','):
+        if '=' in par:
+            clase, segundos = par.split('=', 1)
+            limites[clase.strip()] = float(segundos)
+    return limites
+
+
+def clase_de_ruta(endpoint):
+    return CLASES_RUTA.get(endpoint, 'interactiva')
+
+
+def _antes_de_peticion():
+    from flask import current_app
+
+    clase = clase_de_ruta(request.endpoint)
+    limite = current_app.config['_LIMITES_RUTAS'].get(clase)
+    if limite:
+        g._plazo = (time.monotonic() + limite, clase, limite)
+
+
+def _antes_de_sentencia(conn, cursor, statement, parameters, context, executemany):
+    plazo = g.get('_plazo') if g else None
+    if plazo is not None and time.monotonic() > plazo[0]:
+        g._plazo = None
+        raise TiempoAgotado(f"Tiempo límite de la petición agotado ({plazo[2]:g} s, clase {plazo[1]})")
+
+
+def _manejar_tiempo_agotado(error):
+    from extensions import db
+    from services.metricas_service import incrementar
+
+    db.session.rollback()
+    clase = clase_de_ruta(request.endpoint)
+    incrementar('acentrax_requests_timed_out_total', clase=clase)
+    logger.warning('%s %s: %s', request.method, request.path, error)
+    return jsonify({'success': False, 'message': 'La operación tardó demasiado. Intenta de nuevo más tarde.'}), 503
+
+
+def init_tiempo_limite(app):
+    """Registra el plazo por petición y la comprobación antes de cada sentencia."""
+    from extensions import db
+
+    limites = limites_por_clase(app.config.get('TIEMPO_LIMITE_RUTAS'))
+    app.config['_LIMITES_RUTAS'] = limites
+    if not any(limites.values()):
+        return
+
+    app.before_request(_antes_de_peticion)
+    # Solo llega aquí si la ruta no captura la excepción con su propio except.
+    app.register_error_handler(TiempoAgotado, _manejar_tiempo_agotado)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _antes_de_sentencia)
@@ -0,0 +1,212 @@
+"""
+Servicio de caché para resultados y candidatos del sistema de votación
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from controllers.models import db, Candidato, EstadoPublicacion, VersionDatos
+from services.base_datos_service import insertar_o_actualizar
+from services.imagen_service import urls_rendiciones
+
+
+# Los candidatos solo cambian con su alta, edición o baja; los resultados,
+# además, al publicarlos u ocultarlos. Los votos no incrementan ninguna versión:
+# los resultados se reconstruyen como mucho una vez cada ELECCION_RESULTADOS_INTERVALO
+# segundos, así que votar no bloquea ninguna fila compartida.
+CLAVE_VERSION_CANDIDATOS = 'eleccion:candidatos'
+CLAVE_VERSION_RESULTADOS = 'eleccion:resultados'
+_CLAVES_SNAPSHOT = {'candidatos': CLAVE_VERSION_CANDIDATOS, 'resultados': CLAVE_VERSION_RESULTADOS}
+
+_lock = threading.Lock()
+_version_local = {'valor': None, 'leida_en': 0.0}
+_snapshots = {}
+
+
+def _incrementar(claves):
+    ahora = datetime.utcnow()
+    insertar_o_actualizar(
+        VersionDatos,
+        [{'clave': clave, 'version': 1, 'actualizado_en': ahora} for clave in claves],
+        claves=['clave'],
+        actualizar={'version': VersionDatos.version + 1, 'actualizado_en': ahora}
+    )
+    db.session.info['invalidar_eleccion'] = True
+
+
+def incrementar_version_candidatos():
+    """
+    Invalida la lista de candidatos y los resultados (que muestran sus datos)
+    dentro de la transacción actual, tras crear, editar o borrar un candidato.
+
+    No hace commit: la caché local se invalida solo cuando la transacción se
+    confirma.
+    """
+    _incrementar([CLAVE_VERSION_CANDIDATOS, CLAVE_VERSION_RESULTADOS])
+
+
+def incrementar_version_resultados():
+    """Invalida los resultados dentro de la transacción actual (publicar u ocultar)."""
+    _incrementar([CLAVE_VERSION_RESULTADOS])
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_tras_commit(session):
+    if session.info.pop('invalidar_eleccion', False):
+        _version_local['leida_en'] = 0.0
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_tras_rollback(session):
+    session.info.pop('invalidar_eleccion', None)
+
+
+def obtener_versiones_eleccion():
+    """
+    Devuelve {clave: version} de los candidatos y los resultados.
+
+    Las versiones se releen de la base de datos como máximo una vez cada
+    ELECCION_VERSION_TTL segundos por worker, de modo que el sondeo de los
+    estudiantes no consulta la base de datos en cada petición.
+    """
+    ahora = time.monotonic()
+    ttl = current_app.config.get('ELECCION_VERSION_TTL', 1.0)
+    if _version_local['valor'] is None or ahora - _version_local['leida_en'] >= ttl:
+        filas = db.session.execute(
+            select(VersionDatos.clave, VersionDatos.version)
+            .where(VersionDatos.clave.in_(list(_CLAVES_SNAPSHOT.values())))
+        ).all()
+        _version_local['valor'] = dict(filas)
+        _version_local['leida_en'] = ahora
+    return _version_local['valor']
+
+
+def _version_snapshot(nombre):
+    version = obtener_versiones_eleccion().get(_CLAVES_SNAPSHOT[nombre], 0)
+    if nombre == 'resultados':
+        # Los votos cambian los recuentos sin incrementar la versión
+        intervalo = current_app.config.get('ELECCION_RESULTADOS_INTERVALO', 5.0)
+        return version, int(time.time() // intervalo) if intervalo > 0 else time.monotonic()
+    return version
+
+
+def _obtener_snapshot(nombre, construir):
+    """Devuelve (version, etag, cuerpo) del snapshot, reconstruyéndolo una sola vez por versión."""
+    version = _version_snapshot(nombre)
+    snapshot = _snapshots.get(nombre)
+    if snapshot and snapshot[0] == version:
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshots.get(nombre)
+        if snapshot and snapshot[0] == version:
+            return snapshot
+
+        cuerpo = current_app.json.dumps(construir()).encode('utf-8')
+        # ETag por contenido: reconstruir sin cambios sigue respondiendo 304
+        etag = f"{nombre}-{hashlib.sha1(cuerpo).hexdigest()[:16]}"
+        snapshot = (version, etag, cuerpo)
+        _snapshots[nombre] = snapshot
+        return snapshot
+
+
+def respuesta_cacheada(nombre, construir, privada=False):
+    """
+    Sirve un snapshot de la elección con ETag fuerte y responde 304 si el
+    cliente ya tiene la versión vigente. La comparación es débil: comprimida
+    (services/compresion_service.py) la respuesta lleva la misma ETag como W/.
+    """
+    _, etag, cuerpo = _obtener_snapshot(nombre, construir)
+
+    if request.if_none_match.contains_weak(etag):
+        respuesta = current_app.response_class(status=304)
+    else:
+        respuesta = current_app.response_class(cuerpo, mimetype='application/json')
+
+    respuesta.set_etag(etag)
+    respuesta.headers['Cache-Control'] = 'private, no-cache' if privada else 'public, no-cache'
+    return respuesta
+
+
+def _clave_categoria(categoria):
+    cat = (categoria or '').strip().lower()
+    if cat in ('personero', 'personero estudiantil'):
+        return 'personero'
+    if cat in ('contralor', 'contralor estudiantil'):
+        return 'contralor'
+    if cat in ('cabildante', 'cabildante estudiantil'):
+        return 'cabildante'
+    return None
+
+
+def construir_resultados_publicos():
+    """Construye el payload de /admin/resultados-publicos."""
+    estado = EstadoPublicacion.query.first()
+
+    if not estado or not estado.resultados_publicados:
+        return {
+            'success': True,
+            'resultados_publicados': False,
+            'message': 'Los resultados no están disponibles públicamente.'
+        }
+
+    candidatos = Candidato.query.order_by(Candidato.id_candidato).all()
+    resultados = {
+        'personero': [],
+        'contralor': [],
+        'cabildante': []
+    }
+
+    for candidato in candidatos:
+        key = _clave_categoria(candidato.categoria)
+        if key:
+            resultados[key].append({
+                'id': candidato.id_candidato,
+                'nombre': candidato.nombre,
+                'tarjeton': candidato.tarjeton,
+                'propuesta': candidato.propuesta,
+                'foto': candidato.foto,
+                'fotos': urls_rendiciones(candidato.foto),
+                'votos': candidato.votos or 0,
+                'categoria': candidato.categoria
+            })
+
+    for categoria in resultados:
+        resultados[categoria].sort(key=lambda x: x['votos'], reverse=True)
+
+    version = db.session.get(VersionDatos, CLAVE_VERSION_RESULTADOS)
+    timestamp = version.actualizado_en if version and version.actualizado_en else estado.ultima_actualizacion
+
+    return {
+        'success': True,
+        'resultados_publicados': True,
+        'resultados': resultados,
+        'total_votos': sum(c.votos or 0 for c in candidatos),
+        'fecha_publicacion': estado.fecha_publicacion.isoformat() if estado.fecha_publicacion else None,
+        'publicado_por': estado.usuario_publico,
+        'timestamp': timestamp.isoformat() if timestamp else None
+    }
+
+
+def construir_candidatos_agrupados():
+    """Construye el payload de /estudiante/candidatos agrupado por categoría."""
+    data = {}
+
+    for c in Candidato.query.order_by(Candidato.id_candidato).all():
+        data.setdefault(c.categoria, []).append({
+            "id": c.id_candidato,
+            "nombre": c.nombre,
+            "tarjeton": c.tarjeton,
+            "propuesta": c.propuesta,
+            "categoria": c.categoria,
+            "foto": c.foto.split('/')[-1] if c.foto else None,
+            "fotos": urls_rendiciones(c.foto)
+        })
+
+    return data
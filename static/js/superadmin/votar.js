@@ -143,13 +143,18 @@ document.addEventListener("DOMContentLoaded", () => {
         contenedor.innerHTML = "";
 
         lista.forEach(c => {
-            const fotoURL = `/static/images/candidatos/${c.foto || 'default.png'}`;
+            const fotoURL = c.fotos ? c.fotos.src : `/static/images/candidatos/${c.foto || 'default.png'}`;
+            const fuentes = c.fotos ? `
+                        <source type="image/webp" srcset="${c.fotos.webp}" sizes="(max-width: 768px) 100vw, 320px">
+                        <source type="image/jpeg" srcset="${c.fotos.jpg}" sizes="(max-width: 768px) 100vw, 320px">` : '';
             const col = document.createElement("div");
             col.classList.add("col-md-4", "mb-4");
             col.innerHTML = `
                 <div class="card h-100 candidate-card" data-categoria="${categoria}" data-id="${c.id}">
-                    <img src="${fotoURL}" class="card-img-top" alt="Foto de ${c.nombre}" 
-                         onerror="this.src='/static/images/candidatos/default.png'">
+                    <picture>${fuentes}
+                        <img src="${fotoURL}" class="card-img-top" alt="Foto de ${c.nombre}" loading="lazy"
+                             onerror="this.src='/static/images/candidatos/default.png'">
+                    </picture>
                     <div class="card-body text-center">
                         <h5 class="card-title">${c.nombre}</h5>
                         <div class="tarjeton">Tarjetón ${c.tarjeton}</div>